@@ -39,6 +39,7 @@ from routes.planning import bp as planning_bp
 from routes.goals import bp as goals_bp
 from routes.financial_expenses import bp as financial_expenses_bp
 from routes.merchant_aliases import bp as merchant_aliases_bp
+from routes.imports import bp as imports_bp
 
 # Permite subir o app (CI/testes/smoke) sem tentar conectar no Supabase
 SKIP_DB_INIT = os.getenv("SKIP_DB_INIT", "false").strip().lower() == "true"
@@ -147,6 +148,7 @@ try:
         from repositories.goal_repository_supabase import GoalRepositorySupabase
         from repositories.merchant_alias_repository_supabase import MerchantAliasRepositorySupabase
         from repositories.financial_expense_repository_supabase import FinancialExpenseRepository
+        from repositories.transaction_aggregate_repository_supabase import TransactionAggregateRepository
 
         app.config['SUPABASE'] = db_client
         app.config['OAUTH_STATES'] = db_client.table('oauth_states')
@@ -158,6 +160,7 @@ try:
         app.config['GOAL_REPO'] = GoalRepositorySupabase()
         app.config['MERCHANT_ALIAS_REPO'] = MerchantAliasRepositorySupabase()
         app.config['FINANCIAL_EXPENSE_REPO'] = FinancialExpenseRepository()
+        app.config['TRANSACTION_AGGREGATE_REPO'] = TransactionAggregateRepository()
         # E-mails extra para alertas administrativos (vírgulas). Se vazio, usa admins ativos em public.users.
         app.config['ADMIN_ALERT_EMAILS'] = os.getenv('ADMIN_ALERT_EMAILS', '').strip()
 
@@ -165,6 +168,13 @@ try:
         app.config['CATEGORIES'] = app.config['CATEGORY_REPO']
         app.config['TRANSACTIONS'] = app.config['TRANSACTION_REPO']
         app.config['ACCOUNTS'] = app.config['ACCOUNT_REPO']
+
+        # Fila de importações assíncronas (SQLite local + pool de threads; ver services/import_jobs.py)
+        from services.import_jobs import ImportJobQueue
+        from services.transaction_import_service import run_import_job
+        app.config['IMPORT_JOBS'] = ImportJobQueue.from_env(
+            lambda job, progress: run_import_job(app.config, job, progress)
+        )
     else:
         logger.warning("⚠️  SKIP_DB_INIT=true: pulando init_db()/get_db() (CI/Testes/Smoke)")
         app.config['DB'] = None
@@ -218,6 +228,12 @@ if not SKIP_DB_INIT:
     app.register_blueprint(goals_bp)
     app.register_blueprint(financial_expenses_bp)
     app.register_blueprint(merchant_aliases_bp)
+    app.register_blueprint(imports_bp)
+
+    # Pré-cálculo do cache de relatórios (opt-in: REPORT_CACHE_WARMER_ENABLED=true);
+    # a thread sobe no primeiro request de um único worker, depois do fork
+    from services.report_warmer import install_report_cache_warmer_from_env
+    install_report_cache_warmer_from_env(app)
 else:
     logger.warning("⚠️  SKIP_DB_INIT=true: blueprints de dados NÃO registrados (somente /api/health disponível)")
 
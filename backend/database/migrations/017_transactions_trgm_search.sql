@@ -0,0 +1,126 @@
+-- =============================================================================
+-- Migration 017: Busca textual de transações com pg_trgm
+-- Alça Finanças - PostgreSQL + Supabase
+-- =============================================================================
+-- OBJETIVO:
+--   O filtro `search` de find_advanced vira ILIKE '%termo%' em description/notes,
+--   que não usa índice B-tree e degrada para seq scan no histórico do tenant.
+--
+--   1) Índices GIN (gin_trgm_ops) em description e notes: ILIKE '%termo%'
+--      (termos com 3+ caracteres) e o operador de similaridade % passam a usar
+--      bitmap index scan.
+--   2) search_transaction_ids(...): ids ranqueados + total do filtro, para
+--      GET /api/transactions?search=...&sort=relevance. Mesmos filtros de
+--      TransactionRepository._compile_advanced_filters (NULL = sem filtro).
+--      rank = 1 se o termo aparece (substring) + maior similarity() entre
+--      description e notes; aproximações (typos) entram pelo operador %.
+--      O fallback em processo (utils/trigram_index.py) usa a mesma fórmula.
+--      merchant_name não entra: a coluna não existe no schema, e um ramo sem
+--      índice no OR impediria o uso dos índices GIN.
+--   3) O plano da busca está em scripts/bench_query_plans.py (search_ranked):
+--      Seq Scan em transactions reprova o benchmark.
+--
+-- COMO APLICAR: SQL Editor do Supabase (pg_trgm já vem disponível).
+-- IDEMPOTÊNCIA: IF NOT EXISTS / CREATE OR REPLACE.
+--
+-- ROLLBACK:
+--   DROP FUNCTION IF EXISTS public.search_transaction_ids(uuid, uuid, text, date, date, date, text[], uuid[], uuid[], text[], numeric, numeric, boolean, integer, integer);
+--   DROP INDEX IF EXISTS public.idx_transactions_description_trgm;
+--   DROP INDEX IF EXISTS public.idx_transactions_notes_trgm;
+-- =============================================================================
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_transactions_description_trgm
+    ON public.transactions USING gin (description gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_notes_trgm
+    ON public.transactions USING gin (notes gin_trgm_ops);
+
+-- Predicado canônico: is_canonical se a coluna já existir (supabase/migrations/
+-- 20261018000004, que também recria esta função); senão o ILIKE em source_file.
+-- Assim, aplicar 017 depois daquela migration não volta a busca para o ILIKE.
+DO $migration$
+DECLARE
+    v_canonical text := CASE
+        WHEN EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = 'public' AND table_name = 'transactions' AND column_name = 'is_canonical'
+        ) THEN 't.is_canonical'
+        ELSE $p$t.source_file ILIKE '%.ofx'$p$
+    END;
+BEGIN
+    EXECUTE replace($fn$
+    CREATE OR REPLACE FUNCTION public.search_transaction_ids(
+        p_user_id uuid,
+        p_tenant_id uuid,
+        p_query text,
+        p_date_gte date DEFAULT NULL,
+        p_date_lte date DEFAULT NULL,
+        p_date_lt date DEFAULT NULL,
+        p_types text[] DEFAULT NULL,
+        p_account_ids uuid[] DEFAULT NULL,
+        p_category_ids uuid[] DEFAULT NULL,
+        p_statuses text[] DEFAULT NULL,
+        p_min_amount numeric DEFAULT NULL,
+        p_max_amount numeric DEFAULT NULL,
+        p_is_recurring boolean DEFAULT NULL,
+        p_limit integer DEFAULT 50,
+        p_offset integer DEFAULT 0
+    )
+    RETURNS TABLE (
+        id uuid,
+        search_rank real,
+        total_count bigint
+    )
+    LANGUAGE sql
+    STABLE
+    AS $$
+        WITH term AS (
+            SELECT
+                btrim(p_query) AS q,
+                '%' || replace(replace(replace(btrim(p_query), '\', '\\'), '%', '\%'), '_', '\_') || '%' AS pattern
+        ),
+        matched AS (
+            SELECT
+                t.id,
+                t.date,
+                (
+                    CASE WHEN t.description ILIKE term.pattern OR t.notes ILIKE term.pattern THEN 1 ELSE 0 END
+                    + GREATEST(similarity(coalesce(t.description, ''), term.q), similarity(coalesce(t.notes, ''), term.q))
+                )::real AS search_rank
+            FROM public.transactions t, term
+            WHERE t.user_id = p_user_id
+              AND (p_tenant_id IS NULL OR t.tenant_id = p_tenant_id)
+              AND __CANONICAL__
+              AND (
+                  t.description ILIKE term.pattern
+                  OR t.notes ILIKE term.pattern
+                  OR t.description % term.q
+              )
+              AND (p_date_gte IS NULL OR t.date >= p_date_gte)
+              AND (p_date_lte IS NULL OR t.date <= p_date_lte)
+              AND (p_date_lt IS NULL OR t.date < p_date_lt)
+              AND (p_types IS NULL OR t.type = ANY (p_types))
+              AND (p_account_ids IS NULL OR t.account_id = ANY (p_account_ids))
+              AND (p_category_ids IS NULL OR t.category_id = ANY (p_category_ids))
+              AND (p_statuses IS NULL OR t.status = ANY (p_statuses))
+              AND (p_min_amount IS NULL OR t.amount >= p_min_amount)
+              AND (p_max_amount IS NULL OR t.amount <= p_max_amount)
+              AND (p_is_recurring IS NULL OR t.is_recurring = p_is_recurring)
+        )
+        SELECT m.id, m.search_rank, COUNT(*) OVER () AS total_count
+        FROM matched m
+        ORDER BY m.search_rank DESC, m.date DESC, m.id DESC
+        LIMIT p_limit OFFSET p_offset;
+    $$
+    $fn$, '__CANONICAL__', v_canonical);
+END
+$migration$;
+
+COMMENT ON FUNCTION public.search_transaction_ids(uuid, uuid, text, date, date, date, text[], uuid[], uuid[], text[], numeric, numeric, boolean, integer, integer) IS
+    'Busca ranqueada (pg_trgm) de transações. Ver TransactionRepository._find_advanced_ranked.';
+
+COMMIT;
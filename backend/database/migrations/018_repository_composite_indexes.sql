@@ -0,0 +1,89 @@
+-- =============================================================================
+-- Migration 018: Índices compostos para os formatos de query dos repositórios
+-- Alça Finanças - PostgreSQL + Supabase
+-- =============================================================================
+-- OBJETIVO:
+--   Cobrir as combinações de filtro que os repositórios realmente emitem e que
+--   hoje caem em índices de uma coluna (ou em seq scan conforme a tabela cresce).
+--
+--   transactions
+--     1) (tenant_id, account_id, status, date) INCLUDE (user_id, type, amount)
+--        AccountService: saldo projetado (user_id + account_id IN (...) + tenant)
+--        e filtro por conta/status de find_advanced. INCLUDE permite index-only
+--        scan no cálculo de saldo.
+--     2) (tenant_id, category_id): contagem antes de excluir categoria e filtro
+--        por categoria em find_by_filter/find_advanced.
+--     3) (user_id, account_id, fitid) WHERE fitid IS NOT NULL:
+--        find_existing_fitids sem tenant (importação OFX legada). Com tenant,
+--        idx_transactions_tenant_account_fitid já atende.
+--     4) (user_id, dedup_key) WHERE dedup_key IS NOT NULL: deduplicação por
+--        usuário; a variante por tenant é o índice único
+--        idx_transactions_tenant_dedup_key.
+--     (user_id, tenant_id, date) já é coberto por idx_transactions_tenant_user_date
+--     e idx_transactions_tenant_user_canonical_date.
+--
+--   categories
+--     5) (tenant_id, type, nome normalizado): mesma expressão de
+--        idx_categories_user_tenant_type_normname (016), mas liderada pelo
+--        tenant, para buscas de categoria equivalente no escopo do tenant.
+--     6) (user_id, type, tenant_id): _find_same_user_type_tenant_or_legacy
+--        (user_id + type + tenant_id = X OR tenant_id IS NULL).
+--
+--   accounts
+--     7) (tenant_id, user_id, name, type): find_by_name / find_by_name_and_type.
+--
+-- VERIFICAÇÃO: backend/scripts/bench_query_plans.py roda EXPLAIN ANALYZE de
+--   cada formato de query contra um Postgres local semeado e falha se aparecer
+--   seq scan. merchant_category_aliases fica de fora: find_all_active lê todos
+--   os aliases ativos de um tipo (metade da tabela), onde seq scan é o plano
+--   correto.
+--
+-- COMO APLICAR: SQL Editor do Supabase, depois das migrations de supabase/.
+--   Em produção com tabelas grandes, prefira rodar cada CREATE INDEX com
+--   CONCURRENTLY fora de transação.
+-- IDEMPOTÊNCIA: IF NOT EXISTS.
+--
+-- ROLLBACK:
+--   DROP INDEX IF EXISTS public.idx_transactions_tenant_account_status_date;
+--   DROP INDEX IF EXISTS public.idx_transactions_tenant_category;
+--   DROP INDEX IF EXISTS public.idx_transactions_user_account_fitid;
+--   DROP INDEX IF EXISTS public.idx_transactions_user_dedup_key;
+--   DROP INDEX IF EXISTS public.idx_categories_tenant_type_normname;
+--   DROP INDEX IF EXISTS public.idx_categories_user_type_tenant;
+--   DROP INDEX IF EXISTS public.idx_accounts_tenant_user_name_type;
+-- =============================================================================
+
+BEGIN;
+
+-- transactions
+CREATE INDEX IF NOT EXISTS idx_transactions_tenant_account_status_date
+    ON public.transactions (tenant_id, account_id, status, date)
+    INCLUDE (user_id, type, amount);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_tenant_category
+    ON public.transactions (tenant_id, category_id);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_user_account_fitid
+    ON public.transactions (user_id, account_id, fitid)
+    WHERE fitid IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_transactions_user_dedup_key
+    ON public.transactions (user_id, dedup_key)
+    WHERE dedup_key IS NOT NULL;
+
+-- categories
+CREATE INDEX IF NOT EXISTS idx_categories_tenant_type_normname
+    ON public.categories (
+        tenant_id,
+        type,
+        lower(trim(regexp_replace(btrim(name), '\s+', ' ', 'g')))
+    );
+
+CREATE INDEX IF NOT EXISTS idx_categories_user_type_tenant
+    ON public.categories (user_id, type, tenant_id);
+
+-- accounts
+CREATE INDEX IF NOT EXISTS idx_accounts_tenant_user_name_type
+    ON public.accounts (tenant_id, user_id, name, type);
+
+COMMIT;
@@ -5,6 +5,7 @@ Expõe:
 - http_requests_total: contagem de requisições por method, path, status
 - http_request_duration_seconds: duração das requisições (histogram)
 - app_info: versão/ambiente (gauge)
+- report_cache_warm_*: entradas aquecidas, vazão e atraso do warmer de relatórios
 
 Uso: Prometheus scrape em GET /api/metrics (ou /metrics).
 """
@@ -21,6 +22,11 @@ except ImportError:
 REQUEST_COUNT = None
 REQUEST_LATENCY = None
 APP_INFO = None
+REPORT_WARM_ENTRIES = None
+REPORT_WARM_FAILURES = None
+REPORT_WARM_THROUGHPUT = None
+REPORT_WARM_LAG = None
+REPORT_WARM_DURATION = None
 
 if PROMETHEUS_AVAILABLE:
     REQUEST_COUNT = Counter(
@@ -35,6 +41,37 @@ if PROMETHEUS_AVAILABLE:
         buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
     )
     APP_INFO = Gauge("app_info", "Informação da aplicação", ["env"])
+    REPORT_WARM_ENTRIES = Counter(
+        "report_cache_warm_entries_total",
+        "Entradas do cache de relatórios aquecidas pelo warmer",
+    )
+    REPORT_WARM_FAILURES = Counter(
+        "report_cache_warm_failures_total",
+        "Alvos (usuário, tenant) que falharam no warmer",
+    )
+    REPORT_WARM_THROUGHPUT = Gauge(
+        "report_cache_warm_throughput_entries_per_second",
+        "Vazão da última rodada do warmer",
+    )
+    REPORT_WARM_LAG = Gauge(
+        "report_cache_warm_lag_seconds",
+        "Atraso do fim da última rodada em relação ao horário agendado",
+    )
+    REPORT_WARM_DURATION = Gauge(
+        "report_cache_warm_duration_seconds",
+        "Duração da última rodada do warmer",
+    )
+
+
+def record_report_cache_warm(stats: dict) -> None:
+    """Publica as estatísticas de uma rodada de ReportCacheWarmer.run_once."""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    REPORT_WARM_ENTRIES.inc(stats.get("warmed", 0))
+    REPORT_WARM_FAILURES.inc(stats.get("failed", 0))
+    REPORT_WARM_THROUGHPUT.set(stats.get("throughput_per_second", 0))
+    REPORT_WARM_LAG.set(stats.get("lag_seconds", 0))
+    REPORT_WARM_DURATION.set(stats.get("duration_seconds", 0))
 
 
 def _path_label(path: str) -> str:
@@ -2,6 +2,8 @@
 Account Repository para Supabase
 """
 from typing import List, Dict, Any, Optional
+
+from utils.lookup_cache import get_or_load_map
 from .base_repository_supabase import BaseRepository
 
 
@@ -15,6 +17,10 @@ class AccountRepository(BaseRepository):
         if tenant_id:
             query["tenant_id"] = tenant_id
         return self.find_all(query)
+
+    def find_map_by_user(self, user_id: str, tenant_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Mapa id -> conta do usuário, em cache por tenant (utils/lookup_cache.py). Não alterar."""
+        return get_or_load_map("accounts", tenant_id, user_id, lambda: self.find_by_user(user_id, tenant_id=tenant_id))
     
     def find_by_name(
         self,
@@ -6,6 +6,7 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
 from database.connection import get_supabase
+from repositories.base_repository_supabase import execute_counted, normalize_count_strategy
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,11 @@ def _escape_ilike(value: str) -> str:
 
 
 class AdminUserRepository:
+    # Listagem paginada: exata até o max-rows do PostgREST, estimativa do planner acima
+    LIST_COUNT = "estimated"
+    # Cartões de estatística do painel: exatos, reaproveitados pelo TTL do cache de contagens
+    STATS_COUNT = "cached"
+
     def __init__(self):
         self.supabase = get_supabase()
         self.table = "users"
@@ -49,13 +55,23 @@ class AdminUserRepository:
             logger.error("admin find_by_email: %s", exc)
             return None
 
-    def _base_select(self):
+    def _base_select(self, count: Optional[str] = "exact"):
         return self.supabase.table(self.table).select(
             "id,email,name,role,status,is_admin,created_at,updated_at,"
             "last_login_at,last_activity_at,inactive_warning_sent_at,"
             "scheduled_deletion_at,deleted_at,auth_providers,settings",
-            count="exact",
+            count=count,
+        )
+
+    def _count(self, key: Tuple[Any, ...], apply_filters, strategy: Optional[str] = None) -> int:
+        """Contagem de users com apply_filters(query) e a estratégia pedida (padrão STATS_COUNT)."""
+        strategy = normalize_count_strategy(strategy, self.STATS_COUNT) or self.STATS_COUNT
+        _, total = execute_counted(
+            lambda count: apply_filters(self.supabase.table(self.table).select("id", count=count)).limit(1),
+            strategy,
+            (self.table,) + key,
         )
+        return int(total or 0)
 
     def list_users(
         self,
@@ -65,82 +81,74 @@ class AdminUserRepository:
         search: str = "",
         status_filter: str = "all",
         admins_only: bool = False,
+        count: Optional[str] = None,
     ) -> Tuple[List[Dict[str, Any]], int]:
+        """count: exact | planned | estimated | cached (padrão LIST_COUNT)."""
         per_page = max(1, min(per_page, 100))
         page = max(1, page)
         offset = (page - 1) * per_page
+        strategy = normalize_count_strategy(count, self.LIST_COUNT) or self.LIST_COUNT
+
+        def build(count_mode):
+            q = self._base_select(count_mode)
 
-        q = self._base_select()
+            if admins_only:
+                q = q.eq("role", "admin")
 
-        if admins_only:
-            q = q.eq("role", "admin")
+            if status_filter and status_filter != "all":
+                q = q.eq("status", status_filter)
 
-        if status_filter and status_filter != "all":
-            q = q.eq("status", status_filter)
+            if search and search.strip():
+                s = _escape_ilike(search.strip())
+                pattern = f"%{s}%"
+                q = q.or_(f"name.ilike.{pattern},email.ilike.{pattern}")
 
-        if search and search.strip():
-            s = _escape_ilike(search.strip())
-            pattern = f"%{s}%"
-            q = q.or_(f"name.ilike.{pattern},email.ilike.{pattern}")
+            return q.order("created_at", desc=True).range(offset, offset + per_page - 1)
 
-        q = q.order("created_at", desc=True).range(offset, offset + per_page - 1)
         try:
-            res = q.execute()
+            cache_key = (self.table, "list", admins_only, status_filter, (search or "").strip())
+            res, total = execute_counted(build, strategy, cache_key)
             rows = res.data or []
-            total = getattr(res, "count", None) or len(rows)
+            total = total or len(rows)
             return rows, int(total)
         except Exception as exc:
             logger.error("admin list_users: %s", exc)
             return [], 0
 
-    def count_by_status(self) -> Dict[str, int]:
+    def count_by_status(self, count: Optional[str] = None) -> Dict[str, int]:
         out = {"active": 0, "inactive": 0, "pending_deletion": 0, "disabled": 0, "total": 0}
         try:
-            res = (
-                self.supabase.table(self.table)
-                .select("status", count="exact")
-                .execute()
-            )
-            out["total"] = int(getattr(res, "count", 0) or 0)
+            out["total"] = self._count(("total",), lambda q: q, count)
         except Exception as exc:
             logger.error("count_by_status total: %s", exc)
 
         for st in ("active", "inactive", "pending_deletion", "disabled"):
             try:
-                r = (
-                    self.supabase.table(self.table)
-                    .select("id", count="exact")
-                    .eq("status", st)
-                    .execute()
-                )
-                out[st] = int(getattr(r, "count", 0) or 0)
+                out[st] = self._count(("status", st), lambda q, st=st: q.eq("status", st), count)
             except Exception as exc:
                 logger.error("count_by_status %s: %s", st, exc)
         return out
 
-    def count_admins(self) -> int:
+    def count_admins(self, count: Optional[str] = "exact") -> int:
+        """Exata por padrão: protege a remoção do último admin (AdminUserService)."""
         try:
-            r = (
-                self.supabase.table(self.table)
-                .select("id", count="exact")
-                .eq("role", "admin")
-                .is_("deleted_at", "null")
-                .execute()
+            return self._count(
+                ("admins",),
+                lambda q: q.eq("role", "admin").is_("deleted_at", "null"),
+                count,
             )
-            return int(getattr(r, "count", 0) or 0)
         except Exception as exc:
             logger.error("count_admins: %s", exc)
             return 0
 
-    def count_created_since(self, since_iso: str) -> int:
+    def count_created_since(self, since_iso: str, count: Optional[str] = None) -> int:
         try:
-            r = (
-                self.supabase.table(self.table)
-                .select("id", count="exact")
-                .gte("created_at", since_iso)
-                .execute()
+            # Chave pela hora: os instantes "agora - 24h" mudam a cada chamada
+            return self._count(
+                ("created_since", since_iso[:13]),
+                lambda q: q.gte("created_at", since_iso),
+                count,
             )
-            return int(getattr(r, "count", 0) or 0)
         except Exception as exc:
             logger.error("count_created_since: %s", exc)
             return 0
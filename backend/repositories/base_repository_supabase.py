@@ -1,13 +1,131 @@
 """
 Base Repository para Supabase (PostgreSQL)
 """
-from typing import Optional, List, Dict, Any
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Callable, Hashable, Sequence, Tuple, Union
 from datetime import datetime
 from database.connection import get_supabase, get_db_connection, return_db_connection
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Projeção de colunas: "*" (padrão), "id, date, amount" ou ("id", "date", "amount")
+Columns = Optional[Union[str, Sequence[str]]]
+
+
+def select_clause(columns: Columns = None, embeds: Sequence[str] = ()) -> str:
+    """
+    Converte a projeção pedida no argumento de .select() do PostgREST.
+    embeds: recursos embutidos via FK (ex.: "category:categories(name,color,icon)"),
+    resolvidos pelo PostgREST na mesma requisição.
+    """
+    if not columns:
+        base = "*"
+    elif isinstance(columns, str):
+        base = columns
+    else:
+        base = ", ".join(columns)
+    return ", ".join((base,) + tuple(embeds))
+
+
+# Estratégias de contagem para listas paginadas:
+# - exact:     COUNT(*) do filtro (varredura completa; use quando a UI precisa do número exato)
+# - planned:   estimativa do planner do Postgres (barata, pode errar bastante com filtros)
+# - estimated: exata até o max-rows do PostgREST, planned acima disso
+# - cached:    exata na primeira vez, depois reaproveitada por COUNT_CACHE_TTL_SECONDS
+# None (ou "none") = sem contagem.
+COUNT_STRATEGIES = ("exact", "planned", "estimated", "cached")
+POSTGREST_COUNT_MODES = ("exact", "planned", "estimated")
+
+
+def normalize_count_strategy(value: Any, default: Optional[str] = "exact") -> Optional[str]:
+    """Valida a estratégia pedida; "none" desliga a contagem, valores desconhecidos usam default."""
+    if value is None or value == "":
+        return default
+    value = str(value).strip().lower()
+    if value == "none":
+        return None
+    return value if value in COUNT_STRATEGIES else default
+
+
+class CountCache:
+    """Totais por chave com TTL e limite de entradas (LRU), seguro entre threads."""
+
+    def __init__(self, ttl_seconds: int = 60, max_entries: int = 4096):
+        self._store: "OrderedDict[Hashable, Tuple[int, float]]" = OrderedDict()
+        self._ttl = ttl_seconds
+        self._max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[int]:
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                return None
+            total, expiry = entry
+            if time.monotonic() > expiry:
+                del self._store[key]
+                return None
+            self._store.move_to_end(key)
+            return total
+
+    def set(self, key: Hashable, total: int) -> None:
+        with self._lock:
+            self._store[key] = (total, time.monotonic() + self._ttl)
+            self._store.move_to_end(key)
+            while len(self._store) > self._max_entries:
+                self._store.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+
+
+_count_cache: Optional[CountCache] = None
+
+
+def get_count_cache() -> CountCache:
+    """Cache de contagens (singleton por processo)."""
+    global _count_cache
+    if _count_cache is None:
+        _count_cache = CountCache(ttl_seconds=int(os.getenv("COUNT_CACHE_TTL_SECONDS", "60")))
+    return _count_cache
+
+
+def execute_counted(
+    build_query: Callable[[Optional[str]], Any],
+    strategy: Optional[str],
+    cache_key: Optional[Hashable] = None,
+    store: bool = True,
+) -> Tuple[Any, Optional[int]]:
+    """
+    Executa build_query(count_mode) com a estratégia de contagem pedida.
+    build_query recebe o count do PostgREST ("exact"/"planned"/"estimated"/None)
+    e devolve a query pronta. Retorna (response, total); total None = sem contagem.
+
+    Em "cached", um acerto no cache dispensa a contagem na query; a chave deve
+    incluir tudo o que muda o total (tabela, escopo, filtros e, quando houver,
+    a versão de dados do tenant). store=False só lê o cache (a query conta um
+    subconjunto, ex.: páginas seguintes do keyset).
+    """
+    if strategy == "cached" and cache_key is not None:
+        cache = get_count_cache()
+        total = cache.get(cache_key)
+        if total is not None:
+            return build_query(None).execute(), total
+        response = build_query("exact").execute()
+        total = getattr(response, "count", None)
+        if total is not None and store:
+            cache.set(cache_key, int(total))
+        return response, total
+    mode = "exact" if strategy == "cached" else strategy
+    mode = mode if mode in POSTGREST_COUNT_MODES else None
+    response = build_query(mode).execute()
+    return response, (getattr(response, "count", None) if mode else None)
+
 
 class BaseRepository:
     """Repository base para operações CRUD no Supabase"""
@@ -28,7 +146,8 @@ class BaseRepository:
         sort_by: str = None, 
         ascending: bool = True,
         limit: Optional[int] = None,
-        offset: Optional[int] = None
+        offset: Optional[int] = None,
+        columns: Columns = None,
     ) -> List[Dict[str, Any]]:
         """
         Busca todos os registros
@@ -39,9 +158,10 @@ class BaseRepository:
             ascending: Ordem crescente (True) ou decrescente (False)
             limit: Limite de resultados
             offset: Offset para paginação
+            columns: Colunas a retornar (padrão: todas)
         """
         try:
-            query = self.supabase.table(self.table_name).select("*")
+            query = self.supabase.table(self.table_name).select(select_clause(columns))
             
             # Aplicar filtros
             if filter_query:
@@ -65,15 +185,16 @@ class BaseRepository:
             logger.error(f"Erro ao buscar registros em {self.table_name}: {e}")
             return []
     
-    def find_by_id(self, id: str) -> Optional[Dict[str, Any]]:
+    def find_by_id(self, id: str, columns: Columns = None) -> Optional[Dict[str, Any]]:
         """
         Busca registro por ID
         
         Args:
             id: UUID do registro
+            columns: Colunas a retornar (padrão: todas)
         """
         try:
-            response = self.supabase.table(self.table_name).select("*").eq("id", id).execute()
+            response = self.supabase.table(self.table_name).select(select_clause(columns)).eq("id", id).execute()
             if response.data and len(response.data) > 0:
                 return response.data[0]
             return None
@@ -81,15 +202,16 @@ class BaseRepository:
             logger.error(f"Erro ao buscar registro {id} em {self.table_name}: {e}")
             return None
     
-    def find_one(self, filter_query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def find_one(self, filter_query: Dict[str, Any], columns: Columns = None) -> Optional[Dict[str, Any]]:
         """
         Busca um registro por filtro
         
         Args:
             filter_query: Filtros (ex: {'email': 'user@example.com'})
+            columns: Colunas a retornar (padrão: todas)
         """
         try:
-            query = self.supabase.table(self.table_name).select("*")
+            query = self.supabase.table(self.table_name).select(select_clause(columns))
             
             for key, value in filter_query.items():
                 query = query.eq(key, value)
@@ -202,22 +324,28 @@ class BaseRepository:
             logger.error(f"Erro delete_many em {self.table_name}: {e}")
             raise
 
-    def count(self, filter_query: Dict[str, Any] = None) -> int:
+    def count(self, filter_query: Dict[str, Any] = None, strategy: str = "exact") -> int:
         """
         Conta registros
         
         Args:
             filter_query: Filtros opcionais
+            strategy: exact | planned | estimated | cached (ver COUNT_STRATEGIES)
         """
-        try:
-            query = self.supabase.table(self.table_name).select("id", count="exact")
-            
+        strategy = normalize_count_strategy(strategy) or "exact"
+
+        def build(count_mode):
+            # limit(1): só o total interessa (o corpo vazio não pesa na resposta)
+            query = self.supabase.table(self.table_name).select("id", count=count_mode)
             if filter_query:
                 for key, value in filter_query.items():
                     query = query.eq(key, value)
-            
-            response = query.execute()
-            return response.count if hasattr(response, 'count') else 0
+            return query.limit(1)
+
+        try:
+            cache_key = ("count", self.table_name, tuple(sorted((filter_query or {}).items())))
+            _, total = execute_counted(build, strategy, cache_key)
+            return int(total or 0)
         except Exception as e:
             logger.error(f"Erro ao contar registros em {self.table_name}: {e}")
             return 0
@@ -5,6 +5,7 @@ import logging
 from typing import List, Dict, Any, Optional
 
 from utils.category_name import normalize_category_key
+from utils.lookup_cache import get_or_load_map
 
 from .base_repository_supabase import BaseRepository
 
@@ -21,6 +22,12 @@ class CategoryRepository(BaseRepository):
         if tenant_id:
             query["tenant_id"] = tenant_id
         return self.find_all(query)
+
+    def find_map_by_user(self, user_id: str, tenant_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Mapa id -> categoria do usuário, em cache por tenant (utils/lookup_cache.py). Não alterar."""
+        return get_or_load_map(
+            "categories", tenant_id, user_id, lambda: self.find_by_user(user_id, tenant_id=tenant_id)
+        )
     
     def find_by_type(self, user_id: str, type: str, tenant_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Busca categorias por tipo (income/expense), opcionalmente scoped por tenant."""
@@ -2,8 +2,8 @@
 Repositório para merchant_category_aliases (mapeia descrição/comerciante -> categoria).
 """
 from typing import Dict, Any, Optional, List
-import unicodedata
 
+from utils.merchant_alias_index import get_merchant_alias_index, normalize_alias_text
 from .base_repository_supabase import BaseRepository
 
 
@@ -19,11 +19,7 @@ class MerchantAliasRepositorySupabase(BaseRepository):
         - lower
         - remove acentos (NFKD)
         """
-        base = (text or "").strip().lower()
-        if not base:
-            return ""
-        normalized = unicodedata.normalize("NFKD", base)
-        return "".join(ch for ch in normalized if not unicodedata.combining(ch))
+        return normalize_alias_text(text)
 
     def find_all_active(self, category_type: str) -> List[Dict[str, Any]]:
         return self.find_all(
@@ -43,42 +39,9 @@ class MerchantAliasRepositorySupabase(BaseRepository):
         """
         Retorna o melhor alias para uma descrição, considerando escopo:
         1) user+tenant, 2) tenant, 3) global.
-        """
-        desc_norm = self._normalize(description)
-        if not desc_norm:
-            return None
-
-        aliases = self.find_all_active(category_type)
-        best_score = -1
-        best_alias: Optional[Dict[str, Any]] = None
-
-        for alias in aliases:
-            # Usa match_value/normalized_value e aplica normalização local
-            alias_source = alias.get("normalized_value") or alias.get("match_value") or ""
-            alias_norm = self._normalize(alias_source)
-            match_type = alias.get("match_type") or "contains"
-
-            scope_score = 0
-            if user_id and alias.get("user_id") == user_id:
-                scope_score = 20
-            elif tenant_id and alias.get("tenant_id") == tenant_id:
-                scope_score = 10
-
-            match_score = -1
-            if match_type == "exact" and desc_norm == alias_norm:
-                match_score = 3
-            elif match_type == "prefix" and desc_norm.startswith(alias_norm):
-                match_score = 2
-            elif match_type == "contains" and alias_norm in desc_norm:
-                match_score = 1
-
-            if match_score < 0:
-                continue
-
-            total = scope_score + match_score
-            if total > best_score:
-                best_score = total
-                best_alias = alias
-
-        return best_alias
 
+        Usa o índice compilado por processo (utils/merchant_alias_index.py): a
+        tabela só é baixada de novo quando os aliases mudam (ou o TTL vence).
+        """
+        index = get_merchant_alias_index(category_type, lambda: self.find_all_active(category_type))
+        return index.best_alias(user_id, tenant_id, description)
@@ -0,0 +1,80 @@
+"""
+Repositório para transaction_monthly_aggregates (agregado mensal incremental de transações).
+"""
+from typing import Dict, Any, List, Optional
+import logging
+
+from .base_repository_supabase import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+
+class TransactionAggregateRepository(BaseRepository):
+    SELECT_COLUMNS = "period,category_id,account_id,type,status,total,tx_count"
+
+    def __init__(self):
+        super().__init__("transaction_monthly_aggregates")
+
+    def apply_deltas(self, deltas: List[Dict[str, Any]]) -> bool:
+        """Aplica deltas (+/-) de forma atômica via RPC apply_transaction_aggregate_deltas."""
+        if not deltas:
+            return True
+        try:
+            self.supabase.rpc("apply_transaction_aggregate_deltas", {"p_deltas": deltas}).execute()
+            return True
+        except Exception as e:
+            logger.warning("Erro ao aplicar deltas em %s: %s", self.table_name, e)
+            return False
+
+    def find_by_period(
+        self,
+        user_id: str,
+        tenant_id: str,
+        start_period: str,
+        end_period: str,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Linhas do agregado com start_period <= period < end_period ('YYYY-MM-01'),
+        mesma semântica de intervalo de find_by_user_and_date_range.
+        Retorna None em erro (ex.: migration não aplicada) para o chamador cair na varredura.
+        """
+        try:
+            rows: List[Dict[str, Any]] = []
+            page_size = 1000
+            offset = 0
+            while True:
+                response = (
+                    self.supabase.table(self.table_name)
+                    .select(self.SELECT_COLUMNS)
+                    .eq("tenant_id", tenant_id)
+                    .eq("user_id", user_id)
+                    .gte("period", start_period)
+                    .lt("period", end_period)
+                    .order("period")
+                    .range(offset, offset + page_size - 1)
+                    .execute()
+                )
+                batch = response.data or []
+                for row in batch:
+                    row["total"] = float(row.get("total") or 0)
+                    row["tx_count"] = int(row.get("tx_count") or 0)
+                    row["period"] = str(row.get("period") or "")[:10]
+                rows.extend(batch)
+                if len(batch) < page_size:
+                    break
+                offset += page_size
+            return rows
+        except Exception as e:
+            logger.warning("Agregado mensal indisponível, usando varredura: %s", e)
+            return None
+
+    def rebuild(self, tenant_id: Optional[str] = None) -> int:
+        """Recalcula o agregado a partir de transactions (None = todos os tenants)."""
+        try:
+            response = self.supabase.rpc(
+                "rebuild_transaction_monthly_aggregates", {"p_tenant_id": tenant_id}
+            ).execute()
+            return int(response.data or 0)
+        except Exception as e:
+            logger.error("Erro ao reconstruir %s: %s", self.table_name, e)
+            return 0
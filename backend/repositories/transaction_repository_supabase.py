@@ -1,18 +1,117 @@
 """
 Transaction Repository para Supabase
 """
-from typing import List, Dict, Any, Optional
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union
 from datetime import datetime, date, timedelta
-from .base_repository_supabase import BaseRepository
+from .base_repository_supabase import (
+    BaseRepository,
+    Columns,
+    execute_counted,
+    normalize_count_strategy,
+    select_clause,
+)
 from database.connection import get_supabase
+from utils.cursor import decode_cursor, encode_cursor
+from utils.data_version import get_data_version
+from utils.exceptions import ValidationException
+from utils.trigram_index import TrigramIndex
+
+# Índices de busca em memória (fallback sem a RPC search_transaction_ids, só com
+# TRANSACTIONS_SEARCH_MEMORY_INDEX=true), por (tenant, user, versão de dados):
+# uma escrita torna o índice antigo inalcançável
+MAX_SEARCH_INDEXES = 32
+_search_indexes: "OrderedDict[tuple, TrigramIndex]" = OrderedDict()
+_search_indexes_lock = threading.Lock()
+
+# include= : "category,account" ou sequência de nomes de EMBEDDABLE
+Include = Optional[Union[str, Sequence[str]]]
+T = TypeVar("T")
+
+
+def _is_embed_error(error: Exception) -> bool:
+    """PostgREST sem a relação pedida (PGRST200) ou com cache de schema desatualizado."""
+    message = str(error)
+    return "PGRST200" in message or "relationship" in message.lower()
 
 
 class TransactionRepository(BaseRepository):
     CANONICAL_SOURCE_PATTERN = "%.ofx"
+    # Flag persistida is_canonical (supabase/migrations/20261018000004_transactions_is_canonical.sql),
+    # atendida pelo índice (tenant_id, user_id, is_canonical, date DESC). false = ILIKE em source_file.
+    # Desligada por padrão: sem a migration, ler ou gravar a coluna quebraria toda leitura e
+    # inserção. Ligar (TRANSACTIONS_CANONICAL_COLUMN=true) depois de aplicá-la; enquanto
+    # isso, o trigger da migration já mantém a coluna nas escritas.
+    USE_CANONICAL_COLUMN = os.getenv("TRANSACTIONS_CANONICAL_COLUMN", "false").strip().lower() == "true"
+    # Sem a RPC search_transaction_ids (migration 017), a busca por relevância usa um
+    # índice de trigramas em memória só se habilitado (testes/dev); o índice é refeito
+    # a cada escrita do tenant, então em produção o padrão é cair para o ILIKE por data.
+    SEARCH_MEMORY_INDEX = os.getenv("TRANSACTIONS_SEARCH_MEMORY_INDEX", "false").strip().lower() == "true"
+    # Colunas usadas por relatórios/agregações (sem raw_data, source_file, dedup_key etc.)
+    REPORT_COLUMNS = ("id", "date", "type", "amount", "status", "category_id", "account_id")
+    # Recursos embutíveis com include=, resolvidos pelo PostgREST na mesma requisição pelas
+    # FKs compostas (category_id, category_tenant_id) e (account_id, account_tenant_id).
+    # Cada linha ganha a chave ("category"/"account") com o objeto ou None.
+    EMBEDDABLE = {
+        "category": "category:categories(name,color,icon)",
+        "account": "account:accounts(name,color,icon)",
+    }
 
     def __init__(self):
         super().__init__("transactions")
 
+    @classmethod
+    def is_canonical_source(cls, source_file: Optional[str]) -> bool:
+        """Mesma regra de CANONICAL_SOURCE_PATTERN ('%.ofx', case-insensitive)."""
+        return str(source_file or "").lower().endswith(".ofx")
+
+    def _only_canonical(self, query):
+        """Restringe a query às transações canônicas (flag indexada ou ILIKE legado)."""
+        if self.USE_CANONICAL_COLUMN:
+            return query.eq("is_canonical", True)
+        return query.ilike("source_file", self.CANONICAL_SOURCE_PATTERN)
+
+    def _with_canonical_flag(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.USE_CANONICAL_COLUMN:
+            return data
+        return {**data, "is_canonical": self.is_canonical_source(data.get("source_file"))}
+
+    @classmethod
+    def normalize_include(cls, include: Include) -> Tuple[str, ...]:
+        """Nomes válidos de include ("category,account" ou sequência), sem repetição."""
+        if not include:
+            return ()
+        names = include.split(",") if isinstance(include, str) else include
+        result: List[str] = []
+        for name in names:
+            name = str(name).strip().lower()
+            if name in cls.EMBEDDABLE and name not in result:
+                result.append(name)
+        return tuple(result)
+
+    def _run_with_include(self, run: Callable[[Tuple[str, ...]], T], include: Include) -> T:
+        """
+        Executa run(embeds) com os recursos de include embutidos no select. Se o
+        PostgREST não conhecer a relação, repete sem embed e não tenta mais neste
+        processo: as linhas voltam sem as chaves de include e quem chamou
+        enriquece em memória (mapas de utils/lookup_cache.py).
+        """
+        import logging
+
+        names = self.normalize_include(include)
+        if not names or getattr(self, "_embed_unavailable", False):
+            return run(())
+        try:
+            return run(tuple(self.EMBEDDABLE[name] for name in names))
+        except Exception as e:
+            if not _is_embed_error(e):
+                raise
+            logging.warning(f"Embed de {names} indisponível no PostgREST, enriquecendo em memória: {e}")
+            self._embed_unavailable = True
+            return run(())
+
     def create(self, data: Dict[str, Any]) -> str:
         tenant_id = data.get("tenant_id")
         if not tenant_id:
@@ -25,7 +124,7 @@ class TransactionRepository(BaseRepository):
             data = {**data, "account_tenant_id": tenant_id}
         if not data.get("category_tenant_id"):
             data = {**data, "category_tenant_id": tenant_id}
-        return super().create(data)
+        return super().create(self._with_canonical_flag(data))
 
     def find_by_filter(
         self,
@@ -37,11 +136,13 @@ class TransactionRepository(BaseRepository):
     ) -> Dict[str, Any]:
         """
         Busca transações com filtros e paginação
+        filters['count']: estratégia de contagem (padrão DEFAULT_LIST_COUNT)
         """
-        try:
-            supabase = get_supabase()
-            query = supabase.table(self.table_name).select("*", count="exact")
-            query = query.ilike("source_file", self.CANONICAL_SOURCE_PATTERN)
+        count_mode = normalize_count_strategy(filters.get('count'), self.DEFAULT_LIST_COUNT)
+
+        def build(postgrest_count):
+            query = get_supabase().table(self.table_name).select("*", count=postgrest_count)
+            query = self._only_canonical(query)
 
             # Filtro obrigatório: user_id
             query = query.eq("user_id", user_id)
@@ -78,11 +179,16 @@ class TransactionRepository(BaseRepository):
             
             # Paginação
             offset = (page - 1) * per_page
-            query = query.range(offset, offset + per_page - 1)
-            
-            response = query.execute()
-            
-            total = response.count if hasattr(response, 'count') else len(response.data or [])
+            return query.range(offset, offset + per_page - 1)
+
+        try:
+            cache_key = (
+                "find_by_filter", user_id, tenant_id, get_data_version(tenant_id),
+                tuple(sorted((k, v) for k, v in filters.items() if k in ('month', 'year', 'category_id', 'type', 'account_id'))),
+            )
+            response, total = execute_counted(build, count_mode, cache_key)
+            if total is None:
+                total = len(response.data or [])
             
             return {
                 'data': response.data if response.data else [],
@@ -106,6 +212,54 @@ class TransactionRepository(BaseRepository):
                 }
             }
     
+    # Tamanho da página no streaming por keyset (igual ao max-rows padrão do PostgREST)
+    KEYSET_PAGE_SIZE = 1000
+
+    def iter_by_user_and_date_range(
+        self,
+        user_id: str,
+        start_date: str,
+        end_date: str,
+        tenant_id: Optional[str] = None,
+        page_size: int = KEYSET_PAGE_SIZE,
+        columns: Columns = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Itera as transações do usuário no intervalo [start_date, end_date) sem
+        limite de quantidade, paginando por keyset (date DESC, id DESC).
+
+        Cada página é uma query indexada a partir da última chave lida, então a
+        memória fica limitada a uma página e o resultado não é truncado pelo
+        max-rows do PostgREST. A projeção `columns` deve incluir "date" e "id".
+        Erros de consulta são propagados (um total parcial seria silenciosamente errado).
+        """
+        last_date: Optional[str] = None
+        last_id: Optional[str] = None
+        select = select_clause(columns)
+        while True:
+            query = (
+                self._only_canonical(get_supabase().table(self.table_name).select(select))
+                .eq("user_id", user_id)
+                .gte("date", start_date)
+                .lt("date", end_date)
+            )
+            if tenant_id:
+                query = query.eq("tenant_id", tenant_id)
+            if last_date is not None:
+                query = query.or_(
+                    f'date.lt."{last_date}",and(date.eq."{last_date}",id.lt.{last_id})'
+                )
+            rows = (
+                query.order("date", desc=True)
+                .order("id", desc=True)
+                .limit(page_size)
+                .execute()
+            ).data or []
+            yield from rows
+            if len(rows) < page_size:
+                return
+            last_date, last_id = rows[-1]["date"], rows[-1]["id"]
+
     def find_by_user_and_date_range(
         self,
         user_id: str,
@@ -113,23 +267,28 @@ class TransactionRepository(BaseRepository):
         end_date: str,
         limit: Optional[int] = None,
         tenant_id: Optional[str] = None,
+        columns: Columns = None,
     ) -> List[Dict[str, Any]]:
-        """Busca transações do usuário em um intervalo de datas (ISO)."""
+        """
+        Busca transações do usuário em um intervalo de datas (ISO).
+        Sem `limit`, lê todas as páginas via iter_by_user_and_date_range.
+        `columns` restringe as colunas retornadas (ex.: REPORT_COLUMNS).
+        """
         try:
+            if not limit:
+                return list(self.iter_by_user_and_date_range(
+                    user_id, start_date, end_date, tenant_id=tenant_id, columns=columns
+                ))
             query = (
-                get_supabase()
-                .table(self.table_name)
-                .select("*")
-                .ilike("source_file", self.CANONICAL_SOURCE_PATTERN)
+                self._only_canonical(get_supabase().table(self.table_name).select(select_clause(columns)))
                 .eq("user_id", user_id)
                 .gte("date", start_date)
                 .lt("date", end_date)
                 .order("date", desc=True)
+                .limit(limit)
             )
             if tenant_id:
                 query = query.eq("tenant_id", tenant_id)
-            if limit:
-                query = query.limit(limit)
             response = query.execute()
             return response.data if response.data else []
         except Exception as e:
@@ -137,14 +296,229 @@ class TransactionRepository(BaseRepository):
             logging.error(f"Erro ao buscar transações por período: {e}")
             return []
 
+    # Contagem padrão da listagem paginada por offset (ver COUNT_STRATEGIES):
+    # exata na primeira página, reaproveitada enquanto filtro e versão de dados não mudam
+    DEFAULT_LIST_COUNT = "cached"
+
+    @staticmethod
+    def _compile_advanced_filters(params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Normaliza os filtros de find_advanced (período, tipo, contas, categorias,
+        valor, status, recorrência e busca textual) num dicionário neutro, usado
+        tanto na query do PostgREST (_apply_advanced_filters) quanto nas RPCs de
+        agregação (facet_counts). Chaves ausentes = sem filtro:
+        date_gte, date_lte, date_lt (ISO), types, account_ids, category_ids,
+        statuses (listas), min_amount, max_amount, is_recurring, search_pattern.
+        """
+        compiled: Dict[str, Any] = {}
+
+        # Período
+        date_from = params.get("date_from")
+        date_to = params.get("date_to")
+        month = params.get("month")
+        year = params.get("year")
+        date_preset = params.get("date_preset")
+
+        if date_from and date_to:
+            compiled["date_gte"] = str(date_from)
+            compiled["date_lte"] = str(date_to)
+        elif month and year:
+            # Compatibilidade com filtros antigos
+            m = int(month)
+            y = int(year)
+            compiled["date_gte"] = f"{y}-{m:02d}-01"
+            compiled["date_lt"] = f"{y + 1}-01-01" if m == 12 else f"{y}-{m + 1:02d}-01"
+        elif date_preset:
+            today = date.today()
+            tomorrow = (today + timedelta(days=1)).isoformat()
+            if str(date_preset) == "today":
+                compiled["date_gte"], compiled["date_lt"] = today.isoformat(), tomorrow
+            elif str(date_preset) == "7d":
+                compiled["date_gte"], compiled["date_lt"] = (today - timedelta(days=6)).isoformat(), tomorrow
+            elif str(date_preset) == "last_90_days":
+                compiled["date_gte"], compiled["date_lt"] = (today - timedelta(days=89)).isoformat(), tomorrow
+            elif str(date_preset) in ("year_to_date", "ytd"):
+                compiled["date_gte"], compiled["date_lt"] = date(today.year, 1, 1).isoformat(), tomorrow
+            elif str(date_preset) == "last_month":
+                first_this = today.replace(day=1)
+                first_prev = (first_this - timedelta(days=1)).replace(day=1)
+                compiled["date_gte"], compiled["date_lt"] = first_prev.isoformat(), first_this.isoformat()
+            else:
+                # default: this_month
+                first_this = today.replace(day=1)
+                if first_this.month == 12:
+                    first_next = first_this.replace(year=first_this.year + 1, month=1)
+                else:
+                    first_next = first_this.replace(month=first_this.month + 1)
+                compiled["date_gte"], compiled["date_lt"] = first_this.isoformat(), first_next.isoformat()
+
+        # Tipo (compatível com type único e types múltiplos)
+        tx_types = params.get("types")
+        if tx_types:
+            types = [str(x).strip() for x in str(tx_types).split(",") if str(x).strip()]
+            if types:
+                compiled["types"] = types
+        elif params.get("type"):
+            compiled["types"] = [params["type"]]
+
+        # Contas e categorias múltiplas
+        for key, singular, target in (
+            ("account_ids", "account_id", "account_ids"),
+            ("category_ids", "category_id", "category_ids"),
+        ):
+            raw = params.get(key) or params.get(singular)
+            if raw:
+                ids = [str(x).strip() for x in str(raw).split(",") if str(x).strip()]
+                if ids:
+                    compiled[target] = ids
+
+        # Intervalo de valor
+        for key in ("min_amount", "max_amount"):
+            if params.get(key) not in (None, ""):
+                try:
+                    compiled[key] = float(params[key])
+                except (TypeError, ValueError):
+                    pass
+
+        # Status
+        if params.get("status"):
+            raw_status = str(params["status"]).strip().lower()
+            if raw_status == "canceled":
+                raw_status = "cancelled"
+            if raw_status == "overdue":
+                compiled["statuses"] = ["pending", "overdue"]
+                today_iso = date.today().isoformat()
+                compiled["date_lt"] = min(compiled.get("date_lt") or today_iso, today_iso)
+            else:
+                compiled["statuses"] = [raw_status]
+
+        # Recorrente
+        if params.get("is_recurring") not in (None, ""):
+            compiled["is_recurring"] = params.get("is_recurring") in (True, "true", "1", 1, "yes")
+
+        # Busca textual em múltiplos campos (description, merchant_name, notes)
+        search = params.get("search")
+        if search and str(search).strip():
+            compiled["search_pattern"] = f"%{str(search).strip()}%"
+        return compiled
+
+    @classmethod
+    def compile_filters(cls, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Filtros de find_advanced compilados (ver _compile_advanced_filters), para quem agrega fora do repositório."""
+        return cls._compile_advanced_filters(params)
+
+    def _apply_advanced_filters(self, query, params: Dict[str, Any]):
+        """Aplica os filtros de find_advanced (ver _compile_advanced_filters) a uma query do PostgREST."""
+        compiled = self._compile_advanced_filters(params)
+        if compiled.get("date_gte"):
+            query = query.gte("date", compiled["date_gte"])
+        if compiled.get("date_lte"):
+            query = query.lte("date", compiled["date_lte"])
+        if compiled.get("date_lt"):
+            query = query.lt("date", compiled["date_lt"])
+        for field, key in (("type", "types"), ("account_id", "account_ids"), ("category_id", "category_ids"), ("status", "statuses")):
+            values = compiled.get(key)
+            if values:
+                query = query.eq(field, values[0]) if len(values) == 1 else query.in_(field, values)
+        if "min_amount" in compiled:
+            query = query.gte("amount", compiled["min_amount"])
+        if "max_amount" in compiled:
+            query = query.lte("amount", compiled["max_amount"])
+        if "is_recurring" in compiled:
+            query = query.eq("is_recurring", compiled["is_recurring"])
+        pattern = compiled.get("search_pattern")
+        if pattern:
+            # Usa OR em múltiplas colunas quando suportado
+            query = query.or_(
+                f"description.ilike.{pattern},merchant_name.ilike.{pattern},notes.ilike.{pattern}"
+            )
+        return query
+
+    FACET_NAMES = ("category", "account", "responsible_person", "type_status", "total")
+
+    def facet_counts(
+        self,
+        user_id: str,
+        params: Dict[str, Any],
+        tenant_id: Optional[str] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Facetas exatas do conjunto filtrado via RPC transaction_facets (GROUPING SETS no Postgres).
+        Linhas: {'facet', 'key', 'type', 'status', 'total', 'tx_count'}, com facet em FACET_NAMES.
+        Retorna None se a RPC não estiver disponível (o chamador usa o caminho em memória).
+        """
+        import logging
+
+        try:
+            response = get_supabase().rpc(
+                "transaction_facets", self._filter_rpc_params(user_id, params, tenant_id)
+            ).execute()
+            return response.data or []
+        except Exception as e:
+            logging.warning(f"transaction_facets indisponível, usando facetas em memória: {e}")
+            return None
+
+    def summary_groups(
+        self,
+        user_id: str,
+        params: Dict[str, Any],
+        tenant_id: Optional[str] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Totais do conjunto filtrado (todas as páginas) via RPC transaction_summary_groups.
+        Linhas: {'type', 'status', 'category_id', 'total', 'tx_count'}.
+        Retorna None se a RPC não estiver disponível.
+        """
+        import logging
+
+        try:
+            response = get_supabase().rpc(
+                "transaction_summary_groups", self._filter_rpc_params(user_id, params, tenant_id)
+            ).execute()
+            return response.data or []
+        except Exception as e:
+            logging.warning(f"transaction_summary_groups indisponível: {e}")
+            return None
+
+    def _filter_rpc_params(self, user_id: str, params: Dict[str, Any], tenant_id: Optional[str]) -> Dict[str, Any]:
+        """Filtros compilados no formato dos parâmetros p_* das RPCs de facetas/resumo."""
+        compiled = self._compile_advanced_filters(params)
+        return {
+            "p_user_id": user_id,
+            "p_tenant_id": tenant_id,
+            "p_date_gte": compiled.get("date_gte"),
+            "p_date_lte": compiled.get("date_lte"),
+            "p_date_lt": compiled.get("date_lt"),
+            "p_types": compiled.get("types"),
+            "p_account_ids": compiled.get("account_ids"),
+            "p_category_ids": compiled.get("category_ids"),
+            "p_statuses": compiled.get("statuses"),
+            "p_min_amount": compiled.get("min_amount"),
+            "p_max_amount": compiled.get("max_amount"),
+            "p_is_recurring": compiled.get("is_recurring"),
+            "p_search": compiled.get("search_pattern"),
+        }
+
+    def _count_cache_key(self, user_id: str, tenant_id: Optional[str], params: Dict[str, Any]):
+        """Chave do total em cache: escopo + filtros compilados + versão de dados do tenant."""
+        compiled = self._compile_advanced_filters(params)
+        filters = tuple(
+            sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in compiled.items())
+        )
+        return (self.table_name, user_id, tenant_id, get_data_version(tenant_id), filters)
+
     def find_advanced(
         self,
         user_id: str,
         params: Dict[str, Any],
         tenant_id: Optional[str] = None,
+        columns: Columns = None,
+        include: Include = None,
     ) -> Dict[str, Any]:
         """
         Busca transações com filtros avançados e paginação.
+        `columns` restringe as colunas retornadas (padrão: todas).
+        `include` embute recursos relacionados (EMBEDDABLE, ex.: "category").
         Suporta:
         - page, limit, sort
         - date_from, date_to OU month/year
@@ -152,9 +526,25 @@ class TransactionRepository(BaseRepository):
         - account_ids (lista separada por vírgula)
         - category_ids (lista separada por vírgula)
         - min_amount, max_amount
-        - search (ilike em description)
+        - search (ilike em description/merchant_name/notes; com sort=relevance, o padrão
+          quando há busca, resultados ranqueados via _find_advanced_ranked)
         - status
+        - cursor / pagination=cursor: paginação por keyset (date, id), ver _find_advanced_keyset
+        - count: exact | planned | estimated | cached | none
+          (padrão DEFAULT_LIST_COUNT; modo cursor: sem contagem por padrão)
         """
+        if params.get("cursor") or params.get("pagination") == "cursor":
+            return self._find_advanced_keyset(user_id, params, tenant_id=tenant_id, columns=columns, include=include)
+        search = str(params.get("search") or "").strip()
+        if search and str(params.get("sort") or "relevance").partition(":")[0] == "relevance":
+            ranked = self._find_advanced_ranked(
+                user_id, search, params, tenant_id=tenant_id, columns=columns, include=include
+            )
+            if ranked is not None:
+                return ranked
+            # Sem busca ranqueada disponível: ILIKE com ordenação por data
+            params = {**params, "sort": "date:desc"}
+
         from database.connection import get_supabase
         import logging
 
@@ -164,131 +554,18 @@ class TransactionRepository(BaseRepository):
             page = 1
         if per_page < 1:
             per_page = 50
+        count_mode = normalize_count_strategy(params.get("count"), self.DEFAULT_LIST_COUNT)
 
-        try:
-            supabase = get_supabase()
-            query = supabase.table(self.table_name).select("*", count="exact")
-            query = query.ilike("source_file", self.CANONICAL_SOURCE_PATTERN)
+        def build(postgrest_count, embeds=()):
+            query = get_supabase().table(self.table_name).select(select_clause(columns, embeds), count=postgrest_count)
+            query = self._only_canonical(query)
 
             # Escopo obrigatório
             query = query.eq("user_id", user_id)
             if tenant_id:
                 query = query.eq("tenant_id", tenant_id)
 
-            # Período
-            date_from = params.get("date_from")
-            date_to = params.get("date_to")
-            month = params.get("month")
-            year = params.get("year")
-            date_preset = params.get("date_preset")
-
-            if date_from and date_to:
-                query = query.gte("date", str(date_from)).lte("date", str(date_to))
-            elif month and year:
-                # Compatibilidade com filtros antigos
-                m = int(month)
-                y = int(year)
-                start_date = f"{y}-{m:02d}-01"
-                if m == 12:
-                    end_date = f"{y + 1}-01-01"
-                else:
-                    end_date = f"{y}-{m + 1:02d}-01"
-                query = query.gte("date", start_date).lt("date", end_date)
-            elif date_preset:
-                today = date.today()
-                if str(date_preset) == "today":
-                    start_date = today.isoformat()
-                    end_date = (today + timedelta(days=1)).isoformat()
-                    query = query.gte("date", start_date).lt("date", end_date)
-                elif str(date_preset) == "7d":
-                    start_date = (today - timedelta(days=6)).isoformat()
-                    end_date = (today + timedelta(days=1)).isoformat()
-                    query = query.gte("date", start_date).lt("date", end_date)
-                elif str(date_preset) == "last_90_days":
-                    start_date = (today - timedelta(days=89)).isoformat()
-                    end_date = (today + timedelta(days=1)).isoformat()
-                    query = query.gte("date", start_date).lt("date", end_date)
-                elif str(date_preset) in ("year_to_date", "ytd"):
-                    start_date = date(today.year, 1, 1).isoformat()
-                    end_date = (today + timedelta(days=1)).isoformat()
-                    query = query.gte("date", start_date).lt("date", end_date)
-                elif str(date_preset) == "last_month":
-                    first_this = today.replace(day=1)
-                    last_prev = first_this - timedelta(days=1)
-                    first_prev = last_prev.replace(day=1)
-                    query = query.gte("date", first_prev.isoformat()).lt("date", first_this.isoformat())
-                else:
-                    # default: this_month
-                    first_this = today.replace(day=1)
-                    if first_this.month == 12:
-                        first_next = first_this.replace(year=first_this.year + 1, month=1)
-                    else:
-                        first_next = first_this.replace(month=first_this.month + 1)
-                    query = query.gte("date", first_this.isoformat()).lt("date", first_next.isoformat())
-
-            # Tipo (compatível com type único e types múltiplos)
-            tx_types = params.get("types")
-            if tx_types:
-                types = [str(x).strip() for x in str(tx_types).split(",") if str(x).strip()]
-                if len(types) == 1:
-                    query = query.eq("type", types[0])
-                elif types:
-                    query = query.in_("type", types)
-            elif params.get("type"):
-                query = query.eq("type", params["type"])
-
-            # Contas múltiplas
-            account_ids = params.get("account_ids") or params.get("account_id")
-            if account_ids:
-                ids = [str(x).strip() for x in str(account_ids).split(",") if str(x).strip()]
-                if ids:
-                    query = query.in_("account_id", ids)
-
-            # Categorias múltiplas
-            category_ids = params.get("category_ids") or params.get("category_id")
-            if category_ids:
-                ids = [str(x).strip() for x in str(category_ids).split(",") if str(x).strip()]
-                if ids:
-                    query = query.in_("category_id", ids)
-
-            # Intervalo de valor
-            if params.get("min_amount") not in (None, ""):
-                try:
-                    query = query.gte("amount", float(params["min_amount"]))
-                except (TypeError, ValueError):
-                    pass
-            if params.get("max_amount") not in (None, ""):
-                try:
-                    query = query.lte("amount", float(params["max_amount"]))
-                except (TypeError, ValueError):
-                    pass
-
-            # Status
-            if params.get("status"):
-                raw_status = str(params["status"]).strip().lower()
-                if raw_status == "canceled":
-                    raw_status = "cancelled"
-                if raw_status == "overdue":
-                    query = query.in_("status", ["pending", "overdue"]).lt("date", date.today().isoformat())
-                else:
-                    query = query.eq("status", raw_status)
-
-            # Recorrente
-            if params.get("is_recurring") not in (None, ""):
-                recurring_raw = params.get("is_recurring")
-                recurring = recurring_raw in (True, "true", "1", 1, "yes")
-                query = query.eq("is_recurring", recurring)
-
-            # Busca textual em múltiplos campos (description, merchant_name, notes)
-            search = params.get("search")
-            if search:
-                s = str(search).strip()
-                if s:
-                    pattern = f"%{s}%"
-                    # Usa OR em múltiplas colunas quando suportado
-                    query = query.or_(
-                        f"description.ilike.{pattern},merchant_name.ilike.{pattern},notes.ilike.{pattern}"
-                    )
+            query = self._apply_advanced_filters(query, params)
 
             # Ordenação
             sort_raw = params.get("sort") or "date:desc"
@@ -299,10 +576,19 @@ class TransactionRepository(BaseRepository):
 
             # Paginação
             offset = (page - 1) * per_page
-            query = query.range(offset, offset + per_page - 1)
+            return query.range(offset, offset + per_page - 1)
 
-            response = query.execute()
-            total = response.count if hasattr(response, "count") else len(response.data or [])
+        def run(embeds):
+            return execute_counted(
+                lambda postgrest_count: build(postgrest_count, embeds),
+                count_mode,
+                self._count_cache_key(user_id, tenant_id, params),
+            )
+
+        try:
+            response, total = self._run_with_include(run, include)
+            if total is None and count_mode:
+                total = len(response.data or [])
 
             return {
                 "data": response.data or [],
@@ -310,7 +596,7 @@ class TransactionRepository(BaseRepository):
                     "total": total,
                     "page": page,
                     "per_page": per_page,
-                    "pages": (total + per_page - 1) // per_page if total > 0 else 0,
+                    "pages": (total + per_page - 1) // per_page if total else 0,
                 },
             }
         except Exception as e:
@@ -325,26 +611,304 @@ class TransactionRepository(BaseRepository):
                 },
             }
 
+    # Colunas carregadas no índice de busca em memória (texto + campos dos filtros)
+    SEARCH_INDEX_COLUMNS = (
+        "id", "date", "description", "notes", "type", "status",
+        "amount", "account_id", "category_id", "is_recurring",
+    )
+    # Ids por requisição no .in_() que busca as linhas da página ranqueada
+    RANKED_FETCH_CHUNK = 100
+
+    @staticmethod
+    def _matches_compiled(compiled: Dict[str, Any], row: Dict[str, Any]) -> bool:
+        """Mesmos filtros de _apply_advanced_filters (exceto a busca) aplicados a uma linha."""
+        day = str(row.get("date") or "")[:10]
+        if compiled.get("date_gte") and day < compiled["date_gte"]:
+            return False
+        if compiled.get("date_lte") and day > compiled["date_lte"]:
+            return False
+        if compiled.get("date_lt") and day >= compiled["date_lt"]:
+            return False
+        for field, key in (("type", "types"), ("account_id", "account_ids"), ("category_id", "category_ids"), ("status", "statuses")):
+            values = compiled.get(key)
+            if values and str(row.get(field)) not in values:
+                return False
+        amount = float(row.get("amount") or 0)
+        if "min_amount" in compiled and amount < compiled["min_amount"]:
+            return False
+        if "max_amount" in compiled and amount > compiled["max_amount"]:
+            return False
+        if "is_recurring" in compiled and bool(row.get("is_recurring")) != compiled["is_recurring"]:
+            return False
+        return True
+
+    def _ranked_ids_rpc(
+        self,
+        user_id: str,
+        search: str,
+        compiled: Dict[str, Any],
+        tenant_id: Optional[str],
+        offset: int,
+        limit: int,
+    ) -> Optional[Tuple[List[Tuple[str, float]], int]]:
+        """Página ranqueada via RPC search_transaction_ids (pg_trgm); None se indisponível."""
+        import logging
+
+        rpc_params = {
+            "p_user_id": user_id,
+            "p_tenant_id": tenant_id,
+            "p_query": search,
+            "p_date_gte": compiled.get("date_gte"),
+            "p_date_lte": compiled.get("date_lte"),
+            "p_date_lt": compiled.get("date_lt"),
+            "p_types": compiled.get("types"),
+            "p_account_ids": compiled.get("account_ids"),
+            "p_category_ids": compiled.get("category_ids"),
+            "p_statuses": compiled.get("statuses"),
+            "p_min_amount": compiled.get("min_amount"),
+            "p_max_amount": compiled.get("max_amount"),
+            "p_is_recurring": compiled.get("is_recurring"),
+            "p_limit": limit,
+            "p_offset": offset,
+        }
+        try:
+            rows = get_supabase().rpc("search_transaction_ids", rpc_params).execute().data or []
+        except Exception as e:
+            logging.warning(f"search_transaction_ids indisponível, usando fallback de busca: {e}")
+            return None
+        total = int(rows[0].get("total_count") or 0) if rows else 0
+        return [(str(r["id"]), float(r.get("search_rank") or 0)) for r in rows], total
+
+    def _search_index(self, user_id: str, tenant_id: Optional[str]) -> TrigramIndex:
+        """Índice de trigramas das transações do usuário (montado uma vez por versão de dados)."""
+        key = (tenant_id, user_id, get_data_version(tenant_id))
+        with _search_indexes_lock:
+            index = _search_indexes.get(key)
+            if index is not None:
+                _search_indexes.move_to_end(key)
+                return index
+        index = TrigramIndex()
+        for row in self.iter_by_user_and_date_range(
+            user_id, "0001-01-01", "9999-12-31", tenant_id=tenant_id, columns=self.SEARCH_INDEX_COLUMNS,
+        ):
+            index.add(
+                str(row["id"]),
+                (row.get("description"), row.get("notes")),
+                payload=row,
+                sort_key=(str(row.get("date") or ""), str(row["id"])),
+            )
+        with _search_indexes_lock:
+            _search_indexes[key] = index
+            while len(_search_indexes) > MAX_SEARCH_INDEXES:
+                _search_indexes.popitem(last=False)
+        return index
+
+    def _ranked_ids_in_memory(
+        self,
+        user_id: str,
+        search: str,
+        compiled: Dict[str, Any],
+        tenant_id: Optional[str],
+        offset: int,
+        limit: int,
+    ) -> Tuple[List[Tuple[str, float]], int]:
+        matches = self._search_index(user_id, tenant_id).search(
+            search, predicate=lambda row: self._matches_compiled(compiled, row)
+        )
+        return [(doc_id, rank) for rank, doc_id, _ in matches[offset:offset + limit]], len(matches)
+
+    def _find_advanced_ranked(
+        self,
+        user_id: str,
+        search: str,
+        params: Dict[str, Any],
+        tenant_id: Optional[str] = None,
+        columns: Columns = None,
+        include: Include = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Busca ranqueada por relevância (pg_trgm) com os demais filtros de find_advanced.
+        1) ids da página + total: RPC search_transaction_ids, ou índice de
+           trigramas em memória quando a RPC não existe e SEARCH_MEMORY_INDEX
+           está ligado (senão retorna None e find_advanced usa o ILIKE);
+        2) linhas por id (.in_, com o mesmo escopo das demais leituras),
+           devolvidas na ordem do ranking com `search_rank`.
+        """
+        import logging
+
+        page = max(1, int(params.get("page") or 1))
+        per_page = int(params.get("limit") or 50)
+        if per_page < 1:
+            per_page = 50
+        offset = (page - 1) * per_page
+        compiled = self._compile_advanced_filters(params)
+
+        try:
+            ranked = self._ranked_ids_rpc(user_id, search, compiled, tenant_id, offset, per_page)
+            if ranked is None:
+                if not self.SEARCH_MEMORY_INDEX:
+                    return None
+                ranked = self._ranked_ids_in_memory(user_id, search, compiled, tenant_id, offset, per_page)
+            ranks, total = ranked
+
+            select = select_clause(columns)
+            if select != "*" and "id" not in {c.strip() for c in select.split(",")}:
+                select = f"{select}, id"
+            ids = [doc_id for doc_id, _ in ranks]
+
+            def fetch(embeds):
+                rows: Dict[str, Dict[str, Any]] = {}
+                for start in range(0, len(ids), self.RANKED_FETCH_CHUNK):
+                    chunk = ids[start:start + self.RANKED_FETCH_CHUNK]
+                    query = (
+                        get_supabase().table(self.table_name)
+                        .select(", ".join((select,) + embeds))
+                        .eq("user_id", user_id)
+                    )
+                    if tenant_id:
+                        query = query.eq("tenant_id", tenant_id)
+                    response = self._only_canonical(query).in_("id", chunk).execute()
+                    rows.update({str(row["id"]): row for row in response.data or []})
+                return rows
+
+            by_id = self._run_with_include(fetch, include)
+            data = []
+            for doc_id, rank in ranks:
+                row = by_id.get(doc_id)
+                if row is not None:
+                    data.append({**row, "search_rank": round(rank, 4)})
+
+            return {
+                "data": data,
+                "pagination": {
+                    "total": total,
+                    "page": page,
+                    "per_page": per_page,
+                    "pages": (total + per_page - 1) // per_page if total else 0,
+                    "sort": "relevance",
+                },
+            }
+        except Exception as e:
+            logging.error(f"Erro ao buscar transações (find_advanced relevância): {e}")
+            return {
+                "data": [],
+                "pagination": {"total": 0, "page": page, "per_page": per_page, "pages": 0, "sort": "relevance"},
+            }
+
+    def _find_advanced_keyset(
+        self,
+        user_id: str,
+        params: Dict[str, Any],
+        tenant_id: Optional[str] = None,
+        columns: Columns = None,
+        include: Include = None,
+    ) -> Dict[str, Any]:
+        """
+        Paginação por keyset (date, id) com os mesmos filtros de find_advanced.
+        Cada página é uma query indexada a partir do cursor (custo constante em
+        qualquer profundidade). Só ordena por data (asc/desc), com id como desempate.
+        Contagem só quando pedida (param count).
+        """
+        import logging
+
+        per_page = int(params.get("limit") or 50)
+        if per_page < 1:
+            per_page = 50
+        sort_raw = params.get("sort") or "date:desc"
+        field, _, direction = str(sort_raw).partition(":")
+        if (field or "date") != "date":
+            raise ValidationException("Paginação por cursor só suporta ordenação por data")
+        descending = (direction or "desc").lower() != "asc"
+        cursor = params.get("cursor")
+        last_date = last_id = None
+        if cursor:
+            last_date, last_id, descending = decode_cursor(str(cursor))
+        count_mode = normalize_count_strategy(params.get("count"), None)
+
+        select = select_clause(columns)
+        if select != "*" and not {"id", "date"} <= {c.strip() for c in select.split(",")}:
+            select = f"{select}, id, date"
+
+        def build(postgrest_count, embeds=()):
+            query = get_supabase().table(self.table_name).select(", ".join((select,) + embeds), count=postgrest_count)
+            query = self._only_canonical(query)
+            query = query.eq("user_id", user_id)
+            if tenant_id:
+                query = query.eq("tenant_id", tenant_id)
+            query = self._apply_advanced_filters(query, params)
+            if last_date is not None:
+                op = "lt" if descending else "gt"
+                query = query.or_(
+                    f'date.{op}."{last_date}",and(date.eq."{last_date}",id.{op}.{last_id})'
+                )
+            # Uma linha a mais para saber se existe próxima página
+            return query.order("date", desc=descending).order("id", desc=descending).limit(per_page + 1)
+
+        try:
+            # Com cursor a contagem cobre só o restante; o total do filtro inteiro
+            # vem do cache (gravado na primeira página) quando count=cached
+            response, total = self._run_with_include(
+                lambda embeds: execute_counted(
+                    lambda postgrest_count: build(postgrest_count, embeds),
+                    count_mode,
+                    self._count_cache_key(user_id, tenant_id, params),
+                    store=last_date is None,
+                ),
+                include,
+            )
+            rows = response.data or []
+            has_more = len(rows) > per_page
+            rows = rows[:per_page]
+            next_cursor = (
+                encode_cursor(rows[-1]["date"], rows[-1]["id"], descending)
+                if has_more and rows else None
+            )
+            return {
+                "data": rows,
+                "pagination": {
+                    "mode": "cursor",
+                    "per_page": per_page,
+                    "next_cursor": next_cursor,
+                    "has_more": has_more,
+                    "total": total,
+                    "count_mode": count_mode,
+                },
+            }
+        except Exception as e:
+            logging.error(f"Erro ao buscar transações (find_advanced cursor): {e}")
+            return {
+                "data": [],
+                "pagination": {
+                    "mode": "cursor",
+                    "per_page": per_page,
+                    "next_cursor": None,
+                    "has_more": False,
+                    "total": None,
+                    "count_mode": count_mode,
+                },
+            }
+
     def find_by_user_limit(
         self,
         user_id: str,
         limit: int = 10,
         tenant_id: Optional[str] = None,
+        include: Include = None,
     ) -> List[Dict[str, Any]]:
-        """Busca últimas transações do usuário (para recent_transactions)."""
-        try:
+        """Busca últimas transações do usuário (para recent_transactions); include como em find_advanced."""
+        def run(embeds):
             query = (
-                get_supabase()
-                .table(self.table_name)
-                .select("*")
-                .ilike("source_file", self.CANONICAL_SOURCE_PATTERN)
+                self._only_canonical(get_supabase().table(self.table_name).select(select_clause(None, embeds)))
                 .eq("user_id", user_id)
                 .order("date", desc=True)
                 .limit(limit)
             )
             if tenant_id:
                 query = query.eq("tenant_id", tenant_id)
-            response = query.execute()
+            return query.execute()
+
+        try:
+            response = self._run_with_include(run, include)
             return response.data if response.data else []
         except Exception as e:
             import logging
@@ -429,28 +993,66 @@ class TransactionRepository(BaseRepository):
         Retorna dados pré-agregados para otimizar evolução mensal.
 
         OTIMIZAÇÃO: Faz 1 query única ao invés de N queries (uma por mês).
+        Lê só as colunas necessárias, paginando por keyset (sem truncar em max-rows).
         """
         try:
-            query = (
-                get_supabase()
-                .table(self.table_name)
-                .select("date, type, amount, status")
-                .ilike("source_file", self.CANONICAL_SOURCE_PATTERN)
-                .eq("user_id", user_id)
-                .gte("date", start_date)
-                .lt("date", end_date)
-                .order("date", desc=False)
-            )
-            if tenant_id:
-                query = query.eq("tenant_id", tenant_id)
-
-            response = query.execute()
-            return response.data if response.data else []
+            return list(self.iter_by_user_and_date_range(
+                user_id, start_date, end_date,
+                tenant_id=tenant_id,
+                columns=("id", "date", "type", "amount", "status"),
+            ))
         except Exception as e:
             import logging
             logging.error(f"Erro ao buscar transações agregadas: {e}")
             return []
 
+    AGGREGATE_GROUP_FIELDS = ("period", "category_id", "account_id", "type", "status")
+
+    def aggregate_by_period(
+        self,
+        user_id: str,
+        start_date: str,
+        end_date: str,
+        group_by: List[str],
+        tenant_id: Optional[str] = None,
+        status: Optional[str] = None,
+        tx_type: Optional[str] = None,
+        account_id: Optional[str] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        GROUP BY no Postgres (RPC aggregate_transactions) com SUM(amount)/COUNT(*).
+        Só as dimensões de group_by voltam preenchidas; retorna None em erro
+        (ex.: função não criada) para o chamador usar a agregação em memória.
+        """
+        dims = [field for field in group_by if field in self.AGGREGATE_GROUP_FIELDS]
+        try:
+            response = get_supabase().rpc(
+                "aggregate_transactions",
+                {
+                    "p_user_id": user_id,
+                    "p_tenant_id": tenant_id,
+                    "p_start": start_date,
+                    "p_end": end_date,
+                    "p_group_by": dims,
+                    "p_status": status,
+                    "p_type": tx_type,
+                    "p_account_id": account_id,
+                },
+            ).execute()
+            rows = []
+            for item in response.data or []:
+                row = {field: item.get(field) for field in dims}
+                if "period" in row and row["period"]:
+                    row["period"] = str(row["period"])[:10]
+                row["total"] = float(item.get("total") or 0)
+                row["tx_count"] = int(item.get("tx_count") or 0)
+                rows.append(row)
+            return rows
+        except Exception as e:
+            import logging
+            logging.warning(f"Agregação SQL indisponível, usando memória: {e}")
+            return None
+
     def create_many(self, transactions: List[Dict[str, Any]]) -> List[str]:
         """
         Cria múltiplas transações. Garante account_tenant_id e category_tenant_id = tenant_id.
@@ -475,6 +1077,8 @@ class TransactionRepository(BaseRepository):
                     tx["account_tenant_id"] = t_tenant_id
                 if not tx.get("category_tenant_id"):
                     tx["category_tenant_id"] = t_tenant_id
+                if self.USE_CANONICAL_COLUMN:
+                    tx["is_canonical"] = self.is_canonical_source(tx.get("source_file"))
             supabase = get_supabase()
             response = supabase.table(self.table_name).insert(transactions).execute()
 
@@ -485,3 +1089,58 @@ class TransactionRepository(BaseRepository):
             import logging
             logging.error(f"Erro ao criar múltiplas transações: {e}")
             return []
+
+    # Ids por comando nas operações em lote (mantém a URL do .in_() curta)
+    BULK_CHUNK = 200
+
+    def _scoped_by_ids(self, query, ids: List[str], user_id: str, tenant_id: Optional[str]):
+        query = query.in_("id", ids).eq("user_id", user_id)
+        if tenant_id:
+            query = query.eq("tenant_id", tenant_id)
+        return query
+
+    def find_by_ids(
+        self,
+        ids: List[str],
+        user_id: str,
+        tenant_id: Optional[str] = None,
+        columns: Columns = None,
+    ) -> List[Dict[str, Any]]:
+        """Transações do usuário (e tenant) entre os ids, em lotes de BULK_CHUNK."""
+        rows: List[Dict[str, Any]] = []
+        for start in range(0, len(ids), self.BULK_CHUNK):
+            chunk = ids[start:start + self.BULK_CHUNK]
+            query = get_supabase().table(self.table_name).select(select_clause(columns))
+            response = self._scoped_by_ids(query, chunk, user_id, tenant_id).execute()
+            rows.extend(response.data or [])
+        return rows
+
+    def update_by_ids(
+        self,
+        ids: List[str],
+        data: Dict[str, Any],
+        user_id: str,
+        tenant_id: Optional[str] = None,
+    ) -> int:
+        """
+        Um UPDATE ... WHERE id IN (...) por lote, com escopo de usuário/tenant.
+        Retorna o número de linhas alteradas. Erros sobem para o serviço.
+        """
+        data = {**data, "updated_at": data.get("updated_at") or datetime.utcnow().isoformat()}
+        updated = 0
+        for start in range(0, len(ids), self.BULK_CHUNK):
+            chunk = ids[start:start + self.BULK_CHUNK]
+            query = get_supabase().table(self.table_name).update(data)
+            response = self._scoped_by_ids(query, chunk, user_id, tenant_id).execute()
+            updated += len(response.data or [])
+        return updated
+
+    def delete_by_ids(self, ids: List[str], user_id: str, tenant_id: Optional[str] = None) -> int:
+        """Um DELETE ... WHERE id IN (...) por lote; retorna o número de linhas removidas."""
+        deleted = 0
+        for start in range(0, len(ids), self.BULK_CHUNK):
+            chunk = ids[start:start + self.BULK_CHUNK]
+            query = get_supabase().table(self.table_name).delete()
+            response = self._scoped_by_ids(query, chunk, user_id, tenant_id).execute()
+            deleted += len(response.data or [])
+        return deleted
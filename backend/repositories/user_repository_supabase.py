@@ -1,8 +1,11 @@
 """
 User Repository para Supabase
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from .base_repository_supabase import BaseRepository
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class UserRepository(BaseRepository):
@@ -17,3 +20,18 @@ class UserRepository(BaseRepository):
         """Atualiza configurações do usuário"""
         return self.update(user_id, {'settings': settings})
 
+    def find_recently_active(self, since_iso: str, limit: int = 5000) -> List[Dict[str, Any]]:
+        """Usuários com last_activity_at >= since_iso (mais recentes primeiro), só id e last_activity_at."""
+        try:
+            response = (
+                self.supabase.table(self.table_name)
+                .select("id, last_activity_at")
+                .gte("last_activity_at", since_iso)
+                .order("last_activity_at", desc=True)
+                .limit(limit)
+                .execute()
+            )
+            return response.data or []
+        except Exception as e:
+            logger.error(f"Erro ao buscar usuários ativos desde {since_iso}: {e}")
+            return []
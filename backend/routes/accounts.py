@@ -4,6 +4,7 @@ import pandas as pd
 from datetime import datetime
 from utils.auth_utils import require_auth
 from utils.tenant_context import require_tenant
+from utils.http_cache import etag_by_data_version
 from services.account_service import AccountService
 from services.transaction_service import TransactionService
 from services.category_service import CategoryService
@@ -22,6 +23,7 @@ def _account_id(acc):
 @require_auth
 @limiter.limit("200 per hour")  # Aumenta limite para GET de contas (muitos componentes precisam)
 @require_tenant
+@etag_by_data_version
 def accounts():
     account_repo = current_app.config['ACCOUNTS']
     transactions_repo = current_app.config['TRANSACTIONS']
@@ -61,6 +63,7 @@ def accounts():
 @bp.route('/<account_id>', methods=['GET', 'PUT', 'DELETE'])
 @require_auth
 @require_tenant
+@etag_by_data_version
 def account_detail(account_id: str):
     account_repo = current_app.config['ACCOUNTS']
     transactions_repo = current_app.config['TRANSACTIONS']
@@ -96,7 +99,7 @@ def account_detail(account_id: str):
 @require_tenant
 def import_credit_card_statement(account_id: str):
     """Importa fatura de cartão de crédito via PDF, OFX ou CSV"""
-    from services.import_service import parse_import_file, compute_dedup_key
+    from services.import_service import ingest_import_file, compute_dedup_key
     from services.merchant_alias_service import MerchantAliasService
 
     account_repo = current_app.config['ACCOUNTS']
@@ -105,7 +108,10 @@ def import_credit_card_statement(account_id: str):
 
     account_service = AccountService(account_repo, transactions_repo)
     category_service = CategoryService(categories_repo, transactions_repo)
-    transaction_service = TransactionService(transactions_repo, categories_repo, account_repo)
+    transaction_service = TransactionService(
+        transactions_repo, categories_repo, account_repo,
+        aggregates_repo=current_app.config.get('TRANSACTION_AGGREGATE_REPO'),
+    )
     alias_repo = current_app.config.get('MERCHANT_ALIAS_REPO')
     alias_service = MerchantAliasService(alias_repo) if alias_repo else None
     
@@ -139,9 +145,11 @@ def import_credit_card_statement(account_id: str):
         if filename_lower.endswith('.pdf'):
             return jsonify({'error': 'Importação de PDF ainda não está implementada. Use OFX ou CSV.'}), 400
         
-        # Para OFX e CSV, usa o serviço de importação existente
+        # Para OFX e CSV, usa o serviço de importação existente (conta já conhecida: sem detecção)
         try:
-            file_format, parsed_transactions = parse_import_file(file.filename, file_content)
+            file_format, parsed_transactions, _account_info = ingest_import_file(
+                file.filename, file_content, detect_account=False
+            )
         except Exception as e:
             return jsonify({'error': f'Erro ao processar arquivo: {str(e)}'}), 400
         
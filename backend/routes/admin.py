@@ -34,9 +34,11 @@ def get_stats():
     categories_repo = current_app.config["CATEGORIES"]
     accounts_repo = current_app.config["ACCOUNTS"]
 
-    total_transactions = transactions_repo.count({}) if hasattr(transactions_repo, "count") else 0
-    total_categories = categories_repo.count({}) if hasattr(categories_repo, "count") else 0
-    total_accounts = accounts_repo.count({}) if hasattr(accounts_repo, "count") else 0
+    # Totais da tabela inteira: estimativa do planner (sem varrer transactions); ?count=exact força COUNT(*)
+    count = request.args.get("count") or "planned"
+    total_transactions = transactions_repo.count({}, strategy=count) if hasattr(transactions_repo, "count") else 0
+    total_categories = categories_repo.count({}, strategy=count) if hasattr(categories_repo, "count") else 0
+    total_accounts = accounts_repo.count({}, strategy=count) if hasattr(accounts_repo, "count") else 0
 
     now = datetime.now(timezone.utc)
     start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0).isoformat()
@@ -102,6 +104,8 @@ def list_users():
             search=search,
             status_filter=status_filter,
             admins_only=admins_only,
+            # exact | planned | estimated | cached (padrão: AdminUserRepository.LIST_COUNT)
+            count=request.args.get("count"),
         )
     )
 
@@ -216,12 +220,13 @@ def get_user_details(user_id):
     total_categories = 0
     total_accounts = 0
     try:
+        count = request.args.get("count") or "cached"
         if hasattr(transactions_collection, "count"):
-            total_transactions = transactions_collection.count({"user_id": user_id})
+            total_transactions = transactions_collection.count({"user_id": user_id}, strategy=count)
         if hasattr(categories_collection, "count"):
-            total_categories = categories_collection.count({"user_id": user_id})
+            total_categories = categories_collection.count({"user_id": user_id}, strategy=count)
         if hasattr(accounts_collection, "count"):
-            total_accounts = accounts_collection.count({"user_id": user_id})
+            total_accounts = accounts_collection.count({"user_id": user_id}, strategy=count)
     except Exception as exc:
         logger.warning("get_user_details counts: %s", exc)
 
@@ -1,14 +1,18 @@
 from flask import Blueprint, request, jsonify, current_app
 from utils.auth_utils import require_auth
 from utils.tenant_context import require_tenant
+from utils.http_cache import etag_by_data_version
 from services.category_service import CategoryService
 from utils.exceptions import ValidationException, NotFoundException
+from utils.data_version import bump_data_version
+from utils.lookup_cache import invalidate_lookups
 
 bp = Blueprint('categories', __name__, url_prefix='/api/categories')
 
 @bp.route('', methods=['GET', 'POST'])
 @require_auth
 @require_tenant
+@etag_by_data_version
 def categories():
     category_repo = current_app.config['CATEGORIES']
     transactions_repo = current_app.config['TRANSACTIONS']
@@ -55,6 +59,7 @@ def categories():
 @bp.route('/<category_id>', methods=['GET', 'PUT', 'DELETE'])
 @require_auth
 @require_tenant
+@etag_by_data_version
 def category_detail(category_id: str):
     category_repo = current_app.config['CATEGORIES']
     transactions_repo = current_app.config['TRANSACTIONS']
@@ -183,6 +188,9 @@ def import_categories():
         else:
             return jsonify({'error': 'Apenas arquivos JSON e CSV são aceitos'}), 400
         
+        if imported_count:
+            bump_data_version(tenant_id)
+            invalidate_lookups(tenant_id)
         return jsonify({
             'message': f'{imported_count} categorias importadas com sucesso',
             'imported_count': imported_count,
@@ -2,12 +2,12 @@ from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime
 from utils.auth_utils import require_auth
 from utils.tenant_context import require_tenant
+from utils.http_cache import etag_by_data_version
 from services.report_service import (
     dashboard_summary,
-    dashboard_summary_supabase,
     monthly_evolution,
-    monthly_evolution_supabase,
 )
+from services.report_warmer import cached_dashboard_advanced, cached_dashboard_summary
 
 
 bp = Blueprint('dashboard', __name__, url_prefix='/api')
@@ -21,9 +21,11 @@ def _dashboard_data():
     user_id = request.user_id
     tenant_id = request.tenant_id
     if current_app.config.get('DB_TYPE') == 'supabase':
-        data = dashboard_summary_supabase(transactions, categories, user_id, month, year, tenant_id=tenant_id)
-        if request.args.get('show_evolution', 'true').lower() in ('1', 'true', 'yes'):
-            data['monthly_evolution'] = monthly_evolution_supabase(transactions, user_id, 6, tenant_id=tenant_id)
+        data = cached_dashboard_advanced(
+            transactions, categories, user_id, tenant_id, month, year,
+            show_evolution=request.args.get('show_evolution', 'true').lower() in ('1', 'true', 'yes'),
+            aggregates_repo=current_app.config.get('TRANSACTION_AGGREGATE_REPO'),
+        )
     else:
         data = dashboard_summary(transactions, categories, user_id, month, year)
         if request.args.get('show_evolution', 'true').lower() in ('1', 'true', 'yes'):
@@ -34,19 +36,21 @@ def _dashboard_data():
 @bp.route('/dashboard', methods=['GET'])
 @require_auth
 @require_tenant
+@etag_by_data_version
 def dashboard():
     month = int(request.args.get('month', datetime.now().month))
     year = int(request.args.get('year', datetime.now().year))
     transactions = current_app.config['TRANSACTIONS']
     categories = current_app.config['CATEGORIES']
     if current_app.config.get('DB_TYPE') == 'supabase':
-        data = dashboard_summary_supabase(
+        data = cached_dashboard_summary(
             transactions,
             categories,
             request.user_id,
+            request.tenant_id,
             month,
             year,
-            tenant_id=request.tenant_id,
+            aggregates_repo=current_app.config.get('TRANSACTION_AGGREGATE_REPO'),
         )
     else:
         data = dashboard_summary(transactions, categories, request.user_id, month, year)
@@ -56,6 +60,7 @@ def dashboard():
 @bp.route('/dashboard-advanced', methods=['GET'])
 @require_auth
 @require_tenant
+@etag_by_data_version
 def dashboard_advanced():
     data = _dashboard_data()
     return jsonify(data)
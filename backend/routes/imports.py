@@ -0,0 +1,26 @@
+"""
+Rotas de acompanhamento das importações assíncronas (services/import_jobs.py).
+
+POST /api/transactions/import com mode=async responde 202 com o id do job;
+o cliente consulta aqui o andamento até status 'succeeded' ou 'failed'.
+
+GET /api/imports/<id> — status, etapa, progresso (processed/total), resultado
+                        (mesmo corpo da importação síncrona) e erro
+"""
+from flask import Blueprint, jsonify, current_app, request
+from utils.auth_utils import require_auth
+from utils.tenant_context import require_tenant
+from services.import_jobs import serialize_job
+
+bp = Blueprint('imports', __name__, url_prefix='/api/imports')
+
+
+@bp.route('/<job_id>', methods=['GET'])
+@require_auth
+@require_tenant
+def import_job_status(job_id: str):
+    queue = current_app.config.get('IMPORT_JOBS')
+    job = queue.get(job_id, request.user_id, request.tenant_id) if queue else None
+    if not job:
+        return jsonify({'error': 'Importação não encontrada'}), 404
+    return jsonify(serialize_job(job))
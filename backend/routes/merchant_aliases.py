@@ -14,11 +14,11 @@ POST   /api/merchant-aliases       — cria alias escopado ao tenant/usuário
 PUT    /api/merchant-aliases/<id>  — atualiza alias (só se pertencer ao tenant)
 DELETE /api/merchant-aliases/<id>  — remove alias (só se pertencer ao tenant)
 """
-import unicodedata
 from flask import Blueprint, request, jsonify, current_app
 from utils.auth_utils import require_auth
 from utils.tenant_context import require_tenant
 from utils.exceptions import ValidationException
+from utils.merchant_alias_index import invalidate_merchant_aliases, normalize_alias_text
 
 bp = Blueprint("merchant_aliases", __name__, url_prefix="/api/merchant-aliases")
 
@@ -27,11 +27,7 @@ _VALID_CATEGORY_TYPES = ("income", "expense")
 
 
 def _normalize(text: str) -> str:
-    base = (text or "").strip().lower()
-    if not base:
-        return ""
-    normalized = unicodedata.normalize("NFKD", base)
-    return "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    return normalize_alias_text(text)
 
 
 @bp.route("", methods=["GET"])
@@ -87,6 +83,7 @@ def create_alias():
         "active": True,
     }
     new_id = repo.create(alias_data)
+    invalidate_merchant_aliases()
     return jsonify({"id": new_id, **alias_data}), 201
 
 
@@ -131,6 +128,7 @@ def update_alias(alias_id: str):
         return jsonify({"error": "Nenhum campo para atualizar"}), 400
 
     repo.update(alias_id, update_data)
+    invalidate_merchant_aliases()
     return jsonify({"id": alias_id, **{**existing, **update_data}})
 
 
@@ -148,4 +146,5 @@ def delete_alias(alias_id: str):
         return jsonify({"error": "Alias não encontrado"}), 404
 
     repo.delete(alias_id)
+    invalidate_merchant_aliases()
     return jsonify({"message": "Alias removido"}), 200
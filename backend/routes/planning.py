@@ -11,6 +11,7 @@ from datetime import datetime
 from utils.auth_utils import require_auth
 from utils.tenant_context import require_tenant
 from utils.exceptions import ValidationException
+from utils.data_version import bump_data_version
 
 bp = Blueprint("planning", __name__, url_prefix="/api/planning")
 
@@ -45,17 +46,11 @@ def planning_month_get():
     user_id = request.user_id
     tenant_id = getattr(request, "tenant_id", None)
 
-    from services.planning_service import get_planning_month_payload
+    from services.report_warmer import cached_planning_month
 
     try:
-        data = get_planning_month_payload(
-            user_id=user_id,
-            tenant_id=tenant_id,
-            month=month,
-            year=year,
-            transactions_repo=transactions_repo,
-            categories_repo=categories_repo,
-            budget_repo=budget_repo,
+        data = cached_planning_month(
+            transactions_repo, categories_repo, budget_repo, user_id, tenant_id, month, year,
         )
         return jsonify(data)
     except ValidationException as e:
@@ -220,6 +215,7 @@ def planning_month_delete_line(plan_id: str):
     try:
         ok = budget_repo.delete_plan_by_id(plan_id, tenant_id, user_id)
         if ok:
+            bump_data_version(tenant_id)
             return jsonify({"message": "Linha de orçamento removida"})
         return jsonify({"error": "Linha não encontrada"}), 404
     except Exception as e:
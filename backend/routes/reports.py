@@ -2,15 +2,32 @@ from datetime import datetime
 from flask import Blueprint, request, jsonify, current_app
 from utils.auth_utils import require_auth
 from utils.tenant_context import require_tenant
-from services.report_service import overview_report_supabase, comparison_report_supabase
+from utils.http_cache import etag_by_data_version
+from services.report_service import (
+    overview_report_supabase,
+    comparison_report_supabase,
+    report_bundle_supabase,
+    rollup_report_supabase,
+    ROLLUP_GRANULARITIES,
+    ROLLUP_DIMENSIONS,
+)
+from services.report_cache import get_or_compute
 
 
 bp = Blueprint('reports', __name__, url_prefix='/api/reports')
 
+VALID_OVERVIEW_TYPES = [
+    'expenses_by_category', 'expenses_by_account', 'income_by_category', 'income_by_account', 'balance_by_account',
+]
+INVALID_OVERVIEW_TYPE_ERROR = f'Tipo de relatório inválido. Tipos válidos: {", ".join(VALID_OVERVIEW_TYPES)}'
+MAX_EVOLUTION_MONTHS = 24
+MAX_ROLLUP_MONTHS = 120
+
 
 @bp.route('/overview', methods=['GET'])
 @require_auth
 @require_tenant
+@etag_by_data_version
 def reports_overview():
     try:
         month = int(request.args.get('month', datetime.now().month))
@@ -19,9 +36,8 @@ def reports_overview():
         account_id = request.args.get('account_id')  # Filtro opcional por conta
         
         # Valida o tipo de relatório
-        valid_types = ['expenses_by_category', 'expenses_by_account', 'income_by_category', 'income_by_account', 'balance_by_account']
-        if report_type not in valid_types:
-            return jsonify({'error': f'Tipo de relatório inválido. Tipos válidos: {", ".join(valid_types)}'}), 400
+        if report_type not in VALID_OVERVIEW_TYPES:
+            return jsonify({'error': INVALID_OVERVIEW_TYPE_ERROR}), 400
         
         # Valida mês e ano
         if month < 1 or month > 12:
@@ -55,6 +71,7 @@ def reports_overview():
             report_type,
             account_id,
             tenant_id=request.tenant_id,
+            aggregates_repo=current_app.config.get('TRANSACTION_AGGREGATE_REPO'),
         )
         return jsonify(data)
     except ValueError as e:
@@ -75,6 +92,7 @@ def reports_evolution():
 @bp.route('/comparison', methods=['GET'])
 @require_auth
 @require_tenant
+@etag_by_data_version
 def reports_comparison():
     current_month = int(request.args.get('current_month',  datetime.now().month))
     current_year = int(request.args.get('current_year',  datetime.now().year))
@@ -85,6 +103,129 @@ def reports_comparison():
         current_month,
         current_year,
         tenant_id=request.tenant_id,
+        aggregates_repo=current_app.config.get('TRANSACTION_AGGREGATE_REPO'),
     )
     return jsonify(data)
 
+
+@bp.route('/bundle', methods=['GET'])
+@require_auth
+@require_tenant
+@etag_by_data_version
+def reports_bundle():
+    """
+    Overview (vários tipos), comparison e evolution em uma única leitura de transações.
+
+    Query params:
+    - month, year: período do overview/comparison (padrão: mês atual)
+    - types: tipos de overview separados por vírgula (padrão: todos)
+    - comparison: true/false (padrão: true)
+    - evolution_months: meses de evolução, 0 desliga (padrão: 6, máx. 24)
+    - account_id: filtro opcional por conta (só overview)
+    """
+    try:
+        month = int(request.args.get('month', datetime.now().month))
+        year = int(request.args.get('year', datetime.now().year))
+        types_param = request.args.get('types')
+        if types_param:
+            report_types = [t.strip() for t in types_param.split(',') if t.strip()]
+        else:
+            report_types = list(VALID_OVERVIEW_TYPES)
+        include_comparison = request.args.get('comparison', 'true').lower() in ('1', 'true', 'yes')
+        evolution_months = int(request.args.get('evolution_months', 6))
+        account_id = request.args.get('account_id')
+
+        invalid = [t for t in report_types if t not in VALID_OVERVIEW_TYPES]
+        if invalid:
+            return jsonify({'error': INVALID_OVERVIEW_TYPE_ERROR}), 400
+        if month < 1 or month > 12:
+            return jsonify({'error': 'Mês inválido. Use um valor entre 1 e 12'}), 400
+        if year < 2000 or year > 2100:
+            return jsonify({'error': 'Ano inválido'}), 400
+        if evolution_months < 0 or evolution_months > MAX_EVOLUTION_MONTHS:
+            return jsonify({'error': f'evolution_months deve estar entre 0 e {MAX_EVOLUTION_MONTHS}'}), 400
+
+        accounts_repo = current_app.config['ACCOUNTS']
+        if account_id:
+            account = accounts_repo.find_by_id(account_id)
+            if (
+                not account
+                or account.get('user_id') != request.user_id
+                or account.get('tenant_id') != request.tenant_id
+            ):
+                return jsonify({'error': 'Conta não encontrada'}), 404
+
+        data = report_bundle_supabase(
+            current_app.config['TRANSACTIONS'],
+            current_app.config['CATEGORIES'],
+            accounts_repo,
+            request.user_id,
+            month,
+            year,
+            report_types,
+            include_comparison=include_comparison,
+            evolution_months=evolution_months,
+            account_id=account_id,
+            tenant_id=request.tenant_id,
+            aggregates_repo=current_app.config.get('TRANSACTION_AGGREGATE_REPO'),
+        )
+        return jsonify(data)
+    except ValueError as e:
+        current_app.logger.error(f"Erro de validação em reports_bundle: {str(e)}")
+        return jsonify({'error': f'Erro de validação: {str(e)}'}), 400
+    except Exception as e:
+        current_app.logger.error(f"Erro inesperado em reports_bundle: {str(e)}", exc_info=True)
+        return jsonify({'error': f'Erro ao gerar relatório: {str(e)}'}), 500
+
+
+@bp.route('/rollup', methods=['GET'])
+@require_auth
+@require_tenant
+@etag_by_data_version
+def reports_rollup():
+    """
+    Totais pagos por ano/trimestre/mês, por categoria ou conta, a partir do agregado mensal.
+
+    Query params:
+    - months: tamanho da janela em meses, incluindo o atual (padrão: 12, máx. 120)
+    - granularity: year | quarter | month (padrão: year)
+    - group: category | account (padrão: category)
+    """
+    try:
+        months = int(request.args.get('months', 12))
+        granularity = request.args.get('granularity', 'year')
+        dimension = request.args.get('group', 'category')
+
+        if months < 1 or months > MAX_ROLLUP_MONTHS:
+            return jsonify({'error': f'months deve estar entre 1 e {MAX_ROLLUP_MONTHS}'}), 400
+        if granularity not in ROLLUP_GRANULARITIES:
+            return jsonify({'error': f'Granularidade inválida. Use: {", ".join(ROLLUP_GRANULARITIES)}'}), 400
+        if dimension not in ROLLUP_DIMENSIONS:
+            return jsonify({'error': f'Agrupamento inválido. Use: {", ".join(ROLLUP_DIMENSIONS)}'}), 400
+
+        now = datetime.now()
+        data = get_or_compute(
+            'reports-rollup',
+            request.tenant_id,
+            request.user_id,
+            (months, granularity, dimension, now.strftime('%Y-%m')),
+            lambda: rollup_report_supabase(
+                current_app.config['TRANSACTIONS'],
+                current_app.config['CATEGORIES'],
+                current_app.config['ACCOUNTS'],
+                request.user_id,
+                months=months,
+                granularity=granularity,
+                dimension=dimension,
+                tenant_id=request.tenant_id,
+                aggregates_repo=current_app.config.get('TRANSACTION_AGGREGATE_REPO'),
+                today=now,
+            ),
+        )
+        return jsonify(data)
+    except ValueError as e:
+        current_app.logger.error(f"Erro de validação em reports_rollup: {str(e)}")
+        return jsonify({'error': f'Erro de validação: {str(e)}'}), 400
+    except Exception as e:
+        current_app.logger.error(f"Erro inesperado em reports_rollup: {str(e)}", exc_info=True)
+        return jsonify({'error': f'Erro ao gerar relatório: {str(e)}'}), 500
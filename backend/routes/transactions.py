@@ -1,12 +1,11 @@
 from flask import Blueprint, request, jsonify, current_app
 import pandas as pd
 from io import StringIO
-import uuid
 from datetime import datetime
 
 from utils.auth_utils import require_auth
 from utils.tenant_context import require_tenant
-from services.transaction_service import TransactionService
+from services.transaction_service import TransactionService, uncategorized_category_ids
 from utils.exceptions import ValidationException, NotFoundException
 
 bp = Blueprint('transactions', __name__, url_prefix='/api/transactions')
@@ -15,15 +14,7 @@ bp = Blueprint('transactions', __name__, url_prefix='/api/transactions')
 def _build_transaction_summary(data, category_map):
     paid_income = 0.0
     paid_expense = 0.0
-    uncategorized_ids = {
-        str(category_id)
-        for category_id, category in category_map.items()
-        if str(category.get('name') or '').strip().casefold() in {
-            'não classificado',
-            'nao classificado',
-            'sem categoria',
-        }
-    }
+    uncategorized_ids = uncategorized_category_ids(category_map)
 
     for tx in data:
         if tx.get('status') != 'paid':
@@ -46,6 +37,36 @@ def _build_transaction_summary(data, category_map):
         ),
     }
 
+
+def _build_facet_summary(facet_rows, category_map):
+    """Mesmo formato de _build_transaction_summary, a partir das linhas de facet_counts."""
+    paid_income = 0.0
+    paid_expense = 0.0
+    transaction_count = 0
+    uncategorized_count = 0
+    uncategorized_ids = uncategorized_category_ids(category_map)
+
+    for row in facet_rows:
+        facet = row.get('facet')
+        if facet == 'type_status' and row.get('status') == 'paid':
+            if row.get('type') == 'income':
+                paid_income += float(row.get('total') or 0)
+            elif row.get('type') == 'expense':
+                paid_expense += float(row.get('total') or 0)
+        elif facet == 'total':
+            transaction_count = int(row.get('tx_count') or 0)
+        elif facet == 'category' and (not row.get('key') or str(row.get('key')) in uncategorized_ids):
+            uncategorized_count += int(row.get('tx_count') or 0)
+
+    return {
+        'paid_income': round(paid_income, 2),
+        'paid_expense': round(paid_expense, 2),
+        'net_paid': round(paid_income - paid_expense, 2),
+        'transaction_count': transaction_count,
+        'uncategorized_count': uncategorized_count,
+    }
+
+
 @bp.route('', methods=['GET', 'POST'])
 @require_auth
 @require_tenant
@@ -53,7 +74,10 @@ def transactions():
     transaction_repo = current_app.config['TRANSACTIONS']
     categories_repo = current_app.config['CATEGORIES']
     accounts_repo = current_app.config['ACCOUNTS']
-    service = TransactionService(transaction_repo, categories_repo, accounts_repo)
+    service = TransactionService(
+        transaction_repo, categories_repo, accounts_repo,
+        aggregates_repo=current_app.config.get('TRANSACTION_AGGREGATE_REPO'),
+    )
 
     if request.method == 'GET':
         page = int(request.args.get('page', 1))
@@ -81,6 +105,11 @@ def transactions():
             'status': request.args.get('status'),
             'is_recurring': request.args.get('is_recurring'),
             'sort': request.args.get('sort'),
+            # Paginação por cursor (keyset date+id): ?pagination=cursor na 1ª página, depois ?cursor=<next_cursor>
+            'pagination': request.args.get('pagination'),
+            'cursor': request.args.get('cursor'),
+            # Contagem: exact | planned | estimated | cached | none (padrão: cached no offset, none no cursor)
+            'count': request.args.get('count'),
         }
         
         # Remove chaves com valores vazios para não poluir o repositório
@@ -109,6 +138,34 @@ def transactions():
         return jsonify(e.to_dict()), e.status_code
 
 
+@bp.route('/bulk', methods=['POST'])
+@require_auth
+@require_tenant
+def transactions_bulk():
+    """
+    Alteração em lote. Corpo: {"action": "recategorize" | "status" | "delete",
+    "ids": [...], "category_id": ... (recategorize), "status": ... (status)}.
+    """
+    service = TransactionService(
+        current_app.config['TRANSACTIONS'],
+        current_app.config['CATEGORIES'],
+        current_app.config['ACCOUNTS'],
+        aggregates_repo=current_app.config.get('TRANSACTION_AGGREGATE_REPO'),
+    )
+    data = request.get_json() or {}
+    try:
+        result = service.bulk_update_transactions(
+            request.user_id,
+            data.get('ids'),
+            data.get('action'),
+            data,
+            tenant_id=request.tenant_id,
+        )
+        return jsonify(result)
+    except (ValidationException, NotFoundException) as e:
+        return jsonify(e.to_dict()), e.status_code
+
+
 @bp.route('/<transaction_id>', methods=['GET', 'PUT', 'DELETE'])
 @require_auth
 @require_tenant
@@ -116,7 +173,10 @@ def transaction_detail(transaction_id: str):
     transaction_repo = current_app.config['TRANSACTIONS']
     categories_repo = current_app.config['CATEGORIES']
     accounts_repo = current_app.config['ACCOUNTS']
-    service = TransactionService(transaction_repo, categories_repo, accounts_repo)
+    service = TransactionService(
+        transaction_repo, categories_repo, accounts_repo,
+        aggregates_repo=current_app.config.get('TRANSACTION_AGGREGATE_REPO'),
+    )
 
     try:
         transaction = transaction_repo.find_by_id(transaction_id) if hasattr(transaction_repo, 'find_by_id') else None
@@ -146,20 +206,12 @@ def transaction_detail(transaction_id: str):
 @require_auth
 @require_tenant
 def import_transactions():
-    from services.import_service import parse_import_file, compute_dedup_key
-    from services.account_service import AccountService
-    from services.category_service import CategoryService
-    from services.merchant_alias_service import MerchantAliasService
+    """
+    Importa extrato CSV/OFX. Com mode=async (form ou query), enfileira a
+    importação e responde 202 com o job; o andamento fica em GET /api/imports/<id>.
+    """
+    from services.transaction_import_service import TransactionImportService
 
-    transaction_repo = current_app.config['TRANSACTIONS']
-    categories_repo = current_app.config['CATEGORIES']
-    accounts_repo = current_app.config['ACCOUNTS']
-    service = TransactionService(transaction_repo, categories_repo, accounts_repo)
-    account_service = AccountService(accounts_repo, transaction_repo)
-    category_service = CategoryService(categories_repo, transaction_repo)
-    alias_repo = current_app.config.get('MERCHANT_ALIAS_REPO')
-    alias_service = MerchantAliasService(alias_repo) if alias_repo else None
-    
     if 'file' not in request.files:
         return jsonify({'error': 'Arquivo é obrigatório'}), 400
     
@@ -177,362 +229,38 @@ def import_transactions():
     
     # Obtém account_id do formulário (opcional, mas obrigatório ao final do fluxo)
     account_id = request.form.get('account_id')
-    account_created = False
-    created_account_name = None
-    
-    # Se não forneceu account_id explicitamente, tenta detectar/criar automaticamente
-    if not account_id:
-        from services.account_detector import (
-            extract_account_info_from_ofx,
-            extract_account_info_from_csv,
-            find_or_create_account
-        )
-        
-        try:
-            account_info = None
-            if filename_lower.endswith('.ofx'):
-                account_info = extract_account_info_from_ofx(file_content, file.filename)
-            elif filename_lower.endswith('.csv'):
-                account_info = extract_account_info_from_csv(file.filename, file_content)
-            
-            if account_info:
-                account_id, account_created = find_or_create_account(
-                    accounts_repo,
-                    request.user_id,
-                    account_info,
-                    file.filename,
-                    account_service=account_service,
-                    tenant_id=request.tenant_id,
-                )
-                if account_created and account_id:
-                    account = accounts_repo.find_by_id(account_id) if hasattr(accounts_repo, 'find_by_id') else None
-                    created_account_name = account.get('name') if account else None
-        except Exception as e:
-            # Se falhar na detecção, registra log e segue para validação abaixo
-            current_app.logger.warning(f'Falha ao detectar/criar conta automaticamente: {str(e)}')
-    
-    # Política profissional: não permitimos mais importação de transações sem conta associada.
-    # Se, após tentativa de detecção/criação, ainda não houver account_id, abortamos com erro claro.
-    if not account_id:
-        return jsonify({
-            'error': 'Não foi possível identificar a conta de destino para este arquivo. '
-                     'Selecione uma conta antes de importar ou tente novamente com um arquivo compatível.'
-        }), 400
-    
-    # Validação da conta escolhida/detectada
-    account = accounts_repo.find_by_id(account_id) if hasattr(accounts_repo, 'find_by_id') else None
-    if (
-        not account
-        or account.get('user_id') != request.user_id
-        or account.get('tenant_id') != request.tenant_id
-    ):
-        return jsonify({'error': 'Conta não encontrada'}), 404
-    
-    try:
-        
-        # Detecta formato e parseia
-        try:
-            file_format, parsed_transactions = parse_import_file(file.filename, file_content)
-        except Exception as e:
-            current_app.logger.error(f'Erro ao processar arquivo: {str(e)}', exc_info=True)
-            return jsonify({
-                'error': 'Não foi possível processar o arquivo. Verifique o formato e tente novamente.'
-            }), 400
-        
-        if not parsed_transactions:
-            return jsonify({'error': 'Nenhuma transação encontrada no arquivo'}), 400
-
-        # Importa serviço de detecção de categorias
-        from services.category_detector import detect_category_from_description, get_or_create_category
-        from utils.category_name import build_import_category_cache, import_category_cache_key
 
-        if hasattr(categories_repo, "find_by_user_including_legacy_null_tenant"):
-            user_cats = categories_repo.find_by_user_including_legacy_null_tenant(
-                request.user_id, request.tenant_id
-            )
-        else:
-            user_cats = categories_repo.find_by_user(request.user_id, tenant_id=request.tenant_id)
-        user_categories = build_import_category_cache(user_cats, request.tenant_id or "")
-        income_cats = (
-            categories_repo.find_by_type(request.user_id, 'income', tenant_id=request.tenant_id)
-            if hasattr(categories_repo, 'find_by_type')
-            else (categories_repo.find_all({'user_id': request.user_id, 'type': 'income', 'tenant_id': request.tenant_id}) or [])
-        )
-        expense_cats = (
-            categories_repo.find_by_type(request.user_id, 'expense', tenant_id=request.tenant_id)
-            if hasattr(categories_repo, 'find_by_type')
-            else (categories_repo.find_all({'user_id': request.user_id, 'type': 'expense', 'tenant_id': request.tenant_id}) or [])
+    mode = request.form.get('mode') or request.args.get('mode')
+    jobs = current_app.config.get('IMPORT_JOBS')
+    if mode == 'async' and jobs is not None:
+        job = jobs.submit(
+            request.user_id,
+            request.tenant_id,
+            file.filename,
+            file_content,
+            options={'account_id': account_id},
         )
-        default_income_category = income_cats[0] if income_cats else None
-        default_expense_category = expense_cats[0] if expense_cats else None
-
-        imported_transactions = []
-        errors = []
-        created_categories = []  # Para rastrear categorias criadas
-
-        tenant_id = request.tenant_id  # Garantido por @require_tenant
-
-        for idx, tx in enumerate(parsed_transactions):
-            try:
-                category_id = None
-                
-                # Para CSV padrão, usa category_name se disponível
-                if file_format == 'csv' and 'category_name' in tx and tx['category_name']:
-                    _ck = import_category_cache_key(tx['category_name'], tx['type'], tenant_id or '')
-                    category_id = user_categories.get(_ck)
-                    if not category_id:
-                        # Tenta criar a categoria se não existir
-                        try:
-                            category_id = get_or_create_category(
-                                category_service,
-                                request.user_id,
-                                tx['category_name'],
-                                tx['type'],
-                                tenant_id=tenant_id,
-                            )
-                            user_categories[
-                                import_category_cache_key(tx['category_name'], tx['type'], tenant_id or '')
-                            ] = category_id
-                            created_categories.append(tx['category_name'])
-                        except Exception as e:
-                            current_app.logger.warning(
-                                f'Erro ao criar categoria "{tx["category_name"]}" para linha {idx + 2}: {str(e)}',
-                                exc_info=True
-                            )
-                            # Fallback para categoria padrão ao invés de descartar transação
-                            if tx['type'] == 'income' and default_income_category:
-                                category_id = default_income_category.get('id') or default_income_category.get('_id')
-                                errors.append(f'Linha {idx + 2}: Categoria "{tx["category_name"]}" não criada; usando categoria padrão.')
-                            elif tx['type'] == 'expense' and default_expense_category:
-                                category_id = default_expense_category.get('id') or default_expense_category.get('_id')
-                                errors.append(f'Linha {idx + 2}: Categoria "{tx["category_name"]}" não criada; usando categoria padrão.')
-                            else:
-                                errors.append(f'Linha {idx + 2}: Categoria "{tx["category_name"]}" não criada e nenhuma categoria padrão disponível.')
-                                continue  # Só descarta se realmente não houver fallback
-                else:
-                    # Para Nubank/OFX, primeiro tenta resolver via aliases persistentes
-                    detected = None
-                    alias_category = None
-
-                    if alias_service:
-                        alias_result = alias_service.find_category_for_description(
-                            user_id=request.user_id,
-                            tenant_id=tenant_id,
-                            description=tx['description'],
-                            category_type=tx['type'],
-                        )
-                        if alias_result:
-                            alias_name, alias_type = alias_result
-                            alias_category = (alias_name, alias_type)
-                            current_app.logger.debug(
-                                "ImportTransactions: alias aplicado",
-                                extra={
-                                    "user_id": request.user_id,
-                                    "tenant_id": tenant_id,
-                                    "description": tx['description'],
-                                    "tx_type": tx['type'],
-                                    "alias_category_name": alias_name,
-                                    "alias_category_type": alias_type,
-                                },
-                            )
-                        else:
-                            current_app.logger.debug(
-                                "ImportTransactions: nenhum alias encontrado",
-                                extra={
-                                    "user_id": request.user_id,
-                                    "tenant_id": tenant_id,
-                                    "description": tx['description'],
-                                    "tx_type": tx['type'],
-                                },
-                            )
-
-                    if alias_category:
-                        # Usa categoria padronizada do alias; cor/ícone são derivados pela heurística genérica
-                        alias_name, alias_type = alias_category
-                        detected = detect_category_from_description(alias_name) or (alias_name, None, None)
-                    else:
-                        # Se não houver alias, usa heurística pela descrição original
-                        detected = detect_category_from_description(tx['description'])
-
-                    if detected:
-                        category_name, color, icon = detected
-                        try:
-                            category_id = get_or_create_category(
-                                category_service,
-                                request.user_id,
-                                category_name,
-                                tx['type'],
-                                color,
-                                icon,
-                                tenant_id=tenant_id,
-                            )
-                            _ck = import_category_cache_key(category_name, tx['type'], tenant_id or '')
-                            if _ck not in user_categories:
-                                created_categories.append(category_name)
-                            user_categories[_ck] = category_id
-                        except Exception as e:
-                            errors.append(f'Transação {idx + 1}: Erro ao criar categoria "{category_name}": {str(e)}')
-                            # Usa categoria padrão como fallback
-                            if tx['type'] == 'income' and default_income_category:
-                                category_id = default_income_category.get('id') or default_income_category.get('_id')
-                            elif tx['type'] == 'expense' and default_expense_category:
-                                category_id = default_expense_category.get('id') or default_expense_category.get('_id')
-                            else:
-                                errors.append(f'Transação {idx + 1}: Não foi possível determinar a categoria')
-                                continue
-                    
-                    # Se não conseguiu detectar, usa categoria padrão
-                    if not category_id:
-                        if tx['type'] == 'income' and default_income_category:
-                            category_id = default_income_category.get('id') or default_income_category.get('_id')
-                        elif tx['type'] == 'expense' and default_expense_category:
-                            category_id = default_expense_category.get('id') or default_expense_category.get('_id')
-                        else:
-                            errors.append(f'Transação {idx + 1}: Nenhuma categoria padrão encontrada para tipo {tx["type"]}')
-                            continue
-                
-                # Validações
-                if tx['amount'] <= 0:
-                    errors.append(f'Transação {idx + 1}: Valor deve ser positivo')
-                    continue
-                
-                date_val = tx['date']
-                if hasattr(date_val, 'strftime'):
-                    date_val = date_val.strftime('%Y-%m-%d')
-                # tenant_id já garantido por @require_tenant
-                if not request.tenant_id:
-                    errors.append('Importação exige workspace. Recarregue a página ou faça login novamente.')
-                    continue
-                entry_src = 'ofx' if file_format == 'ofx' else 'csv'
-                transaction_data = {
-                    'id': str(uuid.uuid4()),
-                    'user_id': request.user_id,
-                    'tenant_id': request.tenant_id,
-                    'account_tenant_id': request.tenant_id,
-                    'category_tenant_id': request.tenant_id,
-                    'description': tx['description'],
-                    'amount': tx['amount'],
-                    'type': tx['type'],
-                    'category_id': category_id,
-                    'date': date_val,
-                    'is_recurring': False,
-                    'status': 'paid',
-                    'responsible_person': None,
-                    'installment_info': None,
-                    'entry_source': entry_src,
-                    'source_file': file.filename,
-                    # Propaga FITID (quando disponível) para deduplicação e rastreio
-                    'fitid': (tx.get('raw_data') or {}).get('fitid'),
-                }
-                # account_id já foi garantido/validado anteriormente e é obrigatório
-                transaction_data['account_id'] = account_id
-                # Chave de deduplicação universal (csv + ofx) — cobre a lacuna do fitid,
-                # que só existe para OFX. Ver services.import_service.compute_dedup_key.
-                transaction_data['dedup_key'] = compute_dedup_key(
-                    date_val, tx['amount'], tx['description'], account_id, tx['type']
-                )
-                imported_transactions.append(transaction_data)
-            except Exception as e:
-                current_app.logger.error(
-                    f'Erro inesperado ao processar transação {idx + 1}: {str(e)}',
-                    exc_info=True,
-                    extra={'transaction_index': idx + 1, 'transaction_type': tx.get('type')}
-                )
-                errors.append(f'Transação {idx + 1}: Erro inesperado ao processar. Verifique os logs para detalhes.')
-
-        duplicates_skipped = 0
-
-        if imported_transactions:
-            # Deduplicação por FITID (Financial Institution Transaction ID)
-            # Escopo: (user_id, account_id, fitid, tenant_id)
-            # Transações OFX com mesmo FITID na mesma conta são consideradas duplicatas
-            fitids = sorted(
-                {tx.get('fitid') for tx in imported_transactions if tx.get('fitid')}
-            )
-            existing_fitids = set()
-            if fitids:
-                existing_fitids = set(
-                    transaction_repo.find_existing_fitids(
-                        request.user_id,
-                        account_id,
-                        fitids,
-                        tenant_id=request.tenant_id,
-                    )
-                )
-
-            # Deduplicação universal por dedup_key — cobre csv e ofx (fitid só existe
-            # para ofx). Sem isso, reimportar o mesmo CSV duplicava tudo silenciosamente.
-            dedup_keys = sorted(
-                {tx.get('dedup_key') for tx in imported_transactions if tx.get('dedup_key')}
-            )
-            existing_dedup_keys = set()
-            if dedup_keys:
-                existing_dedup_keys = set(
-                    transaction_repo.find_existing_dedup_keys(
-                        request.tenant_id,
-                        dedup_keys,
-                    )
-                )
-
-            deduped_transactions = []
-            seen_dedup_keys_in_batch = set()
-            for tx in imported_transactions:
-                tx_fitid = tx.get('fitid')
-                tx_dedup_key = tx.get('dedup_key')
-                if tx_fitid and tx_fitid in existing_fitids:
-                    duplicates_skipped += 1
-                    continue
-                if tx_dedup_key and tx_dedup_key in existing_dedup_keys:
-                    duplicates_skipped += 1
-                    continue
-                if tx_dedup_key and tx_dedup_key in seen_dedup_keys_in_batch:
-                    # Mesmo arquivo com linhas duplicadas internamente
-                    duplicates_skipped += 1
-                    continue
-                if tx_dedup_key:
-                    seen_dedup_keys_in_batch.add(tx_dedup_key)
-                deduped_transactions.append(tx)
-
-            if deduped_transactions:
-                service.create_many_transactions(deduped_transactions)
-
-                # Atualiza o saldo da conta apenas para transações realmente inseridas
-                total_change = 0
-                for tx in deduped_transactions:
-                    if tx.get('status') == 'paid':
-                        amount = tx['amount']
-                        if tx['type'] == 'expense':
-                            amount = -amount
-                        total_change += amount
-
-                if total_change != 0:
-                    account_service.update_balance(account_id, total_change)
-        else:
-            deduped_transactions = []
-
-        result = {
-            'message': f'{len(deduped_transactions)} transações importadas com sucesso',
-            'imported_count': len(deduped_transactions),
-            'error_count': len(errors),
-            'file_format': file_format,
-            'categories_created': len(created_categories),
-            'categories_created_list': list(set(created_categories)),  # Remove duplicatas
-            'account_created': account_created,
-            'account_name': created_account_name,
-            'account_id': account_id if account_id else None,
-            'duplicates_skipped': duplicates_skipped,
-        }
-
-        if errors:
-            result['errors'] = errors
-        return jsonify(result), 201 if deduped_transactions else 400
-    except ValidationException as e:
-        return jsonify(e.to_dict()), e.status_code
-    except Exception as e:
-        current_app.logger.error(f'Erro inesperado na importação: {str(e)}', exc_info=True)
         return jsonify({
-            'error': 'Erro inesperado ao processar a importação. Tente novamente mais tarde.'
-        }), 500
+            'job_id': job['id'],
+            'status': job['status'],
+            'status_url': f"/api/imports/{job['id']}",
+        }), 202
+
+    importer = TransactionImportService(
+        current_app.config['TRANSACTIONS'],
+        current_app.config['CATEGORIES'],
+        current_app.config['ACCOUNTS'],
+        aggregates_repo=current_app.config.get('TRANSACTION_AGGREGATE_REPO'),
+        alias_repo=current_app.config.get('MERCHANT_ALIAS_REPO'),
+    )
+    result, status = importer.import_file(
+        request.user_id,
+        request.tenant_id,
+        file.filename,
+        file_content,
+        account_id=account_id,
+    )
+    return jsonify(result), status
 
 
 @bp.route('/facets', methods=['GET'])
@@ -569,10 +297,7 @@ def transactions_facets():
     # Aplica filtros principais de período / tipo / método, etc, de forma similar a find_advanced
     params = {k: v for k, v in filters.items() if v not in (None, '', [])}
     tenant_id = getattr(request, 'tenant_id', None)
-    adv = transaction_repo.find_advanced(request.user_id, {**params, 'limit': 5000}, tenant_id=tenant_id)
-    data = adv.get('data') or []
 
-    # Agregações em memória (para o subconjunto filtrado)
     from collections import Counter
 
     cat_counter = Counter()
@@ -580,15 +305,42 @@ def transactions_facets():
     type_counter = Counter()
     resp_counter = Counter()
 
-    for tx in data:
-        if tx.get('category_id'):
-            cat_counter[tx['category_id']] += 1
-        if tx.get('account_id'):
-            acc_counter[tx['account_id']] += 1
-        if tx.get('type'):
-            type_counter[tx['type']] += 1
-        if tx.get('responsible_person'):
-            resp_counter[tx['responsible_person']] += 1
+    # Preferência: GROUP BY no banco (contagens exatas sobre todo o filtro, payload pequeno)
+    facet_rows = None
+    if hasattr(transaction_repo, 'facet_counts'):
+        facet_rows = transaction_repo.facet_counts(request.user_id, params, tenant_id=tenant_id)
+
+    data = []
+    if facet_rows is not None:
+        for row in facet_rows:
+            facet, key, count = row.get('facet'), row.get('key'), int(row.get('tx_count') or 0)
+            if facet == 'category' and key:
+                cat_counter[key] += count
+            elif facet == 'account' and key:
+                acc_counter[key] += count
+            elif facet == 'responsible_person' and key:
+                resp_counter[key] += count
+            elif facet == 'type_status' and row.get('type'):
+                type_counter[row['type']] += count
+    else:
+        # Fallback: agregações em memória sobre até 5000 linhas do subconjunto filtrado
+        adv = transaction_repo.find_advanced(
+            request.user_id,
+            # Ordem por data: o ranking por relevância não importa para contagens
+            {**params, 'limit': 5000, 'sort': 'date:desc'},
+            tenant_id=tenant_id,
+            columns=('category_id', 'account_id', 'type', 'status', 'amount', 'responsible_person'),
+        )
+        data = adv.get('data') or []
+        for tx in data:
+            if tx.get('category_id'):
+                cat_counter[tx['category_id']] += 1
+            if tx.get('account_id'):
+                acc_counter[tx['account_id']] += 1
+            if tx.get('type'):
+                type_counter[tx['type']] += 1
+            if tx.get('responsible_person'):
+                resp_counter[tx['responsible_person']] += 1
 
     # Resolve nomes de categorias e contas
     categories = []
@@ -633,10 +385,22 @@ def transactions_facets():
     types = [{'type': t, 'count': c} for t, c in type_counter.items()]
     responsible_persons = [{'name': n, 'count': c} for n, c in resp_counter.items()]
 
+    if facet_rows is not None:
+        summary = _build_facet_summary(facet_rows, category_map)
+    else:
+        # Resumo de todo o filtro (agregado mensal/RPC); só sem ambos cai nas até 5000 linhas
+        service = TransactionService(
+            transaction_repo, categories_repo, accounts_repo,
+            aggregates_repo=current_app.config.get('TRANSACTION_AGGREGATE_REPO'),
+        )
+        summary = service.summarize_transactions(request.user_id, params, tenant_id=tenant_id)
+        if summary is None:
+            summary = _build_transaction_summary(data, category_map)
+
     return jsonify({
         'categories': categories,
         'accounts': accounts,
         'types': types,
         'responsible_persons': responsible_persons,
-        'summary': _build_transaction_summary(data, category_map),
+        'summary': summary,
     })
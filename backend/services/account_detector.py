@@ -3,15 +3,8 @@ Serviço para detectar e criar contas/cartões automaticamente baseado em arquiv
 """
 import re
 from typing import Dict, Any, Optional, Tuple
-import xml.etree.ElementTree as ET
 
-
-def _find_first_element(root: ET.Element, paths: list[str]) -> Optional[ET.Element]:
-    for path in paths:
-        element = root.find(path)
-        if element is not None:
-            return element
-    return None
+from services.ofx_stream import iter_ofx_records
 
 
 def _normalize_institution_name(institution: Optional[str]) -> Optional[str]:
@@ -67,6 +60,35 @@ def _infer_institution_from_filename(filename: Optional[str]) -> Optional[str]:
     return None
 
 
+# Agregados do OFX com os dados da conta (lidos na mesma passada das transações)
+OFX_ACCOUNT_TAGS = ('FI', 'BANKACCTFROM', 'CCACCTFROM')
+
+BANK_ID_INSTITUTIONS = {
+    '001': 'Banco do Brasil',
+    '0001': 'Banco do Brasil',
+    '033': 'Santander',
+    '0033': 'Santander',
+    '077': 'Banco Inter',
+    '0077': 'Banco Inter',
+    '104': 'Caixa Econômica Federal',
+    '0104': 'Caixa Econômica Federal',
+    '237': 'Bradesco',
+    '0237': 'Bradesco',
+    '260': 'Nubank',
+    '0260': 'Nubank',
+    '341': 'Itaú'
+}
+
+OFX_ACCOUNT_TYPES = {
+    'CHECKING': 'checking',
+    'SAVINGS': 'savings',
+    'CREDITLINE': 'credit_card',
+    'CREDITCARD': 'credit_card',
+    'MONEYMRKT': 'savings',
+    'INVESTMENT': 'investment'
+}
+
+
 def extract_account_info_from_ofx(content: bytes, filename: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     Extrai informações da conta do arquivo OFX.
@@ -77,199 +99,58 @@ def extract_account_info_from_ofx(content: bytes, filename: Optional[str] = None
         'bank_id': str,
         'branch_id': str
     }
+    Quem também precisa das transações deve usar import_service.ingest_import_file,
+    que lê o arquivo uma vez só.
     """
+    records: Dict[str, Dict[str, Any]] = {}
     try:
-        content_str = content.decode('utf-8', errors='ignore')
-        
-        # Remove headers antes do <OFX>
-        ofx_start = content_str.find('<OFX>')
-        if ofx_start == -1:
-            ofx_start = content_str.lower().find('<ofx>')
-            if ofx_start == -1:
-                return None
-        
-        xml_content = content_str[ofx_start:]
-        xml_content = re.sub(r'>\s+<', '><', xml_content)
-        xml_content = re.sub(r'\s+', ' ', xml_content)
-        
-        try:
-            root = ET.fromstring(xml_content)
-        except ET.ParseError:
-            try:
-                xml_content_fixed = xml_content.replace('<OFX>', '<OFX xmlns="">').replace('<ofx>', '<ofx xmlns="">')
-                root = ET.fromstring(xml_content_fixed)
-            except:
-                # Tenta método alternativo com regex
-                return extract_account_info_from_ofx_regex(content_str, filename)
-        
-        # Busca informações da instituição financeira
-        fi_org = _find_first_element(root, ['.//FI/ORG', './/fi/org', './/Fi/Org'])
-        institution = fi_org.text.strip() if fi_org is not None and fi_org.text else None
-        
-        # Busca BANKID
-        bank_id = None
-        bankid_elem = _find_first_element(root, ['.//BANKID', './/bankid', './/BankId'])
-        if bankid_elem is not None and bankid_elem.text:
-            bank_id = bankid_elem.text.strip()
-            
-        # Se não encontrou instituição no ORG, tenta pelo BANKID
-        if not institution and bank_id:
-            bank_map = {
-                '001': 'Banco do Brasil',
-                '0001': 'Banco do Brasil',
-                '033': 'Santander',
-                '0033': 'Santander',
-                '077': 'Banco Inter',
-                '0077': 'Banco Inter',
-                '104': 'Caixa Econômica Federal',
-                '0104': 'Caixa Econômica Federal',
-                '237': 'Bradesco',
-                '0237': 'Bradesco',
-                '260': 'Nubank',
-                '0260': 'Nubank',
-                '341': 'Itaú'
-            }
-            institution = bank_map.get(bank_id)
-        
-        # Busca informações da conta (conta corrente/poupança ou cartão de crédito)
-        acct_from = _find_first_element(
-            root,
-            [
-                './/BANKACCTFROM',
-                './/bankacctfrom',
-                './/BankAcctFrom',
-                './/CCACCTFROM',
-                './/ccacctfrom',
-                './/CcAcctFrom',
-            ],
-        )
-        if acct_from is None:
-            # Tenta método alternativo
-            return extract_account_info_from_ofx_regex(content_str, filename)
-        
-        # ACCTID (número da conta)
-        acctid_elem = _find_first_element(acct_from, ['ACCTID', 'acctid', 'AcctId'])
-        account_number = acctid_elem.text.strip() if acctid_elem is not None and acctid_elem.text else None
-        
-        # ACCTTYPE (tipo da conta)
-        accttype_elem = _find_first_element(acct_from, ['ACCTTYPE', 'accttype', 'AcctType'])
-        acct_type_raw = accttype_elem.text.strip() if accttype_elem is not None and accttype_elem.text else None
-        
-        # BRANCHID (agência)
-        branchid_elem = _find_first_element(acct_from, ['BRANCHID', 'branchid', 'BranchId'])
-        branch_id = branchid_elem.text.strip() if branchid_elem is not None and branchid_elem.text else None
-        
-        # Mapeia ACCTTYPE para tipo do sistema
-        account_type_map = {
-            'CHECKING': 'checking',
-            'SAVINGS': 'savings',
-            'CREDITLINE': 'credit_card',
-            'CREDITCARD': 'credit_card',
-            'MONEYMRKT': 'savings',
-            'INVESTMENT': 'investment'
-        }
-        
-        if acct_type_raw:
-            account_type = account_type_map.get(acct_type_raw.upper(), 'wallet')
-        else:
-            # OFX de cartão costuma vir em CCACCTFROM sem ACCTTYPE
-            has_credit_card_section = (
-                root.find('.//CREDITCARDMSGSRSV1') is not None
-                or root.find('.//creditcardmsgsrsv1') is not None
-                or root.find('.//CCACCTFROM') is not None
-                or root.find('.//ccacctfrom') is not None
-            )
-            account_type = 'credit_card' if has_credit_card_section else 'wallet'
-        
-        if not account_number:
-            account_number = _extract_account_number_from_filename(filename)
-        account_number = _normalize_account_number(account_number)
-        if not account_number:
-            return None
-
-        if not institution:
-            institution = _infer_institution_from_filename(filename)
-        institution = _normalize_institution_name(institution)
-        
-        return {
-            'institution': institution or 'Banco Desconhecido',
-            'account_number': account_number,
-            'account_type': account_type,
-            'bank_id': bank_id,
-            'branch_id': branch_id
-        }
-    except Exception as e:
+        for tag, fields in iter_ofx_records(content, OFX_ACCOUNT_TAGS):
+            records.setdefault(tag, fields)
+            if tag != 'FI':
+                # FI (SIGNONMSGSRSV1) vem antes do extrato: nada mais a ler
+                break
+    except ValueError:
         return None
+    return account_info_from_ofx_records(records, filename)
 
 
-def extract_account_info_from_ofx_regex(content_str: str, filename: Optional[str] = None) -> Optional[Dict[str, Any]]:
-    """Método alternativo usando regex para extrair informações do OFX"""
+def account_info_from_ofx_records(
+    records: Dict[str, Dict[str, Any]],
+    filename: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Monta as informações da conta a partir dos agregados de OFX_ACCOUNT_TAGS
+    ({TAG: campos}, primeira ocorrência de cada), como devolvidos por iter_ofx_records.
+    """
     try:
-        # Extrai ORG
-        org_match = re.search(r'<ORG[^>]*>([^<]+)', content_str, re.IGNORECASE)
-        institution = org_match.group(1).strip() if org_match else None
-        
-        # Extrai BANKID
-        bankid_match = re.search(r'<BANKID[^>]*>([^<]+)', content_str, re.IGNORECASE)
-        bank_id = bankid_match.group(1).strip() if bankid_match else None
-        
+        acct_from = records.get('BANKACCTFROM') or records.get('CCACCTFROM') or {}
+
+        # Instituição: ORG do FI, senão pelo BANKID
+        institution = (records.get('FI') or {}).get('org')
+        bank_id = acct_from.get('bankid')
         if not institution and bank_id:
-            bank_map = {
-                '001': 'Banco do Brasil',
-                '0001': 'Banco do Brasil',
-                '033': 'Santander',
-                '0033': 'Santander',
-                '077': 'Banco Inter',
-                '0077': 'Banco Inter',
-                '104': 'Caixa Econômica Federal',
-                '0104': 'Caixa Econômica Federal',
-                '237': 'Bradesco',
-                '0237': 'Bradesco',
-                '260': 'Nubank',
-                '0260': 'Nubank',
-                '341': 'Itaú'
-            }
-            institution = bank_map.get(bank_id)
-        
-        # Extrai ACCTID
-        acctid_match = re.search(r'<ACCTID[^>]*>([^<]+)', content_str, re.IGNORECASE)
-        account_number = acctid_match.group(1).strip() if acctid_match else None
-        
-        # Extrai ACCTTYPE
-        accttype_match = re.search(r'<ACCTTYPE[^>]*>([^<]+)', content_str, re.IGNORECASE)
-        acct_type_raw = accttype_match.group(1).strip() if accttype_match else None
-        
-        # Extrai BRANCHID
-        branchid_match = re.search(r'<BRANCHID[^>]*>([^<]+)', content_str, re.IGNORECASE)
-        branch_id = branchid_match.group(1).strip() if branchid_match else None
-        
+            institution = BANK_ID_INSTITUTIONS.get(bank_id)
+
+        account_number = acct_from.get('acctid')
+        acct_type_raw = acct_from.get('accttype')
+        branch_id = acct_from.get('branchid')
+
+        if acct_type_raw:
+            account_type = OFX_ACCOUNT_TYPES.get(acct_type_raw.upper(), 'wallet')
+        else:
+            # OFX de cartão costuma vir em CCACCTFROM sem ACCTTYPE
+            account_type = 'credit_card' if 'CCACCTFROM' in records else 'wallet'
+
         if not account_number:
             account_number = _extract_account_number_from_filename(filename)
         account_number = _normalize_account_number(account_number)
         if not account_number:
             return None
-        
-        account_type_map = {
-            'CHECKING': 'checking',
-            'SAVINGS': 'savings',
-            'CREDITLINE': 'credit_card',
-            'CREDITCARD': 'credit_card',
-            'MONEYMRKT': 'savings',
-            'INVESTMENT': 'investment'
-        }
-        
-        if acct_type_raw:
-            account_type = account_type_map.get(acct_type_raw.upper(), 'wallet')
-        else:
-            has_credit_card_section = bool(
-                re.search(r'<CREDITCARDMSGSRSV1|<CCACCTFROM', content_str, re.IGNORECASE)
-            )
-            account_type = 'credit_card' if has_credit_card_section else 'wallet'
 
         if not institution:
             institution = _infer_institution_from_filename(filename)
         institution = _normalize_institution_name(institution)
-        
+
         return {
             'institution': institution or 'Banco Desconhecido',
             'account_number': account_number,
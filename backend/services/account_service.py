@@ -5,6 +5,8 @@ import logging
 from utils.exceptions import ValidationException, NotFoundException
 from utils.money_utils import parse_money_value
 from database.connection import get_supabase
+from utils.data_version import bump_data_version
+from utils.lookup_cache import invalidate_lookups
 
 logger = logging.getLogger(__name__)
 
@@ -131,6 +133,8 @@ class AccountService:
             created_id = self.account_repo.create(account_data)
             if created_id:
                 account_data['id'] = created_id
+            bump_data_version(tenant_id)
+            invalidate_lookups(tenant_id)
             logger.info(f'Conta criada: {name} (tipo: {account_type}) - user_id: {user_id}')
             return account_data
         except Exception as e:
@@ -203,6 +207,8 @@ class AccountService:
         if update_data:
             try:
                 self.account_repo.update(account_id, update_data)
+                bump_data_version(account.get('tenant_id'))
+                invalidate_lookups(account.get('tenant_id'))
                 logger.info(f'Conta atualizada: {account_id} - user_id: {user_id}')
             except Exception as e:
                 logger.error(f'Erro ao atualizar conta {account_id}: {str(e)}', exc_info=True)
@@ -225,6 +231,8 @@ class AccountService:
                 return
             new_balance = (account.get('current_balance') or 0) + amount
             self.account_repo.update(account_id, {'current_balance': new_balance})
+            bump_data_version(account.get('tenant_id'))
+            invalidate_lookups(account.get('tenant_id'))
 
     def calculate_projected_balance(self, user_id: str, account_id: str, transactions_repo) -> float:
         """
@@ -255,7 +263,10 @@ class AccountService:
             }
             pending_transactions = list(transactions_repo.find(pending_query))
         else:
-            all_txs = transactions_repo.find_all({'user_id': user_id, 'account_id': account_id, 'tenant_id': tenant_id})
+            all_txs = transactions_repo.find_all(
+                {'user_id': user_id, 'account_id': account_id, 'tenant_id': tenant_id},
+                columns=('date', 'status', 'type', 'amount'),
+            )
             pending_transactions = []
             for tx in all_txs:
                 status = tx.get('status') or 'paid'
@@ -350,11 +361,13 @@ class AccountService:
             if getattr(self.transactions_repo, 'count_documents', None) is not None:
                 count = self.transactions_repo.count_documents({'account_id': account_id, 'tenant_id': tenant_id})
             else:
-                count = len(self.transactions_repo.find_all({'account_id': account_id, 'tenant_id': tenant_id}))
+                count = len(self.transactions_repo.find_all({'account_id': account_id, 'tenant_id': tenant_id}, columns='id'))
             if count > 0:
                 raise ValidationException(f'Não é possível deletar. Existem {count} transações nesta conta')
 
             result = self.account_repo.delete(account_id)
+            bump_data_version(tenant_id)
+            invalidate_lookups(tenant_id)
             logger.info(f'Conta deletada: {account_id} ({account.get("name")}) - user_id: {user_id}')
             return result
         except ValidationException:
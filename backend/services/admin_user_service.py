@@ -97,6 +97,7 @@ class AdminUserService:
         search: str,
         status_filter: str,
         admins_only: bool,
+        count: Optional[str] = None,
     ) -> Dict[str, Any]:
         self.sync_idle_statuses(max_scan=400)
         rows, total = self.repo.list_users(
@@ -105,6 +106,7 @@ class AdminUserService:
             search=search,
             status_filter=status_filter,
             admins_only=admins_only,
+            count=count,
         )
         pages = max(1, (total + per_page - 1) // per_page)
         return {"users": rows, "total": total, "page": page, "per_page": per_page, "pages": pages}
@@ -0,0 +1,187 @@
+"""
+Backends de agregação de transações para relatórios.
+
+Uma AggregationQuery descreve o GROUP BY desejado (subconjunto de
+period/category_id/account_id/type/status) e filtros opcionais. Os backends são
+tentados em ordem; o primeiro que responder (não None) vence:
+
+1. AggregateStoreBackend — lê o agregado mensal (transaction_monthly_aggregates);
+2. SqlPushdownBackend    — GROUP BY no Postgres via RPC aggregate_transactions;
+3. InMemoryBackend       — varre as transações e agrupa via TransactionFrame (sempre responde).
+
+Todos devolvem linhas no formato do agregado: os campos de group_by, mais
+'total' e 'tx_count'. Campos filtrados (status/type/account_id) são preenchidos
+com o valor do filtro, para que o chamador possa reagrupar sem distinção de backend.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+from services.transaction_aggregates import (
+    GROUP_FIELDS,
+    GROUPING_COLUMNS,
+    iter_transactions_in_range,
+    period_of,
+)
+from services.transaction_frame import TransactionFrame
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AggregationQuery:
+    user_id: str
+    start_date: str
+    end_date: str
+    tenant_id: Optional[str] = None
+    group_by: Tuple[str, ...] = GROUP_FIELDS
+    status: Optional[str] = None
+    tx_type: Optional[str] = None
+    account_id: Optional[str] = None
+
+    def __post_init__(self):
+        invalid = [f for f in self.group_by if f not in GROUP_FIELDS]
+        if invalid:
+            raise ValueError(f"Campos de agrupamento inválidos: {', '.join(invalid)}")
+
+    @property
+    def whole_months(self) -> bool:
+        return str(self.start_date).endswith('-01') and str(self.end_date).endswith('-01')
+
+
+def project_groups(rows: Iterable[Dict[str, Any]], query: AggregationQuery) -> List[Dict[str, Any]]:
+    """Aplica os filtros da query e reagrupa as linhas nas dimensões de query.group_by."""
+    projected: Dict[Tuple, Dict[str, Any]] = {}
+    for row in rows:
+        if query.status is not None and row.get('status') != query.status:
+            continue
+        if query.tx_type is not None and row.get('type') != query.tx_type:
+            continue
+        if query.account_id is not None and row.get('account_id') != query.account_id:
+            continue
+        key = tuple(row.get(field) for field in query.group_by)
+        target = projected.get(key)
+        if target is None:
+            target = dict(zip(query.group_by, key))
+            target['total'] = 0.0
+            target['tx_count'] = 0
+            projected[key] = target
+        target['total'] += float(row.get('total', 0) or 0)
+        target['tx_count'] += int(row.get('tx_count', 0) or 0)
+    return list(projected.values())
+
+
+def _stamp_filters(rows: List[Dict[str, Any]], query: AggregationQuery) -> List[Dict[str, Any]]:
+    for row in rows:
+        if query.status is not None:
+            row.setdefault('status', query.status)
+        if query.tx_type is not None:
+            row.setdefault('type', query.tx_type)
+        if query.account_id is not None:
+            row.setdefault('account_id', query.account_id)
+    return rows
+
+
+class AggregateStoreBackend:
+    name = 'aggregate_store'
+
+    def __init__(self, aggregates_repo):
+        self.aggregates_repo = aggregates_repo
+
+    def fetch(self, query: AggregationQuery) -> Optional[List[Dict[str, Any]]]:
+        if self.aggregates_repo is None or not query.tenant_id or not query.whole_months:
+            return None
+        rows = self.aggregates_repo.find_by_period(
+            query.user_id, query.tenant_id, period_of(query.start_date), period_of(query.end_date)
+        )
+        if rows is None:
+            return None
+        return project_groups(rows, query)
+
+
+class SqlPushdownBackend:
+    name = 'sql_pushdown'
+
+    def __init__(self, transactions_repo):
+        self.transactions_repo = transactions_repo
+
+    def fetch(self, query: AggregationQuery) -> Optional[List[Dict[str, Any]]]:
+        if not hasattr(self.transactions_repo, 'aggregate_by_period'):
+            return None
+        return self.transactions_repo.aggregate_by_period(
+            query.user_id,
+            query.start_date,
+            query.end_date,
+            group_by=list(query.group_by),
+            tenant_id=query.tenant_id,
+            status=query.status,
+            tx_type=query.tx_type,
+            account_id=query.account_id,
+        )
+
+
+class InMemoryBackend:
+    name = 'in_memory'
+    # Dimensões disponíveis na leitura leve (select id, date, type, amount, status)
+    LIGHT_FIELDS = ('period', 'type', 'status')
+    LIGHT_COLUMNS = ('id', 'date', 'type', 'amount', 'status')
+
+    def __init__(self, transactions_repo):
+        self.transactions_repo = transactions_repo
+
+    def fetch(self, query: AggregationQuery) -> Optional[List[Dict[str, Any]]]:
+        light = (
+            query.account_id is None
+            and all(field in self.LIGHT_FIELDS for field in query.group_by)
+        )
+        if hasattr(self.transactions_repo, 'iter_by_user_and_date_range'):
+            # Stream por keyset: memória limitada a uma página, sem truncar em max-rows
+            transactions = iter_transactions_in_range(
+                self.transactions_repo,
+                query.user_id,
+                query.start_date,
+                query.end_date,
+                tenant_id=query.tenant_id,
+                columns=self.LIGHT_COLUMNS if light else GROUPING_COLUMNS,
+            )
+        else:
+            loader = (
+                self.transactions_repo.find_monthly_aggregated
+                if light and hasattr(self.transactions_repo, 'find_monthly_aggregated')
+                else self.transactions_repo.find_by_user_and_date_range
+            )
+            transactions = loader(
+                query.user_id,
+                query.start_date,
+                query.end_date,
+                tenant_id=query.tenant_id,
+            )
+        # Agrupamento vetorizado (TransactionFrame); filtros viram máscara em vez de reagrupamento
+        frame = TransactionFrame.from_rows(transactions)
+        selected = frame.mask(tx_type=query.tx_type, status=query.status, account_id=query.account_id)
+        return frame.group(query.group_by, mask=selected)
+
+
+def resolve_aggregation_backends(transactions_repo, aggregates_repo=None) -> List[Any]:
+    """Ordem padrão: agregado mensal → pushdown SQL → memória."""
+    backends: List[Any] = []
+    if aggregates_repo is not None:
+        backends.append(AggregateStoreBackend(aggregates_repo))
+    backends.append(SqlPushdownBackend(transactions_repo))
+    backends.append(InMemoryBackend(transactions_repo))
+    return backends
+
+
+def run_aggregation(
+    query: AggregationQuery,
+    transactions_repo,
+    aggregates_repo=None,
+    backends: Optional[List[Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Executa a query no primeiro backend disponível."""
+    for backend in backends or resolve_aggregation_backends(transactions_repo, aggregates_repo):
+        rows = backend.fetch(query)
+        if rows is not None:
+            logger.debug("Agregação de transações via %s (%d grupos)", backend.name, len(rows))
+            return _stamp_filters(rows, query)
+    return []
@@ -2,10 +2,11 @@
 Serviço para detectar e criar categorias automaticamente baseado em palavras-chave
 """
 import logging
-import re
 from typing import Dict, Any, Optional, Tuple
 
 from utils.category_name import collapse_whitespace_display
+from utils.keyword_automaton import KeywordAutomaton
+from utils.lookup_cache import invalidate_lookups
 
 logger = logging.getLogger(__name__)
 
@@ -167,51 +168,57 @@ CATEGORY_KEYWORDS = {
 }
 
 
+def _keyword_weight(keyword: str) -> int:
+    # Se a palavra tem mais de 4 caracteres, dá mais peso
+    return 2 if len(keyword) > 4 else 1
+
+
+def _compile_category_keywords(category_keywords: Dict[str, Dict[str, Any]]):
+    """
+    Compila CATEGORY_KEYWORDS num autômato único + pesos por palavra.
+    Retorna (autômato, {palavra: [(índice_da_categoria, peso), ...]}, categorias em ordem).
+    Palavra repetida na mesma categoria soma o peso de novo, como no laço original.
+    """
+    categories = [
+        (name, data) for name, data in category_keywords.items() if name != 'Outros'
+    ]
+    weights: Dict[str, Dict[int, int]] = {}
+    for index, (_name, data) in enumerate(categories):
+        for keyword in data['keywords']:
+            per_category = weights.setdefault(keyword, {})
+            per_category[index] = per_category.get(index, 0) + _keyword_weight(keyword)
+    keyword_scores = {keyword: list(scores.items()) for keyword, scores in weights.items()}
+    return KeywordAutomaton(keyword_scores), keyword_scores, categories
+
+
+_KEYWORD_AUTOMATON, _KEYWORD_SCORES, _SCORED_CATEGORIES = _compile_category_keywords(CATEGORY_KEYWORDS)
+
+
 def detect_category_from_description(description: str) -> Optional[Tuple[str, str, str]]:
     """
     Detecta a categoria baseado na descrição da transação.
     Retorna: (nome_categoria, cor, ícone) ou None se não conseguir detectar
+
+    Pontuação: cada palavra-chave da categoria presente na descrição (em
+    minúsculas) soma 2 se tiver mais de 4 caracteres, senão 1; vence o maior
+    score e, no empate, a categoria que vem primeiro em CATEGORY_KEYWORDS.
+    Todas as palavras são buscadas numa só passada (utils/keyword_automaton.py).
     """
     if not description:
         return None
-    
-    description_lower = description.lower()
-    
-    # Remove caracteres especiais e normaliza
-    description_clean = re.sub(r'[^\w\s]', ' ', description_lower)
-    words = description_clean.split()
-    
+
     # Conta matches por categoria
-    category_scores = {}
-    
-    for category_name, category_data in CATEGORY_KEYWORDS.items():
-        if category_name == 'Outros':
-            continue
-            
-        score = 0
-        keywords = category_data['keywords']
-        
-        for keyword in keywords:
-            # Busca palavra completa ou parcial
-            if keyword in description_lower:
-                # Se a palavra tem mais de 4 caracteres, dá mais peso
-                if len(keyword) > 4:
-                    score += 2
-                else:
-                    score += 1
-        
-        if score > 0:
-            category_scores[category_name] = {
-                'score': score,
-                'color': category_data['color'],
-                'icon': category_data['icon']
-            }
-    
+    scores: Dict[int, int] = {}
+    for keyword in _KEYWORD_AUTOMATON.find_all(description.lower()):
+        for index, weight in _KEYWORD_SCORES[keyword]:
+            scores[index] = scores.get(index, 0) + weight
+
     # Retorna a categoria com maior score
-    if category_scores:
-        best_category = max(category_scores.items(), key=lambda x: x[1]['score'])
-        return (best_category[0], best_category[1]['color'], best_category[1]['icon'])
-    
+    if scores:
+        best_index = max(sorted(scores), key=scores.__getitem__)
+        best_name, best_data = _SCORED_CATEGORIES[best_index]
+        return (best_name, best_data['color'], best_data['icon'])
+
     # Se não encontrou nenhuma, retorna "Outros"
     return ('Outros', CATEGORY_KEYWORDS['Outros']['color'], CATEGORY_KEYWORDS['Outros']['icon'])
 
@@ -250,6 +257,7 @@ def get_or_create_category(
         if tenant_id and existing.get("tenant_id") in (None, ""):
             try:
                 repo.update(str(eid), {"tenant_id": tenant_id})
+                invalidate_lookups(tenant_id)
             except Exception as exc:
                 logger.warning(
                     "Não foi possível associar tenant à categoria legada %s: %s",
@@ -3,6 +3,8 @@ import uuid
 import logging
 from utils.exceptions import ValidationException, NotFoundException
 from utils.category_name import collapse_whitespace_display
+from utils.data_version import bump_data_version
+from utils.lookup_cache import invalidate_lookups
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +61,8 @@ class CategoryService:
             created_id = self.category_repo.create(category_data)
             if created_id:
                 category_data['id'] = created_id
+            bump_data_version(tenant_id)
+            invalidate_lookups(tenant_id)
             logger.info(f'Categoria criada: {name} ({category_type}) - user_id: {user_id}')
             return category_data
         except Exception as e:
@@ -123,6 +127,8 @@ class CategoryService:
         if update_data:
             try:
                 self.category_repo.update(category_id, update_data)
+                bump_data_version(category.get('tenant_id'))
+                invalidate_lookups(category.get('tenant_id'))
                 logger.info(f'Categoria atualizada: {category_id} - user_id: {user_id}')
             except Exception as e:
                 logger.error(f'Erro ao atualizar categoria {category_id}: {str(e)}', exc_info=True)
@@ -146,11 +152,13 @@ class CategoryService:
             if getattr(self.transactions_repo, 'count_documents', None) is not None:
                 count = self.transactions_repo.count_documents({'category_id': category_id, 'tenant_id': tenant_id})
             else:
-                count = len(self.transactions_repo.find_all({'category_id': category_id, 'tenant_id': tenant_id}))
+                count = len(self.transactions_repo.find_all({'category_id': category_id, 'tenant_id': tenant_id}, columns='id'))
             if count > 0:
                 raise ValidationException(f'Não é possível deletar. Existem {count} transações nesta categoria')
 
             result = self.category_repo.delete(category_id)
+            bump_data_version(tenant_id)
+            invalidate_lookups(tenant_id)
             logger.info(f'Categoria deletada: {category_id} ({category.get("name")}) - user_id: {user_id}')
             return result
         except ValidationException:
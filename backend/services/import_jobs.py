@@ -0,0 +1,269 @@
+"""
+Fila de importações assíncronas (POST /api/transactions/import?mode=async).
+
+O upload grava um job e responde 202 com o id; um pool de threads do próprio
+processo executa a importação (TransactionImportService) fora do ciclo da
+requisição, e o cliente acompanha progresso, contadores e erros em
+GET /api/imports/<id>.
+
+Backend local, sem serviços externos: os jobs (e o arquivo enviado, até o fim
+do processamento) ficam num SQLite em disco (IMPORT_JOBS_DB), compartilhado
+pelos processos do gunicorn — qualquer worker responde o GET. A execução é
+"reivindicada" com UPDATE ... WHERE status = 'queued', então um job roda uma
+vez só. Job em 'running' sem atualização há IMPORT_JOB_STALE_SECONDS (processo
+reciclado no meio da importação) é reportado como falho. Job ainda em
+'queued' há mais que isso (o worker que o enfileirou no pool em memória foi
+reciclado/morto antes de começar) é reenviado ao pool de quem consulta o
+status; o claim condicional garante que ele rode uma vez só.
+"""
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed')
+DEFAULT_WORKERS = 2
+DEFAULT_STALE_SECONDS = 600
+DEFAULT_RETENTION_SECONDS = 7 * 24 * 3600
+
+STALE_ERROR = 'Importação interrompida (o servidor reiniciou durante o processamento). Envie o arquivo novamente.'
+UNEXPECTED_ERROR = 'Erro inesperado ao processar a importação. Tente novamente mais tarde.'
+
+# runner(job, progress) -> (corpo, status_http); progress(etapa, processadas, total)
+JobRunner = Callable[[Dict[str, Any], Callable[[str, int, int], None]], Tuple[Dict[str, Any], int]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS import_jobs (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    tenant_id TEXT,
+    filename TEXT NOT NULL,
+    options TEXT NOT NULL DEFAULT '{}',
+    payload BLOB,
+    status TEXT NOT NULL,
+    stage TEXT,
+    processed INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    result_status INTEGER,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_import_jobs_owner ON import_jobs (user_id, tenant_id, created_at);
+"""
+
+_PUBLIC_COLUMNS = (
+    'id, user_id, tenant_id, filename, options, status, stage, processed, total, '
+    'result, result_status, error, created_at, updated_at'
+)
+
+
+class ImportJobStore:
+    """Jobs de importação em SQLite; uma conexão por operação (seguro entre threads e processos)."""
+
+    def __init__(
+        self,
+        path: str,
+        stale_seconds: int = DEFAULT_STALE_SECONDS,
+        retention_seconds: int = DEFAULT_RETENTION_SECONDS,
+    ):
+        self.path = path
+        self.stale_seconds = stale_seconds
+        self.retention_seconds = retention_seconds
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, user_id: str, tenant_id: Optional[str], filename: str, payload: bytes, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO import_jobs (id, user_id, tenant_id, filename, options, payload, status, stage, created_at, updated_at) '
+                "VALUES (?, ?, ?, ?, ?, ?, 'queued', 'queued', ?, ?)",
+                (job_id, user_id, tenant_id, filename, json.dumps(options or {}), sqlite3.Binary(payload), now, now),
+            )
+            # Limpeza oportunista dos jobs antigos já finalizados
+            conn.execute(
+                "DELETE FROM import_jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?",
+                (now - self.retention_seconds,),
+            )
+        return self.get(job_id)
+
+    def claim(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Marca o job como 'running' (se ainda estiver na fila) e o devolve com o payload."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE import_jobs SET status = 'running', stage = 'starting', updated_at = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id),
+            )
+            if cursor.rowcount != 1:
+                return None
+            row = conn.execute(f'SELECT {_PUBLIC_COLUMNS}, payload FROM import_jobs WHERE id = ?', (job_id,)).fetchone()
+        job = self._to_dict(row)
+        job['payload'] = bytes(row['payload'] or b'')
+        return job
+
+    def touch_stale_queued(self, job_id: str) -> bool:
+        """
+        Se o job está em 'queued' sem atualização há stale_seconds, renova
+        updated_at e retorna True (quem chamou deve reenviá-lo). Condicional:
+        entre processos concorrentes, só um recebe True por janela.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE import_jobs SET updated_at = ? WHERE id = ? AND status = 'queued' AND updated_at < ?",
+                (now, job_id, now - self.stale_seconds),
+            )
+            return cursor.rowcount == 1
+
+    def update_progress(self, job_id: str, stage: str, processed: int = 0, total: int = 0) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE import_jobs SET stage = ?, processed = ?, total = ?, updated_at = ? WHERE id = ?',
+                (stage, processed, total, time.time(), job_id),
+            )
+
+    def finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]], result_status: Optional[int], error: Optional[str] = None) -> None:
+        """Grava o resultado e descarta o arquivo enviado."""
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE import_jobs SET status = ?, stage = ?, result = ?, result_status = ?, error = ?, '
+                'payload = NULL, processed = total, updated_at = ? WHERE id = ?',
+                (
+                    status, 'done',
+                    json.dumps(result, default=str) if result is not None else None,
+                    result_status, error, time.time(), job_id,
+                ),
+            )
+
+    def get(self, job_id: str, user_id: Optional[str] = None, tenant_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Job sem o payload; com user_id/tenant_id, só se pertencer ao escopo."""
+        with self._connect() as conn:
+            row = conn.execute(f'SELECT {_PUBLIC_COLUMNS} FROM import_jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = self._to_dict(row)
+        if user_id is not None and (job['user_id'] != user_id or job['tenant_id'] != tenant_id):
+            return None
+        if job['status'] == 'running' and time.time() - job['updated_at'] > self.stale_seconds:
+            self._fail_stale(job_id)
+            return self.get(job_id)
+        return job
+
+    def _fail_stale(self, job_id: str) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE import_jobs SET status = 'failed', stage = 'done', result = ?, result_status = 500, error = ?, "
+                "payload = NULL, updated_at = ? WHERE id = ? AND status = 'running' AND updated_at < ?",
+                (json.dumps({'error': STALE_ERROR}), STALE_ERROR, now, job_id, now - self.stale_seconds),
+            )
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job['options'] = json.loads(job.get('options') or '{}')
+        job['result'] = json.loads(job['result']) if job.get('result') else None
+        return job
+
+
+class ImportJobQueue:
+    """Enfileira jobs no ImportJobStore e os executa num pool de threads do processo."""
+
+    def __init__(self, store: ImportJobStore, runner: JobRunner, max_workers: int = DEFAULT_WORKERS):
+        self.store = store
+        self.runner = runner
+        self.max_workers = max(1, max_workers)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, runner: JobRunner) -> 'ImportJobQueue':
+        store = ImportJobStore(
+            os.getenv('IMPORT_JOBS_DB') or os.path.join(tempfile.gettempdir(), 'alca_import_jobs.sqlite3'),
+            stale_seconds=int(os.getenv('IMPORT_JOB_STALE_SECONDS', DEFAULT_STALE_SECONDS)),
+        )
+        return cls(store, runner, max_workers=int(os.getenv('IMPORT_JOB_WORKERS', DEFAULT_WORKERS)))
+
+    def _executor(self) -> ThreadPoolExecutor:
+        # Criado no primeiro uso: threads não sobrevivem ao fork dos workers do gunicorn
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='import-job')
+            return self._pool
+
+    def submit(
+        self,
+        user_id: str,
+        tenant_id: Optional[str],
+        filename: str,
+        content: bytes,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        job = self.store.create(user_id, tenant_id, filename, content, options)
+        self._executor().submit(self.run, job['id'])
+        return job
+
+    def get(self, job_id: str, user_id: Optional[str] = None, tenant_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Job no escopo (ImportJobStore.get); reenvia ao pool um job esquecido em 'queued'."""
+        job = self.store.get(job_id, user_id, tenant_id)
+        if job and job['status'] == 'queued' and self.store.touch_stale_queued(job_id):
+            logger.warning('Job de importação %s parado na fila; reenviando', job_id)
+            self._executor().submit(self.run, job_id)
+        return job
+
+    def run(self, job_id: str) -> None:
+        job = self.store.claim(job_id)
+        if job is None:
+            return
+
+        def progress(stage: str, processed: int = 0, total: int = 0) -> None:
+            self.store.update_progress(job_id, stage, processed, total)
+
+        try:
+            result, result_status = self.runner(job, progress)
+        except Exception as e:
+            logger.error('Job de importação %s falhou: %s', job_id, e, exc_info=True)
+            self.store.finish(job_id, 'failed', {'error': UNEXPECTED_ERROR}, 500, error=str(e))
+            return
+        status = 'succeeded' if result_status < 400 else 'failed'
+        self.store.finish(job_id, status, result, result_status, error=(result or {}).get('error'))
+
+
+def serialize_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Formato público do job (GET /api/imports/<id>)."""
+    return {
+        'id': job['id'],
+        'status': job['status'],
+        'stage': job.get('stage'),
+        'processed': job.get('processed', 0),
+        'total': job.get('total', 0),
+        'filename': job.get('filename'),
+        'result': job.get('result'),
+        'result_status': job.get('result_status'),
+        'error': job.get('error'),
+        'created_at': job.get('created_at'),
+        'updated_at': job.get('updated_at'),
+    }
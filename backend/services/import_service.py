@@ -2,9 +2,15 @@ import csv
 import re
 import unicodedata
 from datetime import datetime, date as date_cls
-from typing import List, Dict, Any, Tuple
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
 from io import StringIO
-import xml.etree.ElementTree as ET
+
+from services.account_detector import (
+    OFX_ACCOUNT_TAGS,
+    account_info_from_ofx_records,
+    extract_account_info_from_csv,
+)
+from services.ofx_stream import iter_ofx_records
 
 
 def _strip_accents(value: str) -> str:
@@ -310,185 +316,65 @@ def parse_nubank_csv(content: bytes) -> List[Dict[str, Any]]:
     return transactions
 
 
-def parse_ofx(content: bytes) -> List[Dict[str, Any]]:
-    """Parse arquivo OFX"""
-    content_str = content.decode('utf-8', errors='ignore')
-    
-    # OFX pode ter headers SGML, precisamos extrair apenas o XML
-    # Remove headers antes do <OFX>
-    ofx_start = content_str.find('<OFX>')
-    if ofx_start == -1:
-        # Tenta encontrar sem case sensitive
-        ofx_start = content_str.lower().find('<ofx>')
-        if ofx_start == -1:
-            raise ValueError('Formato OFX inválido: tag <OFX> não encontrada')
-    
-    xml_content = content_str[ofx_start:]
-    
-    # OFX pode ter tags sem fechamento, precisamos normalizar
-    # Remove quebras de linha dentro das tags e espaços extras
-    xml_content = re.sub(r'>\s+<', '><', xml_content)
-    xml_content = re.sub(r'\s+', ' ', xml_content)
-    
-    # Tenta parsear o XML
-    try:
-        root = ET.fromstring(xml_content)
-    except ET.ParseError as e:
-        # Tenta com namespace vazio
-        try:
-            xml_content_fixed = xml_content.replace('<OFX>', '<OFX xmlns="">').replace('<ofx>', '<ofx xmlns="">')
-            root = ET.fromstring(xml_content_fixed)
-        except:
-            # Tenta método alternativo: busca direta por padrões
-            return parse_ofx_alternative(content_str)
-    
-    transactions = []
-    
-    # Busca transações (pode estar em STMTTRN ou BANKTRANLIST)
-    # Tenta diferentes caminhos possíveis
-    stmttrn_list = root.findall('.//STMTTRN') or root.findall('.//stmttrn') or root.findall('.//StmtTrn')
-    
-    if not stmttrn_list:
-        # Tenta método alternativo
-        return parse_ofx_alternative(content_str)
-    
-    for stmttrn in stmttrn_list:
-        try:
-            # Itera sobre os filhos para encontrar os campos, já que find() pode falhar com namespaces ou estruturas complexas
-            dtposted_text = None
-            memo_text = None
-            name_text = None
-            trnamt_text = None
-            fitid_text = None
-            trntype_text = None
-            
-            for child in stmttrn:
-                tag_lower = child.tag.lower()
-                # Remove namespace se existir (ex: {http://...}TAG)
-                if '}' in tag_lower:
-                    tag_lower = tag_lower.split('}')[1]
-                
-                if tag_lower == 'dtposted':
-                    dtposted_text = child.text
-                elif tag_lower == 'memo':
-                    memo_text = child.text
-                elif tag_lower == 'name':
-                    name_text = child.text
-                elif tag_lower == 'trnamt':
-                    trnamt_text = child.text
-                elif tag_lower == 'fitid':
-                    fitid_text = child.text
-                elif tag_lower == 'trntype':
-                    trntype_text = child.text
-
-            if not dtposted_text:
-                continue
-            
-            # OFX data format: YYYYMMDDHHMMSS ou YYYYMMDD
-            dtposted_text = dtposted_text.strip()
-            if len(dtposted_text) >= 8:
-                year = int(dtposted_text[0:4])
-                month = int(dtposted_text[4:6])
-                day = int(dtposted_text[6:8])
-                transaction_date = datetime(year, month, day)
-            else:
-                continue
-            
-            # Descrição
-            memo_raw = (memo_text if memo_text else '') or \
-                         (name_text if name_text else '') or \
-                         'Transação sem descrição'
-            memo_raw = memo_raw.strip()
-            memo_type = _classify_ofx_memo_type(memo_raw)
-            counterparty_name = _extract_counterparty_name_from_memo(memo_raw, memo_type)
-            pix_details = _extract_pix_details_from_memo(memo_raw, memo_type, counterparty_name)
-            description = _normalize_ofx_description(memo_raw, memo_type, counterparty_name)
-            
-            # Valor (aceita pt-BR ou en)
-            if not trnamt_text:
-                continue
-            amount = _parse_signed_money_value(trnamt_text.strip())
-            if amount == 0 and trnamt_text.strip():
-                continue
-            
-            # Tipo (negativo = despesa, positivo = receita)
-            transaction_type = 'expense' if amount < 0 else 'income'
-            amount = abs(amount)
-            
-            transactions.append({
-                'date': transaction_date,
-                'description': description.strip(),
-                'amount': amount,
-                'type': transaction_type,
-                'raw_data': {
-                    'fitid': fitid_text,
-                    'trntype': trntype_text,
-                    'memo_original': memo_raw,
-                    'memo_type': memo_type,
-                    'counterparty_name': counterparty_name,
-                    'is_reversal': memo_type == 'reversal' or (fitid_text or '').endswith(':reversal'),
-                    'pix_details': pix_details,
-                }
-            })
-        except Exception:
-            continue
-    
-    return transactions
+def parse_ofx(content: Union[bytes, BinaryIO]) -> List[Dict[str, Any]]:
+    """Parse arquivo OFX (SGML ou XML), em bytes ou stream binário."""
+    return list(iter_ofx_transactions(content))
 
 
-def parse_ofx_alternative(content_str: str) -> List[Dict[str, Any]]:
-    """Método alternativo para parsear OFX usando regex quando XML parsing falha"""
-    transactions = []
-    
-    # Busca padrões STMTTRN usando regex
-    stmttrn_pattern = r'<STMTTRN>(.*?)</STMTTRN>'
-    matches = re.findall(stmttrn_pattern, content_str, re.DOTALL | re.IGNORECASE)
-    
-    for match in matches:
-        try:
-            # Extrai DTPOSTED
-            dtposted_match = re.search(r'<DTPOSTED[^>]*>([^<]+)', match, re.IGNORECASE)
-            if not dtposted_match:
-                continue
-            
-            dtposted_text = dtposted_match.group(1).strip()
-            if len(dtposted_text) >= 8:
-                year = int(dtposted_text[0:4])
-                month = int(dtposted_text[4:6])
-                day = int(dtposted_text[6:8])
-                transaction_date = datetime(year, month, day)
-            else:
-                continue
-            
-            # Extrai MEMO ou NAME
-            memo_match = re.search(r'<MEMO[^>]*>([^<]+)', match, re.IGNORECASE)
-            name_match = re.search(r'<NAME[^>]*>([^<]+)', match, re.IGNORECASE)
-            description = (memo_match.group(1) if memo_match else '') or \
-                         (name_match.group(1) if name_match else '') or \
-                         'Transação sem descrição'
-            
-            # Extrai TRNAMT (aceita pt-BR ou en)
-            trnamt_match = re.search(r'<TRNAMT[^>]*>([^<]+)', match, re.IGNORECASE)
-            if not trnamt_match:
-                continue
-            amount = _parse_signed_money_value(trnamt_match.group(1).strip())
-            if amount == 0 and trnamt_match.group(1).strip():
-                continue
-            
-            transaction_type = 'expense' if amount < 0 else 'income'
-            amount = abs(amount)
-            
-            transactions.append({
-                'date': transaction_date,
-                'description': description.strip(),
-                'amount': amount,
-                'type': transaction_type,
-                'raw_data': {}
-            })
-        except Exception:
-            continue
-    
-    return transactions
+def iter_ofx_transactions(content: Union[bytes, BinaryIO]) -> Iterator[Dict[str, Any]]:
+    """
+    Transações do OFX à medida que o arquivo é lido (services/ofx_stream.py):
+    um STMTTRN em memória por vez, sem montar a árvore do documento.
+    """
+    for _tag, fields in iter_ofx_records(content, ('STMTTRN',)):
+        transaction = _ofx_fields_to_transaction(fields)
+        if transaction is not None:
+            yield transaction
+
+
+def _ofx_fields_to_transaction(fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Converte os campos de um STMTTRN; None quando falta data/valor ou são inválidos."""
+    try:
+        # OFX data format: YYYYMMDDHHMMSS ou YYYYMMDD (ex.: 20260101000000[-3:BRT])
+        dtposted_text = (fields.get('dtposted') or '').strip()
+        if len(dtposted_text) < 8:
+            return None
+        transaction_date = datetime(int(dtposted_text[0:4]), int(dtposted_text[4:6]), int(dtposted_text[6:8]))
+
+        # Descrição
+        memo_raw = (fields.get('memo') or fields.get('name') or 'Transação sem descrição').strip()
+        memo_type = _classify_ofx_memo_type(memo_raw)
+        counterparty_name = _extract_counterparty_name_from_memo(memo_raw, memo_type)
+        pix_details = _extract_pix_details_from_memo(memo_raw, memo_type, counterparty_name)
+        description = _normalize_ofx_description(memo_raw, memo_type, counterparty_name)
+
+        # Valor (aceita pt-BR ou en)
+        trnamt_text = (fields.get('trnamt') or '').strip()
+        if not trnamt_text:
+            return None
+        amount = _parse_signed_money_value(trnamt_text)
+        if amount == 0:
+            return None
+
+        fitid_text = fields.get('fitid')
+        return {
+            'date': transaction_date,
+            'description': description.strip(),
+            # Tipo (negativo = despesa, positivo = receita)
+            'amount': abs(amount),
+            'type': 'expense' if amount < 0 else 'income',
+            'raw_data': {
+                'fitid': fitid_text,
+                'trntype': fields.get('trntype'),
+                'memo_original': memo_raw,
+                'memo_type': memo_type,
+                'counterparty_name': counterparty_name,
+                'is_reversal': memo_type == 'reversal' or (fitid_text or '').endswith(':reversal'),
+                'pix_details': pix_details,
+            }
+        }
+    except Exception:
+        return None
 
 
 def parse_standard_csv(content: bytes) -> List[Dict[str, Any]]:
@@ -556,3 +442,41 @@ def parse_import_file(filename: str, content: bytes) -> Tuple[str, List[Dict[str
     
     return file_format, transactions
 
+
+def ingest_ofx(content: Union[bytes, BinaryIO], filename: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Transações e dados da conta do OFX numa única leitura: os agregados de conta
+    (FI/BANKACCTFROM/CCACCTFROM) e os STMTTRN saem do mesmo iter_ofx_records.
+    """
+    transactions = []
+    account_records: Dict[str, Dict[str, Any]] = {}
+    for tag, fields in iter_ofx_records(content, ('STMTTRN',) + OFX_ACCOUNT_TAGS):
+        if tag == 'STMTTRN':
+            transaction = _ofx_fields_to_transaction(fields)
+            if transaction is not None:
+                transactions.append(transaction)
+        else:
+            account_records.setdefault(tag, fields)
+    return transactions, account_info_from_ofx_records(account_records, filename)
+
+
+def ingest_import_file(
+    filename: str,
+    content: bytes,
+    detect_account: bool = True,
+) -> Tuple[str, List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Como parse_import_file, mais os dados da conta detectados no arquivo
+    (account_detector), sem parsear o arquivo duas vezes.
+    Retorna: (formato_detectado, lista_de_transações, info_da_conta ou None)
+    """
+    file_format = detect_file_format(filename, content)
+
+    if file_format == 'ofx':
+        transactions, account_info = ingest_ofx(content, filename)
+        return file_format, transactions, account_info if detect_account else None
+
+    transactions = parse_nubank_csv(content) if file_format == 'nubank_csv' else parse_standard_csv(content)
+    account_info = extract_account_info_from_csv(filename, content) if detect_account else None
+    return file_format, transactions, account_info
+
@@ -0,0 +1,135 @@
+"""
+Leitura incremental de OFX (SGML 1.x ou XML 2.x).
+
+Em vez de decodificar o arquivo inteiro, normalizar com re.sub e montar uma
+árvore (ElementTree), o tokenizer lê o stream de bytes em blocos e emite
+tokens de abertura/fechamento de tag. iter_ofx_records agrupa os tokens de
+cada agregado pedido (ex.: STMTTRN) num dicionário de campos e o entrega assim
+que o agregado termina — só um registro fica em memória por vez.
+
+SGML: tags-folha sem fechamento (<TRNAMT>-10.00) são tratadas nativamente; o
+valor de uma tag é o texto até o próximo '<'. Um agregado sem </TAG> termina
+quando o agregado que o contém fecha ou quando outro do mesmo tipo abre.
+"""
+import codecs
+import html
+from io import BytesIO
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Tuple, Union
+
+CHUNK_SIZE = 64 * 1024
+
+OfxSource = Union[bytes, bytearray, BinaryIO]
+
+
+def _iter_text_chunks(source: OfxSource, chunk_size: int) -> Iterator[str]:
+    """Decodifica o stream em blocos (UTF-8, ignorando bytes inválidos, como o parser anterior)."""
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    while True:
+        block = source.read(chunk_size)
+        if not block:
+            break
+        text = block if isinstance(block, str) else decoder.decode(block)
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def _clean_text(raw: str) -> str:
+    text = ' '.join(raw.split())
+    return html.unescape(text) if '&' in text else text
+
+
+def iter_ofx_tokens(source: OfxSource, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, str, str]]:
+    """
+    Tokens (kind, TAG, texto): ('open', TAG, texto até o próximo '<') e ('close', TAG, '').
+    Nomes de tag em maiúsculas; cabeçalho SGML, <?xml ...?> e <!...> são ignorados.
+    """
+    buffer = ''
+    pending = None
+    text_parts = []
+    for chunk in _iter_text_chunks(source, chunk_size):
+        buffer += chunk
+        pos = 0
+        while True:
+            lt = buffer.find('<', pos)
+            if lt == -1:
+                if pending is not None:
+                    text_parts.append(buffer[pos:])
+                buffer = ''
+                break
+            gt = buffer.find('>', lt + 1)
+            if gt == -1:
+                # Tag cortada no fim do bloco: completa com o próximo
+                if pending is not None:
+                    text_parts.append(buffer[pos:lt])
+                buffer = buffer[lt:]
+                break
+            if pending is not None:
+                text_parts.append(buffer[pos:lt])
+                yield ('open', pending, _clean_text(''.join(text_parts)))
+                pending = None
+                text_parts = []
+            raw_tag = buffer[lt + 1:gt].strip()
+            pos = gt + 1
+            if not raw_tag or raw_tag[0] in '?!':
+                continue
+            if raw_tag[0] == '/':
+                yield ('close', raw_tag[1:].strip().upper(), '')
+                continue
+            name = raw_tag.split()[0].rstrip('/').upper()
+            if raw_tag.endswith('/'):
+                yield ('open', name, '')
+                yield ('close', name, '')
+                continue
+            pending = name
+    if pending is not None:
+        yield ('open', pending, _clean_text(''.join(text_parts)))
+
+
+def iter_ofx_records(
+    source: OfxSource,
+    record_tags: Iterable[str] = ('STMTTRN',),
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    (TAG, campos) para cada agregado em `record_tags`, na ordem do arquivo.
+    Campos: {nome_da_tag_em_minúsculas: texto} das folhas do agregado (inclusive
+    de sub-agregados; vale a primeira ocorrência).
+    Levanta ValueError se o arquivo não tiver a tag <OFX>.
+    """
+    wanted = {tag.upper() for tag in record_tags}
+    seen_ofx = False
+    current = None
+    fields: Dict[str, Any] = {}
+    opened = set()
+
+    for kind, tag, text in iter_ofx_tokens(source, chunk_size):
+        if not seen_ofx:
+            seen_ofx = kind == 'open' and tag == 'OFX'
+            continue
+        if current is not None:
+            if kind == 'close':
+                if tag in opened:
+                    continue
+                # Fechou o próprio registro ou um agregado externo (registro sem </TAG>)
+                yield current, fields
+                current = None
+                continue
+            if tag not in wanted:
+                opened.add(tag)
+                if text:
+                    fields.setdefault(tag.lower(), text)
+                continue
+            # Novo registro abrindo sem o fechamento do anterior
+            yield current, fields
+        if kind == 'open' and tag in wanted:
+            current, fields, opened = tag, {}, set()
+
+    if current is not None:
+        yield current, fields
+    if not seen_ofx:
+        raise ValueError('Formato OFX inválido: tag <OFX> não encontrada')
@@ -5,6 +5,9 @@ Regras: PLANS = budget_plans/budget_monthly, FACTS = transactions.
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
+from services.transaction_aggregates import iter_transactions_in_range
+from services.transaction_frame import TransactionFrame
+from utils.data_version import bump_data_version
 from services.planning_constants import (
     EXPENSE_STATUS_SAFE,
     EXPENSE_STATUS_WARNING,
@@ -24,6 +27,8 @@ from services.planning_constants import (
 
 
 def _build_category_map(categories_repo, user_id: str, tenant_id: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    if hasattr(categories_repo, "find_map_by_user"):
+        return categories_repo.find_map_by_user(user_id, tenant_id=tenant_id)
     if not hasattr(categories_repo, "find_by_user"):
         return {}
     categories = categories_repo.find_by_user(user_id, tenant_id=tenant_id) or []
@@ -90,25 +95,26 @@ def get_planning_month_payload(
             planned_income = float(budget_monthly.get("planned_income") or 0)
         plans = budget_repo.get_plans_for_month(tenant_id, user_id, month, year)
 
-    transactions_list = transactions_repo.find_by_user_and_date_range(
-        user_id, start_iso, end_iso, tenant_id=tenant_id
-    )
-    real_income = sum(float(t.get("amount", 0)) for t in transactions_list if t.get("type") == "income")
-    real_expenses = sum(float(t.get("amount", 0)) for t in transactions_list if t.get("type") == "expense")
+    # Colunar: uma passada sobre o stream, somas/agrupamentos vetorizados em centavos
+    frame = TransactionFrame.from_rows(iter_transactions_in_range(
+        transactions_repo, user_id, start_iso, end_iso, tenant_id=tenant_id,
+        columns=("id", "date", "type", "amount", "category_id"),
+    ))
+    is_expense = frame.mask(tx_type="expense")
+    real_income = frame.sum_cents(frame.mask(tx_type="income")) / 100
+    real_expenses = frame.sum_cents(is_expense) / 100
+
+    def _by_category(mask) -> Dict[str, float]:
+        return {
+            str(row["category_id"]) if row["category_id"] else "__none__": row["total"]
+            for row in frame.group(("category_id",), mask=mask)
+        }
+
+    spent_by_cat = _by_category(is_expense)
+    received_by_cat = _by_category(~is_expense)
     real_balance = real_income - real_expenses
     savings_rate = (real_balance / real_income * 100) if real_income > 0 else 0.0
 
-    spent_by_cat: Dict[str, float] = {}
-    received_by_cat: Dict[str, float] = {}
-    for t in transactions_list:
-        cid = t.get("category_id")
-        cid_str = str(cid) if cid else "__none__"
-        amount = float(t.get("amount", 0))
-        if t.get("type") == "expense":
-            spent_by_cat[cid_str] = spent_by_cat.get(cid_str, 0) + amount
-        else:
-            received_by_cat[cid_str] = received_by_cat.get(cid_str, 0) + amount
-
     planned_by_cat: Dict[str, float] = {}
     for p in plans:
         cid = str(p.get("category_id", ""))
@@ -253,6 +259,7 @@ def save_planning_month(
     """Persiste budget_monthly e budget_plans para o mês (PUT /api/planning/month)."""
     budget_repo.upsert_monthly(tenant_id, month, year, planned_income, savings_percentage)
     budget_repo.upsert_plans(tenant_id, user_id, month, year, category_plans)
+    bump_data_version(tenant_id)
     return {"message": "Planejamento salvo com sucesso", "month": month, "year": year}
 
 
@@ -267,4 +274,5 @@ def create_or_upsert_budget_lines(
 ) -> Dict[str, Any]:
     """Cria ou atualiza linhas de orçamento (POST /api/planning/month)."""
     budget_repo.upsert_plans(tenant_id, user_id, month, year, lines)
+    bump_data_version(tenant_id)
     return {"message": "Orçamento atualizado", "month": month, "year": year}
@@ -0,0 +1,107 @@
+"""
+Cache em memória (LRU + TTL) para respostas de dashboard e relatórios.
+
+Chave: tupla montada pela rota, sempre incluindo (tenant_id, user_id, ...,
+data_version) — ver utils/data_version.py. Como a versão muda a cada escrita,
+entradas antigas nunca são lidas de novo; saem por LRU ou TTL.
+
+Os valores são dicts prontos para jsonify e NÃO devem ser alterados por quem os lê.
+"""
+import os
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from utils.data_version import get_data_version
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 300  # 5 minutos
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class ReportCache:
+    """
+    Cache in-memory com LRU e TTL, seguro entre threads.
+    Estrutura interna: key -> (value, expiry_ts), em ordem de uso.
+    """
+
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self._store: "OrderedDict[Hashable, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._ttl = ttl_seconds
+        self._max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Retorna o valor se existir e não estiver expirado (marca como recém-usado)."""
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expiry = entry
+            if time.monotonic() > expiry:
+                del self._store[key]
+                self.misses += 1
+                return None
+            self._store.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
+        """Armazena com TTL (padrão do cache ou ttl_seconds); remove as entradas menos usadas acima do limite."""
+        ttl = self._ttl if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._store[key] = (value, time.monotonic() + ttl)
+            self._store.move_to_end(key)
+            while len(self._store) > self._max_entries:
+                self._store.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+# Instância global (uma por processo)
+_cache: Optional[ReportCache] = None
+
+
+def get_report_cache() -> ReportCache:
+    """Retorna instância do cache (singleton por processo)."""
+    global _cache
+    if _cache is None:
+        _cache = ReportCache(
+            ttl_seconds=int(os.getenv('REPORT_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS)),
+            max_entries=int(os.getenv('REPORT_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)),
+        )
+    return _cache
+
+
+def report_cache_key(kind: str, tenant_id: str, user_id: str, params: Tuple = ()) -> Tuple:
+    """(kind, tenant_id, user_id, *params, data_version) — muda a cada escrita no tenant."""
+    return (kind, tenant_id, user_id) + tuple(params) + (get_data_version(tenant_id),)
+
+
+def get_or_compute(
+    kind: str,
+    tenant_id: str,
+    user_id: str,
+    params: Tuple,
+    compute: Callable[[], Dict[str, Any]],
+    ttl_seconds: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Retorna do cache ou calcula com `compute()` e armazena (ttl_seconds sobrescreve o TTL padrão)."""
+    cache = get_report_cache()
+    key = report_cache_key(kind, tenant_id, user_id, params)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, ttl_seconds=ttl_seconds)
+    return value
@@ -0,0 +1,366 @@
+"""
+Pré-cálculo do cache de relatórios (dashboard, evolução mensal e planejamento).
+
+Os pontos de entrada cached_* são usados tanto pelas rotas quanto pelo warmer,
+para que ambos gravem exatamente as mesmas chaves em services/report_cache.py.
+
+ReportCacheWarmer busca usuários com last_activity_at recente
+(services/user_activity_service.py), resolve seus tenants e calcula as
+respostas do mês corrente com concorrência limitada (ThreadPoolExecutor).
+O agendamento (start_report_cache_warmer) roda em thread daemon: na subida,
+a cada intervalo e sempre que o mês vira.
+
+O warmer é opt-in (REPORT_CACHE_WARMER_ENABLED) e as entradas aquecidas
+recebem TTL igual ao intervalo, para durarem até a próxima rodada.
+
+Processos: a thread não pode nascer no import do app — com `gunicorn --preload`
+ela ficaria só no master (threads não sobrevivem ao fork) e, sem preload, cada
+worker faria a sua rodada completa contra o banco. ReportCacheWarmerLauncher
+sobe a thread no primeiro request de um worker (depois do fork) e só no worker
+que obtém o lock de arquivo REPORT_CACHE_WARMER_LOCK: uma rodada por host. O
+cache aquecido é o desse worker; se ele for reciclado, o lock é liberado e
+outro worker assume na próxima tentativa.
+"""
+import os
+import tempfile
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.report_cache import get_or_compute
+from services.report_service import dashboard_summary_supabase, monthly_evolution_supabase
+from services.planning_service import get_planning_month_payload
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_ACTIVE_WITHIN_DAYS = 7
+DEFAULT_INTERVAL_SECONDS = 3600
+DASHBOARD_EVOLUTION_MONTHS = 6
+# Intervalo entre tentativas de assumir o warmer num worker que não ficou com o lock
+LEADER_RETRY_SECONDS = 60
+
+
+def cached_dashboard_summary(
+    transactions_repo,
+    categories_repo,
+    user_id: str,
+    tenant_id: str,
+    month: int,
+    year: int,
+    aggregates_repo=None,
+    ttl_seconds: Optional[int] = None,
+) -> Dict[str, Any]:
+    """GET /api/dashboard (Supabase)."""
+    return get_or_compute(
+        'dashboard', tenant_id, user_id, (month, year),
+        lambda: dashboard_summary_supabase(
+            transactions_repo, categories_repo, user_id, month, year,
+            tenant_id=tenant_id, aggregates_repo=aggregates_repo,
+        ),
+        ttl_seconds=ttl_seconds,
+    )
+
+
+def cached_dashboard_advanced(
+    transactions_repo,
+    categories_repo,
+    user_id: str,
+    tenant_id: str,
+    month: int,
+    year: int,
+    show_evolution: bool = True,
+    aggregates_repo=None,
+    now: Optional[datetime] = None,
+    ttl_seconds: Optional[int] = None,
+) -> Dict[str, Any]:
+    """GET /api/dashboard-advanced (Supabase): resumo + evolução dos últimos 6 meses."""
+
+    def compute():
+        result = dashboard_summary_supabase(
+            transactions_repo, categories_repo, user_id, month, year,
+            tenant_id=tenant_id, aggregates_repo=aggregates_repo,
+        )
+        if show_evolution:
+            result['monthly_evolution'] = monthly_evolution_supabase(
+                transactions_repo, user_id, DASHBOARD_EVOLUTION_MONTHS,
+                tenant_id=tenant_id, aggregates_repo=aggregates_repo,
+            )
+        return result
+
+    # Evolução é relativa ao mês corrente: entra na chave para não atravessar a virada do mês
+    evolution_anchor = (now or datetime.now()).strftime('%Y-%m') if show_evolution else None
+    return get_or_compute(
+        'dashboard-advanced', tenant_id, user_id, (month, year, evolution_anchor), compute,
+        ttl_seconds=ttl_seconds,
+    )
+
+
+def cached_planning_month(
+    transactions_repo,
+    categories_repo,
+    budget_repo,
+    user_id: str,
+    tenant_id: Optional[str],
+    month: int,
+    year: int,
+    ttl_seconds: Optional[int] = None,
+) -> Dict[str, Any]:
+    """GET /api/planning/month."""
+    return get_or_compute(
+        'planning-month', tenant_id, user_id, (month, year),
+        lambda: get_planning_month_payload(
+            user_id=user_id,
+            tenant_id=tenant_id,
+            month=month,
+            year=year,
+            transactions_repo=transactions_repo,
+            categories_repo=categories_repo,
+            budget_repo=budget_repo,
+        ),
+        ttl_seconds=ttl_seconds,
+    )
+
+
+class ReportCacheWarmer:
+    def __init__(
+        self,
+        users_repo,
+        tenants_repo,
+        transactions_repo,
+        categories_repo,
+        budget_repo=None,
+        aggregates_repo=None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        active_within_days: int = DEFAULT_ACTIVE_WITHIN_DAYS,
+        ttl_seconds: Optional[int] = None,
+    ):
+        self.users_repo = users_repo
+        self.tenants_repo = tenants_repo
+        self.transactions_repo = transactions_repo
+        self.categories_repo = categories_repo
+        self.budget_repo = budget_repo
+        self.aggregates_repo = aggregates_repo
+        self.max_workers = max(1, max_workers)
+        self.active_within_days = active_within_days
+        self.ttl_seconds = ttl_seconds
+
+    def active_targets(self) -> List[Tuple[str, str]]:
+        """(user_id, tenant_id) de usuários com atividade nos últimos active_within_days dias."""
+        since = (datetime.now(timezone.utc) - timedelta(days=self.active_within_days)).isoformat()
+        targets: List[Tuple[str, str]] = []
+        for user in self.users_repo.find_recently_active(since) or []:
+            user_id = user.get('id')
+            if not user_id:
+                continue
+            for membership in self.tenants_repo.get_user_tenants(str(user_id)) or []:
+                if membership.get('tenant_id'):
+                    targets.append((str(user_id), str(membership['tenant_id'])))
+        return targets
+
+    def warm_target(self, user_id: str, tenant_id: str, now: datetime) -> int:
+        """Calcula (ou reaproveita) as respostas do mês corrente; retorna quantas entradas tocou."""
+        month, year = now.month, now.year
+        cached_dashboard_summary(
+            self.transactions_repo, self.categories_repo, user_id, tenant_id, month, year,
+            aggregates_repo=self.aggregates_repo, ttl_seconds=self.ttl_seconds,
+        )
+        cached_dashboard_advanced(
+            self.transactions_repo, self.categories_repo, user_id, tenant_id, month, year,
+            aggregates_repo=self.aggregates_repo, now=now, ttl_seconds=self.ttl_seconds,
+        )
+        entries = 2
+        if self.budget_repo is not None:
+            cached_planning_month(
+                self.transactions_repo, self.categories_repo, self.budget_repo,
+                user_id, tenant_id, month, year, ttl_seconds=self.ttl_seconds,
+            )
+            entries += 1
+        return entries
+
+    def run_once(self, now: Optional[datetime] = None, scheduled_at: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Uma rodada completa. Retorna estatísticas:
+        targets, warmed (entradas), failed (alvos com erro), duration_seconds,
+        throughput_per_second e lag_seconds (fim da rodada - horário agendado).
+        """
+        now = now or datetime.now()
+        started = time.time()
+        scheduled_at = scheduled_at if scheduled_at is not None else started
+        targets = self.active_targets()
+        warmed = 0
+        failed = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='report-warmer') as pool:
+            futures = {
+                pool.submit(self.warm_target, user_id, tenant_id, now): (user_id, tenant_id)
+                for user_id, tenant_id in targets
+            }
+            for future in as_completed(futures):
+                try:
+                    warmed += future.result()
+                except Exception as e:
+                    failed += 1
+                    user_id, tenant_id = futures[future]
+                    logger.warning("ReportCacheWarmer: falha ao aquecer user=%s tenant=%s: %s", user_id, tenant_id, e)
+        finished = time.time()
+        duration = finished - started
+        stats = {
+            'targets': len(targets),
+            'warmed': warmed,
+            'failed': failed,
+            'duration_seconds': round(duration, 3),
+            'throughput_per_second': round(warmed / duration, 2) if duration > 0 else float(warmed),
+            'lag_seconds': round(finished - scheduled_at, 3),
+        }
+        logger.info("ReportCacheWarmer: %s", stats)
+        return stats
+
+
+def _record_metrics(stats: Dict[str, Any]) -> None:
+    try:
+        from metrics import record_report_cache_warm
+        record_report_cache_warm(stats)
+    except Exception as e:
+        logger.debug("ReportCacheWarmer: métricas indisponíveis: %s", e)
+
+
+def start_report_cache_warmer(
+    warmer: ReportCacheWarmer,
+    interval_seconds: int = DEFAULT_INTERVAL_SECONDS,
+    poll_seconds: int = 60,
+) -> threading.Thread:
+    """
+    Thread daemon: roda na subida, a cada interval_seconds e logo após a virada do mês.
+    lag_seconds mede o atraso em relação ao horário em que a rodada era devida.
+    """
+
+    def loop():
+        next_run = time.time()
+        last_month = None
+        while True:
+            now = datetime.now()
+            month_key = now.strftime('%Y-%m')
+            due = next_run
+            if last_month is not None and month_key != last_month:
+                # Virada do mês: a rodada era devida desde a meia-noite do dia 1
+                due = min(due, datetime(now.year, now.month, 1).timestamp())
+            if time.time() >= due:
+                try:
+                    _record_metrics(warmer.run_once(now=now, scheduled_at=due))
+                except Exception as e:
+                    logger.error("ReportCacheWarmer: rodada falhou: %s", e)
+                last_month = month_key
+                next_run = time.time() + interval_seconds
+            time.sleep(poll_seconds)
+
+    thread = threading.Thread(target=loop, name='report-cache-warmer', daemon=True)
+    thread.start()
+    return thread
+
+
+class ReportCacheWarmerLauncher:
+    """
+    Sobe o warmer depois do fork, num único worker por host (lock de arquivo).
+    maybe_start() é barato e idempotente: chamado a cada request (before_request).
+    """
+
+    def __init__(
+        self,
+        build_warmer,
+        interval_seconds: int = DEFAULT_INTERVAL_SECONDS,
+        lock_path: Optional[str] = None,
+        start=start_report_cache_warmer,
+        retry_seconds: int = LEADER_RETRY_SECONDS,
+    ):
+        self.build_warmer = build_warmer
+        self.interval_seconds = interval_seconds
+        self.lock_path = lock_path or os.path.join(tempfile.gettempdir(), 'alca_report_warmer.lock')
+        self._start = start
+        self.retry_seconds = retry_seconds
+        self.thread: Optional[threading.Thread] = None
+        self._lock_file = None
+        self._pid: Optional[int] = None
+        self._next_attempt = 0.0
+        self._guard = threading.Lock()
+
+    def _acquire_leader_lock(self) -> bool:
+        try:
+            import fcntl
+        except ImportError:
+            # Sem fcntl (Windows/dev): um processo só, sem eleição
+            return True
+        lock_file = open(self.lock_path, 'a+')
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        # Mantido aberto enquanto o processo viver; o SO libera o lock na saída
+        self._lock_file = lock_file
+        return True
+
+    def maybe_start(self) -> Optional[threading.Thread]:
+        if self._pid == os.getpid() and self.thread is not None:
+            return self.thread
+        now = time.monotonic()
+        if self._pid == os.getpid() and now < self._next_attempt:
+            return None
+        with self._guard:
+            if self._pid != os.getpid():
+                # Processo novo (fork): estado herdado do master não vale aqui
+                self._pid = os.getpid()
+                self.thread = None
+                self._lock_file = None
+                self._next_attempt = 0.0
+            if self.thread is not None or now < self._next_attempt:
+                return self.thread
+            self._next_attempt = now + self.retry_seconds
+            try:
+                if not self._acquire_leader_lock():
+                    return None
+            except OSError as e:
+                logger.warning("ReportCacheWarmer: lock %s indisponível: %s", self.lock_path, e)
+                return None
+            logger.info("ReportCacheWarmer ativo no pid %s (intervalo %ss)", self._pid, self.interval_seconds)
+            self.thread = self._start(self.build_warmer(), interval_seconds=self.interval_seconds)
+            return self.thread
+
+
+def install_report_cache_warmer_from_env(app) -> Optional[ReportCacheWarmerLauncher]:
+    """
+    Se REPORT_CACHE_WARMER_ENABLED=true, registra o launcher em before_request
+    (repositórios de app.config). Nada roda no import do app.
+    """
+    if os.getenv('REPORT_CACHE_WARMER_ENABLED', 'false').strip().lower() != 'true':
+        return None
+    from repositories.tenant_repository import TenantRepository
+
+    interval = int(os.getenv('REPORT_CACHE_WARMER_INTERVAL_SECONDS', DEFAULT_INTERVAL_SECONDS))
+
+    def build_warmer() -> ReportCacheWarmer:
+        return ReportCacheWarmer(
+            users_repo=app.config['USERS'],
+            tenants_repo=TenantRepository(),
+            transactions_repo=app.config['TRANSACTIONS'],
+            categories_repo=app.config['CATEGORIES'],
+            budget_repo=app.config.get('BUDGET_REPO'),
+            aggregates_repo=app.config.get('TRANSACTION_AGGREGATE_REPO'),
+            max_workers=int(os.getenv('REPORT_CACHE_WARMER_MAX_WORKERS', DEFAULT_MAX_WORKERS)),
+            active_within_days=int(os.getenv('REPORT_CACHE_WARMER_ACTIVE_DAYS', DEFAULT_ACTIVE_WITHIN_DAYS)),
+            ttl_seconds=interval,
+        )
+
+    launcher = ReportCacheWarmerLauncher(
+        build_warmer,
+        interval_seconds=interval,
+        lock_path=os.getenv('REPORT_CACHE_WARMER_LOCK') or None,
+    )
+    @app.before_request
+    def _start_report_cache_warmer():
+        # before_request não pode devolver valor (viraria a resposta)
+        launcher.maybe_start()
+
+    return launcher
@@ -0,0 +1,140 @@
+"""
+Agregado mensal de transações (tabela transaction_monthly_aggregates).
+
+Chave do agregado: (tenant_id, user_id, period, category_id, account_id, type, status),
+onde period é o primeiro dia do mês ('YYYY-MM-01').
+
+Este módulo concentra:
+- o cálculo de deltas (+/-) enviados ao repositório a cada escrita de transação;
+- o agrupamento em memória com o mesmo formato (fallback quando o agregado não está disponível).
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+GROUP_FIELDS = ('period', 'category_id', 'account_id', 'type', 'status')
+# Projeção mínima para agrupar em memória (mesmas colunas de TransactionRepository.REPORT_COLUMNS)
+GROUPING_COLUMNS = ('id', 'date', 'type', 'amount', 'status', 'category_id', 'account_id')
+
+
+def is_canonical_transaction(transaction: Dict[str, Any]) -> bool:
+    """Flag is_canonical quando presente; senão a regra de CANONICAL_SOURCE_PATTERN ('%.ofx')."""
+    if transaction.get('is_canonical') is not None:
+        return bool(transaction['is_canonical'])
+    return str(transaction.get('source_file') or '').lower().endswith('.ofx')
+
+
+def period_of(date_value: Any) -> Optional[str]:
+    """Primeiro dia do mês da transação ('YYYY-MM-01'); None se a data for inválida."""
+    raw = str(date_value or '')[:10]
+    if len(raw) < 7 or raw[4] != '-':
+        return None
+    return f"{raw[:7]}-01"
+
+
+def _group_key(transaction: Dict[str, Any]) -> Tuple:
+    return (
+        period_of(transaction.get('date')),
+        transaction.get('category_id') or None,
+        transaction.get('account_id') or None,
+        transaction.get('type'),
+        transaction.get('status') or 'pending',
+    )
+
+
+def iter_transactions_in_range(
+    transactions_repo,
+    user_id: str,
+    start_date: str,
+    end_date: str,
+    tenant_id: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Transações canônicas do intervalo [start_date, end_date) como stream.
+    Usa o iterador por keyset do repositório quando existe; senão, a lista de
+    find_by_user_and_date_range (repositórios antigos/mocks).
+    `columns` é a projeção pedida ao banco; None = todas as colunas.
+    """
+    if hasattr(transactions_repo, 'iter_by_user_and_date_range'):
+        return transactions_repo.iter_by_user_and_date_range(
+            user_id, start_date, end_date, tenant_id=tenant_id, columns=columns
+        )
+    return iter(transactions_repo.find_by_user_and_date_range(
+        user_id, start_date, end_date, tenant_id=tenant_id
+    ))
+
+
+def group_transactions(transactions: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Agrupa transações no formato das linhas do agregado:
+    {'period', 'category_id', 'account_id', 'type', 'status', 'total', 'tx_count'}.
+    """
+    groups: Dict[Tuple, Dict[str, Any]] = {}
+    for t in transactions:
+        key = _group_key(t)
+        row = groups.get(key)
+        if row is None:
+            row = dict(zip(GROUP_FIELDS, key))
+            row['total'] = 0.0
+            row['tx_count'] = 0
+            groups[key] = row
+        row['total'] += float(t.get('amount', 0) or 0)
+        row['tx_count'] += 1
+    return list(groups.values())
+
+
+def build_aggregate_deltas(
+    added: Iterable[Dict[str, Any]] = (),
+    removed: Iterable[Dict[str, Any]] = (),
+) -> List[Dict[str, Any]]:
+    """
+    Converte transações adicionadas/removidas em deltas do agregado.
+    Ignora transações não canônicas ou sem tenant/usuário; deltas que se anulam são descartados.
+    """
+    deltas: Dict[Tuple, Dict[str, Any]] = {}
+    for sign, transactions in ((1, added), (-1, removed)):
+        for t in transactions:
+            if not t or not is_canonical_transaction(t):
+                continue
+            tenant_id, user_id = t.get('tenant_id'), t.get('user_id')
+            key = _group_key(t)
+            if not tenant_id or not user_id or key[0] is None:
+                continue
+            full_key = (str(tenant_id), str(user_id)) + key
+            row = deltas.get(full_key)
+            if row is None:
+                row = {'tenant_id': str(tenant_id), 'user_id': str(user_id), **dict(zip(GROUP_FIELDS, key))}
+                row['total'] = 0.0
+                row['tx_count'] = 0
+                deltas[full_key] = row
+            row['total'] += sign * float(t.get('amount', 0) or 0)
+            row['tx_count'] += sign
+    return [
+        {**row, 'total': round(row['total'], 2)}
+        for row in deltas.values()
+        if row['tx_count'] != 0 or round(row['total'], 2) != 0
+    ]
+
+
+def record_transaction_changes(
+    aggregates_repo,
+    added: Iterable[Dict[str, Any]] = (),
+    removed: Iterable[Dict[str, Any]] = (),
+) -> bool:
+    """
+    Aplica os deltas no agregado. Falhas são só logadas: a transação já foi gravada
+    e o agregado pode ser reconstruído (rebuild_transaction_monthly_aggregates).
+    """
+    if aggregates_repo is None:
+        return False
+    deltas = build_aggregate_deltas(added=added, removed=removed)
+    if not deltas:
+        return True
+    try:
+        return bool(aggregates_repo.apply_deltas(deltas))
+    except Exception as e:
+        logger.warning("Falha ao atualizar agregado mensal de transações: %s", e)
+        return False
+
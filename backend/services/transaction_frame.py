@@ -0,0 +1,208 @@
+"""
+Representação colunar de transações para as contas de relatórios.
+
+TransactionFrame é montado uma única vez a partir das linhas do repositório
+(lista ou stream) e guarda só arrays NumPy compactos:
+
+- amount_cents   int64  valor em centavos (soma exata, sem float por linha);
+- day_ordinal    int32  date.toordinal() da data (0 se inválida);
+- month_index    int32  ano * 12 + (mês - 1) (-1 se inválida);
+- type/status/category_id/account_id  int32  códigos de dicionário (código ->
+  valor original, decodificado só nas linhas de saída).
+
+Os kernels de agrupamento/soma (group, sum_cents) rodam sobre os arrays e
+devolvem linhas no mesmo formato de transaction_aggregates.group_transactions.
+"""
+from array import array
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from services.transaction_aggregates import GROUP_FIELDS
+
+
+def _to_cents(value: Any) -> int:
+    try:
+        return int(round(float(value or 0) * 100))
+    except (TypeError, ValueError):
+        return 0
+
+
+# date(1970, 1, 1).toordinal(): converte dias desde a época (datetime64) em ordinal
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _parse_cents(amounts: List[Any]) -> np.ndarray:
+    try:
+        values = np.asarray(amounts, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array([_to_cents(value) for value in amounts], dtype=np.int64)
+    return np.rint(values * 100).astype(np.int64)
+
+
+def _parse_dates(dates: List[str]):
+    """(day_ordinal, month_index); datas inválidas viram 0 / -1 (período None)."""
+    try:
+        days = np.array(dates, dtype='datetime64[D]')
+    except ValueError:
+        return _parse_dates_slow(dates)
+    invalid = np.isnat(days)
+    day_ordinal = np.where(invalid, 0, days.astype(np.int64) + _EPOCH_ORDINAL).astype(np.int32)
+    months = days.astype('datetime64[M]').astype(np.int64) + 1970 * 12
+    month_index = np.where(invalid, -1, months).astype(np.int32)
+    return day_ordinal, month_index
+
+
+def _parse_dates_slow(dates: List[str]):
+    """Linha a linha, para colunas com valores fora do formato ISO."""
+    day_ordinal = array('i')
+    month_index = array('i')
+    for raw in dates:
+        try:
+            year, month = int(raw[:4]), int(raw[5:7])
+            month_index.append(year * 12 + month - 1 if raw[4] == '-' and 1 <= month <= 12 else -1)
+        except (ValueError, IndexError):
+            month_index.append(-1)
+        try:
+            day_ordinal.append(date.fromisoformat(raw).toordinal())
+        except ValueError:
+            day_ordinal.append(0)
+    return np.array(day_ordinal, dtype=np.int32), np.array(month_index, dtype=np.int32)
+
+
+class _Codes:
+    """Dicionário valor -> código sequencial (a ordem de chegada define o código)."""
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self._index: Dict[Any, int] = {}
+
+    def encode(self, value: Any) -> int:
+        code = self._index.get(value)
+        if code is None:
+            code = len(self.values)
+            self._index[value] = code
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: Any) -> Optional[int]:
+        return self._index.get(value)
+
+
+class TransactionFrame:
+    def __init__(
+        self,
+        amount_cents: np.ndarray,
+        day_ordinal: np.ndarray,
+        month_index: np.ndarray,
+        codes: Dict[str, np.ndarray],
+        dictionaries: Dict[str, _Codes],
+    ):
+        self.amount_cents = amount_cents
+        self.day_ordinal = day_ordinal
+        self.month_index = month_index
+        self._codes = codes
+        self._dictionaries = dictionaries
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "TransactionFrame":
+        """
+        Uma passada sobre as linhas (só extrai valores e códigos); a conversão de
+        valores e datas é feita de uma vez, vetorizada, sobre as colunas.
+        """
+        amounts: List[Any] = []
+        dates: List[str] = []
+        dictionaries = {field: _Codes() for field in ('type', 'status', 'category_id', 'account_id')}
+        codes = {field: array('i') for field in dictionaries}
+        encode_type = dictionaries['type'].encode
+        encode_status = dictionaries['status'].encode
+        encode_category = dictionaries['category_id'].encode
+        encode_account = dictionaries['account_id'].encode
+        for t in rows:
+            amounts.append(t.get('amount') or 0)
+            dates.append(str(t.get('date') or '')[:10])
+            # Mesmas normalizações de transaction_aggregates._group_key
+            codes['type'].append(encode_type(t.get('type')))
+            codes['status'].append(encode_status(t.get('status') or 'pending'))
+            codes['category_id'].append(encode_category(t.get('category_id') or None))
+            codes['account_id'].append(encode_account(t.get('account_id') or None))
+
+        day_ordinal, month_index = _parse_dates(dates)
+        return cls(
+            amount_cents=_parse_cents(amounts),
+            day_ordinal=day_ordinal,
+            month_index=month_index,
+            codes={field: np.array(values, dtype=np.int32) for field, values in codes.items()},
+            dictionaries=dictionaries,
+        )
+
+    def __len__(self) -> int:
+        return int(self.amount_cents.shape[0])
+
+    def _column(self, field: str) -> np.ndarray:
+        return self.month_index if field == 'period' else self._codes[field]
+
+    def _decode(self, field: str, code: int) -> Any:
+        if field == 'period':
+            if code < 0:
+                return None
+            return f"{code // 12:04d}-{code % 12 + 1:02d}-01"
+        return self._dictionaries[field].values[code]
+
+    def mask(
+        self,
+        tx_type: Optional[str] = None,
+        status: Optional[str] = None,
+        account_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> np.ndarray:
+        """Máscara booleana; filtros None são ignorados; intervalo de datas [start, end)."""
+        selected = np.ones(len(self), dtype=bool)
+        for field, value in (('type', tx_type), ('status', status), ('account_id', account_id)):
+            if value is None:
+                continue
+            code = self._dictionaries[field].lookup(value)
+            if code is None:
+                return np.zeros(len(self), dtype=bool)
+            selected &= self._codes[field] == code
+        if start_date:
+            selected &= self.day_ordinal >= date.fromisoformat(start_date[:10]).toordinal()
+        if end_date:
+            selected &= self.day_ordinal < date.fromisoformat(end_date[:10]).toordinal()
+        return selected
+
+    def sum_cents(self, mask: Optional[np.ndarray] = None) -> int:
+        values = self.amount_cents if mask is None else self.amount_cents[mask]
+        return int(values.sum())
+
+    def group(self, fields: Sequence[str] = GROUP_FIELDS, mask: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """
+        GROUP BY fields com SUM(amount) e COUNT(*), no formato do agregado:
+        {<fields>, 'total', 'tx_count'}.
+        """
+        invalid = [f for f in fields if f not in GROUP_FIELDS]
+        if invalid:
+            raise ValueError(f"Campos de agrupamento inválidos: {', '.join(invalid)}")
+        index = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        if index.size == 0:
+            return []
+
+        # Chave única por linha em base mista (cada coluna deslocada para começar em 0)
+        key = np.zeros(index.size, dtype=np.int64)
+        for field in fields:
+            column = self._column(field)[index].astype(np.int64)
+            low = int(column.min())
+            key = key * (int(column.max()) - low + 1) + (column - low)
+        _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+        totals = np.bincount(inverse, weights=self.amount_cents[index])
+        counts = np.bincount(inverse)
+
+        rows = []
+        for group, row_index in enumerate(index[first]):
+            row = {field: self._decode(field, int(self._column(field)[row_index])) for field in fields}
+            row['total'] = round(float(totals[group]) / 100, 2)
+            row['tx_count'] = int(counts[group])
+            rows.append(row)
+        return rows
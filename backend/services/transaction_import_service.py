@@ -0,0 +1,438 @@
+"""
+Importação de extratos (CSV/OFX) em transações, fora do contexto de request.
+
+Mesmo fluxo que rodava dentro de POST /api/transactions/import: leitura única do
+arquivo (ingest_import_file), detecção/criação da conta, resolução de categorias
+(aliases + heurística), deduplicação por FITID e dedup_key, inserção em lote e
+atualização do saldo. Fica num serviço para poder rodar tanto na própria
+requisição quanto num worker da fila de importações (services/import_jobs.py).
+
+import_file devolve (corpo, status_http) — o mesmo corpo que a rota respondia.
+"""
+import logging
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from services.account_detector import find_or_create_account
+from services.account_service import AccountService
+from services.category_detector import detect_category_from_description, get_or_create_category
+from services.category_service import CategoryService
+from services.import_service import compute_dedup_key, ingest_import_file
+from services.merchant_alias_service import MerchantAliasService
+from services.transaction_service import TransactionService
+from utils.category_name import build_import_category_cache, import_category_cache_key
+from utils.exceptions import ValidationException
+
+logger = logging.getLogger(__name__)
+
+# Intervalo (em transações) entre atualizações de progresso na etapa de categorização
+PROGRESS_EVERY = 100
+
+# progress(etapa, processadas, total): parsing, categorizing, deduplicating, saving
+ProgressCallback = Callable[[str, int, int], None]
+
+
+class TransactionImportService:
+    def __init__(self, transaction_repo, categories_repo, accounts_repo, aggregates_repo=None, alias_repo=None):
+        self.transaction_repo = transaction_repo
+        self.categories_repo = categories_repo
+        self.accounts_repo = accounts_repo
+        self.aggregates_repo = aggregates_repo
+        self.alias_repo = alias_repo
+
+    def _owns_account(self, account_id: str, user_id: str, tenant_id: str) -> bool:
+        find_by_id = getattr(self.accounts_repo, 'find_by_id', None)
+        account = find_by_id(account_id) if find_by_id else None
+        return bool(account) and account.get('user_id') == user_id and account.get('tenant_id') == tenant_id
+
+    def import_file(
+        self,
+        user_id: str,
+        tenant_id: str,
+        filename: str,
+        file_content: bytes,
+        account_id: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Tuple[Dict[str, Any], int]:
+        """
+        Importa o arquivo para a conta `account_id` (ou a detectada/criada a partir do arquivo).
+        Retorna (corpo, status_http): 201 com transações importadas, 4xx/500 caso contrário.
+        """
+        transaction_repo = self.transaction_repo
+        categories_repo = self.categories_repo
+        accounts_repo = self.accounts_repo
+        service = TransactionService(
+            transaction_repo, categories_repo, accounts_repo,
+            aggregates_repo=self.aggregates_repo,
+        )
+        account_service = AccountService(accounts_repo, transaction_repo)
+        category_service = CategoryService(categories_repo, transaction_repo)
+        alias_service = MerchantAliasService(self.alias_repo) if self.alias_repo else None
+
+        def report(stage: str, processed: int = 0, total: int = 0) -> None:
+            if progress:
+                progress(stage, processed, total)
+
+        account_created = False
+        created_account_name = None
+
+        # Conta informada: valida antes de ler o arquivo (404 sem custo de parsing)
+        explicit_account = bool(account_id)
+        if explicit_account and not self._owns_account(account_id, user_id, tenant_id):
+            return {'error': 'Conta não encontrada'}, 404
+
+        # Detecta formato, parseia e extrai os dados da conta numa única leitura
+        report('parsing')
+        try:
+            file_format, parsed_transactions, account_info = ingest_import_file(
+                filename, file_content, detect_account=not account_id
+            )
+        except Exception as e:
+            logger.error(f'Erro ao processar arquivo: {str(e)}', exc_info=True)
+            return {
+                'error': 'Não foi possível processar o arquivo. Verifique o formato e tente novamente.'
+            }, 400
+
+        # Se não forneceu account_id explicitamente, tenta detectar/criar automaticamente
+        if not account_id:
+            try:
+                if account_info:
+                    account_id, account_created = find_or_create_account(
+                        accounts_repo,
+                        user_id,
+                        account_info,
+                        filename,
+                        account_service=account_service,
+                        tenant_id=tenant_id,
+                    )
+                    if account_created and account_id:
+                        account = accounts_repo.find_by_id(account_id) if hasattr(accounts_repo, 'find_by_id') else None
+                        created_account_name = account.get('name') if account else None
+            except Exception as e:
+                # Se falhar na detecção, registra log e segue para validação abaixo
+                logger.warning(f'Falha ao detectar/criar conta automaticamente: {str(e)}')
+
+        # Política profissional: não permitimos mais importação de transações sem conta associada.
+        # Se, após tentativa de detecção/criação, ainda não houver account_id, abortamos com erro claro.
+        if not account_id:
+            return {
+                'error': 'Não foi possível identificar a conta de destino para este arquivo. '
+                         'Selecione uma conta antes de importar ou tente novamente com um arquivo compatível.'
+            }, 400
+
+        # Validação da conta detectada (a informada já foi validada acima)
+        if not explicit_account and not self._owns_account(account_id, user_id, tenant_id):
+            return {'error': 'Conta não encontrada'}, 404
+
+        try:
+            if not parsed_transactions:
+                return {'error': 'Nenhuma transação encontrada no arquivo'}, 400
+
+            if hasattr(categories_repo, "find_by_user_including_legacy_null_tenant"):
+                user_cats = categories_repo.find_by_user_including_legacy_null_tenant(
+                    user_id, tenant_id
+                )
+            else:
+                user_cats = categories_repo.find_by_user(user_id, tenant_id=tenant_id)
+            user_categories = build_import_category_cache(user_cats, tenant_id or "")
+            income_cats = (
+                categories_repo.find_by_type(user_id, 'income', tenant_id=tenant_id)
+                if hasattr(categories_repo, 'find_by_type')
+                else (categories_repo.find_all({'user_id': user_id, 'type': 'income', 'tenant_id': tenant_id}) or [])
+            )
+            expense_cats = (
+                categories_repo.find_by_type(user_id, 'expense', tenant_id=tenant_id)
+                if hasattr(categories_repo, 'find_by_type')
+                else (categories_repo.find_all({'user_id': user_id, 'type': 'expense', 'tenant_id': tenant_id}) or [])
+            )
+            default_income_category = income_cats[0] if income_cats else None
+            default_expense_category = expense_cats[0] if expense_cats else None
+
+            imported_transactions = []
+            errors = []
+            created_categories = []  # Para rastrear categorias criadas
+
+            total = len(parsed_transactions)
+            for idx, tx in enumerate(parsed_transactions):
+                if idx % PROGRESS_EVERY == 0:
+                    report('categorizing', idx, total)
+                try:
+                    category_id = None
+
+                    # Para CSV padrão, usa category_name se disponível
+                    if file_format == 'csv' and 'category_name' in tx and tx['category_name']:
+                        _ck = import_category_cache_key(tx['category_name'], tx['type'], tenant_id or '')
+                        category_id = user_categories.get(_ck)
+                        if not category_id:
+                            # Tenta criar a categoria se não existir
+                            try:
+                                category_id = get_or_create_category(
+                                    category_service,
+                                    user_id,
+                                    tx['category_name'],
+                                    tx['type'],
+                                    tenant_id=tenant_id,
+                                )
+                                user_categories[
+                                    import_category_cache_key(tx['category_name'], tx['type'], tenant_id or '')
+                                ] = category_id
+                                created_categories.append(tx['category_name'])
+                            except Exception as e:
+                                logger.warning(
+                                    f'Erro ao criar categoria "{tx["category_name"]}" para linha {idx + 2}: {str(e)}',
+                                    exc_info=True
+                                )
+                                # Fallback para categoria padrão ao invés de descartar transação
+                                if tx['type'] == 'income' and default_income_category:
+                                    category_id = default_income_category.get('id') or default_income_category.get('_id')
+                                    errors.append(f'Linha {idx + 2}: Categoria "{tx["category_name"]}" não criada; usando categoria padrão.')
+                                elif tx['type'] == 'expense' and default_expense_category:
+                                    category_id = default_expense_category.get('id') or default_expense_category.get('_id')
+                                    errors.append(f'Linha {idx + 2}: Categoria "{tx["category_name"]}" não criada; usando categoria padrão.')
+                                else:
+                                    errors.append(f'Linha {idx + 2}: Categoria "{tx["category_name"]}" não criada e nenhuma categoria padrão disponível.')
+                                    continue  # Só descarta se realmente não houver fallback
+                    else:
+                        # Para Nubank/OFX, primeiro tenta resolver via aliases persistentes
+                        detected = None
+                        alias_category = None
+
+                        if alias_service:
+                            alias_result = alias_service.find_category_for_description(
+                                user_id=user_id,
+                                tenant_id=tenant_id,
+                                description=tx['description'],
+                                category_type=tx['type'],
+                            )
+                            if alias_result:
+                                alias_name, alias_type = alias_result
+                                alias_category = (alias_name, alias_type)
+                                logger.debug(
+                                    "ImportTransactions: alias aplicado",
+                                    extra={
+                                        "user_id": user_id,
+                                        "tenant_id": tenant_id,
+                                        "description": tx['description'],
+                                        "tx_type": tx['type'],
+                                        "alias_category_name": alias_name,
+                                        "alias_category_type": alias_type,
+                                    },
+                                )
+                            else:
+                                logger.debug(
+                                    "ImportTransactions: nenhum alias encontrado",
+                                    extra={
+                                        "user_id": user_id,
+                                        "tenant_id": tenant_id,
+                                        "description": tx['description'],
+                                        "tx_type": tx['type'],
+                                    },
+                                )
+
+                        if alias_category:
+                            # Usa categoria padronizada do alias; cor/ícone são derivados pela heurística genérica
+                            alias_name, alias_type = alias_category
+                            detected = detect_category_from_description(alias_name) or (alias_name, None, None)
+                        else:
+                            # Se não houver alias, usa heurística pela descrição original
+                            detected = detect_category_from_description(tx['description'])
+
+                        if detected:
+                            category_name, color, icon = detected
+                            try:
+                                category_id = get_or_create_category(
+                                    category_service,
+                                    user_id,
+                                    category_name,
+                                    tx['type'],
+                                    color,
+                                    icon,
+                                    tenant_id=tenant_id,
+                                )
+                                _ck = import_category_cache_key(category_name, tx['type'], tenant_id or '')
+                                if _ck not in user_categories:
+                                    created_categories.append(category_name)
+                                user_categories[_ck] = category_id
+                            except Exception as e:
+                                errors.append(f'Transação {idx + 1}: Erro ao criar categoria "{category_name}": {str(e)}')
+                                # Usa categoria padrão como fallback
+                                if tx['type'] == 'income' and default_income_category:
+                                    category_id = default_income_category.get('id') or default_income_category.get('_id')
+                                elif tx['type'] == 'expense' and default_expense_category:
+                                    category_id = default_expense_category.get('id') or default_expense_category.get('_id')
+                                else:
+                                    errors.append(f'Transação {idx + 1}: Não foi possível determinar a categoria')
+                                    continue
+
+                        # Se não conseguiu detectar, usa categoria padrão
+                        if not category_id:
+                            if tx['type'] == 'income' and default_income_category:
+                                category_id = default_income_category.get('id') or default_income_category.get('_id')
+                            elif tx['type'] == 'expense' and default_expense_category:
+                                category_id = default_expense_category.get('id') or default_expense_category.get('_id')
+                            else:
+                                errors.append(f'Transação {idx + 1}: Nenhuma categoria padrão encontrada para tipo {tx["type"]}')
+                                continue
+
+                    # Validações
+                    if tx['amount'] <= 0:
+                        errors.append(f'Transação {idx + 1}: Valor deve ser positivo')
+                        continue
+
+                    date_val = tx['date']
+                    if hasattr(date_val, 'strftime'):
+                        date_val = date_val.strftime('%Y-%m-%d')
+                    if not tenant_id:
+                        errors.append('Importação exige workspace. Recarregue a página ou faça login novamente.')
+                        continue
+                    entry_src = 'ofx' if file_format == 'ofx' else 'csv'
+                    transaction_data = {
+                        'id': str(uuid.uuid4()),
+                        'user_id': user_id,
+                        'tenant_id': tenant_id,
+                        'account_tenant_id': tenant_id,
+                        'category_tenant_id': tenant_id,
+                        'description': tx['description'],
+                        'amount': tx['amount'],
+                        'type': tx['type'],
+                        'category_id': category_id,
+                        'date': date_val,
+                        'is_recurring': False,
+                        'status': 'paid',
+                        'responsible_person': None,
+                        'installment_info': None,
+                        'entry_source': entry_src,
+                        'source_file': filename,
+                        # Propaga FITID (quando disponível) para deduplicação e rastreio
+                        'fitid': (tx.get('raw_data') or {}).get('fitid'),
+                    }
+                    # account_id já foi garantido/validado anteriormente e é obrigatório
+                    transaction_data['account_id'] = account_id
+                    # Chave de deduplicação universal (csv + ofx) — cobre a lacuna do fitid,
+                    # que só existe para OFX. Ver services.import_service.compute_dedup_key.
+                    transaction_data['dedup_key'] = compute_dedup_key(
+                        date_val, tx['amount'], tx['description'], account_id, tx['type']
+                    )
+                    imported_transactions.append(transaction_data)
+                except Exception as e:
+                    logger.error(
+                        f'Erro inesperado ao processar transação {idx + 1}: {str(e)}',
+                        exc_info=True,
+                        extra={'transaction_index': idx + 1, 'transaction_type': tx.get('type')}
+                    )
+                    errors.append(f'Transação {idx + 1}: Erro inesperado ao processar. Verifique os logs para detalhes.')
+
+            duplicates_skipped = 0
+
+            report('deduplicating', total, total)
+            if imported_transactions:
+                # Deduplicação por FITID (Financial Institution Transaction ID)
+                # Escopo: (user_id, account_id, fitid, tenant_id)
+                # Transações OFX com mesmo FITID na mesma conta são consideradas duplicatas
+                fitids = sorted(
+                    {tx.get('fitid') for tx in imported_transactions if tx.get('fitid')}
+                )
+                existing_fitids = set()
+                if fitids:
+                    existing_fitids = set(
+                        transaction_repo.find_existing_fitids(
+                            user_id,
+                            account_id,
+                            fitids,
+                            tenant_id=tenant_id,
+                        )
+                    )
+
+                # Deduplicação universal por dedup_key — cobre csv e ofx (fitid só existe
+                # para ofx). Sem isso, reimportar o mesmo CSV duplicava tudo silenciosamente.
+                dedup_keys = sorted(
+                    {tx.get('dedup_key') for tx in imported_transactions if tx.get('dedup_key')}
+                )
+                existing_dedup_keys = set()
+                if dedup_keys:
+                    existing_dedup_keys = set(
+                        transaction_repo.find_existing_dedup_keys(
+                            tenant_id,
+                            dedup_keys,
+                        )
+                    )
+
+                deduped_transactions = []
+                seen_dedup_keys_in_batch = set()
+                for tx in imported_transactions:
+                    tx_fitid = tx.get('fitid')
+                    tx_dedup_key = tx.get('dedup_key')
+                    if tx_fitid and tx_fitid in existing_fitids:
+                        duplicates_skipped += 1
+                        continue
+                    if tx_dedup_key and tx_dedup_key in existing_dedup_keys:
+                        duplicates_skipped += 1
+                        continue
+                    if tx_dedup_key and tx_dedup_key in seen_dedup_keys_in_batch:
+                        # Mesmo arquivo com linhas duplicadas internamente
+                        duplicates_skipped += 1
+                        continue
+                    if tx_dedup_key:
+                        seen_dedup_keys_in_batch.add(tx_dedup_key)
+                    deduped_transactions.append(tx)
+
+                if deduped_transactions:
+                    report('saving', total, total)
+                    service.create_many_transactions(deduped_transactions)
+
+                    # Atualiza o saldo da conta apenas para transações realmente inseridas
+                    total_change = 0
+                    for tx in deduped_transactions:
+                        if tx.get('status') == 'paid':
+                            amount = tx['amount']
+                            if tx['type'] == 'expense':
+                                amount = -amount
+                            total_change += amount
+
+                    if total_change != 0:
+                        account_service.update_balance(account_id, total_change)
+            else:
+                deduped_transactions = []
+
+            result = {
+                'message': f'{len(deduped_transactions)} transações importadas com sucesso',
+                'imported_count': len(deduped_transactions),
+                'error_count': len(errors),
+                'file_format': file_format,
+                'categories_created': len(created_categories),
+                'categories_created_list': list(set(created_categories)),  # Remove duplicatas
+                'account_created': account_created,
+                'account_name': created_account_name,
+                'account_id': account_id if account_id else None,
+                'duplicates_skipped': duplicates_skipped,
+            }
+
+            if errors:
+                result['errors'] = errors
+            return result, (201 if deduped_transactions else 400)
+        except ValidationException as e:
+            return e.to_dict(), e.status_code
+        except Exception as e:
+            logger.error(f'Erro inesperado na importação: {str(e)}', exc_info=True)
+            return {
+                'error': 'Erro inesperado ao processar a importação. Tente novamente mais tarde.'
+            }, 500
+
+
+def run_import_job(config, job: Dict[str, Any], progress: ProgressCallback) -> Tuple[Dict[str, Any], int]:
+    """Runner da fila (services/import_jobs.py): importa o job com os repositórios de `config` (app.config)."""
+    importer = TransactionImportService(
+        config['TRANSACTIONS'],
+        config['CATEGORIES'],
+        config['ACCOUNTS'],
+        aggregates_repo=config.get('TRANSACTION_AGGREGATE_REPO'),
+        alias_repo=config.get('MERCHANT_ALIAS_REPO'),
+    )
+    return importer.import_file(
+        job['user_id'],
+        job['tenant_id'],
+        job['filename'],
+        job['payload'],
+        account_id=(job.get('options') or {}).get('account_id'),
+        progress=progress,
+    )
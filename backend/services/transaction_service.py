@@ -1,13 +1,25 @@
 from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime
+from datetime import date as date_cls, datetime, timedelta
 import uuid
 import logging
 from utils.exceptions import ValidationException, NotFoundException
 from utils.money_utils import parse_money_value
 from utils.date_utils import parse_date_value
+from services.transaction_aggregates import record_transaction_changes
+from services.report_cache import get_or_compute
+from utils.data_version import bump_data_version
+from utils.lookup_cache import invalidate_lookups
 
 logger = logging.getLogger(__name__)
 
+# Valores aceitos em transactions.status (CHECK transactions_status_check)
+TRANSACTION_STATUSES = ('paid', 'pending', 'overdue', 'cancelled')
+BULK_ACTIONS = ('recategorize', 'status', 'delete')
+BULK_MAX_IDS = 1000
+UNCATEGORIZED_NAMES = {'não classificado', 'nao classificado', 'sem categoria'}
+# Filtros compilados que o agregado mensal consegue responder (dimensões da tabela)
+SUMMARY_STORE_FILTERS = {'date_gte', 'date_lt', 'date_lte', 'types', 'account_ids', 'category_ids', 'statuses'}
+
 
 def _category_for(categories_repo, category_id):
     if not category_id:
@@ -20,6 +32,9 @@ def _category_for(categories_repo, category_id):
 
 
 def _build_category_map(categories_repo, user_id, tenant_id=None):
+    if hasattr(categories_repo, "find_map_by_user"):
+        # Mapa em cache por tenant (utils/lookup_cache.py); só leitura
+        return categories_repo.find_map_by_user(user_id, tenant_id=tenant_id)
     query_kwargs = {"tenant_id": tenant_id} if tenant_id else {}
     categories = []
     if hasattr(categories_repo, "find_by_user"):
@@ -38,6 +53,119 @@ def _build_category_map(categories_repo, user_id, tenant_id=None):
     return mapped
 
 
+def attach_category(row, categories_by_id):
+    """
+    Preenche row['category'] = {name, color, icon}: do recurso embutido pelo
+    PostgREST (include="category") quando a linha já o traz, senão do mapa de
+    categorias. Sem categoria, a chave fica ausente.
+    """
+    if 'category' in row:
+        category = row.pop('category')
+    else:
+        cat_id = row.get('category_id')
+        category = (categories_by_id or {}).get(str(cat_id)) if cat_id else None
+    if category:
+        row['category'] = {
+            'name': category.get('name', ''),
+            'color': category.get('color', '#6b7280'),
+            'icon': category.get('icon', 'circle')
+        }
+    return row
+
+
+def uncategorized_category_ids(category_map) -> set:
+    """Ids das categorias "Não classificado"/"Sem categoria" (contam como sem categoria no resumo)."""
+    return {
+        str(category_id)
+        for category_id, category in (category_map or {}).items()
+        if str(category.get('name') or '').strip().casefold() in UNCATEGORIZED_NAMES
+    }
+
+
+def build_summary_from_groups(rows, category_map) -> Dict[str, Any]:
+    """
+    Resumo da listagem a partir de linhas agrupadas {type, status, category_id, total, tx_count}
+    (RPC transaction_summary_groups ou agregado mensal). Mesmo formato do resumo de /facets.
+    """
+    paid_income = 0.0
+    paid_expense = 0.0
+    transaction_count = 0
+    uncategorized_count = 0
+    uncategorized_ids = uncategorized_category_ids(category_map)
+
+    for row in rows:
+        count = int(row.get('tx_count') or 0)
+        transaction_count += count
+        if row.get('status') == 'paid':
+            if row.get('type') == 'income':
+                paid_income += float(row.get('total') or 0)
+            elif row.get('type') == 'expense':
+                paid_expense += float(row.get('total') or 0)
+        category_id = row.get('category_id')
+        if not category_id or str(category_id) in uncategorized_ids:
+            uncategorized_count += count
+
+    return {
+        'paid_income': round(paid_income, 2),
+        'paid_expense': round(paid_expense, 2),
+        'net_paid': round(paid_income - paid_expense, 2),
+        'transaction_count': transaction_count,
+        'uncategorized_count': uncategorized_count,
+    }
+
+
+def _whole_month_range(compiled: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """
+    (start_period, end_period) quando o período compilado cobre meses inteiros
+    (date_gte no dia 1 e fim exclusivo no dia 1, ou date_lte no último dia do mês).
+    """
+    start = str(compiled.get('date_gte') or '')
+    if len(start) != 10 or not start.endswith('-01'):
+        return None
+    if compiled.get('date_lt') and compiled.get('date_lte'):
+        return None
+    try:
+        if compiled.get('date_lt'):
+            end = date_cls.fromisoformat(str(compiled['date_lt']))
+        elif compiled.get('date_lte'):
+            end = date_cls.fromisoformat(str(compiled['date_lte'])) + timedelta(days=1)
+        else:
+            return None
+    except ValueError:
+        return None
+    if end.day != 1 or end.isoformat() <= start:
+        return None
+    return start, end.isoformat()
+
+
+def _filter_aggregate_rows(rows, compiled: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Aplica às linhas do agregado mensal os filtros de tipo/conta/categoria/status."""
+    selected = rows
+    for field, key in (('type', 'types'), ('account_id', 'account_ids'), ('category_id', 'category_ids'), ('status', 'statuses')):
+        values = compiled.get(key)
+        if values:
+            allowed = {str(v) for v in values}
+            selected = [row for row in selected if str(row.get(field)) in allowed]
+    return list(selected)
+
+
+def _balance_changes(removed: List[Dict[str, Any]], added: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Diferença de saldo por conta ao trocar `removed` por `added`: só transações
+    pagas com conta contam (income soma, expense subtrai). Contas sem diferença ficam de fora.
+    """
+    changes: Dict[str, float] = {}
+    for rows, sign in ((removed, -1), (added, 1)):
+        for tx in rows:
+            account_id = tx.get('account_id')
+            if not account_id or tx.get('status') != 'paid':
+                continue
+            amount = float(tx.get('amount', 0) or 0)
+            effect = amount if tx.get('type') == 'income' else -amount
+            changes[str(account_id)] = changes.get(str(account_id), 0.0) + sign * effect
+    return {account_id: change for account_id, change in changes.items() if abs(change) > 1e-9}
+
+
 def _account_for(accounts_repo, account_id, user_id):
     if not account_id:
         return None
@@ -84,10 +212,12 @@ def _resolve_transaction_tenant_ids(
 
 
 class TransactionService:
-    def __init__(self, transaction_repo, categories_repo, accounts_repo):
+    def __init__(self, transaction_repo, categories_repo, accounts_repo, aggregates_repo=None):
         self.transaction_repo = transaction_repo
         self.categories_repo = categories_repo
         self.accounts_repo = accounts_repo
+        # Agregado mensal (transaction_monthly_aggregates); opcional — sem ele os relatórios varrem transações
+        self.aggregates_repo = aggregates_repo
 
     def list_transactions(
         self,
@@ -102,27 +232,80 @@ class TransactionService:
         filters.setdefault("page", page)
         filters.setdefault("limit", per_page)
 
-        result = self.transaction_repo.find_advanced(
-            user_id,
-            filters,
-            tenant_id=tenant_id,
-        )
+        query_kwargs: Dict[str, Any] = {"tenant_id": tenant_id}
+        if "category" in getattr(self.transaction_repo, "EMBEDDABLE", {}):
+            # Categoria embutida na mesma requisição; sem embed, cai no mapa em memória
+            query_kwargs["include"] = "category"
+        result = self.transaction_repo.find_advanced(user_id, filters, **query_kwargs)
         data = result.get('data') or []
-        categories_by_id = _build_category_map(self.categories_repo, user_id, tenant_id=tenant_id)
+        categories_by_id = None
+        if any('category' not in transaction for transaction in data):
+            categories_by_id = _build_category_map(self.categories_repo, user_id, tenant_id=tenant_id)
         for transaction in data:
-            cat_id = transaction.get('category_id')
-            category = categories_by_id.get(str(cat_id)) if cat_id else None
-            if category:
-                transaction['category'] = {
-                    'name': category.get('name', ''),
-                    'color': category.get('color', '#6b7280'),
-                    'icon': category.get('icon', 'circle')
-                }
+            attach_category(transaction, categories_by_id)
             transaction['id'] = transaction.get('id') or transaction.get('_id')
             transaction.pop('_id', None)
         result['data'] = data
+        summary = self.summarize_transactions(user_id, filters, tenant_id=tenant_id)
+        if summary is not None:
+            result['summary'] = summary
         return result
 
+    def summarize_transactions(
+        self,
+        user_id: str,
+        filters: Dict[str, Any],
+        tenant_id: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Resumo (entradas/saídas pagas, saldo, total, sem categoria) de TODO o
+        conjunto filtrado, independente da página. Usa o mesmo compilador de
+        filtros de find_advanced e, em ordem:
+        1. agregado mensal, quando o filtro é só período de meses inteiros + tipo/conta/categoria/status;
+        2. RPC transaction_summary_groups (GROUP BY no Postgres).
+        Sem nenhum dos dois, retorna None. Em cache por versão de dados do tenant.
+        """
+        if not hasattr(self.transaction_repo, 'compile_filters'):
+            return None
+        compiled = self.transaction_repo.compile_filters(filters or {})
+
+        def compute():
+            return self._compute_summary(user_id, filters or {}, compiled, tenant_id)
+
+        if not tenant_id:
+            return compute()
+        params = tuple(
+            sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in compiled.items())
+        )
+        return get_or_compute('transactions-summary', tenant_id, user_id, params, compute)
+
+    def _compute_summary(
+        self,
+        user_id: str,
+        filters: Dict[str, Any],
+        compiled: Dict[str, Any],
+        tenant_id: Optional[str],
+    ) -> Optional[Dict[str, Any]]:
+        rows = None
+        month_range = _whole_month_range(compiled)
+        if (
+            self.aggregates_repo is not None
+            and tenant_id
+            and month_range
+            and set(compiled) <= SUMMARY_STORE_FILTERS
+        ):
+            rows = self.aggregates_repo.find_by_period(user_id, tenant_id, *month_range)
+            if rows is not None:
+                rows = _filter_aggregate_rows(rows, compiled)
+        if rows is None and hasattr(self.transaction_repo, 'summary_groups'):
+            rows = self.transaction_repo.summary_groups(user_id, filters, tenant_id=tenant_id)
+        if rows is None:
+            return None
+        category_map = {}
+        if any(row.get('category_id') for row in rows):
+            category_map = _build_category_map(self.categories_repo, user_id, tenant_id=tenant_id)
+        return build_summary_from_groups(rows, category_map)
+
     def create_transaction(self, user_id: str, data: Dict[str, Any], tenant_id: Optional[str] = None) -> Dict[str, Any]:
         if not tenant_id:
             raise ValidationException('Workspace não identificado. Recarregue a página ou faça login novamente.')
@@ -182,16 +365,26 @@ class TransactionService:
             logger.error(f'Erro ao criar transação: {str(e)}', exc_info=True)
             raise ValidationException(f'Erro ao salvar no banco de dados. Detalhe: {str(e)}')
 
+        record_transaction_changes(self.aggregates_repo, added=[transaction_data])
+
         if account_id and transaction_data['status'] == 'paid':
             self._update_account_balance(account_id, transaction_data['amount'], transaction_data['type'])
+        # Depois do saldo: uma leitura entre as escritas não pode ser cacheada com a versão nova
+        bump_data_version(tenant_id)
 
         return {'count': 1, 'transaction': transaction_data}
 
     def create_many_transactions(self, transactions: List[Dict[str, Any]]) -> List[str]:
         try:
-            return self.transaction_repo.create_many(transactions)
+            created_ids = self.transaction_repo.create_many(transactions)
         except ValueError as e:
             raise ValidationException(f'Dados inválidos para transações. {str(e)}')
+        # O insert em lote é tudo-ou-nada: se voltaram ids, todas as linhas foram gravadas
+        if created_ids:
+            record_transaction_changes(self.aggregates_repo, added=transactions)
+            for tenant_id in {tx.get('tenant_id') for tx in transactions if tx.get('tenant_id')}:
+                bump_data_version(tenant_id)
+        return created_ids
 
     def get_transaction(self, user_id: str, transaction_id: str) -> Dict[str, Any]:
         transaction = self.transaction_repo.find_by_id(transaction_id)
@@ -277,12 +470,19 @@ class TransactionService:
                 self._update_account_balance(old_account_id, old_amount, opposite_type)
 
             # Atualiza transação no repositório
-            self.transaction_repo.update(transaction_id, update_data)
+            updated = self.transaction_repo.update(transaction_id, update_data)
             logger.info(f'Transação atualizada: {transaction_id} - user_id: {user_id}')
+            if updated is not False:
+                record_transaction_changes(
+                    self.aggregates_repo,
+                    added=[{**transaction, **update_data}],
+                    removed=[transaction],
+                )
 
             # Passo 2: aplicar saldo novo
             if new_account_id and new_status == 'paid' and new_amount:
                 self._update_account_balance(new_account_id, new_amount, new_type)
+            bump_data_version(current_tenant_id)
         except Exception as e:
             logger.error(f'Erro ao atualizar transação {transaction_id}: {str(e)}', exc_info=True)
             raise ValidationException(f'Erro ao atualizar no banco de dados. Detalhe: {str(e)}')
@@ -306,12 +506,102 @@ class TransactionService:
                 self._update_account_balance(transaction['account_id'], amount, opposite_type)
 
             result = self.transaction_repo.delete(transaction_id)
+            if result:
+                record_transaction_changes(self.aggregates_repo, removed=[transaction])
+                bump_data_version(transaction.get('tenant_id'))
             logger.info(f'Transação deletada: {transaction_id} ({transaction.get("description")}) - user_id: {user_id}')
             return result
         except Exception as e:
             logger.error(f'Erro ao deletar transação {transaction_id}: {str(e)}', exc_info=True)
             raise ValidationException(f'Erro ao deletar transação no banco de dados. Detalhe: {str(e)}')
 
+    def bulk_update_transactions(
+        self,
+        user_id: str,
+        ids: List[str],
+        action: str,
+        data: Optional[Dict[str, Any]] = None,
+        tenant_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Altera várias transações de uma vez: action = 'recategorize' (data.category_id),
+        'status' (data.status) ou 'delete'.
+
+        Uma leitura e um UPDATE/DELETE por lote de ids (repositório com
+        find_by_ids/update_by_ids/delete_by_ids; sem eles, linha a linha), e o
+        saldo de cada conta afetada é ajustado uma única vez com a soma das
+        diferenças. Ids de outro usuário/workspace são ignorados e devolvidos em not_found.
+        """
+        data = data or {}
+        if action not in BULK_ACTIONS:
+            raise ValidationException(f'Ação inválida. Use: {", ".join(BULK_ACTIONS)}')
+        if not tenant_id:
+            raise ValidationException('Workspace não identificado. Por favor, recarregue a página ou faça login novamente.')
+        if not isinstance(ids, list) or not ids:
+            raise ValidationException('Informe a lista de ids das transações')
+        ids = list(dict.fromkeys(str(i) for i in ids if i))
+        if len(ids) > BULK_MAX_IDS:
+            raise ValidationException(f'Máximo de {BULK_MAX_IDS} transações por operação')
+
+        update_data: Dict[str, Any] = {}
+        if action == 'recategorize':
+            category_id = data.get('category_id') or None
+            _, category_tenant_id = _resolve_transaction_tenant_ids(
+                tenant_id, None, category_id, user_id, self.accounts_repo, self.categories_repo,
+            )
+            update_data = {'category_id': category_id, 'category_tenant_id': category_tenant_id}
+        elif action == 'status':
+            status = data.get('status')
+            if status not in TRANSACTION_STATUSES:
+                raise ValidationException(f'Status inválido. Use: {", ".join(TRANSACTION_STATUSES)}')
+            update_data = {'status': status}
+
+        transactions = self._find_owned_transactions(user_id, ids, tenant_id)
+        found_ids = [str(tx.get('id') or tx.get('_id')) for tx in transactions]
+        found = set(found_ids)
+        not_found = [i for i in ids if i not in found]
+        if not transactions:
+            return {'action': action, 'requested': len(ids), 'affected': 0, 'not_found': not_found}
+
+        try:
+            if action == 'delete':
+                affected = self._delete_transactions_by_ids(found_ids, user_id, tenant_id)
+                updated_rows: List[Dict[str, Any]] = []
+            else:
+                affected = self._update_transactions_by_ids(found_ids, update_data, user_id, tenant_id)
+                updated_rows = [{**tx, **update_data} for tx in transactions]
+        except Exception as e:
+            logger.error(f'Erro na operação em lote {action} ({len(found_ids)} transações): {str(e)}', exc_info=True)
+            raise ValidationException(f'Erro ao atualizar transações no banco de dados. Detalhe: {str(e)}')
+
+        record_transaction_changes(self.aggregates_repo, added=updated_rows, removed=transactions)
+        for account_id, change in _balance_changes(transactions, updated_rows).items():
+            self._apply_balance_change(account_id, change)
+        bump_data_version(tenant_id)
+
+        logger.info(f'Operação em lote {action}: {affected} transação(ões) - user_id: {user_id}')
+        return {'action': action, 'requested': len(ids), 'affected': affected, 'not_found': not_found}
+
+    def _find_owned_transactions(self, user_id: str, ids: List[str], tenant_id: str) -> List[Dict[str, Any]]:
+        if hasattr(self.transaction_repo, 'find_by_ids'):
+            return self.transaction_repo.find_by_ids(ids, user_id, tenant_id=tenant_id)
+        rows = []
+        for transaction_id in ids:
+            tx = self.transaction_repo.find_by_id(transaction_id)
+            if tx and tx.get('user_id') == user_id and tx.get('tenant_id') == tenant_id:
+                rows.append(tx)
+        return rows
+
+    def _update_transactions_by_ids(self, ids: List[str], update_data: Dict[str, Any], user_id: str, tenant_id: str) -> int:
+        if hasattr(self.transaction_repo, 'update_by_ids'):
+            return self.transaction_repo.update_by_ids(ids, update_data, user_id, tenant_id=tenant_id)
+        return sum(1 for transaction_id in ids if self.transaction_repo.update(transaction_id, dict(update_data)) is not False)
+
+    def _delete_transactions_by_ids(self, ids: List[str], user_id: str, tenant_id: str) -> int:
+        if hasattr(self.transaction_repo, 'delete_by_ids'):
+            return self.transaction_repo.delete_by_ids(ids, user_id, tenant_id=tenant_id)
+        return sum(1 for transaction_id in ids if self.transaction_repo.delete(transaction_id))
+
     def _create_installments(
         self,
         data: Dict[str, Any],
@@ -359,7 +649,9 @@ class TransactionService:
             to_create.append(tx)
 
         try:
-            self.transaction_repo.create_many(to_create)
+            created_ids = self.transaction_repo.create_many(to_create)
+            if created_ids:
+                record_transaction_changes(self.aggregates_repo, added=to_create)
             logger.info(f'Parcelamento criado: {installments}x de {data["description"]} - user_id: {user_id}')
         except Exception as e:
             logger.error(f'Erro ao criar parcelamento: {str(e)}', exc_info=True)
@@ -373,7 +665,8 @@ class TransactionService:
              for tx in to_create:
                  if tx['status'] == 'paid':
                      self._update_account_balance(account_id, tx['amount'], tx['type'])
-                
+        bump_data_version(tenant_id)
+
         return {'count': len(to_create), 'transactions': to_create}
 
     def _get_opposite_type(self, type: str) -> str:
@@ -392,7 +685,10 @@ class TransactionService:
         Para REVERTER uma transação, use _get_opposite_type:
         self._update_account_balance(account_id, amount, self._get_opposite_type(old_type))
         """
-        balance_change = amount if type == 'income' else -amount
+        self._apply_balance_change(account_id, amount if type == 'income' else -amount)
+
+    def _apply_balance_change(self, account_id: str, balance_change: float):
+        """Soma balance_change ao saldo da conta (positivo = entrada)."""
         if getattr(self.accounts_repo, 'update_one', None) is not None:
             self.accounts_repo.update_one(
                 {'_id': account_id},
@@ -403,3 +699,7 @@ class TransactionService:
             if acc:
                 new_balance = (acc.get('current_balance') or 0) + balance_change
                 self.accounts_repo.update(account_id, {'current_balance': new_balance})
+                # Saldo faz parte do mapa de contas em cache dos relatórios e das
+                # respostas cacheadas (dashboard/contas): nova versão após a escrita
+                invalidate_lookups(acc.get('tenant_id'))
+                bump_data_version(acc.get('tenant_id'))
@@ -18,6 +18,9 @@ from typing import Any, Dict, List
 from database.connection import get_supabase
 from repositories.base_repository_supabase import BaseRepository
 from repositories.tenant_repository import TenantRepository
+from utils.data_version import bump_data_version
+from utils.lookup_cache import invalidate_lookups
+from utils.merchant_alias_index import invalidate_merchant_aliases
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +59,9 @@ def wipe_user_business_data(user_id: str, config: Dict[str, Any]) -> Dict[str, i
 
     tx_repo = config["TRANSACTIONS"]
     counts["transactions"] = tx_repo.delete_many({"user_id": user_id})
+    counts["transaction_monthly_aggregates"] = _try_delete_many(
+        "transaction_monthly_aggregates", {"user_id": user_id}
+    )
 
     fe_repo = config.get("FINANCIAL_EXPENSE_REPO")
     if fe_repo is not None:
@@ -79,6 +85,7 @@ def wipe_user_business_data(user_id: str, config: Dict[str, Any]) -> Dict[str, i
     for tid in sole_tenants:
         ma_tenant += _try_delete_many("merchant_category_aliases", {"tenant_id": tid})
     counts["merchant_category_aliases_tenant"] = ma_tenant
+    invalidate_merchant_aliases()
 
     counts["chatbot_conversations"] = _try_delete_many("chatbot_conversations", {"user_id": user_id})
 
@@ -98,4 +105,12 @@ def wipe_user_business_data(user_id: str, config: Dict[str, Any]) -> Dict[str, i
     cat_repo = config["CATEGORIES"]
     counts["categories"] = cat_repo.delete_many({"user_id": user_id})
 
+    # Invalida caches de dashboard/relatórios de todos os workspaces do utilizador
+    try:
+        for tenant in TenantRepository().get_user_tenants(user_id):
+            bump_data_version(tenant.get("tenant_id"))
+            invalidate_lookups(tenant.get("tenant_id"))
+    except Exception as e:
+        logger.warning("wipe: falha ao invalidar versão de dados: %s", e)
+
     return counts
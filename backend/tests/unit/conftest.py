@@ -0,0 +1,161 @@
+"""
+Fixtures compartilhadas dos testes unitários: cliente PostgREST falso e repositório em lista.
+"""
+import re
+
+import pytest
+
+# date.lt."<data>",and(date.eq."<data>",id.lt.<id>) — filtro de keyset de _apply_keyset
+_KEYSET = re.compile(r'date\.(lt|gt)\."([^"]+)",and\(date\.eq\."[^"]+",id\.(?:lt|gt)\.(\w+)\)')
+
+
+class FakeQuery:
+    """
+    Builder do PostgREST: registra cada chamada em client.calls como (método, *args)
+    e aplica só o que muda o resultado (keyset, in_, order, limit/range). Filtros
+    como eq/ilike são apenas registrados.
+    """
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.columns = None
+        self.count = None
+        self.ids = None
+        self.cursor = None
+        self.order_fields = []
+        self.desc = False
+        self.page_size = None
+        self.offset = 0
+
+    def _record(self, name, *args):
+        self.client.calls.append((name,) + args)
+
+    def select(self, columns="*", count=None):
+        self._record("select", columns)
+        self.columns, self.count = columns, count
+        return self
+
+    def in_(self, field, values):
+        self._record("in_", field, values)
+        self.ids = values
+        return self
+
+    def or_(self, expr):
+        self._record("or_", expr)
+        match = _KEYSET.match(expr)
+        if match:
+            self.cursor = match.groups()
+        return self
+
+    def order(self, field, desc=False):
+        self._record("order", field)
+        if not self.order_fields:
+            self.desc = desc
+        self.order_fields.append(field)
+        return self
+
+    def limit(self, n):
+        self._record("limit", n)
+        self.page_size = n
+        return self
+
+    def range(self, start, end):
+        self._record("range", start, end)
+        self.offset, self.page_size = start, end - start + 1
+        return self
+
+    def __getattr__(self, name):
+        def method(*args, **_kwargs):
+            self._record(name, *args)
+            return self
+        return method
+
+    def execute(self):
+        self.client.executed.append(self)
+        rows = self.client.respond(self) if self.client.respond else self._page()
+        total = self.client.total if self.client.total is not None else len(self.client.rows)
+        return type("Resp", (), {"data": rows, "count": total if self.count else None})()
+
+    def _page(self):
+        rows = list(self.client.rows)
+        if self.ids is not None:
+            rows = [r for r in rows if r["id"] in self.ids]
+        if self.order_fields:
+            rows.sort(key=lambda r: tuple(r.get(f) for f in self.order_fields), reverse=self.desc)
+        if self.cursor:
+            op, date, tx_id = self.cursor
+            key = (date, tx_id)
+            rows = [r for r in rows if ((r["date"], r["id"]) < key if op == "lt" else (r["date"], r["id"]) > key)]
+        if self.page_size is not None:
+            rows = rows[self.offset:self.offset + self.page_size]
+        return rows
+
+
+class _FakeRpc:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def execute(self):
+        if self.client.rpc_rows is None:
+            raise RuntimeError(f"function {self.name} does not exist")
+        return type("Resp", (), {"data": self.client.rpc_rows})()
+
+
+class FakeSupabase:
+    """
+    Cliente falso. rows/total alimentam as consultas de tabela; respond(query),
+    se passado, substitui as linhas devolvidas; rpc_rows=None faz toda RPC falhar
+    como função inexistente.
+    """
+
+    def __init__(self, rows=(), total=None, respond=None, rpc_rows=None):
+        self.rows = list(rows)
+        self.total = total
+        self.respond = respond
+        self.rpc_rows = rpc_rows
+        self.calls = []
+        self.executed = []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        self.calls.append(("rpc", name, params))
+        return _FakeRpc(self, name)
+
+    @property
+    def selects(self):
+        return [call[1] for call in self.calls if call[0] == "select"]
+
+
+@pytest.fixture
+def fake_supabase(monkeypatch):
+    """Fábrica: fake_supabase(**kwargs) instala um FakeSupabase como get_supabase dos repositórios."""
+    from repositories import base_repository_supabase as base_module
+    from repositories import transaction_repository_supabase as tx_module
+
+    def install(**kwargs):
+        client = FakeSupabase(**kwargs)
+        monkeypatch.setattr(tx_module, "get_supabase", lambda: client)
+        monkeypatch.setattr(base_module, "get_supabase", lambda: client)
+        monkeypatch.setattr("database.connection.get_supabase", lambda: client)
+        return client
+
+    return install
+
+
+class ListRepo:
+    """Repositório de catálogo (categorias, contas) que só lista itens fixos."""
+
+    def __init__(self, items):
+        self.items = items
+
+    def find_by_user(self, user_id, tenant_id=None):
+        return self.items
+
+
+@pytest.fixture
+def list_repo():
+    return ListRepo
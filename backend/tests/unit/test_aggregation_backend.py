@@ -0,0 +1,93 @@
+"""
+Testes unitários dos backends de agregação (services/aggregation_backend.py).
+
+O pushdown SQL e a agregação em memória devem produzir o mesmo relatório.
+"""
+import pytest
+
+from services.aggregation_backend import (
+    AggregationQuery,
+    InMemoryBackend,
+    SqlPushdownBackend,
+    project_groups,
+    run_aggregation,
+)
+from services.transaction_aggregates import group_transactions
+from services.report_service import overview_report_supabase
+
+
+TRANSACTIONS = [
+    {'type': 'expense', 'amount': 100, 'category_id': 'cat1', 'account_id': 'acc1', 'status': 'paid', 'date': '2024-01-03'},
+    {'type': 'expense', 'amount': 30, 'category_id': 'cat2', 'account_id': 'acc2', 'status': 'paid', 'date': '2024-01-04'},
+    {'type': 'expense', 'amount': 50, 'category_id': 'cat1', 'account_id': 'acc1', 'status': 'pending', 'date': '2024-01-05'},
+    {'type': 'income', 'amount': 200, 'category_id': 'cat3', 'account_id': 'acc1', 'status': 'paid', 'date': '2024-01-06'},
+]
+
+
+class ScanRepo:
+    def find_by_user_and_date_range(self, user_id, start, end, tenant_id=None):
+        return TRANSACTIONS
+
+
+class PushdownRepo:
+    """Simula o RPC aggregate_transactions a partir das mesmas transações."""
+
+    def __init__(self):
+        self.calls = []
+
+    def find_by_user_and_date_range(self, *args, **kwargs):
+        raise AssertionError("pushdown não deveria varrer transações")
+
+    def aggregate_by_period(self, user_id, start, end, group_by, tenant_id=None, status=None, tx_type=None, account_id=None):
+        self.calls.append(tuple(group_by))
+        query = AggregationQuery(user_id, start, end, tenant_id=tenant_id, group_by=tuple(group_by),
+                                 status=status, tx_type=tx_type, account_id=account_id)
+        return project_groups(group_transactions(TRANSACTIONS), query)
+
+
+CATEGORIES = [{'id': 'cat1', 'name': 'Mercado'}, {'id': 'cat2', 'name': 'Lazer'}, {'id': 'cat3', 'name': 'Salário'}]
+ACCOUNTS = [
+    {'id': 'acc1', 'name': 'Corrente', 'is_active': True, 'current_balance': 70},
+    {'id': 'acc2', 'name': 'Cartão', 'is_active': True, 'current_balance': -30},
+]
+
+
+@pytest.fixture
+def catalogs(list_repo):
+    return list_repo(CATEGORIES), list_repo(ACCOUNTS)
+
+
+def test_query_rejeita_dimensao_desconhecida():
+    with pytest.raises(ValueError):
+        AggregationQuery('u', '2024-01-01', '2024-02-01', group_by=('description',))
+
+
+def test_filtros_sao_preenchidos_nas_linhas():
+    query = AggregationQuery('u', '2024-01-01', '2024-02-01', group_by=('category_id',), status='paid', tx_type='expense')
+    rows = run_aggregation(query, ScanRepo(), backends=[InMemoryBackend(ScanRepo())])
+    assert {r['category_id']: r['total'] for r in rows} == {'cat1': 100, 'cat2': 30}
+    assert all(r['status'] == 'paid' and r['type'] == 'expense' for r in rows)
+
+
+def test_sem_rpc_cai_para_memoria():
+    assert SqlPushdownBackend(ScanRepo()).fetch(AggregationQuery('u', '2024-01-01', '2024-02-01')) is None
+
+
+@pytest.mark.parametrize('report_type', [
+    'expenses_by_category', 'income_by_category', 'expenses_by_account', 'income_by_account', 'balance_by_account',
+])
+def test_overview_pushdown_igual_a_memoria(report_type, catalogs):
+    categories, accounts = catalogs
+    pushdown = PushdownRepo()
+    from_memory = overview_report_supabase(ScanRepo(), categories, accounts, 'u', 1, 2024, report_type, tenant_id='t')
+    from_sql = overview_report_supabase(pushdown, categories, accounts, 'u', 1, 2024, report_type, tenant_id='t')
+    assert from_sql == from_memory
+    assert pushdown.calls and 'status' not in pushdown.calls[0]
+
+
+def test_overview_filtro_por_conta_no_backend(catalogs):
+    categories, accounts = catalogs
+    result = overview_report_supabase(
+        PushdownRepo(), categories, accounts, 'u', 1, 2024, 'expenses_by_category', account_id='acc2', tenant_id='t'
+    )
+    assert result['total_amount'] == 30
@@ -0,0 +1,32 @@
+"""
+Testes unitários do verificador de planos de scripts/bench_query_plans.py.
+"""
+from scripts.bench_query_plans import QUERY_SHAPES, find_seq_scans
+
+
+def test_detecta_seq_scan_em_tabela_semeada_em_qualquer_nivel():
+    plan = {
+        "Node Type": "Nested Loop",
+        "Plans": [
+            {"Node Type": "Index Scan", "Relation Name": "transactions", "Index Name": "idx_x"},
+            {
+                "Node Type": "Hash",
+                "Plans": [{"Node Type": "Seq Scan", "Relation Name": "categories"}],
+            },
+            {"Node Type": "Seq Scan", "Relation Name": "pg_class"},
+        ],
+    }
+    assert find_seq_scans(plan) == ["categories"]
+    assert find_seq_scans({"Node Type": "Bitmap Heap Scan", "Relation Name": "transactions"}) == []
+
+
+def test_formatos_de_query_tem_nomes_unicos():
+    names = [name for name, _, _ in QUERY_SHAPES]
+    assert len(names) == len(set(names))
+
+
+def test_formatos_de_query_aceitam_os_parametros_do_psycopg2():
+    # psycopg2 usa a mesma interpolação %(nome)s / %% do Python
+    params = {key: "x" for key in ("tenant", "user_id", "account", "account2", "category")}
+    for name, _, sql in QUERY_SHAPES:
+        assert "%(" not in sql % params, name
@@ -0,0 +1,72 @@
+"""
+Testes unitários do autômato de palavras-chave (utils/keyword_automaton.py) e
+da detecção de categoria que o usa (services/category_detector.py).
+"""
+import random
+
+import pytest
+
+from services.category_detector import CATEGORY_KEYWORDS, detect_category_from_description
+from utils.keyword_automaton import KeywordAutomaton
+
+
+def _legacy_detect(description):
+    # Implementação anterior: testa cada palavra de cada categoria
+    if not description:
+        return None
+    lower = description.lower()
+    scores = {}
+    for name, data in CATEGORY_KEYWORDS.items():
+        if name == 'Outros':
+            continue
+        score = sum(2 if len(k) > 4 else 1 for k in data['keywords'] if k in lower)
+        if score:
+            scores[name] = (score, data['color'], data['icon'])
+    if scores:
+        best = max(scores.items(), key=lambda item: item[1][0])
+        return (best[0], best[1][1], best[1][2])
+    return ('Outros', CATEGORY_KEYWORDS['Outros']['color'], CATEGORY_KEYWORDS['Outros']['icon'])
+
+
+def test_automato_acha_palavras_sobrepostas():
+    automaton = KeywordAutomaton(['rest', 'restaurante', 'ante', 'uber', 'uber eats', ''])
+    assert len(automaton) == 5
+    assert automaton.find_all('UBER EATS restaurante'.lower()) == {'uber', 'uber eats', 'rest', 'restaurante', 'ante'}
+    assert list(automaton.iter_matches('xrestaurante')) == [(5, 'rest'), (12, 'restaurante'), (12, 'ante')]
+    assert automaton.find_all('nada aqui') == set()
+
+
+def test_automato_equivale_a_busca_por_substring():
+    rng = random.Random(7)
+    keywords = [''.join(rng.choice('abc') for _ in range(rng.randint(1, 4))) for _ in range(30)]
+    automaton = KeywordAutomaton(keywords)
+    for _ in range(300):
+        text = ''.join(rng.choice('abcd') for _ in range(rng.randint(0, 20)))
+        assert automaton.find_all(text) == {k for k in keywords if k in text}
+
+
+@pytest.mark.parametrize('description', [
+    'PIX UBER EATS',
+    'Restaurante e bar do Zé',
+    'Farmácia Drogasil',
+    'Posto Shell combustível',
+    'NETFLIX.COM',
+    'pagamento diverso',
+    'a',
+])
+def test_deteccao_igual_a_implementacao_anterior(description):
+    assert detect_category_from_description(description) == _legacy_detect(description)
+
+
+def test_deteccao_igual_em_corpus_aleatorio():
+    rng = random.Random(42)
+    keywords = [k for data in CATEGORY_KEYWORDS.values() for k in data['keywords']]
+    for _ in range(2000):
+        words = rng.sample(keywords, rng.randint(0, 4)) + rng.sample(['LTDA', 'PIX', '*', 'SP'], 2)
+        rng.shuffle(words)
+        description = ' '.join(w.upper() if rng.random() < 0.5 else w for w in words)
+        assert detect_category_from_description(description) == _legacy_detect(description)
+
+
+def test_descricao_vazia():
+    assert detect_category_from_description('') is None
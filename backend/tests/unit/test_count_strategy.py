@@ -0,0 +1,58 @@
+"""
+Testes unitários das estratégias de contagem (exact / planned / estimated / cached).
+"""
+import pytest
+
+from repositories import base_repository_supabase as base_module
+from repositories.base_repository_supabase import CountCache, normalize_count_strategy
+from utils import data_version as data_version_module
+from utils.data_version import DataVersionStore
+
+
+@pytest.fixture
+def counts(fake_supabase, monkeypatch, tmp_path):
+    client = fake_supabase(rows=[{"id": "1"}], total=42)
+    monkeypatch.setattr(base_module, "_count_cache", CountCache(ttl_seconds=60))
+    monkeypatch.setattr(data_version_module, "_store", DataVersionStore(directory=str(tmp_path)))
+    # count pedido em cada consulta executada
+    return client.executed
+
+
+def test_normalize_count_strategy():
+    assert normalize_count_strategy(None) == "exact"
+    assert normalize_count_strategy("Planned") == "planned"
+    assert normalize_count_strategy("none", "cached") is None
+    assert normalize_count_strategy("bogus", "cached") == "cached"
+
+
+def test_listagem_usa_contagem_em_cache_ate_a_versao_mudar(counts):
+    from repositories.transaction_repository_supabase import TransactionRepository
+
+    repo = TransactionRepository()
+    params = {"month": "2", "year": "2024", "limit": 10}
+    first = repo.find_advanced("u1", {**params, "page": 1}, tenant_id="t1")
+    second = repo.find_advanced("u1", {**params, "page": 2}, tenant_id="t1")
+    assert first["pagination"]["total"] == second["pagination"]["total"] == 42
+    assert [q.count for q in counts] == ["exact", None]
+
+    data_version_module.bump_data_version("t1")
+    repo.find_advanced("u1", {**params, "page": 2}, tenant_id="t1")
+    assert counts[-1].count == "exact"
+
+
+def test_estrategias_do_postgrest_e_sem_contagem(counts):
+    from repositories.transaction_repository_supabase import TransactionRepository
+
+    repo = TransactionRepository()
+    assert repo.find_advanced("u1", {"count": "planned"})["pagination"]["total"] == 42
+    none = repo.find_advanced("u1", {"count": "none"})
+    assert [q.count for q in counts] == ["planned", None]
+    assert none["pagination"]["total"] is None
+
+
+def test_count_da_base_aceita_estrategia(counts):
+    repo = base_module.BaseRepository("categories")
+    assert repo.count({}, strategy="planned") == 42
+    assert repo.count({"user_id": "u1"}, strategy="cached") == 42
+    assert repo.count({"user_id": "u1"}, strategy="cached") == 42
+    assert [q.count for q in counts] == ["planned", "exact", None]
@@ -0,0 +1,74 @@
+"""
+Testes unitários do ETag por versão de dados (utils/http_cache.py).
+"""
+import pytest
+from flask import Flask, jsonify, request
+
+from utils import data_version as data_version_module
+from utils.data_version import DataVersionStore
+from utils.http_cache import etag_by_data_version
+
+
+@pytest.fixture
+def app_and_calls(tmp_path, monkeypatch):
+    store = DataVersionStore(directory=str(tmp_path))
+    monkeypatch.setattr(data_version_module, "_store", store)
+    app = Flask(__name__)
+    calls = []
+
+    @app.before_request
+    def fake_auth():
+        request.user_id = request.headers.get("X-User", "u1")
+        request.tenant_id = "t1"
+
+    @app.route("/data", methods=["GET", "POST"])
+    @etag_by_data_version
+    def data():
+        calls.append(request.method)
+        return jsonify({"ok": True})
+
+    @app.route("/missing")
+    @etag_by_data_version
+    def missing():
+        return jsonify({"error": "x"}), 404
+
+    return app, calls, store
+
+
+def test_304_sem_chamar_a_view(app_and_calls):
+    app, calls, _ = app_and_calls
+    client = app.test_client()
+    first = client.get("/data")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    second = client.get("/data", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.headers["ETag"] == etag
+    assert calls == ["GET"]
+
+
+def test_escrita_muda_etag(app_and_calls):
+    app, calls, store = app_and_calls
+    client = app.test_client()
+    etag = client.get("/data").headers["ETag"]
+    store.bump("t1")
+    response = client.get("/data", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_etag_por_usuario_e_query(app_and_calls):
+    app, _, _ = app_and_calls
+    client = app.test_client()
+    etag = client.get("/data?month=1").headers["ETag"]
+    assert client.get("/data?month=2", headers={"If-None-Match": etag}).status_code == 200
+    assert client.get("/data?month=1", headers={"If-None-Match": etag, "X-User": "u2"}).status_code == 200
+
+
+def test_post_e_erros_sem_etag(app_and_calls):
+    app, calls, _ = app_and_calls
+    client = app.test_client()
+    assert "ETag" not in client.post("/data").headers
+    assert "ETag" not in client.get("/missing").headers
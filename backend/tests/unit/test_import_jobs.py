@@ -0,0 +1,106 @@
+"""
+Testes unitários da fila de importações assíncronas (services/import_jobs.py).
+"""
+import time
+
+import pytest
+
+from services.import_jobs import ImportJobQueue, ImportJobStore, STALE_ERROR, serialize_job
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ImportJobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def _runner(job, progress):
+    progress("categorizing", 1, 2)
+    return {"imported_count": 2, "file": job["filename"], "size": len(job["payload"])}, 201
+
+
+def test_job_executa_uma_vez_e_descarta_o_arquivo(store):
+    queue = ImportJobQueue(store, _runner)
+    job = store.create("u1", "t1", "extrato.ofx", b"<OFX>", {"account_id": "a1"})
+    assert job["status"] == "queued" and job["options"] == {"account_id": "a1"}
+
+    queue.run(job["id"])
+    queue.run(job["id"])  # já reivindicado: não roda de novo
+
+    done = store.get(job["id"], "u1", "t1")
+    assert done["status"] == "succeeded" and done["result_status"] == 201
+    assert done["result"] == {"imported_count": 2, "file": "extrato.ofx", "size": 5}
+    assert store.claim(job["id"]) is None
+
+
+def test_submit_processa_em_background(store):
+    queue = ImportJobQueue(store, _runner, max_workers=1)
+    job = queue.submit("u1", "t1", "a.csv", b"x")
+    for _ in range(100):
+        if store.get(job["id"])["status"] == "succeeded":
+            break
+        time.sleep(0.02)
+    assert serialize_job(store.get(job["id"]))["result"]["imported_count"] == 2
+
+
+def test_falhas_e_escopo(store):
+    def failing(job, progress):
+        if job["filename"] == "explode.csv":
+            raise RuntimeError("boom")
+        return {"error": "Nenhuma transação encontrada no arquivo"}, 400
+
+    queue = ImportJobQueue(store, failing)
+    for name in ("explode.csv", "vazio.csv"):
+        job = store.create("u1", "t1", name, b"")
+        queue.run(job["id"])
+        failed = store.get(job["id"], "u1", "t1")
+        assert failed["status"] == "failed" and failed["result"]["error"]
+
+    assert store.get(job["id"], "u2", "t1") is None
+    assert store.get(job["id"], "u1", "t2") is None
+
+
+def test_job_em_execucao_sem_progresso_vira_falha(tmp_path):
+    store = ImportJobStore(str(tmp_path / "jobs.sqlite3"), stale_seconds=0)
+    job = store.create("u1", "t1", "a.ofx", b"")
+    store.claim(job["id"])
+    time.sleep(0.01)
+    stale = store.get(job["id"])
+    assert stale["status"] == "failed" and stale["error"] == STALE_ERROR
+
+
+def test_job_esquecido_na_fila_e_reenviado_e_roda_uma_vez(tmp_path):
+    store = ImportJobStore(str(tmp_path / "jobs.sqlite3"), stale_seconds=0)
+    runs = []
+
+    def runner(job, progress):
+        runs.append(job["id"])
+        return {"imported_count": 1}, 201
+
+    # Enfileirado por um worker que morreu antes de executar
+    job = store.create("u1", "t1", "a.ofx", b"x")
+    time.sleep(0.01)
+    queue = ImportJobQueue(store, runner, max_workers=1)
+    assert queue.get(job["id"], "u1", "t1")["status"] == "queued"
+    for _ in range(100):
+        if store.get(job["id"])["status"] == "succeeded":
+            break
+        time.sleep(0.02)
+    assert store.get(job["id"])["status"] == "succeeded"
+
+    queue.get(job["id"], "u1", "t1")
+    queue.run(job["id"])
+    assert runs == [job["id"]]
+    assert queue.get(job["id"], "u2", "t1") is None
+
+
+def test_conta_invalida_responde_404_antes_de_ler_o_arquivo(monkeypatch):
+    import services.transaction_import_service as module
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError("arquivo não deveria ser lido")
+
+    monkeypatch.setattr(module, "ingest_import_file", no_parse)
+    accounts = type("Accounts", (), {"find_by_id": lambda self, _id: {"user_id": "outro", "tenant_id": "t1"}})()
+    service = module.TransactionImportService(None, None, accounts)
+    body, status = service.import_file("u1", "t1", "a.ofx", b"<OFX>", account_id="a1")
+    assert status == 404 and body == {"error": "Conta não encontrada"}
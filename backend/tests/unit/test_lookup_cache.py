@@ -0,0 +1,79 @@
+"""
+Testes unitários do cache de mapas de categorias/contas (utils/lookup_cache.py).
+"""
+import pytest
+
+from utils import data_version as data_version_module
+from utils import lookup_cache as lookup_cache_module
+from utils.data_version import DataVersionStore, bump_data_version
+from utils.lookup_cache import LookupCache, get_or_load_map, invalidate_lookups
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch, tmp_path):
+    monkeypatch.setattr(data_version_module, "_store", DataVersionStore(directory=str(tmp_path)))
+    monkeypatch.setattr(lookup_cache_module, "_cache", LookupCache(max_entries=2))
+
+
+def _loader(rows, calls):
+    def load():
+        calls.append(1)
+        return rows
+    return load
+
+
+def test_reaproveita_mapa_ate_invalidacao_de_lookups():
+    calls = []
+    rows = [{"id": "c1", "name": "Mercado"}, {"_id": "c2", "name": "Salário"}, {"name": "sem id"}]
+    first = get_or_load_map("categories", "t1", "u1", _loader(rows, calls))
+    assert set(first) == {"c1", "c2"}
+    assert get_or_load_map("categories", "t1", "u1", _loader(rows, calls)) is first
+    assert len(calls) == 1
+
+    # Escrita só em transações: versão geral muda, mapa continua válido
+    bump_data_version("t1")
+    get_or_load_map("categories", "t1", "u1", _loader(rows, calls))
+    assert len(calls) == 1
+
+    invalidate_lookups("t1")
+    get_or_load_map("categories", "t1", "u1", _loader(rows, calls))
+    assert len(calls) == 2
+
+
+def test_sem_tenant_nao_usa_cache_e_lru_limitado():
+    calls = []
+    get_or_load_map("accounts", None, "u1", _loader([], calls))
+    get_or_load_map("accounts", None, "u1", _loader([], calls))
+    assert len(calls) == 2
+
+    for tenant in ("t1", "t2", "t3"):
+        get_or_load_map("accounts", tenant, "u1", _loader([], calls))
+    assert len(lookup_cache_module.get_lookup_cache()) == 2
+
+
+def test_servico_de_categoria_invalida_e_listagem_usa_mapa(monkeypatch):
+    from services.category_service import CategoryService
+    from services.transaction_service import TransactionService
+
+    invalidated = []
+    monkeypatch.setattr("services.category_service.invalidate_lookups", invalidated.append)
+
+    category_repo = type("Repo", (), {
+        "find_by_name_and_type": lambda self, *a, **k: None,
+        "find_equivalent_category": lambda self, *a, **k: None,
+        "create": lambda self, data: "c9",
+    })()
+    CategoryService(category_repo, None).create_category("u1", {"name": "Lazer", "type": "expense"}, tenant_id="t1")
+    assert invalidated == ["t1"]
+
+    maps = []
+    categories_repo = type("Repo", (), {
+        "find_map_by_user": lambda self, user_id, tenant_id=None: maps.append(tenant_id) or {"c1": {"name": "Mercado"}},
+        "find_by_user": lambda self, *a, **k: pytest.fail("não deve baixar todas as categorias"),
+    })()
+    transaction_repo = type("Repo", (), {
+        "find_advanced": lambda self, *a, **k: {"data": [{"id": "x", "category_id": "c1"}], "pagination": {}},
+    })()
+    result = TransactionService(transaction_repo, categories_repo, None).list_transactions("u1", {}, tenant_id="t1")
+    assert result["data"][0]["category"]["name"] == "Mercado"
+    assert maps == ["t1"]
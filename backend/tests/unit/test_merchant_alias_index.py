@@ -0,0 +1,100 @@
+"""
+Testes unitários do índice compilado de aliases de comerciante (utils/merchant_alias_index.py).
+"""
+import random
+
+import pytest
+
+from utils import merchant_alias_index as module
+from utils.merchant_alias_index import MerchantAliasIndex, get_merchant_alias_index, normalize_alias_text
+
+
+def _linear_best_alias(aliases, user_id, tenant_id, description):
+    # Busca linear anterior (MerchantAliasRepositorySupabase.find_best_alias)
+    desc_norm = normalize_alias_text(description)
+    if not desc_norm:
+        return None
+    best_score, best_alias = -1, None
+    for alias in aliases:
+        alias_norm = normalize_alias_text(alias.get("normalized_value") or alias.get("match_value") or "")
+        match_type = alias.get("match_type") or "contains"
+        scope_score = 0
+        if user_id and alias.get("user_id") == user_id:
+            scope_score = 20
+        elif tenant_id and alias.get("tenant_id") == tenant_id:
+            scope_score = 10
+        match_score = -1
+        if match_type == "exact" and desc_norm == alias_norm:
+            match_score = 3
+        elif match_type == "prefix" and desc_norm.startswith(alias_norm):
+            match_score = 2
+        elif match_type == "contains" and alias_norm in desc_norm:
+            match_score = 1
+        if match_score >= 0 and scope_score + match_score > best_score:
+            best_score, best_alias = scope_score + match_score, alias
+    return best_alias
+
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path, monkeypatch):
+    from utils import data_version
+
+    monkeypatch.setattr(data_version, "_store", data_version.DataVersionStore(str(tmp_path)))
+    module.clear_merchant_alias_indexes()
+    yield
+    module.clear_merchant_alias_indexes()
+
+
+def test_escopo_e_tipo_de_match():
+    aliases = [
+        {"id": "g", "match_type": "contains", "match_value": "uber", "category_name": "Transporte"},
+        {"id": "t", "match_type": "prefix", "match_value": "Uber", "tenant_id": "t1", "category_name": "Trabalho"},
+        {"id": "u", "match_type": "contains", "normalized_value": "eats", "user_id": "u1", "category_name": "Alimentação"},
+        {"id": "x", "match_type": "exact", "match_value": "Padaria São João", "category_name": "Alimentação"},
+    ]
+    index = MerchantAliasIndex(aliases)
+    assert index.best_alias("u1", "t1", "UBER EATS")["id"] == "u"
+    assert index.best_alias("u2", "t1", "UBER EATS")["id"] == "t"
+    assert index.best_alias("u2", "t2", "corrida uber")["id"] == "g"
+    assert index.best_alias(None, None, "  padaria sao joao ")["id"] == "x"
+    assert index.best_alias(None, None, "padaria sao joao centro") is None
+    assert index.best_alias("u1", "t1", "") is None
+
+
+def test_equivale_a_busca_linear():
+    rng = random.Random(11)
+    words = ["uber", "ub", "posto", "posto shell", "café", "cafe", "ifood", "sh", "ell"]
+    aliases = [
+        {
+            "id": str(i),
+            "match_type": rng.choice(["exact", "prefix", "contains", None]),
+            "match_value": " ".join(rng.sample(words, rng.randint(1, 2))),
+            "user_id": rng.choice([None, "u1", "u2"]),
+            "tenant_id": rng.choice([None, "t1", "t2"]),
+        }
+        for i in range(60)
+    ]
+    index = MerchantAliasIndex(aliases)
+    for _ in range(500):
+        description = " ".join(rng.sample(words, rng.randint(1, 3)))
+        user_id, tenant_id = rng.choice([(None, None), ("u1", "t1"), ("u2", "t2")])
+        assert index.best_alias(user_id, tenant_id, description) is _linear_best_alias(aliases, user_id, tenant_id, description)
+
+
+def test_indice_recarrega_so_apos_invalidacao():
+    loads = []
+
+    def load():
+        loads.append(1)
+        return [{"match_type": "contains", "match_value": "uber", "category_name": "Transporte"}]
+
+    for _ in range(3):
+        get_merchant_alias_index("expense", load)
+    assert len(loads) == 1
+
+    get_merchant_alias_index("income", load)
+    assert len(loads) == 2
+
+    module.invalidate_merchant_aliases()
+    get_merchant_alias_index("expense", load)
+    assert len(loads) == 3
@@ -0,0 +1,97 @@
+"""
+Testes unitários do leitor incremental de OFX (services/ofx_stream.py).
+"""
+from io import BytesIO
+
+import pytest
+
+from services.import_service import iter_ofx_transactions, parse_ofx
+from services.ofx_stream import iter_ofx_records
+
+SGML = b"""OFXHEADER:100
+DATA:OFXSGML
+
+<OFX>
+<BANKMSGSRSV1><STMTTRNRS><STMTRS>
+<BANKACCTFROM>
+<BANKID>0260
+<ACCTID>12345
+</BANKACCTFROM>
+<BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20230101000000[-3:BRT]
+<TRNAMT>-100.00
+<FITID>1
+<MEMO>Padaria   &amp;   Caf\xc3\xa9
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20230102
+<TRNAMT>250,50
+<FITID>2
+<PAYEE><NAME>Empresa X</PAYEE>
+</BANKTRANLIST>
+</STMTRS></STMTTRNRS></BANKMSGSRSV1>
+</OFX>
+"""
+
+
+class _CountingStream(BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+@pytest.mark.parametrize("chunk_size", [3, 7, 64 * 1024])
+def test_registros_sgml_independem_do_tamanho_do_bloco(chunk_size):
+    records = list(iter_ofx_records(SGML, ("STMTTRN",), chunk_size=chunk_size))
+    assert [fields["fitid"] for _tag, fields in records] == ["1", "2"]
+    assert records[0][1]["memo"] == "Padaria & Café"
+    # STMTTRN sem fechamento termina com o </BANKTRANLIST>
+    assert records[1][1]["name"] == "Empresa X"
+
+
+def test_parse_ofx_aceita_stream_e_bytes():
+    from_stream = parse_ofx(BytesIO(SGML))
+    assert from_stream == parse_ofx(SGML)
+    assert [(tx["type"], tx["amount"]) for tx in from_stream] == [("expense", 100.0), ("income", 250.5)]
+    assert from_stream[1]["description"] == "Empresa X"
+    assert from_stream[0]["raw_data"]["fitid"] == "1"
+
+
+def test_primeiro_registro_sai_antes_do_fim_do_arquivo():
+    filler = b"".join(
+        b"<STMTTRN><DTPOSTED>20230101<TRNAMT>-1<FITID>%d</STMTTRN>" % i for i in range(2000)
+    )
+    stream = _CountingStream(b"<OFX><BANKTRANLIST>" + filler + b"</BANKTRANLIST></OFX>")
+    _tag, first = next(iter_ofx_records(stream, ("STMTTRN",), chunk_size=256))
+    assert first["fitid"] == "0"
+    assert stream.reads < 5
+
+
+def test_sem_tag_ofx_e_invalido():
+    with pytest.raises(ValueError):
+        list(iter_ofx_transactions(b"<HTML><BODY>nada</BODY></HTML>"))
+
+
+def test_ingestao_unica_devolve_conta_e_transacoes(monkeypatch):
+    import services.import_service as module
+
+    scans = []
+
+    def counting(*args, **kwargs):
+        scans.append(args[1])
+        return iter_ofx_records(*args, **kwargs)
+
+    monkeypatch.setattr(module, "iter_ofx_records", counting)
+    file_format, transactions, account_info = module.ingest_import_file("extrato.ofx", SGML)
+
+    assert file_format == "ofx" and len(transactions) == 2
+    assert account_info["institution"] == "Nubank"
+    assert account_info["account_number"] == "12345"
+    assert len(scans) == 1
@@ -0,0 +1,81 @@
+"""
+Testes unitários do bundle de relatórios (report_bundle_supabase).
+
+O bundle deve fazer uma única leitura de transações e devolver os mesmos
+resultados das funções individuais.
+"""
+from datetime import datetime
+
+import pytest
+
+from services.report_service import (
+    comparison_report_supabase,
+    monthly_evolution_supabase,
+    overview_report_supabase,
+    report_bundle_supabase,
+)
+
+
+NOW = datetime.now()
+THIS_MONTH = NOW.strftime('%Y-%m-05')
+PREV_MONTH = (datetime(NOW.year - 1, 12, 5) if NOW.month == 1 else datetime(NOW.year, NOW.month - 1, 5)).strftime('%Y-%m-%d')
+
+TRANSACTIONS = [
+    {'type': 'expense', 'amount': 100, 'category_id': 'cat1', 'account_id': 'acc1', 'status': 'paid', 'date': THIS_MONTH},
+    {'type': 'expense', 'amount': 60, 'category_id': 'cat1', 'account_id': 'acc1', 'status': 'pending', 'date': THIS_MONTH},
+    {'type': 'income', 'amount': 500, 'category_id': 'cat2', 'account_id': 'acc2', 'status': 'paid', 'date': THIS_MONTH},
+    {'type': 'expense', 'amount': 80, 'category_id': None, 'account_id': 'acc2', 'status': 'paid', 'date': PREV_MONTH},
+    {'type': 'income', 'amount': 300, 'category_id': 'cat2', 'account_id': 'acc1', 'status': 'paid', 'date': PREV_MONTH},
+]
+
+
+class RangeRepo:
+    """Filtra por intervalo [start, end) como o repositório real e conta leituras."""
+
+    def __init__(self):
+        self.reads = 0
+
+    def find_by_user_and_date_range(self, user_id, start, end, tenant_id=None):
+        self.reads += 1
+        return [t for t in TRANSACTIONS if start <= t['date'] < end]
+
+
+CATEGORIES = [{'id': 'cat1', 'name': 'Mercado'}, {'id': 'cat2', 'name': 'Salário'}]
+ACCOUNTS = [
+    {'id': 'acc1', 'name': 'Corrente', 'is_active': True, 'current_balance': 10},
+    {'id': 'acc2', 'name': 'Poupança', 'is_active': True, 'current_balance': 20},
+]
+
+TYPES = ['expenses_by_category', 'income_by_category', 'expenses_by_account', 'income_by_account', 'balance_by_account']
+
+
+@pytest.fixture
+def catalogs(list_repo):
+    return list_repo(CATEGORIES), list_repo(ACCOUNTS)
+
+
+def test_bundle_faz_uma_leitura_e_bate_com_relatorios_individuais(catalogs):
+    categories, accounts = catalogs
+    repo = RangeRepo()
+    bundle = report_bundle_supabase(
+        repo, categories, accounts, 'u', NOW.month, NOW.year, TYPES,
+        include_comparison=True, evolution_months=6, tenant_id='t',
+    )
+    assert repo.reads == 1
+
+    for report_type in TYPES:
+        single = overview_report_supabase(RangeRepo(), categories, accounts, 'u', NOW.month, NOW.year, report_type, tenant_id='t')
+        assert bundle['overview'][report_type] == {'data': single['data'], 'total_amount': single['total_amount']}
+
+    assert bundle['comparison'] == comparison_report_supabase(RangeRepo(), 'u', NOW.month, NOW.year, tenant_id='t')
+    assert bundle['evolution'] == monthly_evolution_supabase(RangeRepo(), 'u', 6, tenant_id='t')
+
+
+def test_bundle_respeita_filtro_de_conta_e_secoes_desligadas(catalogs):
+    categories, accounts = catalogs
+    bundle = report_bundle_supabase(
+        RangeRepo(), categories, accounts, 'u', NOW.month, NOW.year, ['income_by_category'],
+        include_comparison=False, evolution_months=0, account_id='acc1', tenant_id='t',
+    )
+    assert bundle['overview']['income_by_category']['total_amount'] == 0
+    assert 'comparison' not in bundle and 'evolution' not in bundle
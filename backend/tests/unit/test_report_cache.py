@@ -0,0 +1,115 @@
+"""
+Testes unitários do cache de respostas versionado (services/report_cache.py + utils/data_version.py).
+"""
+import pytest
+
+from services import report_cache as report_cache_module
+from services.report_cache import ReportCache, get_or_compute
+from utils import data_version as data_version_module
+from utils.data_version import DataVersionStore
+
+
+@pytest.fixture
+def isolated_versions(tmp_path, monkeypatch):
+    store = DataVersionStore(directory=str(tmp_path))
+    monkeypatch.setattr(data_version_module, "_store", store)
+    monkeypatch.setattr(report_cache_module, "_cache", ReportCache(ttl_seconds=60, max_entries=8))
+    return store
+
+
+def test_lru_remove_entrada_menos_usada():
+    cache = ReportCache(ttl_seconds=60, max_entries=2)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}
+    cache.set("c", {"v": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    assert len(cache) == 2
+
+
+def test_ttl_expira(monkeypatch):
+    cache = ReportCache(ttl_seconds=10, max_entries=2)
+    now = [1000.0]
+    monkeypatch.setattr(report_cache_module.time, "monotonic", lambda: now[0])
+    cache.set("a", {"v": 1})
+    now[0] += 11
+    assert cache.get("a") is None
+
+
+def test_versao_compartilhada_entre_instancias(tmp_path):
+    writer = DataVersionStore(directory=str(tmp_path))
+    reader = DataVersionStore(directory=str(tmp_path))
+    base = writer.get("tenant-1")
+    assert reader.get("tenant-1") == base
+    version = writer.bump("tenant-1")
+    assert reader.get("tenant-1") == version
+    assert reader.get("tenant-2") == base
+
+
+def test_versao_base_muda_se_o_diretorio_for_apagado(tmp_path):
+    import shutil
+
+    directory = tmp_path / "versions"
+    store = DataVersionStore(directory=str(directory))
+    base = store.get("tenant-1")
+    assert base != "0"
+    store.bump("tenant-2")
+
+    shutil.rmtree(directory)
+    # Nem o tenant que tinha versão nem o que nunca teve voltam a um valor antigo
+    assert store.get("tenant-1") not in (base, "0")
+    assert store.get("tenant-2") == store.get("tenant-1")
+    assert DataVersionStore(directory=str(directory)).get("tenant-1") == store.get("tenant-1")
+
+
+def test_escrita_invalida_apenas_o_tenant(isolated_versions):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"n": len(calls)}
+
+    assert get_or_compute("dashboard", "t1", "u1", (1, 2024), compute) == {"n": 1}
+    assert get_or_compute("dashboard", "t1", "u1", (1, 2024), compute) == {"n": 1}
+    get_or_compute("dashboard", "t2", "u2", (1, 2024), compute)
+    assert len(calls) == 2
+
+    isolated_versions.bump("t1")
+    assert get_or_compute("dashboard", "t1", "u1", (1, 2024), compute) == {"n": 3}
+    get_or_compute("dashboard", "t2", "u2", (1, 2024), compute)
+    assert len(calls) == 3
+
+
+def test_transaction_service_incrementa_versao(isolated_versions):
+    from services.transaction_service import TransactionService
+
+    tx = {"id": "tx1", "user_id": "u1", "tenant_id": "t1", "amount": 10, "type": "expense", "status": "pending"}
+    transaction_repo = type("TxRepo", (), {
+        "find_by_id": lambda self, x: dict(tx),
+        "delete": lambda self, x: True,
+    })()
+    before = isolated_versions.get("t1")
+    TransactionService(transaction_repo, None, None).delete_transaction("u1", "tx1")
+    assert isolated_versions.get("t1") != before
+
+
+def test_versao_muda_depois_da_escrita_do_saldo(isolated_versions):
+    from services.transaction_service import TransactionService
+
+    tx = {"id": "tx1", "user_id": "u1", "tenant_id": "t1", "account_id": "a1",
+          "amount": 10, "type": "expense", "status": "paid"}
+    seen_at_balance_write = []
+    transaction_repo = type("TxRepo", (), {
+        "find_by_id": lambda self, x: dict(tx),
+        "update": lambda self, x, data: True,
+    })()
+    accounts_repo = type("AccRepo", (), {
+        "find_by_id": lambda self, x: {"id": "a1", "user_id": "u1", "tenant_id": "t1", "current_balance": 100},
+        "update": lambda self, x, data: seen_at_balance_write.append(isolated_versions.get("t1")),
+    })()
+    TransactionService(transaction_repo, None, accounts_repo).update_transaction("u1", "tx1", {"amount": 20})
+
+    # Leitura feita durante a escrita do saldo não pode ficar cacheada com a versão final
+    assert seen_at_balance_write
+    assert isolated_versions.get("t1") not in seen_at_balance_write
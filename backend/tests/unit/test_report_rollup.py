@@ -0,0 +1,86 @@
+"""
+Testes unitários do rollup anual/trimestral (rollup_report_supabase).
+
+Meses fechados vêm do agregado mensal; só o mês aberto é lido das transações.
+"""
+from datetime import datetime
+
+import pytest
+
+from services.report_service import rollup_report_supabase
+
+
+TODAY = datetime(2024, 5, 20)
+
+CUBE = [
+    {'period': '2023-11-01', 'category_id': 'cat1', 'account_id': 'acc1', 'type': 'expense', 'status': 'paid', 'total': 100, 'tx_count': 2},
+    {'period': '2024-02-01', 'category_id': 'cat1', 'account_id': 'acc1', 'type': 'expense', 'status': 'paid', 'total': 50, 'tx_count': 1},
+    {'period': '2024-02-01', 'category_id': 'cat1', 'account_id': 'acc1', 'type': 'expense', 'status': 'pending', 'total': 999, 'tx_count': 1},
+    {'period': '2024-04-01', 'category_id': None, 'account_id': 'acc2', 'type': 'income', 'status': 'paid', 'total': 300, 'tx_count': 1},
+]
+
+OPEN_MONTH = [
+    {'date': '2024-05-03', 'type': 'expense', 'amount': 40, 'status': 'paid', 'category_id': 'cat1', 'account_id': 'acc1'},
+    {'date': '2024-05-04', 'type': 'expense', 'amount': 7, 'status': 'pending', 'category_id': 'cat1', 'account_id': 'acc1'},
+]
+
+
+class CubeRepo:
+    def __init__(self):
+        self.calls = []
+
+    def find_by_period(self, user_id, tenant_id, start_period, end_period):
+        self.calls.append((start_period, end_period))
+        return [r for r in CUBE if start_period <= r['period'] < end_period]
+
+
+class LiveRepo:
+    def __init__(self):
+        self.ranges = []
+
+    def find_by_user_and_date_range(self, user_id, start, end, tenant_id=None):
+        self.ranges.append((start, end))
+        return [t for t in OPEN_MONTH if start <= t['date'] < end]
+
+
+CATEGORIES = [{'id': 'cat1', 'name': 'Mercado', 'color': '#f00'}]
+
+
+@pytest.fixture
+def rollup(list_repo):
+    def run(**kwargs):
+        cube, live = CubeRepo(), LiveRepo()
+        data = rollup_report_supabase(
+            live, list_repo(CATEGORIES), list_repo([]), 'u',
+            tenant_id='t', aggregates_repo=cube, today=TODAY, **kwargs,
+        )
+        return data, cube, live
+    return run
+
+
+def test_anual_usa_cubo_para_meses_fechados_e_le_so_o_mes_aberto(rollup):
+    data, cube, live = rollup(months=12, granularity='year')
+    assert cube.calls == [('2023-06-01', '2024-05-01')]
+    assert live.ranges == [('2024-05-01', '2024-06-01')]
+    buckets = {b['bucket']: b for b in data['buckets']}
+    assert buckets['2023']['expense'] == 100
+    assert buckets['2024']['expense'] == 90
+    assert buckets['2024']['income'] == 300
+    assert data['totals'] == {'income': 300, 'expense': 190, 'balance': 110}
+    names = {item['name'] for item in buckets['2024']['items']}
+    assert names == {'Mercado', 'Sem categoria'}
+
+
+def test_trimestral_por_conta(rollup):
+    data, _, _ = rollup(months=12, granularity='quarter', dimension='account')
+    buckets = {b['bucket']: b for b in data['buckets']}
+    assert sorted(buckets) == ['2023-Q4', '2024-Q1', '2024-Q2']
+    assert buckets['2024-Q2']['income'] == 300
+    assert buckets['2024-Q2']['expense'] == 40
+    assert {item['id'] for item in buckets['2024-Q2']['items']} == {'acc1', 'acc2'}
+
+
+def test_janela_de_um_mes_nao_le_o_cubo(rollup):
+    data, cube, live = rollup(months=1, granularity='month')
+    assert cube.calls == []
+    assert [b['bucket'] for b in data['buckets']] == ['2024-05']
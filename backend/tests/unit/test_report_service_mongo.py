@@ -0,0 +1,72 @@
+"""
+Testes unitários dos relatórios no caminho MongoDB (dashboard_summary, comparison_report).
+"""
+from datetime import datetime
+
+from services.report_service import comparison_report, dashboard_summary
+
+
+class _Cursor(list):
+    def sort(self, field, direction):
+        return _Cursor(sorted(self, key=lambda doc: doc[field], reverse=direction < 0))
+
+    def limit(self, n):
+        return _Cursor(self[:n])
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    @staticmethod
+    def _matches(doc, query):
+        for key, cond in query.items():
+            value = doc.get(key)
+            if isinstance(cond, dict):
+                if '$gte' in cond and not value >= cond['$gte']:
+                    return False
+                if '$lt' in cond and not value < cond['$lt']:
+                    return False
+            elif value != cond:
+                return False
+        return True
+
+    def find(self, query):
+        return _Cursor(dict(d) for d in self.docs if self._matches(d, query))
+
+    def find_one(self, query):
+        return next((dict(d) for d in self.docs if self._matches(d, query)), None)
+
+    def aggregate(self, pipeline):
+        return []
+
+
+def _tx(day, month, amount, tx_type='expense', status='paid'):
+    return {'_id': f'{month}-{day}-{amount}', 'user_id': 'u1', 'date': datetime(2024, month, day),
+            'amount': amount, 'type': tx_type, 'status': status, 'category_id': 'c1'}
+
+
+TRANSACTIONS = [
+    _tx(5, 3, 100),
+    _tx(6, 3, 40, status='pending'),
+    _tx(7, 3, 500, tx_type='income'),
+    _tx(10, 2, 80),
+]
+
+
+def test_dashboard_summary_mongo_conta_pagas_e_pendentes():
+    categories = FakeCollection([{'_id': 'c1', 'name': 'Mercado', 'color': '#000', 'icon': 'cart'}])
+    result = dashboard_summary(FakeCollection(TRANSACTIONS), categories, 'u1', 3, 2024)
+
+    assert result['summary']['total_income'] == 500
+    assert result['summary']['total_expense'] == 100
+    assert result['summary']['transactions_count'] == 2
+    assert result['summary']['pending_transactions_count'] == 1
+
+
+def test_comparison_report_mongo_conta_transacoes_pagas():
+    result = comparison_report(FakeCollection(TRANSACTIONS), 'u1', 3, 2024)
+
+    assert result['current_period']['transactions_count'] == 2
+    assert result['previous_period']['transactions_count'] == 1
+    assert result['variations']['transactions_variation'] == 1
@@ -0,0 +1,131 @@
+"""
+Testes unitários do warmer do cache de relatórios (services/report_warmer.py).
+"""
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from services import report_cache as report_cache_module
+from services.report_cache import ReportCache
+from services.report_warmer import ReportCacheWarmer, cached_dashboard_summary, cached_planning_month
+from utils import data_version as data_version_module
+from utils.data_version import DataVersionStore
+
+NOW = datetime(2024, 6, 1, 0, 5)
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_version_module, "_store", DataVersionStore(directory=str(tmp_path)))
+    monkeypatch.setattr(report_cache_module, "_cache", ReportCache(ttl_seconds=60, max_entries=64))
+
+
+class CountingRepo:
+    """Repositório de transações que conta leituras e mede concorrência."""
+
+    def __init__(self, fail_user=None, delay=0.0):
+        self.reads = 0
+        self.active = 0
+        self.max_active = 0
+        self.fail_user = fail_user
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def find_by_user_and_date_range(self, user_id, start, end, tenant_id=None):
+        with self._lock:
+            self.reads += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if user_id == self.fail_user:
+                raise RuntimeError("falha simulada")
+            time.sleep(self.delay)
+            return [{"date": start, "type": "expense", "amount": 10, "status": "paid", "category_id": "c1"}]
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def find_by_user_limit(self, user_id, limit, tenant_id=None):
+        return []
+
+
+USERS = type("Users", (), {
+    "find_recently_active": lambda self, since: [{"id": f"u{i}"} for i in range(6)],
+})()
+TENANTS = type("Tenants", (), {
+    "get_user_tenants": lambda self, user_id: [{"tenant_id": f"t-{user_id}"}],
+})()
+CATEGORIES = type("Cats", (), {"find_by_user": lambda self, user_id, tenant_id=None: []})()
+BUDGET = type("Budget", (), {
+    "get_monthly": lambda self, *a: None,
+    "get_plans_for_month": lambda self, *a: [],
+})()
+
+
+def _warmer(repo, max_workers=2):
+    return ReportCacheWarmer(USERS, TENANTS, repo, CATEGORIES, budget_repo=BUDGET, max_workers=max_workers)
+
+
+def test_rodada_aquece_entradas_usadas_pelas_rotas():
+    repo = CountingRepo()
+    stats = _warmer(repo).run_once(now=NOW)
+    assert stats["targets"] == 6
+    assert stats["warmed"] == 18
+    assert stats["failed"] == 0
+    reads = repo.reads
+
+    data = cached_dashboard_summary(repo, CATEGORIES, "u3", "t-u3", NOW.month, NOW.year)
+    plan = cached_planning_month(repo, CATEGORIES, BUDGET, "u3", "t-u3", NOW.month, NOW.year)
+    assert repo.reads == reads
+    assert data
+    assert plan["summary"]["real_expenses"] == 10
+
+
+def test_concorrencia_limitada_e_falhas_contadas():
+    repo = CountingRepo(fail_user="u0", delay=0.01)
+    stats = _warmer(repo, max_workers=2).run_once(now=NOW, scheduled_at=time.time() - 30)
+    assert repo.max_active <= 2
+    assert stats["failed"] == 1
+    assert stats["warmed"] == 15
+    assert stats["lag_seconds"] >= 30
+    assert stats["throughput_per_second"] > 0
+
+
+def test_launcher_sobe_um_warmer_so_no_worker_com_o_lock(tmp_path, monkeypatch):
+    from services.report_warmer import ReportCacheWarmerLauncher
+
+    started = []
+
+    def fake_start(warmer, interval_seconds):
+        started.append(warmer)
+        return "thread"
+
+    lock_path = str(tmp_path / "warmer.lock")
+    leader = ReportCacheWarmerLauncher(lambda: "w1", lock_path=lock_path, start=fake_start, retry_seconds=0)
+    other = ReportCacheWarmerLauncher(lambda: "w2", lock_path=lock_path, start=fake_start, retry_seconds=0)
+
+    assert leader.maybe_start() == "thread"
+    assert leader.maybe_start() == "thread"
+    assert other.maybe_start() is None
+    assert started == ["w1"]
+
+    # Líder reciclado: o lock é liberado e outro worker assume
+    leader._lock_file.close()
+    assert other.maybe_start() == "thread"
+    assert started == ["w1", "w2"]
+
+
+def test_launcher_nao_herda_estado_do_processo_pai(tmp_path, monkeypatch):
+    from services import report_warmer as module
+
+    launcher = module.ReportCacheWarmerLauncher(
+        lambda: "w", lock_path=str(tmp_path / "l.lock"), start=lambda w, interval_seconds: "thread"
+    )
+    launcher.maybe_start()
+    launcher._lock_file.close()
+    # Simula o fork: mesmo objeto, outro pid
+    monkeypatch.setattr(module.os, "getpid", lambda: -1)
+    assert launcher.maybe_start() == "thread"
+    assert launcher._pid == -1
@@ -0,0 +1,149 @@
+"""
+Testes unitários do agregado mensal de transações (transaction_monthly_aggregates).
+
+Garante que os deltas enviados nas escritas e a leitura pelos relatórios
+produzem os mesmos totais da varredura de transações.
+"""
+from services.transaction_aggregates import (
+    build_aggregate_deltas,
+    group_transactions,
+    record_transaction_changes,
+)
+from services.report_service import dashboard_summary_supabase, comparison_report_supabase
+from services.transaction_service import TransactionService
+
+
+TENANT_ID = "tenant-uuid-1"
+USER_ID = "user-uuid-1"
+
+
+def _tx(amount, tx_type="expense", status="paid", date="2024-01-10", category_id="cat1", account_id="acc1", source_file="extrato.OFX"):
+    return {
+        "id": f"tx-{amount}-{date}",
+        "tenant_id": TENANT_ID,
+        "user_id": USER_ID,
+        "amount": amount,
+        "type": tx_type,
+        "status": status,
+        "date": date,
+        "category_id": category_id,
+        "account_id": account_id,
+        "source_file": source_file,
+    }
+
+
+class MemoryAggregatesRepo:
+    """Simula o RPC apply_transaction_aggregate_deltas em memória."""
+
+    def __init__(self):
+        self.rows = {}
+        self.period_calls = 0
+
+    def apply_deltas(self, deltas):
+        for d in deltas:
+            key = (d["tenant_id"], d["user_id"], d["period"], d["category_id"], d["account_id"], d["type"], d["status"])
+            row = self.rows.setdefault(key, {"total": 0.0, "tx_count": 0})
+            row["total"] += d["total"]
+            row["tx_count"] += d["tx_count"]
+            if row["tx_count"] <= 0:
+                del self.rows[key]
+        return True
+
+    def find_by_period(self, user_id, tenant_id, start_period, end_period):
+        self.period_calls += 1
+        return [
+            {
+                "period": key[2], "category_id": key[3], "account_id": key[4],
+                "type": key[5], "status": key[6], **row,
+            }
+            for key, row in self.rows.items()
+            if key[0] == tenant_id and key[1] == user_id and start_period <= key[2] < end_period
+        ]
+
+
+class ScanFailsRepo:
+    def find_by_user_and_date_range(self, *args, **kwargs):
+        raise AssertionError("não deveria varrer transações com o agregado disponível")
+
+    def find_by_user_limit(self, user_id, limit, tenant_id=None):
+        return []
+
+
+def test_deltas_ignoram_transacoes_nao_canonicas():
+    deltas = build_aggregate_deltas(added=[_tx(10), _tx(5, source_file="manual.csv"), _tx(7, source_file=None)])
+    assert len(deltas) == 1
+    assert deltas[0]["total"] == 10
+    assert deltas[0]["tx_count"] == 1
+    assert deltas[0]["period"] == "2024-01-01"
+
+
+def test_deltas_de_update_que_se_anulam_sao_descartados():
+    tx = _tx(10)
+    assert build_aggregate_deltas(added=[dict(tx)], removed=[tx]) == []
+
+
+def test_update_move_valor_entre_categorias():
+    old = _tx(10, category_id="cat1")
+    new = dict(old, category_id="cat2", amount=12)
+    deltas = {d["category_id"]: d for d in build_aggregate_deltas(added=[new], removed=[old])}
+    assert deltas["cat1"]["total"] == -10 and deltas["cat1"]["tx_count"] == -1
+    assert deltas["cat2"]["total"] == 12 and deltas["cat2"]["tx_count"] == 1
+
+
+def test_record_sem_repositorio_nao_falha():
+    assert record_transaction_changes(None, added=[_tx(10)]) is False
+
+
+def test_dashboard_le_do_agregado_com_mesmos_totais_da_varredura():
+    transactions = [
+        _tx(100, "expense", "paid"),
+        _tx(50, "expense", "pending"),
+        _tx(300, "income", "paid", category_id="cat2"),
+        _tx(40, "expense", "paid", category_id=None),
+    ]
+    aggregates = MemoryAggregatesRepo()
+    record_transaction_changes(aggregates, added=transactions)
+
+    scan_repo = type("TxRepo", (), {
+        "find_by_user_and_date_range": lambda self, *a, **k: transactions,
+        "find_by_user_limit": lambda self, *a, **k: [],
+    })()
+    categories_repo = type("CatRepo", (), {"find_by_user": lambda self, *a, **k: []})()
+
+    from_scan = dashboard_summary_supabase(scan_repo, categories_repo, USER_ID, 1, 2024, tenant_id=TENANT_ID)
+    from_store = dashboard_summary_supabase(
+        ScanFailsRepo(), categories_repo, USER_ID, 1, 2024,
+        tenant_id=TENANT_ID, aggregates_repo=aggregates,
+    )
+
+    assert aggregates.period_calls == 1
+    assert from_store["summary"] == from_scan["summary"]
+    assert from_store["summary"]["total_expense"] == 140
+    assert from_store["summary"]["pending_transactions_count"] == 1
+    assert sorted(c["total"] for c in from_store["expense_by_category"]) == [40, 100]
+
+
+def test_agregado_indisponivel_cai_na_varredura():
+    transactions = [_tx(100, "income", "paid")]
+    scan_repo = type("TxRepo", (), {"find_by_user_and_date_range": lambda self, *a, **k: transactions})()
+    broken = type("AggRepo", (), {"find_by_period": lambda self, *a, **k: None})()
+
+    result = comparison_report_supabase(scan_repo, USER_ID, 1, 2024, tenant_id=TENANT_ID, aggregates_repo=broken)
+    assert result["current_period"]["income"] == 100
+
+
+def test_transaction_service_delete_registra_delta_negativo():
+    tx = _tx(25)
+    transaction_repo = type("TxRepo", (), {
+        "find_by_id": lambda self, x: dict(tx),
+        "delete": lambda self, x: True,
+    })()
+    accounts_repo = type("AccRepo", (), {"find_by_id": lambda self, x: None})()
+    aggregates = MemoryAggregatesRepo()
+    aggregates.apply_deltas(build_aggregate_deltas(added=[tx]))
+
+    service = TransactionService(transaction_repo, None, accounts_repo, aggregates_repo=aggregates)
+    service.delete_transaction(USER_ID, tx["id"])
+
+    assert aggregates.rows == {}
+    assert group_transactions([tx])[0]["tx_count"] == 1
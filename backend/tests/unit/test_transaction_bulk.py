@@ -0,0 +1,89 @@
+"""
+Testes unitários das operações em lote de TransactionService.
+"""
+import pytest
+
+from services.transaction_service import TransactionService, _balance_changes
+from utils.exceptions import ValidationException
+
+TENANT_ID = "tenant-1"
+USER_ID = "user-1"
+
+
+def _rows():
+    return [
+        {"id": "1", "user_id": USER_ID, "tenant_id": TENANT_ID, "account_id": "a1", "status": "paid", "type": "expense", "amount": 10, "date": "2024-01-01"},
+        {"id": "2", "user_id": USER_ID, "tenant_id": TENANT_ID, "account_id": "a1", "status": "paid", "type": "income", "amount": 50, "date": "2024-01-02"},
+        {"id": "3", "user_id": USER_ID, "tenant_id": TENANT_ID, "account_id": "a2", "status": "pending", "type": "expense", "amount": 7, "date": "2024-01-03"},
+    ]
+
+
+class _TransactionRepo:
+    def __init__(self):
+        self.rows = {r["id"]: r for r in _rows()}
+        self.calls = []
+
+    def find_by_ids(self, ids, user_id, tenant_id=None):
+        self.calls.append(("find_by_ids", tuple(ids)))
+        return [dict(self.rows[i]) for i in ids if i in self.rows]
+
+    def update_by_ids(self, ids, data, user_id, tenant_id=None):
+        self.calls.append(("update_by_ids", tuple(ids), data))
+        return len(ids)
+
+    def delete_by_ids(self, ids, user_id, tenant_id=None):
+        self.calls.append(("delete_by_ids", tuple(ids)))
+        return len(ids)
+
+
+class _AccountsRepo:
+    def __init__(self):
+        self.balances = {"a1": 100.0, "a2": 0.0}
+        self.reads = 0
+
+    def find_by_id(self, account_id):
+        self.reads += 1
+        return {"id": account_id, "tenant_id": TENANT_ID, "current_balance": self.balances[account_id]}
+
+    def update(self, account_id, data):
+        self.balances[account_id] = data["current_balance"]
+        return True
+
+
+def _service():
+    categories_repo = type("Repo", (), {
+        "find_by_id": lambda self, cid: {"id": cid, "tenant_id": TENANT_ID} if cid == "c1" else None,
+    })()
+    return TransactionService(_TransactionRepo(), categories_repo, _AccountsRepo())
+
+
+def test_status_em_lote_ajusta_saldo_uma_vez_por_conta():
+    service = _service()
+    result = service.bulk_update_transactions(USER_ID, ["1", "2", "3", "x"], "status", {"status": "pending"}, tenant_id=TENANT_ID)
+    assert result == {"action": "status", "requested": 4, "affected": 3, "not_found": ["x"]}
+    assert [c[0] for c in service.transaction_repo.calls] == ["find_by_ids", "update_by_ids"]
+    # a1: estorna -10 e +50 => 100 - 40; a2 não era paga
+    assert service.accounts_repo.balances == {"a1": 60.0, "a2": 0.0}
+    assert service.accounts_repo.reads == 1
+
+
+def test_recategorizar_nao_mexe_em_saldo_e_exclusao_estorna():
+    service = _service()
+    service.bulk_update_transactions(USER_ID, ["1", "2"], "recategorize", {"category_id": "c1"}, tenant_id=TENANT_ID)
+    assert service.transaction_repo.calls[-1][2] == {"category_id": "c1", "category_tenant_id": TENANT_ID}
+    assert service.accounts_repo.reads == 0
+
+    service.bulk_update_transactions(USER_ID, ["1", "2", "3"], "delete", tenant_id=TENANT_ID)
+    assert service.transaction_repo.calls[-1] == ("delete_by_ids", ("1", "2", "3"))
+    assert service.accounts_repo.balances["a1"] == 60.0
+
+
+def test_validacoes():
+    service = _service()
+    with pytest.raises(ValidationException):
+        service.bulk_update_transactions(USER_ID, ["1"], "status", {"status": "feito"}, tenant_id=TENANT_ID)
+    with pytest.raises(ValidationException):
+        service.bulk_update_transactions(USER_ID, ["1"], "archive", tenant_id=TENANT_ID)
+    with pytest.raises(ValidationException):
+        service.bulk_update_transactions(USER_ID, [], "delete", tenant_id=TENANT_ID)
+    assert _balance_changes(_rows(), [{**r, "category_id": "c1"} for r in _rows()]) == {}
@@ -0,0 +1,53 @@
+"""
+Testes unitários da flag is_canonical em TransactionRepository.
+"""
+import pytest
+
+from services.transaction_aggregates import is_canonical_transaction
+
+
+@pytest.fixture
+def repo_and_calls(fake_supabase, monkeypatch):
+    from repositories.transaction_repository_supabase import TransactionRepository
+
+    client = fake_supabase(rows=[{"id": "1"}])
+    # Flag desligada por padrão (antes da migration); estes testes cobrem o modo ligado
+    monkeypatch.setattr(TransactionRepository, "USE_CANONICAL_COLUMN", True)
+    return TransactionRepository(), client.calls
+
+
+def test_insercao_grava_a_flag(repo_and_calls):
+    repo, calls = repo_and_calls
+    repo.create({"tenant_id": "t1", "source_file": "Extrato.OFX", "amount": 1})
+    repo.create_many([{"tenant_id": "t1", "source_file": "planilha.csv"}])
+    inserted = [data for name, data in calls if name == "insert"]
+    assert inserted[0]["is_canonical"] is True
+    assert inserted[1][0]["is_canonical"] is False
+
+
+def test_consultas_filtram_pela_coluna_e_fallback_ilike(repo_and_calls, monkeypatch):
+    repo, calls = repo_and_calls
+    repo.find_by_user_limit("u1", limit=5)
+    assert ("eq", "is_canonical", True) in calls
+    assert not any(name == "ilike" for name, *_ in calls)
+
+    calls.clear()
+    monkeypatch.setattr(type(repo), "USE_CANONICAL_COLUMN", False)
+    repo.find_by_user_limit("u1", limit=5)
+    assert ("ilike", "source_file", "%.ofx") in calls
+
+
+def test_flag_desligada_nao_grava_a_coluna(repo_and_calls, monkeypatch):
+    repo, calls = repo_and_calls
+    monkeypatch.setattr(type(repo), "USE_CANONICAL_COLUMN", False)
+    repo.create({"tenant_id": "t1", "source_file": "Extrato.OFX", "amount": 1})
+    repo.create_many([{"tenant_id": "t1", "source_file": "extrato.ofx"}])
+    inserted = [data for name, data in calls if name == "insert"]
+    assert "is_canonical" not in inserted[0]
+    assert "is_canonical" not in inserted[1][0]
+
+
+def test_agregados_preferem_a_flag():
+    assert is_canonical_transaction({"is_canonical": True, "source_file": None})
+    assert not is_canonical_transaction({"is_canonical": False, "source_file": "a.ofx"})
+    assert is_canonical_transaction({"source_file": "a.OFX"})
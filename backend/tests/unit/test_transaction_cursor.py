@@ -0,0 +1,63 @@
+"""
+Testes unitários da paginação por cursor em TransactionRepository.find_advanced.
+"""
+import pytest
+
+from utils.cursor import decode_cursor, encode_cursor
+from utils.exceptions import ValidationException
+
+ROWS = [
+    {"id": f"{i:04d}", "date": f"2024-01-{1 + i % 10:02d}", "type": "expense", "amount": 1}
+    for i in range(23)
+]
+
+
+@pytest.fixture
+def repo_and_client(fake_supabase):
+    from repositories.transaction_repository_supabase import TransactionRepository
+
+    client = fake_supabase(rows=ROWS)
+    return TransactionRepository(), client
+
+
+@pytest.mark.parametrize("sort", ["date:desc", "date:asc"])
+def test_cursor_percorre_tudo_sem_repetir_e_sem_contagem(repo_and_client, sort):
+    repo, client = repo_and_client
+    seen = []
+    params = {"pagination": "cursor", "limit": 10, "sort": sort}
+    while True:
+        result = repo.find_advanced("u1", params)
+        seen.extend(r["id"] for r in result["data"])
+        pagination = result["pagination"]
+        assert pagination["total"] is None
+        if not pagination["has_more"]:
+            break
+        params = {"cursor": pagination["next_cursor"], "limit": 10}
+    assert sorted(seen) == sorted(r["id"] for r in ROWS)
+    assert len(seen) == len(set(seen))
+    assert all(kind != "range" for kind, *_ in client.calls)
+    assert all(query.count is None for query in client.executed)
+
+
+def test_cursor_com_contagem_estimada(repo_and_client):
+    repo, client = repo_and_client
+    result = repo.find_advanced("u1", {"pagination": "cursor", "limit": 5, "count": "estimated"})
+    assert result["pagination"]["total"] == len(ROWS)
+    assert "estimated" in [query.count for query in client.executed]
+
+
+def test_modo_offset_mantem_contagem_exata(repo_and_client):
+    repo, client = repo_and_client
+    result = repo.find_advanced("u1", {"page": 2, "limit": 10})
+    assert result["pagination"]["total"] == len(ROWS)
+    assert ("range", 10, 19) in client.calls
+
+
+def test_cursor_invalido_ou_ordenacao_nao_suportada(repo_and_client):
+    repo, _ = repo_and_client
+    with pytest.raises(ValidationException):
+        repo.find_advanced("u1", {"cursor": "nao-e-um-cursor"})
+    with pytest.raises(ValidationException):
+        repo.find_advanced("u1", {"pagination": "cursor", "sort": "amount:desc"})
+    with pytest.raises(ValidationException):
+        decode_cursor(encode_cursor("2024-01-01", "1),id.gt.(x"))
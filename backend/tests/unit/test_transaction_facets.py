@@ -0,0 +1,54 @@
+"""
+Testes unitários das facetas de transações calculadas no banco (RPC transaction_facets).
+"""
+from repositories.transaction_repository_supabase import TransactionRepository
+from routes.transactions import _build_facet_summary, _build_transaction_summary
+
+
+def test_facet_counts_envia_os_mesmos_filtros_de_find_advanced(fake_supabase):
+    client = fake_supabase(rpc_rows=[])
+    TransactionRepository().facet_counts(
+        "u1",
+        {"month": "2", "year": "2024", "types": "expense,income", "account_id": "a1",
+         "min_amount": "10", "search": " mercado ", "is_recurring": "true"},
+        tenant_id="t1",
+    )
+    kind, name, params = client.calls[0]
+    assert (kind, name) == ("rpc", "transaction_facets")
+    assert params["p_user_id"] == "u1" and params["p_tenant_id"] == "t1"
+    assert (params["p_date_gte"], params["p_date_lt"]) == ("2024-02-01", "2024-03-01")
+    assert params["p_types"] == ["expense", "income"]
+    assert params["p_account_ids"] == ["a1"]
+    assert params["p_min_amount"] == 10.0 and params["p_max_amount"] is None
+    assert params["p_search"] == "%mercado%"
+    assert params["p_is_recurring"] is True
+
+
+def test_facet_counts_sem_rpc_retorna_none(fake_supabase):
+    fake_supabase()
+    assert TransactionRepository().facet_counts("u1", {}) is None
+
+
+def test_resumo_por_facetas_igual_ao_resumo_em_memoria():
+    category_map = {
+        'salary': {'name': 'Salário'},
+        'food': {'name': 'Alimentação'},
+        'unknown': {'name': 'Não classificado'},
+    }
+    transactions = [
+        {'type': 'income', 'amount': 1200.10, 'status': 'paid', 'category_id': 'salary'},
+        {'type': 'expense', 'amount': 200.05, 'status': 'paid', 'category_id': 'food'},
+        {'type': 'expense', 'amount': 50, 'status': 'pending', 'category_id': 'unknown'},
+        {'type': 'expense', 'amount': 25, 'status': 'paid', 'category_id': None},
+    ]
+    facet_rows = [
+        {'facet': 'category', 'key': 'salary', 'total': 1200.10, 'tx_count': 1},
+        {'facet': 'category', 'key': 'food', 'total': 200.05, 'tx_count': 1},
+        {'facet': 'category', 'key': 'unknown', 'total': 50, 'tx_count': 1},
+        {'facet': 'category', 'key': None, 'total': 25, 'tx_count': 1},
+        {'facet': 'type_status', 'type': 'income', 'status': 'paid', 'total': 1200.10, 'tx_count': 1},
+        {'facet': 'type_status', 'type': 'expense', 'status': 'paid', 'total': 225.05, 'tx_count': 2},
+        {'facet': 'type_status', 'type': 'expense', 'status': 'pending', 'total': 50, 'tx_count': 1},
+        {'facet': 'total', 'key': None, 'total': 1475.15, 'tx_count': 4},
+    ]
+    assert _build_facet_summary(facet_rows, category_map) == _build_transaction_summary(transactions, category_map)
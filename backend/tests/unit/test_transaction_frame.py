@@ -0,0 +1,64 @@
+"""
+Testes unitários do TransactionFrame (services/transaction_frame.py).
+"""
+from services.transaction_aggregates import group_transactions
+from services.transaction_frame import TransactionFrame
+
+
+def _rows(n):
+    return [
+        {
+            "id": str(i),
+            "date": f"{2022 + i % 3}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            "type": "expense" if i % 3 else "income",
+            "status": ("paid", "pending", None)[i % 3],
+            "amount": f"{(i % 97) + 0.01 * (i % 100):.2f}",
+            "category_id": f"c{i % 7}" if i % 5 else None,
+            "account_id": f"a{i % 4}",
+        }
+        for i in range(n)
+    ]
+
+
+def _by_key(rows, fields):
+    return {tuple(r[f] for f in fields): (round(r["total"], 2), r["tx_count"]) for r in rows}
+
+
+def test_group_igual_ao_agrupamento_em_python():
+    rows = _rows(5000)
+    frame = TransactionFrame.from_rows(iter(rows))
+    fields = ("period", "category_id", "account_id", "type", "status")
+    assert len(frame) == 5000
+    assert _by_key(frame.group(fields), fields) == _by_key(group_transactions(rows), fields)
+
+
+def test_mascara_e_subconjunto_de_campos():
+    rows = _rows(600)
+    frame = TransactionFrame.from_rows(rows)
+    groups = frame.group(("period",), mask=frame.mask(tx_type="income", status="paid"))
+    expected = {}
+    for r in rows:
+        if r["type"] == "income" and r["status"] == "paid":
+            period = r["date"][:7] + "-01"
+            total, count = expected.get((period,), (0, 0))
+            expected[(period,)] = (total + round(float(r["amount"]) * 100), count + 1)
+    assert _by_key(groups, ("period",)) == {k: (round(v[0] / 100, 2), v[1]) for k, v in expected.items()}
+
+
+def test_valor_desconhecido_e_datas_invalidas():
+    frame = TransactionFrame.from_rows([
+        {"date": "sem-data", "type": "expense", "amount": "10.10"},
+        {"date": "2024-03-05", "type": "expense", "amount": 5},
+    ])
+    assert frame.group(mask=frame.mask(tx_type="transfer")) == []
+    assert frame.sum_cents() == 1510
+    periods = {row["period"]: row["total"] for row in frame.group(("period",))}
+    assert periods == {None: 10.1, "2024-03-01": 5.0}
+    assert frame.sum_cents(frame.mask(start_date="2024-03-01", end_date="2024-04-01")) == 500
+
+
+def test_frame_vazio():
+    frame = TransactionFrame.from_rows([])
+    assert len(frame) == 0
+    assert frame.group(("period",)) == []
+    assert frame.sum_cents() == 0
@@ -0,0 +1,63 @@
+"""
+Testes unitários de include= (recursos embutidos do PostgREST) em TransactionRepository.
+"""
+import pytest
+
+from services.transaction_service import TransactionService
+
+ROW = {"id": "1", "date": "2024-01-05", "category_id": "c1", "description": "Mercado"}
+
+
+def _embed(embed_ok):
+    def respond(query):
+        if "categories(" not in query.columns:
+            return [dict(ROW)]
+        if not embed_ok:
+            raise RuntimeError("{'code': 'PGRST200', 'message': 'Could not find a relationship'}")
+        return [{**ROW, "category": {"name": "Mercado", "color": None, "icon": "cart"}}]
+    return respond
+
+
+@pytest.fixture
+def make_repo(fake_supabase):
+    from repositories.transaction_repository_supabase import TransactionRepository
+
+    def make(embed_ok):
+        client = fake_supabase(respond=_embed(embed_ok), total=1)
+        return TransactionRepository(), client
+    return make
+
+
+def test_normaliza_include():
+    from repositories.transaction_repository_supabase import TransactionRepository
+
+    assert TransactionRepository.normalize_include(" Category,account,category,foo") == ("category", "account")
+    assert TransactionRepository.normalize_include(None) == ()
+
+
+def test_embed_em_uma_requisicao(make_repo):
+    repo, client = make_repo(embed_ok=True)
+    rows = repo.find_by_user_limit("u1", 5, tenant_id="t1", include="category")
+    assert client.selects == ["*, category:categories(name,color,icon)"]
+    assert rows[0]["category"]["icon"] == "cart"
+
+    categories_repo = type("Repo", (), {
+        "find_by_user": lambda self, *a, **k: pytest.fail("não deve carregar categorias"),
+    })()
+    result = TransactionService(repo, categories_repo, None).list_transactions("u1", {"count": "none"}, tenant_id="t1")
+    assert result["data"][0]["category"] == {"name": "Mercado", "color": None, "icon": "cart"}
+
+
+def test_sem_relacao_no_postgrest_cai_para_mapa_em_memoria(make_repo):
+    repo, client = make_repo(embed_ok=False)
+    categories_repo = type("Repo", (), {
+        "find_by_user": lambda self, *a, **k: [{"id": "c1", "name": "Mercado", "color": "#fff", "icon": "cart"}],
+    })()
+    service = TransactionService(repo, categories_repo, None)
+    result = service.list_transactions("u1", {"count": "none"}, tenant_id="t1")
+    assert result["data"][0]["category"]["name"] == "Mercado"
+
+    # Depois da primeira falha o embed não é mais tentado
+    client.calls.clear()
+    service.list_transactions("u1", {"count": "none"}, tenant_id="t1")
+    assert client.selects == ["*"]
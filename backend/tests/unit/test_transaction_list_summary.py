@@ -0,0 +1,89 @@
+"""
+Testes unitários do resumo da listagem (TransactionService.summarize_transactions).
+"""
+import pytest
+
+from repositories.transaction_repository_supabase import TransactionRepository
+from services.report_cache import get_report_cache
+from services.transaction_service import TransactionService, build_summary_from_groups
+
+CATEGORIES = {"c1": {"id": "c1", "name": "Mercado"}, "c9": {"id": "c9", "name": "Não classificado"}}
+STORE_ROWS = [
+    {"period": "2024-01-01", "type": "income", "status": "paid", "category_id": "c1", "account_id": "a1", "total": 1000.0, "tx_count": 2},
+    {"period": "2024-01-01", "type": "expense", "status": "paid", "category_id": None, "account_id": "a1", "total": 300.0, "tx_count": 3},
+    {"period": "2024-02-01", "type": "expense", "status": "pending", "category_id": "c9", "account_id": "a2", "total": 50.0, "tx_count": 1},
+]
+
+
+class _TransactionRepo:
+    compile_filters = staticmethod(TransactionRepository._compile_advanced_filters)
+
+    def __init__(self):
+        self.summary_calls = []
+
+    def summary_groups(self, user_id, params, tenant_id=None):
+        self.summary_calls.append(params)
+        return [{"type": "expense", "status": "paid", "category_id": "c1", "total": 80.0, "tx_count": 4}]
+
+    def find_advanced(self, user_id, params, tenant_id=None, **_kwargs):
+        return {"data": [{"id": "t1", "category_id": "c1"}], "pagination": {"total": 7}}
+
+
+class _AggregateRepo:
+    def __init__(self):
+        self.calls = []
+
+    def find_by_period(self, user_id, tenant_id, start_period, end_period):
+        self.calls.append((start_period, end_period))
+        return [row for row in STORE_ROWS if start_period <= row["period"] < end_period]
+
+
+@pytest.fixture
+def service():
+    get_report_cache().clear()
+    categories = type("Cats", (), {"find_by_user": lambda self, *_a, **_k: list(CATEGORIES.values())})()
+    return TransactionService(_TransactionRepo(), categories, None, aggregates_repo=_AggregateRepo())
+
+
+def test_agregado_mensal_para_meses_inteiros(service):
+    summary = service.summarize_transactions("u1", {"date_from": "2024-01-01", "date_to": "2024-02-29"}, tenant_id="t1")
+    assert service.aggregates_repo.calls == [("2024-01-01", "2024-03-01")]
+    assert service.transaction_repo.summary_calls == []
+    assert summary == {
+        "paid_income": 1000.0,
+        "paid_expense": 300.0,
+        "net_paid": 700.0,
+        "transaction_count": 6,
+        "uncategorized_count": 4,
+    }
+
+    filtered = service.summarize_transactions("u1", {"month": 1, "year": 2024, "type": "expense"}, tenant_id="t1")
+    assert filtered["transaction_count"] == 3 and filtered["paid_income"] == 0
+
+
+def test_filtros_fora_do_agregado_usam_rpc(service):
+    summary = service.summarize_transactions("u1", {"month": 1, "year": 2024, "search": "uber"}, tenant_id="t1")
+    assert service.aggregates_repo.calls == []
+    assert summary["paid_expense"] == 80.0 and summary["uncategorized_count"] == 0
+
+    service.summarize_transactions("u1", {"date_from": "2024-01-10", "date_to": "2024-01-20"}, tenant_id="t1")
+    assert service.aggregates_repo.calls == []
+    assert len(service.transaction_repo.summary_calls) == 2
+
+
+def test_listagem_inclui_resumo_em_cache_entre_paginas(service):
+    first = service.list_transactions("u1", {"search": "uber", "page": 1}, tenant_id="t1")
+    second = service.list_transactions("u1", {"search": "uber", "page": 2}, tenant_id="t1")
+    assert first["summary"] == second["summary"]
+    assert first["summary"]["transaction_count"] == 4
+    assert len(service.transaction_repo.summary_calls) == 1
+
+
+def test_sem_fonte_de_agregacao_nao_inclui_resumo():
+    repo = type("Repo", (), {"find_advanced": lambda self, *_a, **_k: {"data": []}})()
+    result = TransactionService(repo, None, None).list_transactions("u1", {}, tenant_id="t1")
+    assert "summary" not in result
+
+
+def test_resumo_de_grupos_vazio():
+    assert build_summary_from_groups([], {})["transaction_count"] == 0
@@ -0,0 +1,74 @@
+"""
+Testes unitários da busca ranqueada (índice de trigramas e fallback de find_advanced).
+"""
+import pytest
+
+from utils import data_version as data_version_module
+from utils.data_version import DataVersionStore
+from utils.trigram_index import TrigramIndex, similarity, trigrams
+
+ROWS = [
+    {"id": "1", "date": "2024-01-05", "description": "PIX MERCADO LIVRE", "notes": None, "type": "expense", "amount": 10},
+    {"id": "2", "date": "2024-01-06", "description": "Supermercado Dia", "notes": None, "type": "expense", "amount": 20},
+    {"id": "3", "date": "2024-01-07", "description": "Uber *trip", "notes": "ida ao mercado", "type": "expense", "amount": 30},
+    {"id": "4", "date": "2024-01-08", "description": "Salário", "notes": None, "type": "income", "amount": 1000},
+    {"id": "5", "date": "2024-01-09", "description": "Mercadu", "notes": None, "type": "expense", "amount": 5},
+]
+
+
+def test_trigramas_e_similaridade_como_pg_trgm():
+    assert trigrams("cat") == {"  c", " ca", "cat", "at "}
+    assert similarity("mercado", "mercado") == 1.0
+    assert similarity("mercado", "uber") == 0.0
+    assert 0.3 <= similarity("mercadu", "mercado") < 1.0
+
+
+def test_indice_ranqueia_substring_acima_de_aproximacao():
+    index = TrigramIndex()
+    for row in ROWS:
+        index.add(row["id"], (row["description"], row["notes"]), payload=row, sort_key=(row["date"], row["id"]))
+    results = index.search("mercado")
+    ids = [doc_id for _, doc_id, _ in results]
+    assert set(ids) == {"1", "2", "3", "5"}
+    # "Mercadu" só casa por similaridade: fica por último
+    assert ids[-1] == "5"
+    assert all(rank >= 1 for rank, doc_id, _ in results if doc_id != "5")
+    # Palavra inteira nas notas tem similaridade maior que "supermercado"
+    assert [d for _, d, _ in index.search("mercado", predicate=lambda r: r["amount"] >= 20)] == ["3", "2"]
+
+
+@pytest.fixture
+def repo(fake_supabase, monkeypatch, tmp_path):
+    from repositories import transaction_repository_supabase as module
+
+    # Sem a RPC search_transaction_ids (rpc_rows=None)
+    client = fake_supabase(rows=ROWS)
+    monkeypatch.setattr(module, "_search_indexes", type(module._search_indexes)())
+    monkeypatch.setattr(data_version_module, "_store", DataVersionStore(directory=str(tmp_path)))
+    repository = module.TransactionRepository()
+    repository.client_calls = client.calls
+    return repository
+
+
+def test_find_advanced_ranqueado_com_fallback_em_memoria(repo, monkeypatch):
+    monkeypatch.setattr(repo, "SEARCH_MEMORY_INDEX", True)
+    result = repo.find_advanced("u1", {"search": "mercado", "types": "expense", "min_amount": "10", "limit": 2})
+    pagination = result["pagination"]
+    assert pagination["total"] == 3
+    assert pagination["sort"] == "relevance"
+    assert len(result["data"]) == 2
+    assert all(row["search_rank"] >= 1 for row in result["data"])
+
+    page2 = repo.find_advanced("u1", {"search": "mercado", "types": "expense", "min_amount": "10", "limit": 2, "page": 2})
+    seen = {r["id"] for r in result["data"]} | {r["id"] for r in page2["data"]}
+    assert seen == {"1", "2", "3"}
+    # Linhas da página buscadas com o mesmo escopo das demais leituras
+    assert ("eq", "user_id", "u1") in repo.client_calls
+
+
+def test_sem_rpc_e_sem_indice_em_memoria_usa_ilike(repo):
+    result = repo.find_advanced("u1", {"search": "mercado", "limit": 10})
+    assert "sort" not in result["pagination"]
+    or_filters = [call[1] for call in repo.client_calls if call[0] == "or_"]
+    assert or_filters and "description.ilike" in or_filters[0]
+    assert ("order", "date") in repo.client_calls
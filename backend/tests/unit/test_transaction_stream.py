@@ -0,0 +1,63 @@
+"""
+Testes unitários do streaming por keyset (TransactionRepository.iter_by_user_and_date_range)
+e dos consumidores (agregação em memória e planejamento).
+"""
+from repositories.transaction_repository_supabase import TransactionRepository
+from services.aggregation_backend import AggregationQuery, InMemoryBackend
+from services.planning_service import get_planning_month_payload
+
+
+def _rows(n):
+    # Várias transações por dia para exercitar o desempate por id
+    return [
+        {"id": f"{i:04d}", "date": f"2024-01-{1 + i % 28:02d}", "type": "expense",
+         "amount": 1.0, "status": "paid", "category_id": "c1"}
+        for i in range(n)
+    ]
+
+
+def test_iterador_le_todas_as_paginas_sem_repetir(fake_supabase):
+    rows = _rows(25)
+    client = fake_supabase(rows=rows)
+    repo = TransactionRepository()
+    streamed = list(repo.iter_by_user_and_date_range("u1", "2024-01-01", "2024-02-01", page_size=10))
+    assert sorted(r["id"] for r in streamed) == sorted(r["id"] for r in rows)
+    pages = [query.cursor for query in client.executed]
+    assert len(pages) == 3
+    assert pages[0] is None
+
+
+def test_projecao_de_colunas_chega_ao_select(fake_supabase):
+    client = fake_supabase(rows=_rows(3))
+    repo = TransactionRepository()
+    repo.find_by_user_and_date_range("u1", "2024-01-01", "2024-02-01", columns=repo.REPORT_COLUMNS)
+    assert "id, date, type, amount, status, category_id, account_id" in client.selects
+    repo.find_by_user_and_date_range("u1", "2024-01-01", "2024-02-01")
+    assert "*" in client.selects
+
+
+def test_find_by_user_and_date_range_nao_trunca(fake_supabase):
+    fake_supabase(rows=_rows(2500))
+    repo = TransactionRepository()
+    assert len(repo.find_by_user_and_date_range("u1", "2024-01-01", "2024-02-01")) == 2500
+
+
+def test_in_memory_backend_e_planejamento_consomem_stream():
+    rows = _rows(30)
+    seen = {}
+
+    class StreamRepo:
+        def iter_by_user_and_date_range(self, user_id, start, end, tenant_id=None, columns=None):
+            seen["columns"] = columns
+            return iter(rows)
+
+    query = AggregationQuery(user_id="u1", start_date="2024-01-01", end_date="2024-02-01", group_by=("period",))
+    groups = InMemoryBackend(StreamRepo()).fetch(query)
+    assert groups[0]["total"] == 30.0
+    assert "category_id" not in seen["columns"]
+
+    payload = get_planning_month_payload(
+        user_id="u1", tenant_id=None, month=1, year=2024,
+        transactions_repo=StreamRepo(), categories_repo=None, budget_repo=None,
+    )
+    assert payload["summary"]["real_expenses"] == 30.0
@@ -0,0 +1,33 @@
+"""
+Cursor opaco para paginação por keyset (date, id).
+
+O cliente recebe `next_cursor` e o devolve como `cursor`; o conteúdo
+(última data, último id e direção da ordenação) não faz parte do contrato.
+"""
+import base64
+import json
+import re
+from typing import Tuple
+
+from utils.exceptions import ValidationException
+
+# O cursor vira filtro do PostgREST: só aceitamos data ISO e id simples (uuid)
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_ID = re.compile(r"[0-9A-Za-z-]{1,64}")
+
+
+def encode_cursor(last_date: str, last_id: str, descending: bool = True) -> str:
+    payload = json.dumps([str(last_date)[:10], str(last_id), "d" if descending else "a"], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str, bool]:
+    """(last_date, last_id, descending). ValidationException se o cursor for inválido."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_date, last_id, direction = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if direction not in ("a", "d") or not _DATE.fullmatch(str(last_date)) or not _ID.fullmatch(str(last_id)):
+            raise ValueError(direction)
+        return str(last_date), str(last_id), direction == "d"
+    except Exception:
+        raise ValidationException("Cursor de paginação inválido")
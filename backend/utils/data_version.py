@@ -0,0 +1,160 @@
+"""
+Versão dos dados de negócio por tenant, usada para invalidar caches de leitura
+(dashboard, relatórios) sem consultar o banco.
+
+Toda mutação de transação, conta ou categoria chama bump_data_version(tenant_id);
+as chaves de cache incluem get_data_version(tenant_id), então uma escrita torna
+todas as entradas antigas do tenant inalcançáveis (e elas expiram por LRU/TTL).
+
+A versão fica num arquivo por tenant em DATA_VERSION_DIR (padrão: diretório
+temporário do sistema). Ela só é compartilhada entre os workers do gunicorn do
+MESMO host: com várias réplicas/hosts, cada um tem suas versões (e seus caches),
+a menos que DATA_VERSION_DIR aponte para um volume comum. A troca é atômica
+(escreve temporário + os.replace). Se o diretório não puder ser usado, cai para
+um contador em memória (só o processo atual).
+
+Tenant sem arquivo de versão usa a versão base do diretório: um nonce gravado
+quando o diretório é criado (não uma constante). Se o diretório for apagado
+(ex.: reinício do container), a base muda junto, e um ETag calculado antes não
+volta a coincidir com dados diferentes.
+"""
+import os
+import re
+import tempfile
+import threading
+import uuid
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VERSION = "0"
+_SAFE_KEY = re.compile(r"[^A-Za-z0-9_.-]")
+# Nome fora do formato das chaves de tenant (uuid[.escopo])
+_BASE_FILE = ".directory-nonce"
+
+
+class DataVersionStore:
+    def __init__(self, directory: Optional[str] = None):
+        self._directory = directory or os.getenv(
+            "DATA_VERSION_DIR",
+            os.path.join(tempfile.gettempdir(), "alca_data_versions"),
+        )
+        self._memory: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        # Base do modo em memória: nova a cada processo, como o próprio contador
+        self._memory_base = uuid.uuid4().hex
+        self._use_files = True
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            self._base_version()
+        except OSError as e:
+            logger.warning("DataVersionStore: diretório %s indisponível, usando memória: %s", self._directory, e)
+            self._use_files = False
+
+    def _path(self, tenant_id: str) -> str:
+        return os.path.join(self._directory, _SAFE_KEY.sub("_", str(tenant_id)))
+
+    def _base_version(self) -> str:
+        """
+        Nonce do diretório, criado junto com ele. Relido a cada uso (não fica em
+        memória): se o diretório sumir, o próximo worker grava um nonce novo e
+        todos passam a vê-lo.
+        """
+        path = os.path.join(self._directory, _BASE_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                base = fh.read().strip()
+            if base:
+                return base
+        except FileNotFoundError:
+            pass
+        nonce = uuid.uuid4().hex
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            # O_EXCL: se outro worker criou antes, vale o nonce dele
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.write(nonce)
+            return nonce
+        except FileExistsError:
+            with open(path, "r", encoding="utf-8") as fh:
+                return fh.read().strip() or nonce
+        # OSError (exceto os acima) sobe para get(), que cai para a memória
+
+    def get(self, tenant_id: Optional[str]) -> str:
+        """Versão atual do tenant (a base do diretório se nunca houve escrita registrada)."""
+        if not tenant_id:
+            return DEFAULT_VERSION
+        if self._use_files:
+            try:
+                with open(self._path(tenant_id), "r", encoding="utf-8") as fh:
+                    version = fh.read().strip()
+                if version:
+                    return version
+                return self._base_version()
+            except FileNotFoundError:
+                try:
+                    return self._base_version()
+                except OSError as e:
+                    logger.debug("DataVersionStore: falha ao ler versão base: %s", e)
+            except OSError as e:
+                logger.debug("DataVersionStore: falha ao ler versão de %s: %s", tenant_id, e)
+        with self._lock:
+            return self._memory.get(str(tenant_id), self._memory_base)
+
+    def bump(self, tenant_id: Optional[str]) -> str:
+        """Gera nova versão para o tenant e a retorna."""
+        if not tenant_id:
+            return DEFAULT_VERSION
+        version = uuid.uuid4().hex
+        if self._use_files:
+            path = self._path(tenant_id)
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            try:
+                # O diretório pode ter sido apagado depois da inicialização
+                os.makedirs(self._directory, exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as fh:
+                    fh.write(version)
+                os.replace(tmp_path, path)
+                return version
+            except OSError as e:
+                logger.warning("DataVersionStore: falha ao gravar versão de %s: %s", tenant_id, e)
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+        with self._lock:
+            self._memory[str(tenant_id)] = version
+        return version
+
+
+# Instância global (uma por processo; a versão em si é compartilhada via arquivo)
+_store: Optional[DataVersionStore] = None
+
+
+def get_data_version_store() -> DataVersionStore:
+    global _store
+    if _store is None:
+        _store = DataVersionStore()
+    return _store
+
+
+def _scoped(tenant_id: Optional[str], scope: Optional[str]) -> Optional[str]:
+    if not tenant_id or not scope:
+        return tenant_id
+    return f"{tenant_id}.{scope}"
+
+
+def get_data_version(tenant_id: Optional[str], scope: Optional[str] = None) -> str:
+    """
+    Versão do tenant. scope separa versões de subconjuntos que mudam com menos
+    frequência (ex.: "lookups" = contas/categorias, ver utils/lookup_cache.py),
+    para que escritas em transações não invalidem esses caches.
+    """
+    return get_data_version_store().get(_scoped(tenant_id, scope))
+
+
+def bump_data_version(tenant_id: Optional[str], scope: Optional[str] = None) -> str:
+    """Chamar após qualquer escrita em transações, contas ou categorias do tenant."""
+    return get_data_version_store().bump(_scoped(tenant_id, scope))
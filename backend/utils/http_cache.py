@@ -0,0 +1,58 @@
+"""
+ETag / If-None-Match para rotas GET de leitura (dashboard, relatórios, contas, categorias).
+
+O ETag é forte e derivado de (tenant_id, user_id, versão de dados do tenant,
+caminho + query string, data de hoje). Como a versão muda a cada escrita
+(utils/data_version.py), um If-None-Match igual ao ETag atual significa
+resposta idêntica: devolvemos 304 antes de qualquer chamada a repositório.
+
+A data entra no ETag porque algumas respostas dependem do dia
+(saldo projetado das contas, evolução relativa ao mês corrente, mês padrão).
+"""
+import hashlib
+from datetime import date
+from functools import wraps
+
+from flask import request, make_response
+
+from utils.data_version import get_data_version
+
+
+def compute_data_etag(tenant_id: str, user_id: str) -> str:
+    basis = "|".join([
+        str(tenant_id or ""),
+        str(user_id or ""),
+        get_data_version(tenant_id),
+        request.full_path,
+        date.today().isoformat(),
+    ])
+    return hashlib.sha256(basis.encode("utf-8")).hexdigest()[:32]
+
+
+def etag_by_data_version(f):
+    """
+    Decorator para rotas que dependem só dos dados do tenant.
+    Pré-requisito: aplicado depois de @require_auth e @require_tenant
+    (usa request.user_id e request.tenant_id). Só atua em GET.
+    """
+
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if request.method != "GET":
+            return f(*args, **kwargs)
+
+        etag = compute_data_etag(getattr(request, "tenant_id", None), getattr(request, "user_id", None))
+        if request.if_none_match.contains(etag):
+            response = make_response("", 304)
+        else:
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        # Resposta por usuário: nada de cache compartilhado; o cliente sempre revalida
+        response.headers["Cache-Control"] = "private, no-cache"
+        response.vary.add("Authorization")
+        response.vary.add("X-Tenant-Id")
+        return response
+
+    return decorated
@@ -0,0 +1,82 @@
+"""
+Autômato de Aho-Corasick para achar várias palavras-chave num texto numa só passada.
+
+Usado pela detecção de categorias por palavra-chave (services/category_detector.py):
+em vez de testar `keyword in texto` para cada palavra de cada categoria
+(O(palavras x tamanho) por descrição), o texto é lido uma vez e o autômato
+informa todas as palavras que ocorrem nele, inclusive sobrepostas
+("rest" e "restaurante", "uber" e "uber eats").
+
+As transições de falha são pré-resolvidas (tabela de transição completa por
+estado, restrita aos caracteres que aparecem nas palavras), então cada
+caractere custa uma consulta de dicionário. A comparação é literal: quem chama
+normaliza o texto (ex.: lower()) como fazia antes.
+"""
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Set, Tuple
+
+
+class KeywordAutomaton:
+    """Conjunto fixo de palavras-chave compilado; imutável depois de construído."""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: FrozenSet[str] = frozenset(k for k in keywords if k)
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[str]] = [[]]
+        for keyword in sorted(self.keywords):
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    goto.append({})
+                    outputs.append([])
+                    nxt = goto[state][ch] = len(goto) - 1
+                state = nxt
+            outputs[state].append(keyword)
+
+        # BFS: link de falha de cada estado e tabela de transição completa
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        alphabet = {ch for keyword in self.keywords for ch in keyword}
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state].extend(outputs[fail[state]])
+            for ch in alphabet:
+                child = goto[state].get(ch)
+                if child is not None:
+                    fail[child] = delta[fail[state]].get(ch, 0)
+                    delta[state][ch] = child
+                    queue.append(child)
+                else:
+                    fallback = delta[fail[state]].get(ch, 0)
+                    if fallback:
+                        delta[state][ch] = fallback
+
+        self._delta = delta
+        self._outputs: List[Tuple[str, ...]] = [tuple(found) for found in outputs]
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """(posição final exclusiva, palavra) de cada ocorrência, na ordem do texto."""
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        for pos, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            for keyword in outputs[state]:
+                yield pos + 1, keyword
+
+    def find_all(self, text: str) -> Set[str]:
+        """Palavras-chave distintas que ocorrem em `text` (equivale a `{k for k in keywords if k in text}`)."""
+        delta = self._delta
+        outputs = self._outputs
+        found: Set[str] = set()
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
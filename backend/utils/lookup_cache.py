@@ -0,0 +1,116 @@
+"""
+Cache por processo dos mapas id -> registro de categorias e contas do tenant.
+
+Listagens e relatórios enriquecem cada linha com nome/cor/ícone da categoria e
+da conta; sem cache, cada página baixava a tabela inteira de categorias (e a de
+contas nos relatórios). Aqui o mapa é montado uma vez por
+(tipo, tenant, usuário, versão de lookups) e reaproveitado.
+
+Invalidação por versão: CategoryService/AccountService (e os demais pontos que
+alteram contas/categorias, inclusive o saldo) chamam invalidate_lookups(tenant_id),
+que troca a versão do escopo "lookups" em utils/data_version.py. Escritas só em
+transações não mexem nessa versão, então não derrubam o cache. O TTL é só uma
+rede de segurança para escritas feitas fora do backend.
+
+Os mapas devolvidos são compartilhados e NÃO devem ser alterados por quem os lê.
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from utils.data_version import bump_data_version, get_data_version
+
+LOOKUPS_SCOPE = "lookups"
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_ENTRIES = 256
+
+
+class LookupCache:
+    """Mapas por chave com TTL e limite de entradas (LRU), seguro entre threads."""
+
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self._store: "OrderedDict[Hashable, Tuple[Dict[str, Dict[str, Any]], float]]" = OrderedDict()
+        self._ttl = ttl_seconds
+        self._max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Dict[str, Any]]]:
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expiry = entry
+            if time.monotonic() > expiry:
+                del self._store[key]
+                self.misses += 1
+                return None
+            self._store.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Dict[str, Dict[str, Any]]) -> None:
+        with self._lock:
+            self._store[key] = (value, time.monotonic() + self._ttl)
+            self._store.move_to_end(key)
+            while len(self._store) > self._max_entries:
+                self._store.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+_cache: Optional[LookupCache] = None
+
+
+def get_lookup_cache() -> LookupCache:
+    """Retorna instância do cache (singleton por processo)."""
+    global _cache
+    if _cache is None:
+        _cache = LookupCache(
+            ttl_seconds=int(os.getenv("LOOKUP_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+            max_entries=int(os.getenv("LOOKUP_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+        )
+    return _cache
+
+
+def invalidate_lookups(tenant_id: Optional[str]) -> None:
+    """Chamar após escrita em contas ou categorias do tenant."""
+    bump_data_version(tenant_id, scope=LOOKUPS_SCOPE)
+
+
+def build_id_map(rows) -> Dict[str, Dict[str, Any]]:
+    return {
+        str(row.get("id") or row.get("_id")): row
+        for row in rows or []
+        if (row.get("id") or row.get("_id"))
+    }
+
+
+def get_or_load_map(
+    kind: str,
+    tenant_id: Optional[str],
+    user_id: str,
+    load: Callable[[], Any],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Mapa id -> registro de `kind` (ex.: "categories"); `load()` devolve as linhas.
+    Sem tenant_id não há versão para invalidar: carrega sempre.
+    """
+    if not tenant_id:
+        return build_id_map(load())
+    cache = get_lookup_cache()
+    key = (kind, tenant_id, user_id, get_data_version(tenant_id, scope=LOOKUPS_SCOPE))
+    mapped = cache.get(key)
+    if mapped is None:
+        mapped = build_id_map(load())
+        cache.set(key, mapped)
+    return mapped
@@ -0,0 +1,174 @@
+"""
+Índice compilado, por processo, dos aliases de comerciante (merchant_category_aliases).
+
+Antes, cada descrição resolvida (uma por linha importada) baixava a tabela
+inteira de aliases ativos do category_type e testava alias por alias. Aqui os
+aliases de cada category_type são carregados uma vez e compilados em:
+- exact: dicionário valor normalizado -> aliases;
+- prefix: trie percorrida pelos caracteres da descrição;
+- contains: autômato de Aho-Corasick (utils/keyword_automaton.py).
+Uma consulta custa uma passada pela descrição, independentemente do número
+de aliases.
+
+A escolha é a mesma da busca linear: escopo (usuário 20 > tenant 10 > global 0)
++ tipo de match (exact 3 > prefix 2 > contains 1); no empate, vence o alias que
+vinha primeiro na listagem do banco.
+
+Invalidação por versão: as rotas de aliases chamam invalidate_merchant_aliases()
+após criar/alterar/remover, o que troca a versão global em utils/data_version.py
+(compartilhada entre os workers). O TTL é só uma rede de segurança para
+escritas feitas fora do backend (seeds, SQL direto).
+
+Os aliases devolvidos são compartilhados e NÃO devem ser alterados por quem os lê.
+"""
+import os
+import threading
+import time
+import unicodedata
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.data_version import bump_data_version, get_data_version
+from utils.keyword_automaton import KeywordAutomaton
+
+# Chave da versão em utils/data_version.py (aliases globais não pertencem a um tenant)
+ALIASES_VERSION_KEY = "merchant_aliases"
+DEFAULT_TTL_SECONDS = 300
+
+SCOPE_SCORES = {"user": 20, "tenant": 10, "global": 0}
+MATCH_SCORES = {"exact": 3, "prefix": 2, "contains": 1}
+
+_TERMINAL = ""  # chave dos aliases que terminam num nó da trie (caracteres nunca são "")
+
+
+def normalize_alias_text(text: str) -> str:
+    """strip + lower + remove acentos (NFKD), igual ao normalized_value gravado."""
+    base = (text or "").strip().lower()
+    if not base:
+        return ""
+    normalized = unicodedata.normalize("NFKD", base)
+    return "".join(ch for ch in normalized if not unicodedata.combining(ch))
+
+
+# (posição na listagem, alias)
+_Entry = Tuple[int, Dict[str, Any]]
+
+
+class MerchantAliasIndex:
+    """Aliases ativos de um category_type compilados para consulta; imutável depois de construído."""
+
+    def __init__(self, aliases: Iterable[Dict[str, Any]]):
+        self._exact: Dict[str, List[_Entry]] = {}
+        self._prefix_trie: Dict[str, Any] = {}
+        self._contains: Dict[str, List[_Entry]] = {}
+        self._contains_empty: List[_Entry] = []
+        self.size = 0
+
+        for position, alias in enumerate(aliases or []):
+            self.size += 1
+            alias_norm = normalize_alias_text(alias.get("normalized_value") or alias.get("match_value") or "")
+            match_type = alias.get("match_type") or "contains"
+            entry = (position, alias)
+            if match_type == "exact":
+                self._exact.setdefault(alias_norm, []).append(entry)
+            elif match_type == "prefix":
+                node = self._prefix_trie
+                for ch in alias_norm:
+                    node = node.setdefault(ch, {})
+                node.setdefault(_TERMINAL, []).append(entry)
+            elif match_type == "contains":
+                if alias_norm:
+                    self._contains.setdefault(alias_norm, []).append(entry)
+                else:
+                    # "" está contido em qualquer descrição
+                    self._contains_empty.append(entry)
+
+        self._automaton = KeywordAutomaton(self._contains)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _candidates(self, desc_norm: str):
+        """(match_score, posição, alias) de todos os aliases que casam com a descrição."""
+        for position, alias in self._exact.get(desc_norm, ()):
+            yield MATCH_SCORES["exact"], position, alias
+
+        node = self._prefix_trie
+        for ch in desc_norm:
+            for position, alias in node.get(_TERMINAL, ()):
+                yield MATCH_SCORES["prefix"], position, alias
+            node = node.get(ch)
+            if node is None:
+                break
+        else:
+            for position, alias in node.get(_TERMINAL, ()):
+                yield MATCH_SCORES["prefix"], position, alias
+
+        for position, alias in self._contains_empty:
+            yield MATCH_SCORES["contains"], position, alias
+        for value in self._automaton.find_all(desc_norm):
+            for position, alias in self._contains[value]:
+                yield MATCH_SCORES["contains"], position, alias
+
+    def best_alias(self, user_id: Optional[str], tenant_id: Optional[str], description: str) -> Optional[Dict[str, Any]]:
+        """Melhor alias para a descrição (ou None), considerando escopo e tipo de match."""
+        desc_norm = normalize_alias_text(description)
+        if not desc_norm:
+            return None
+
+        best_key: Optional[Tuple[int, int]] = None
+        best_alias: Optional[Dict[str, Any]] = None
+        for match_score, position, alias in self._candidates(desc_norm):
+            if user_id and alias.get("user_id") == user_id:
+                scope_score = SCOPE_SCORES["user"]
+            elif tenant_id and alias.get("tenant_id") == tenant_id:
+                scope_score = SCOPE_SCORES["tenant"]
+            else:
+                scope_score = SCOPE_SCORES["global"]
+            # Maior score; no empate, o que vinha antes na listagem
+            key = (scope_score + match_score, -position)
+            if best_key is None or key > best_key:
+                best_key = key
+                best_alias = alias
+        return best_alias
+
+
+_indexes: Dict[str, Tuple[str, float, MerchantAliasIndex]] = {}
+_lock = threading.Lock()
+
+
+def _ttl_seconds() -> int:
+    return int(os.getenv("MERCHANT_ALIAS_INDEX_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+
+
+def get_merchant_alias_index(
+    category_type: str,
+    load: Callable[[], Iterable[Dict[str, Any]]],
+) -> MerchantAliasIndex:
+    """
+    Índice do category_type; `load()` devolve os aliases ativos e só é chamado
+    quando a versão mudou, o TTL venceu ou o processo ainda não tinha o índice.
+    """
+    version = get_data_version(ALIASES_VERSION_KEY)
+    now = time.monotonic()
+    entry = _indexes.get(category_type)
+    if entry is not None and entry[0] == version and now < entry[1]:
+        return entry[2]
+    with _lock:
+        # Outra thread pode ter recompilado enquanto esta esperava
+        entry = _indexes.get(category_type)
+        if entry is not None and entry[0] == version and now < entry[1]:
+            return entry[2]
+        index = MerchantAliasIndex(load())
+        _indexes[category_type] = (version, now + _ttl_seconds(), index)
+        return index
+
+
+def invalidate_merchant_aliases() -> None:
+    """Chamar após criar, alterar ou remover aliases."""
+    bump_data_version(ALIASES_VERSION_KEY)
+
+
+def clear_merchant_alias_indexes() -> None:
+    """Descarta os índices deste processo (testes)."""
+    with _lock:
+        _indexes.clear()
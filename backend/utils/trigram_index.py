@@ -0,0 +1,128 @@
+"""
+Índice de trigramas em memória, compatível com o pg_trgm.
+
+Fallback da busca ranqueada de transações quando a RPC search_transaction_ids
+(database/migrations/017_transactions_trgm_search.sql) não está disponível e
+backend para testes. Mesmas regras do Postgres:
+
+- trigramas por palavra (sequências alfanuméricas em minúsculas), com a
+  palavra acolchoada como "  palavra ";
+- similarity(a, b) = |T(a) ∩ T(b)| / |T(a) ∪ T(b)|; `a % b` se >= 0.3;
+- rank = 1 se o termo aparece como substring (ILIKE) + maior similaridade
+  entre os textos do documento.
+
+Candidatos saem das listas invertidas (trigrama -> documentos), então o custo
+da busca depende dos documentos que compartilham trigramas com o termo, não do
+tamanho total do índice.
+"""
+import re
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+SIMILARITY_THRESHOLD = 0.3  # pg_trgm.similarity_threshold padrão
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def trigrams(text: Optional[str]) -> FrozenSet[str]:
+    """Conjunto de trigramas de show_trgm(text)."""
+    grams: Set[str] = set()
+    for word in _WORD.findall((text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def similarity(a: Optional[str], b: Optional[str]) -> float:
+    return _similarity(trigrams(a), trigrams(b))
+
+
+def _similarity(left: FrozenSet[str], right: FrozenSet[str]) -> float:
+    if not left or not right:
+        return 0.0
+    shared = len(left & right)
+    return shared / (len(left) + len(right) - shared)
+
+
+def _substring_trigrams(term: str) -> Set[str]:
+    """Trigramas internos (sem acolchoamento) que todo texto contendo o termo também tem."""
+    grams: Set[str] = set()
+    for word in _WORD.findall(term):
+        grams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """
+    Documentos: (doc_id, textos, payload, sort_key). O primeiro texto é o
+    principal (o único que entra na aproximação por similaridade, como
+    `description % q` na RPC); os demais só casam por substring.
+    """
+
+    def __init__(self):
+        self._ids: List[Any] = []
+        self._texts: List[Tuple[str, ...]] = []
+        self._grams: List[Tuple[FrozenSet[str], ...]] = []
+        self._payloads: List[Any] = []
+        self._sort_keys: List[Any] = []
+        self._postings: Dict[str, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, doc_id: Any, texts: Sequence[Optional[str]], payload: Any = None, sort_key: Any = None) -> None:
+        position = len(self._ids)
+        lowered = tuple((text or "").lower() for text in texts)
+        grams = tuple(trigrams(text) for text in lowered)
+        self._ids.append(doc_id)
+        self._texts.append(lowered)
+        self._grams.append(grams)
+        self._payloads.append(payload)
+        self._sort_keys.append(sort_key if sort_key is not None else ())
+        for gram in set().union(*grams):
+            self._postings.setdefault(gram, set()).add(position)
+
+    def _candidates(self, term: str, term_grams: FrozenSet[str]) -> Set[int]:
+        inner = _substring_trigrams(term)
+        if inner:
+            # Substring: o documento precisa ter todos os trigramas internos do termo
+            postings = sorted((self._postings.get(gram, set()) for gram in inner), key=len)
+            substring = set(postings[0]).intersection(*postings[1:])
+        else:
+            # Termo curto (< 3 caracteres por palavra): sem trigrama útil, varre tudo
+            substring = set(range(len(self._ids)))
+        # Aproximação: similarity >= limiar exige compartilhar ao menos limiar * |T(termo)| trigramas
+        shared: Dict[int, int] = {}
+        for gram in term_grams:
+            for position in self._postings.get(gram, ()):
+                shared[position] = shared.get(position, 0) + 1
+        minimum = SIMILARITY_THRESHOLD * len(term_grams)
+        return substring | {position for position, count in shared.items() if count >= minimum}
+
+    def search(
+        self,
+        term: str,
+        predicate: Optional[Callable[[Any], bool]] = None,
+    ) -> List[Tuple[float, Any, Any]]:
+        """
+        (rank, doc_id, payload) dos documentos que casam com o termo, do mais
+        relevante para o menos (desempate por sort_key decrescente).
+        predicate(payload) filtra os candidatos antes do ranking.
+        """
+        term = (term or "").strip().lower()
+        if not term:
+            return []
+        term_grams = trigrams(term)
+        results = []
+        for position in self._candidates(term, term_grams):
+            payload = self._payloads[position]
+            if predicate is not None and not predicate(payload):
+                continue
+            texts = self._texts[position]
+            grams = self._grams[position]
+            contains = any(term in text for text in texts)
+            if not contains and _similarity(grams[0], term_grams) < SIMILARITY_THRESHOLD:
+                continue
+            best = max((_similarity(g, term_grams) for g in grams), default=0.0)
+            results.append((position, (1.0 if contains else 0.0) + best))
+        results.sort(key=lambda item: (item[1], self._sort_keys[item[0]]), reverse=True)
+        return [(rank, self._ids[position], self._payloads[position]) for position, rank in results]
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useAuth } from '../../contexts/AuthContext';
-import { transactionsAPI, accountsAPI } from '../../utils/api';
+import { transactionsAPI, accountsAPI, importsAPI } from '../../utils/api';
 
 interface AccountOption {
   id: string;
@@ -24,6 +24,37 @@ interface ImportResult {
 
 type ActiveTab = 'debit' | 'credit_card';
 
+interface ImportJob {
+  id: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  stage?: string;
+  processed: number;
+  total: number;
+  result?: ImportResult | null;
+  result_status?: number | null;
+  error?: string | null;
+}
+
+const IMPORT_JOB_POLL_MS = 1000;
+// Limite do acompanhamento: acima do IMPORT_JOB_STALE_SECONDS do backend (600s) com folga
+const IMPORT_JOB_MAX_POLLS = 15 * 60;
+
+const IMPORT_STAGE_LABELS: Record<string, string> = {
+  queued: 'Na fila de importação...',
+  starting: 'Iniciando importação...',
+  parsing: 'Lendo o arquivo...',
+  categorizing: 'Categorizando transações',
+  deduplicating: 'Verificando duplicadas...',
+  saving: 'Salvando transações...',
+};
+
+const describeImportJob = (job: ImportJob) => {
+  const label = IMPORT_STAGE_LABELS[job.stage || job.status] || 'Processando transações...';
+  return job.stage === 'categorizing' && job.total > 0
+    ? `${label} (${job.processed}/${job.total})...`
+    : label;
+};
+
 const Import = () => {
   const { isAuthenticated, loading: authLoading } = useAuth();
   const [accounts, setAccounts] = useState<AccountOption[]>([]);
@@ -140,8 +171,29 @@ const Import = () => {
       } else {
         // Importação geral (débito)
         setProgressMessage('Processando transações...');
-        const apiResponse = await transactionsAPI.import(selectedFile, selectedAccountId || undefined);
-        response = { data: apiResponse.data as ImportResult };
+        const apiResponse = await transactionsAPI.import(selectedFile, selectedAccountId || undefined, { async: true });
+        if (apiResponse.status === 202 && apiResponse.data?.job_id) {
+          // Importação enfileirada: acompanha o job até terminar
+          let job: ImportJob = apiResponse.data;
+          let polls = 0;
+          while (job.status !== 'succeeded' && job.status !== 'failed') {
+            if (polls >= IMPORT_JOB_MAX_POLLS) {
+              throw new Error('A importação está demorando mais que o esperado. Confira as transações em alguns minutos antes de enviar o arquivo novamente.');
+            }
+            polls += 1;
+            await new Promise((resolve) => setTimeout(resolve, IMPORT_JOB_POLL_MS));
+            job = (await importsAPI.get(apiResponse.data.job_id)).data as ImportJob;
+            setProgressMessage(describeImportJob(job));
+          }
+          if (job.status === 'failed' || (job.result_status ?? 500) >= 400) {
+            throw Object.assign(new Error(job.result?.error as string || job.error || 'Erro ao importar arquivo'), {
+              response: { data: job.result },
+            });
+          }
+          response = { data: job.result as ImportResult };
+        } else {
+          response = { data: apiResponse.data as ImportResult };
+        }
       }
 
       setProgressMessage('Finalizando importação...');
@@ -310,6 +310,7 @@ export const TransactionFilters: FC<TransactionFiltersProps> = ({
                   <option value="amount:desc">Valor (maior)</option>
                   <option value="amount:asc">Valor (menor)</option>
                   <option value="created_at:desc">Criação (mais recente)</option>
+                  <option value="relevance">Relevância (busca)</option>
                 </select>
               </div>
             </div>
@@ -17,6 +17,14 @@ import {
 } from '../../types/transaction';
 import { useTransactionFilters } from '../../hooks/useTransactionFilters';
 
+type TransactionListSummary = {
+  paid_income: number;
+  paid_expense: number;
+  net_paid: number;
+  transaction_count: number;
+  uncategorized_count: number;
+};
+
 const Transactions = () => {
   const { t } = useTranslation();
   const location = useLocation();
@@ -32,14 +40,10 @@ const Transactions = () => {
     accounts: Array<{ id: string; name: string; count: number }>;
     types: Array<{ type: string; count: number }>;
     responsible_persons?: Array<{ name: string; count: number }>;
-    summary?: {
-      paid_income: number;
-      paid_expense: number;
-      net_paid: number;
-      transaction_count: number;
-      uncategorized_count: number;
-    };
+    summary?: TransactionListSummary;
   } | null>(null);
+  // Resumo de todo o filtro devolvido pela própria listagem (independe da página)
+  const [listSummary, setListSummary] = useState<TransactionListSummary | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [showForm, setShowForm] = useState(false);
@@ -117,6 +121,7 @@ const Transactions = () => {
       }
 
       setTransactions(transactionsArray as TransactionRecord[]);
+      setListSummary((transactionsData as any)?.summary ?? null);
 
       // Captura total de resultados para UX
       const pagination = (transactionsData as any)?.pagination;
@@ -344,6 +349,8 @@ const Transactions = () => {
     }
   };
 
+  const summary = listSummary ?? facets?.summary;
+
   // Mostra loading enquanto autenticação está sendo verificada ou dados estão carregando
   if (authLoading || (!transactions.length && loading && isAuthenticated)) {
     return (
@@ -391,9 +398,9 @@ const Transactions = () => {
 
       <section aria-label="Resumo das transações filtradas" className="grid grid-cols-1 gap-3 sm:grid-cols-2 xl:grid-cols-5">
         {[
-          { label: 'Entradas recebidas', value: facets?.summary?.paid_income ?? 0, icon: 'arrow-down-left', valueClass: 'text-emerald-600 dark:text-emerald-400', iconClass: 'bg-emerald-100 text-emerald-600 dark:bg-emerald-900/30 dark:text-emerald-300', hint: 'Receitas pagas no filtro' },
-          { label: 'Total pago', value: facets?.summary?.paid_expense ?? 0, icon: 'check2-circle', valueClass: 'text-blue-600 dark:text-blue-400', iconClass: 'bg-blue-100 text-blue-600 dark:bg-blue-900/30 dark:text-blue-300', hint: 'Despesas efetivadas no filtro' },
-          { label: 'Saldo líquido', value: facets?.summary?.net_paid ?? 0, icon: 'activity', valueClass: (facets?.summary?.net_paid ?? 0) >= 0 ? 'text-emerald-600 dark:text-emerald-400' : 'text-red-600 dark:text-red-400', iconClass: (facets?.summary?.net_paid ?? 0) >= 0 ? 'bg-emerald-100 text-emerald-600 dark:bg-emerald-900/30 dark:text-emerald-300' : 'bg-red-100 text-red-600 dark:bg-red-900/30 dark:text-red-300', hint: 'Entradas menos pagamentos' },
+          { label: 'Entradas recebidas', value: summary?.paid_income ?? 0, icon: 'arrow-down-left', valueClass: 'text-emerald-600 dark:text-emerald-400', iconClass: 'bg-emerald-100 text-emerald-600 dark:bg-emerald-900/30 dark:text-emerald-300', hint: 'Receitas pagas no filtro' },
+          { label: 'Total pago', value: summary?.paid_expense ?? 0, icon: 'check2-circle', valueClass: 'text-blue-600 dark:text-blue-400', iconClass: 'bg-blue-100 text-blue-600 dark:bg-blue-900/30 dark:text-blue-300', hint: 'Despesas efetivadas no filtro' },
+          { label: 'Saldo líquido', value: summary?.net_paid ?? 0, icon: 'activity', valueClass: (summary?.net_paid ?? 0) >= 0 ? 'text-emerald-600 dark:text-emerald-400' : 'text-red-600 dark:text-red-400', iconClass: (summary?.net_paid ?? 0) >= 0 ? 'bg-emerald-100 text-emerald-600 dark:bg-emerald-900/30 dark:text-emerald-300' : 'bg-red-100 text-red-600 dark:bg-red-900/30 dark:text-red-300', hint: 'Entradas menos pagamentos' },
         ].map((item) => (
           <article key={item.label} className="card-base p-4 sm:p-5">
             <div className="flex items-start justify-between gap-3">
@@ -412,12 +419,12 @@ const Transactions = () => {
         ))}
         <article className="card-base p-4 sm:p-5">
           <p className="text-xs font-semibold uppercase tracking-wide text-slate-500 dark:text-slate-400">Transações</p>
-          <p className="mt-2 text-xl font-bold text-slate-900 dark:text-white">{facets?.summary?.transaction_count ?? totalCount ?? 0}</p>
+          <p className="mt-2 text-xl font-bold text-slate-900 dark:text-white">{summary?.transaction_count ?? totalCount ?? 0}</p>
           <p className="mt-2 text-xs text-slate-500 dark:text-slate-400">No período e filtros atuais</p>
         </article>
         <article className="card-base border-amber-200 p-4 sm:p-5 dark:border-amber-800/50">
           <p className="text-xs font-semibold uppercase tracking-wide text-amber-700 dark:text-amber-300">Revisar categoria</p>
-          <p className="mt-2 text-xl font-bold text-amber-700 dark:text-amber-300">{facets?.summary?.uncategorized_count ?? 0}</p>
+          <p className="mt-2 text-xl font-bold text-amber-700 dark:text-amber-300">{summary?.uncategorized_count ?? 0}</p>
           <p className="mt-2 text-xs text-slate-500 dark:text-slate-400">Sem classificação confiável</p>
         </article>
       </section>
@@ -313,16 +313,27 @@ export const transactionsAPI = {
   create: (transactionData: any) => api.post('/transactions', transactionData),
   update: (id: string, transactionData: any) => api.put(`/transactions/${id}`, transactionData),
   delete: (id: string) => api.delete(`/transactions/${id}`),
-  import: (csvFile: File, accountId?: string) => {
+  bulk: (action: 'recategorize' | 'status' | 'delete', ids: string[], data: { category_id?: string | null; status?: string } = {}) =>
+    api.post('/transactions/bulk', { action, ids, ...data }),
+  import: (csvFile: File, accountId?: string, options: { async?: boolean } = {}) => {
     const formData = new FormData();
     formData.append('file', csvFile);
     if (accountId) {
       formData.append('account_id', accountId);
     }
+    if (options.async) {
+      // Responde 202 com job_id; acompanhar em importsAPI.get
+      formData.append('mode', 'async');
+    }
     return api.post('/transactions/import', formData, formDataPostConfig);
   },
 };
 
+// Importações assíncronas (status/progresso do job)
+export const importsAPI = {
+  get: (jobId: string) => api.get(`/imports/${jobId}`),
+};
+
 // Funções de relatórios
 export const reportsAPI = {
   getOverview: (params: ReportOverviewParams) => {
@@ -0,0 +1,172 @@
+-- =============================================================================
+-- Migration: 20261018000001_transaction_monthly_aggregates
+-- Description:
+--   transaction_monthly_aggregates: agregado mensal mantido incrementalmente
+--   por (tenant_id, user_id, period, category_id, account_id, type, status).
+--   O dashboard e os relatórios (overview/comparison/evolution) lêem esta
+--   tabela em vez de varrer todas as transações do período a cada request.
+--
+--   - period: primeiro dia do mês (date) — permite filtrar intervalos de meses
+--     com gte/lte no PostgREST.
+--   - Só entram transações canônicas (source_file terminando em .ofx), igual a
+--     TransactionRepository.CANONICAL_SOURCE_PATTERN usado pelos relatórios.
+--   - Escrita: backend/services/transaction_service.py envia deltas (+/-) via
+--     apply_transaction_aggregate_deltas(jsonb) em create/update/delete/import.
+--   - Reparo: rebuild_transaction_monthly_aggregates(tenant_id) recalcula do zero
+--     (NULL = todos os tenants). Executado no fim desta migration (backfill).
+--
+-- COMO APLICAR: supabase db push, ou colar no SQL Editor.
+-- PRÉ-REQUISITO: transactions.source_file (20260726000004). Postgres 15+
+--   (UNIQUE NULLS NOT DISTINCT — category_id/account_id podem ser NULL).
+-- IDEMPOTÊNCIA: IF NOT EXISTS / CREATE OR REPLACE; o backfill recria as linhas.
+--
+-- ROLLBACK:
+--   DROP FUNCTION IF EXISTS public.rebuild_transaction_monthly_aggregates(uuid);
+--   DROP FUNCTION IF EXISTS public.apply_transaction_aggregate_deltas(jsonb);
+--   DROP TABLE IF EXISTS public.transaction_monthly_aggregates;
+-- =============================================================================
+
+BEGIN;
+
+SET client_min_messages = warning;
+
+CREATE TABLE IF NOT EXISTS public.transaction_monthly_aggregates (
+    tenant_id uuid NOT NULL,
+    user_id uuid NOT NULL,
+    period date NOT NULL,
+    category_id uuid,
+    account_id uuid,
+    type character varying(20) NOT NULL,
+    status character varying(20) NOT NULL,
+    total numeric(15,2) NOT NULL DEFAULT 0,
+    tx_count integer NOT NULL DEFAULT 0,
+    updated_at timestamp with time zone DEFAULT now(),
+    CONSTRAINT transaction_monthly_aggregates_period_first_day
+        CHECK (EXTRACT(DAY FROM period) = 1),
+    CONSTRAINT transaction_monthly_aggregates_key
+        UNIQUE NULLS NOT DISTINCT (tenant_id, user_id, period, category_id, account_id, type, status)
+);
+
+CREATE INDEX IF NOT EXISTS idx_transaction_monthly_aggregates_user_period
+    ON public.transaction_monthly_aggregates (tenant_id, user_id, period);
+
+COMMENT ON TABLE public.transaction_monthly_aggregates IS
+    'Agregado mensal incremental de transações canônicas (.ofx). Mantido pelo backend via apply_transaction_aggregate_deltas.';
+
+-- -----------------------------------------------------------------------------
+-- apply_transaction_aggregate_deltas(p_deltas jsonb)
+--   p_deltas: [{tenant_id, user_id, period, category_id, account_id, type,
+--               status, total, tx_count}, ...] — total/tx_count podem ser
+--   negativos (remoção). Linhas desta chamada que chegam a tx_count <= 0
+--   são apagadas (só as chaves recebidas, nunca a tabela inteira).
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.apply_transaction_aggregate_deltas(p_deltas jsonb)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_rows integer := 0;
+    v_emptied jsonb;
+BEGIN
+    -- Upsert dos deltas; RETURNING devolve só as chaves tocadas nesta chamada,
+    -- e as que zeraram são apagadas abaixo (sem varrer a tabela toda).
+    WITH upserted AS (
+        INSERT INTO public.transaction_monthly_aggregates AS agg
+            (tenant_id, user_id, period, category_id, account_id, type, status, total, tx_count, updated_at)
+        SELECT d.tenant_id, d.user_id, d.period, d.category_id, d.account_id, d.type, d.status,
+               SUM(d.total), SUM(d.tx_count), now()
+        FROM jsonb_to_recordset(COALESCE(p_deltas, '[]'::jsonb)) AS d(
+            tenant_id uuid, user_id uuid, period date, category_id uuid, account_id uuid,
+            type text, status text, total numeric, tx_count integer
+        )
+        GROUP BY d.tenant_id, d.user_id, d.period, d.category_id, d.account_id, d.type, d.status
+        ON CONFLICT ON CONSTRAINT transaction_monthly_aggregates_key DO UPDATE
+            SET total = agg.total + EXCLUDED.total,
+                tx_count = agg.tx_count + EXCLUDED.tx_count,
+                updated_at = now()
+        RETURNING agg.tenant_id, agg.user_id, agg.period, agg.category_id, agg.account_id,
+                  agg.type, agg.status, agg.tx_count
+    )
+    SELECT count(*),
+           COALESCE(
+               jsonb_agg(jsonb_build_object(
+                   'tenant_id', u.tenant_id, 'user_id', u.user_id, 'period', u.period,
+                   'category_id', u.category_id, 'account_id', u.account_id,
+                   'type', u.type, 'status', u.status
+               )) FILTER (WHERE u.tx_count <= 0),
+               '[]'::jsonb
+           )
+    INTO v_rows, v_emptied
+    FROM upserted AS u;
+
+    IF jsonb_array_length(v_emptied) > 0 THEN
+        DELETE FROM public.transaction_monthly_aggregates AS agg
+        USING jsonb_to_recordset(v_emptied) AS e(
+            tenant_id uuid, user_id uuid, period date, category_id uuid, account_id uuid,
+            type text, status text
+        )
+        WHERE agg.tenant_id = e.tenant_id
+          AND agg.user_id = e.user_id
+          AND agg.period = e.period
+          AND agg.category_id IS NOT DISTINCT FROM e.category_id
+          AND agg.account_id IS NOT DISTINCT FROM e.account_id
+          AND agg.type = e.type
+          AND agg.status = e.status
+          AND agg.tx_count <= 0;
+    END IF;
+
+    RETURN v_rows;
+END;
+$$;
+
+-- -----------------------------------------------------------------------------
+-- rebuild_transaction_monthly_aggregates(p_tenant_id uuid)
+--   Recalcula o agregado a partir de public.transactions (NULL = todos).
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.rebuild_transaction_monthly_aggregates(p_tenant_id uuid DEFAULT NULL)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_rows integer := 0;
+BEGIN
+    DELETE FROM public.transaction_monthly_aggregates
+    WHERE p_tenant_id IS NULL OR tenant_id = p_tenant_id;
+
+    INSERT INTO public.transaction_monthly_aggregates
+        (tenant_id, user_id, period, category_id, account_id, type, status, total, tx_count, updated_at)
+    SELECT t.tenant_id, t.user_id, date_trunc('month', t.date)::date, t.category_id, t.account_id,
+           t.type, COALESCE(t.status, 'pending'), SUM(t.amount), COUNT(*), now()
+    FROM public.transactions t
+    WHERE t.source_file ILIKE '%.ofx'
+      AND (p_tenant_id IS NULL OR t.tenant_id = p_tenant_id)
+    GROUP BY t.tenant_id, t.user_id, date_trunc('month', t.date)::date, t.category_id, t.account_id,
+             t.type, COALESCE(t.status, 'pending');
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$;
+
+ALTER TABLE public.transaction_monthly_aggregates ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS transaction_monthly_aggregates_tenant_policy_select ON public.transaction_monthly_aggregates;
+
+-- Só leitura para authenticated; a escrita é feita pelo backend (service role).
+CREATE POLICY transaction_monthly_aggregates_tenant_policy_select ON public.transaction_monthly_aggregates
+    FOR SELECT
+    TO authenticated
+    USING (
+        auth.uid() = user_id
+        AND EXISTS (
+            SELECT 1
+            FROM public.tenant_members tm
+            WHERE tm.tenant_id = tenant_id
+              AND tm.user_id = auth.uid()
+        )
+    );
+
+-- Backfill do histórico existente.
+SELECT public.rebuild_transaction_monthly_aggregates(NULL);
+
+COMMIT;
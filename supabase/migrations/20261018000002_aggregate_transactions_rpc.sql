@@ -0,0 +1,74 @@
+-- =============================================================================
+-- Migration: 20261018000002_aggregate_transactions_rpc
+-- Description:
+--   aggregate_transactions(...): GROUP BY de transações no Postgres para os
+--   relatórios (overview/comparison/evolution/dashboard), em vez de trafegar
+--   todas as linhas do mês em JSON e somar em Python.
+--
+--   - p_group_by: subconjunto de {period, category_id, account_id, type, status}.
+--     Dimensões fora da lista voltam NULL e não participam do agrupamento
+--     (CASE estático — sem SQL dinâmico, sem risco de injeção).
+--   - p_status / p_type / p_account_id: filtros opcionais (NULL = todos).
+--   - Intervalo [p_start, p_end), mesma semântica de find_by_user_and_date_range.
+--   - Só transações canônicas (source_file terminando em .ofx).
+--
+--   Usada por TransactionRepository.aggregate_by_period
+--   (backend/services/aggregation_backend.py — SqlPushdownBackend).
+--
+-- COMO APLICAR: supabase db push, ou colar no SQL Editor.
+-- IDEMPOTÊNCIA: CREATE OR REPLACE.
+--
+-- ROLLBACK:
+--   DROP FUNCTION IF EXISTS public.aggregate_transactions(uuid, uuid, date, date, text[], text, text, uuid);
+-- =============================================================================
+
+BEGIN;
+
+SET client_min_messages = warning;
+
+CREATE OR REPLACE FUNCTION public.aggregate_transactions(
+    p_user_id uuid,
+    p_tenant_id uuid,
+    p_start date,
+    p_end date,
+    p_group_by text[],
+    p_status text DEFAULT NULL,
+    p_type text DEFAULT NULL,
+    p_account_id uuid DEFAULT NULL
+)
+RETURNS TABLE (
+    period date,
+    category_id uuid,
+    account_id uuid,
+    type text,
+    status text,
+    total numeric,
+    tx_count bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        CASE WHEN 'period' = ANY (p_group_by) THEN date_trunc('month', t.date)::date END,
+        CASE WHEN 'category_id' = ANY (p_group_by) THEN t.category_id END,
+        CASE WHEN 'account_id' = ANY (p_group_by) THEN t.account_id END,
+        CASE WHEN 'type' = ANY (p_group_by) THEN t.type::text END,
+        CASE WHEN 'status' = ANY (p_group_by) THEN t.status::text END,
+        SUM(t.amount),
+        COUNT(*)
+    FROM public.transactions t
+    WHERE t.user_id = p_user_id
+      AND (p_tenant_id IS NULL OR t.tenant_id = p_tenant_id)
+      AND t.date >= p_start
+      AND t.date < p_end
+      AND t.source_file ILIKE '%.ofx'
+      AND (p_status IS NULL OR t.status = p_status)
+      AND (p_type IS NULL OR t.type = p_type)
+      AND (p_account_id IS NULL OR t.account_id = p_account_id)
+    GROUP BY 1, 2, 3, 4, 5;
+$$;
+
+COMMENT ON FUNCTION public.aggregate_transactions(uuid, uuid, date, date, text[], text, text, uuid) IS
+    'GROUP BY de transações canônicas para relatórios. Ver backend/services/aggregation_backend.py.';
+
+COMMIT;
@@ -0,0 +1,104 @@
+-- =============================================================================
+-- Migration: 20261018000003_transaction_facets_rpc
+-- Description:
+--   transaction_facets(...): facetas da tela de transações (categorias, contas,
+--   responsáveis, tipo x status e total) calculadas com GROUPING SETS no
+--   Postgres, em vez de trazer até 5000 linhas e contar em Python.
+--
+--   - Filtros espelham TransactionRepository._compile_advanced_filters
+--     (mesmos filtros de find_advanced); NULL = sem filtro.
+--   - Intervalo de datas: p_date_gte <= date, date <= p_date_lte, date < p_date_lt.
+--   - p_search é o padrão ILIKE já montado ('%texto%'), aplicado em description,
+--     merchant_name (via to_jsonb, coluna opcional) e notes.
+--   - Só transações canônicas (source_file terminando em .ofx).
+--   - Linhas: facet in ('category','account','responsible_person','type_status','total'),
+--     key (id/nome da faceta; NULL = sem categoria/conta/responsável),
+--     type/status (só em type_status), total (SUM(amount)) e tx_count.
+--
+--   Usada por TransactionRepository.facet_counts (GET /api/transactions/facets).
+--
+-- COMO APLICAR: supabase db push, ou colar no SQL Editor.
+-- IDEMPOTÊNCIA: CREATE OR REPLACE.
+--
+-- ROLLBACK:
+--   DROP FUNCTION IF EXISTS public.transaction_facets(uuid, uuid, date, date, date, text[], uuid[], uuid[], text[], numeric, numeric, boolean, text);
+-- =============================================================================
+
+BEGIN;
+
+SET client_min_messages = warning;
+
+CREATE OR REPLACE FUNCTION public.transaction_facets(
+    p_user_id uuid,
+    p_tenant_id uuid DEFAULT NULL,
+    p_date_gte date DEFAULT NULL,
+    p_date_lte date DEFAULT NULL,
+    p_date_lt date DEFAULT NULL,
+    p_types text[] DEFAULT NULL,
+    p_account_ids uuid[] DEFAULT NULL,
+    p_category_ids uuid[] DEFAULT NULL,
+    p_statuses text[] DEFAULT NULL,
+    p_min_amount numeric DEFAULT NULL,
+    p_max_amount numeric DEFAULT NULL,
+    p_is_recurring boolean DEFAULT NULL,
+    p_search text DEFAULT NULL
+)
+RETURNS TABLE (
+    facet text,
+    key text,
+    type text,
+    status text,
+    total numeric,
+    tx_count bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH filtered AS (
+        SELECT t.category_id, t.account_id, t.responsible_person, t.type::text AS type, t.status::text AS status, t.amount
+        FROM public.transactions t
+        WHERE t.user_id = p_user_id
+          AND (p_tenant_id IS NULL OR t.tenant_id = p_tenant_id)
+          AND t.source_file ILIKE '%.ofx'
+          AND (p_date_gte IS NULL OR t.date >= p_date_gte)
+          AND (p_date_lte IS NULL OR t.date <= p_date_lte)
+          AND (p_date_lt IS NULL OR t.date < p_date_lt)
+          AND (p_types IS NULL OR t.type = ANY (p_types))
+          AND (p_account_ids IS NULL OR t.account_id = ANY (p_account_ids))
+          AND (p_category_ids IS NULL OR t.category_id = ANY (p_category_ids))
+          AND (p_statuses IS NULL OR t.status = ANY (p_statuses))
+          AND (p_min_amount IS NULL OR t.amount >= p_min_amount)
+          AND (p_max_amount IS NULL OR t.amount <= p_max_amount)
+          AND (p_is_recurring IS NULL OR t.is_recurring = p_is_recurring)
+          AND (
+              p_search IS NULL
+              OR t.description ILIKE p_search
+              OR (to_jsonb(t) ->> 'merchant_name') ILIKE p_search
+              OR t.notes ILIKE p_search
+          )
+    )
+    SELECT
+        CASE
+            WHEN GROUPING(f.category_id) = 0 THEN 'category'
+            WHEN GROUPING(f.account_id) = 0 THEN 'account'
+            WHEN GROUPING(f.responsible_person) = 0 THEN 'responsible_person'
+            WHEN GROUPING(f.type) = 0 THEN 'type_status'
+            ELSE 'total'
+        END AS facet,
+        CASE
+            WHEN GROUPING(f.category_id) = 0 THEN f.category_id::text
+            WHEN GROUPING(f.account_id) = 0 THEN f.account_id::text
+            WHEN GROUPING(f.responsible_person) = 0 THEN f.responsible_person::text
+        END AS key,
+        f.type,
+        f.status,
+        SUM(f.amount) AS total,
+        COUNT(*) AS tx_count
+    FROM filtered f
+    GROUP BY GROUPING SETS ((f.category_id), (f.account_id), (f.responsible_person), (f.type, f.status), ());
+$$;
+
+COMMENT ON FUNCTION public.transaction_facets(uuid, uuid, date, date, date, text[], uuid[], uuid[], text[], numeric, numeric, boolean, text) IS
+    'Facetas exatas da listagem de transações. Ver TransactionRepository.facet_counts.';
+
+COMMIT;
@@ -0,0 +1,258 @@
+-- =============================================================================
+-- Migration: 20261018000004_transactions_is_canonical
+-- Description:
+--   transactions.is_canonical: flag persistida de "transação canônica"
+--   (source_file terminando em .ofx), para trocar o predicado
+--   `source_file ILIKE '%.ofx'` — curinga à esquerda, que nenhum índice atende —
+--   por `is_canonical = true` nas queries mais quentes do backend.
+--
+--   - Mantida na escrita: o backend envia is_canonical em create/create_many
+--     (TransactionRepository) e o trigger recalcula em INSERT/UPDATE de
+--     source_file (cobre escritas fora do backend).
+--   - Backfill das linhas existentes.
+--   - Índice composto (tenant_id, user_id, is_canonical, date DESC): listagem,
+--     intervalo de datas, keyset e últimas transações.
+--   - aggregate_transactions, transaction_facets e search_transaction_ids
+--     (busca ranqueada, backend/database/migrations/017) passam a filtrar pela flag.
+--
+--   Depois de aplicar, ligar TRANSACTIONS_CANONICAL_COLUMN=true no backend para
+--   que as queries usem a coluna (padrão false = ILIKE, seguro antes da migration).
+--
+-- COMO APLICAR: supabase db push, ou colar no SQL Editor.
+-- IDEMPOTÊNCIA: IF NOT EXISTS / CREATE OR REPLACE / DROP TRIGGER IF EXISTS.
+--
+-- ROLLBACK:
+--   (reaplicar 20261018000002, 20261018000003 e backend/database/migrations/017
+--    para restaurar as funções com ILIKE; 017 só depois de remover a coluna)
+--   DROP TRIGGER IF EXISTS trg_transactions_is_canonical ON public.transactions;
+--   DROP FUNCTION IF EXISTS public.transactions_set_is_canonical();
+--   DROP INDEX IF EXISTS idx_transactions_tenant_user_canonical_date;
+--   ALTER TABLE public.transactions DROP COLUMN IF EXISTS is_canonical;
+-- =============================================================================
+
+BEGIN;
+
+SET client_min_messages = warning;
+
+-- DEFAULT constante: sem reescrita da tabela (Postgres 11+)
+ALTER TABLE public.transactions
+    ADD COLUMN IF NOT EXISTS is_canonical boolean NOT NULL DEFAULT false;
+
+COMMENT ON COLUMN public.transactions.is_canonical IS
+    'true quando source_file termina em .ofx (case-insensitive). Mantida por trg_transactions_is_canonical.';
+
+CREATE OR REPLACE FUNCTION public.transactions_set_is_canonical()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.is_canonical := COALESCE(lower(NEW.source_file) LIKE '%.ofx', false);
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_transactions_is_canonical ON public.transactions;
+
+CREATE TRIGGER trg_transactions_is_canonical
+    BEFORE INSERT OR UPDATE OF source_file ON public.transactions
+    FOR EACH ROW
+    EXECUTE FUNCTION public.transactions_set_is_canonical();
+
+-- Backfill (só as linhas que mudam)
+UPDATE public.transactions
+SET is_canonical = true
+WHERE source_file ILIKE '%.ofx'
+  AND is_canonical = false;
+
+CREATE INDEX IF NOT EXISTS idx_transactions_tenant_user_canonical_date
+    ON public.transactions (tenant_id, user_id, is_canonical, date DESC);
+
+-- -----------------------------------------------------------------------------
+-- RPCs de relatório/facetas: mesmo contrato, predicado indexável
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.aggregate_transactions(
+    p_user_id uuid,
+    p_tenant_id uuid,
+    p_start date,
+    p_end date,
+    p_group_by text[],
+    p_status text DEFAULT NULL,
+    p_type text DEFAULT NULL,
+    p_account_id uuid DEFAULT NULL
+)
+RETURNS TABLE (
+    period date,
+    category_id uuid,
+    account_id uuid,
+    type text,
+    status text,
+    total numeric,
+    tx_count bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        CASE WHEN 'period' = ANY (p_group_by) THEN date_trunc('month', t.date)::date END,
+        CASE WHEN 'category_id' = ANY (p_group_by) THEN t.category_id END,
+        CASE WHEN 'account_id' = ANY (p_group_by) THEN t.account_id END,
+        CASE WHEN 'type' = ANY (p_group_by) THEN t.type::text END,
+        CASE WHEN 'status' = ANY (p_group_by) THEN t.status::text END,
+        SUM(t.amount),
+        COUNT(*)
+    FROM public.transactions t
+    WHERE t.user_id = p_user_id
+      AND (p_tenant_id IS NULL OR t.tenant_id = p_tenant_id)
+      AND t.date >= p_start
+      AND t.date < p_end
+      AND t.is_canonical
+      AND (p_status IS NULL OR t.status = p_status)
+      AND (p_type IS NULL OR t.type = p_type)
+      AND (p_account_id IS NULL OR t.account_id = p_account_id)
+    GROUP BY 1, 2, 3, 4, 5;
+$$;
+
+CREATE OR REPLACE FUNCTION public.transaction_facets(
+    p_user_id uuid,
+    p_tenant_id uuid DEFAULT NULL,
+    p_date_gte date DEFAULT NULL,
+    p_date_lte date DEFAULT NULL,
+    p_date_lt date DEFAULT NULL,
+    p_types text[] DEFAULT NULL,
+    p_account_ids uuid[] DEFAULT NULL,
+    p_category_ids uuid[] DEFAULT NULL,
+    p_statuses text[] DEFAULT NULL,
+    p_min_amount numeric DEFAULT NULL,
+    p_max_amount numeric DEFAULT NULL,
+    p_is_recurring boolean DEFAULT NULL,
+    p_search text DEFAULT NULL
+)
+RETURNS TABLE (
+    facet text,
+    key text,
+    type text,
+    status text,
+    total numeric,
+    tx_count bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH filtered AS (
+        SELECT t.category_id, t.account_id, t.responsible_person, t.type::text AS type, t.status::text AS status, t.amount
+        FROM public.transactions t
+        WHERE t.user_id = p_user_id
+          AND (p_tenant_id IS NULL OR t.tenant_id = p_tenant_id)
+          AND t.is_canonical
+          AND (p_date_gte IS NULL OR t.date >= p_date_gte)
+          AND (p_date_lte IS NULL OR t.date <= p_date_lte)
+          AND (p_date_lt IS NULL OR t.date < p_date_lt)
+          AND (p_types IS NULL OR t.type = ANY (p_types))
+          AND (p_account_ids IS NULL OR t.account_id = ANY (p_account_ids))
+          AND (p_category_ids IS NULL OR t.category_id = ANY (p_category_ids))
+          AND (p_statuses IS NULL OR t.status = ANY (p_statuses))
+          AND (p_min_amount IS NULL OR t.amount >= p_min_amount)
+          AND (p_max_amount IS NULL OR t.amount <= p_max_amount)
+          AND (p_is_recurring IS NULL OR t.is_recurring = p_is_recurring)
+          AND (
+              p_search IS NULL
+              OR t.description ILIKE p_search
+              OR (to_jsonb(t) ->> 'merchant_name') ILIKE p_search
+              OR t.notes ILIKE p_search
+          )
+    )
+    SELECT
+        CASE
+            WHEN GROUPING(f.category_id) = 0 THEN 'category'
+            WHEN GROUPING(f.account_id) = 0 THEN 'account'
+            WHEN GROUPING(f.responsible_person) = 0 THEN 'responsible_person'
+            WHEN GROUPING(f.type) = 0 THEN 'type_status'
+            ELSE 'total'
+        END AS facet,
+        CASE
+            WHEN GROUPING(f.category_id) = 0 THEN f.category_id::text
+            WHEN GROUPING(f.account_id) = 0 THEN f.account_id::text
+            WHEN GROUPING(f.responsible_person) = 0 THEN f.responsible_person::text
+        END AS key,
+        f.type,
+        f.status,
+        SUM(f.amount) AS total,
+        COUNT(*) AS tx_count
+    FROM filtered f
+    GROUP BY GROUPING SETS ((f.category_id), (f.account_id), (f.responsible_person), (f.type, f.status), ());
+$$;
+
+-- -----------------------------------------------------------------------------
+-- search_transaction_ids: mesma busca ranqueada de backend/database/migrations/017,
+-- filtrando pela flag. pg_trgm é exigido pelo corpo (similarity, operador %).
+-- -----------------------------------------------------------------------------
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE OR REPLACE FUNCTION public.search_transaction_ids(
+    p_user_id uuid,
+    p_tenant_id uuid,
+    p_query text,
+    p_date_gte date DEFAULT NULL,
+    p_date_lte date DEFAULT NULL,
+    p_date_lt date DEFAULT NULL,
+    p_types text[] DEFAULT NULL,
+    p_account_ids uuid[] DEFAULT NULL,
+    p_category_ids uuid[] DEFAULT NULL,
+    p_statuses text[] DEFAULT NULL,
+    p_min_amount numeric DEFAULT NULL,
+    p_max_amount numeric DEFAULT NULL,
+    p_is_recurring boolean DEFAULT NULL,
+    p_limit integer DEFAULT 50,
+    p_offset integer DEFAULT 0
+)
+RETURNS TABLE (
+    id uuid,
+    search_rank real,
+    total_count bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH term AS (
+        SELECT
+            btrim(p_query) AS q,
+            '%' || replace(replace(replace(btrim(p_query), '\', '\\'), '%', '\%'), '_', '\_') || '%' AS pattern
+    ),
+    matched AS (
+        SELECT
+            t.id,
+            t.date,
+            (
+                CASE WHEN t.description ILIKE term.pattern OR t.notes ILIKE term.pattern THEN 1 ELSE 0 END
+                + GREATEST(similarity(coalesce(t.description, ''), term.q), similarity(coalesce(t.notes, ''), term.q))
+            )::real AS search_rank
+        FROM public.transactions t, term
+        WHERE t.user_id = p_user_id
+          AND (p_tenant_id IS NULL OR t.tenant_id = p_tenant_id)
+          AND t.is_canonical
+          AND (
+              t.description ILIKE term.pattern
+              OR t.notes ILIKE term.pattern
+              OR t.description % term.q
+          )
+          AND (p_date_gte IS NULL OR t.date >= p_date_gte)
+          AND (p_date_lte IS NULL OR t.date <= p_date_lte)
+          AND (p_date_lt IS NULL OR t.date < p_date_lt)
+          AND (p_types IS NULL OR t.type = ANY (p_types))
+          AND (p_account_ids IS NULL OR t.account_id = ANY (p_account_ids))
+          AND (p_category_ids IS NULL OR t.category_id = ANY (p_category_ids))
+          AND (p_statuses IS NULL OR t.status = ANY (p_statuses))
+          AND (p_min_amount IS NULL OR t.amount >= p_min_amount)
+          AND (p_max_amount IS NULL OR t.amount <= p_max_amount)
+          AND (p_is_recurring IS NULL OR t.is_recurring = p_is_recurring)
+    )
+    SELECT m.id, m.search_rank, COUNT(*) OVER () AS total_count
+    FROM matched m
+    ORDER BY m.search_rank DESC, m.date DESC, m.id DESC
+    LIMIT p_limit OFFSET p_offset;
+$$;
+
+COMMENT ON FUNCTION public.search_transaction_ids(uuid, uuid, text, date, date, date, text[], uuid[], uuid[], text[], numeric, numeric, boolean, integer, integer) IS
+    'Busca ranqueada (pg_trgm) de transações. Ver TransactionRepository._find_advanced_ranked.';
+
+COMMIT;
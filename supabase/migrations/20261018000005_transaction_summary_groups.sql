@@ -0,0 +1,85 @@
+-- =============================================================================
+-- Migration: 20261018000005_transaction_summary_groups
+-- Description:
+--   transaction_summary_groups(...): resumo da listagem de transações
+--   (entradas/saídas pagas, saldo, total e sem categoria) calculado sobre TODO o
+--   conjunto filtrado, não só sobre a página carregada.
+--
+--   - Mesmos parâmetros e filtros de transaction_facets (espelham
+--     TransactionRepository._compile_advanced_filters); NULL = sem filtro.
+--   - Só transações canônicas (is_canonical).
+--   - Linhas: type, status, category_id (NULL = sem categoria), total (SUM(amount))
+--     e tx_count. Poucas linhas mesmo com muitas transações.
+--
+--   Usada por TransactionRepository.summary_groups (GET /api/transactions, campo
+--   summary) quando o filtro não cabe no agregado mensal.
+--
+-- COMO APLICAR: supabase db push, ou colar no SQL Editor (depois de 20261018000004).
+-- IDEMPOTÊNCIA: CREATE OR REPLACE.
+--
+-- ROLLBACK:
+--   DROP FUNCTION IF EXISTS public.transaction_summary_groups(uuid, uuid, date, date, date, text[], uuid[], uuid[], text[], numeric, numeric, boolean, text);
+-- =============================================================================
+
+BEGIN;
+
+SET client_min_messages = warning;
+
+CREATE OR REPLACE FUNCTION public.transaction_summary_groups(
+    p_user_id uuid,
+    p_tenant_id uuid DEFAULT NULL,
+    p_date_gte date DEFAULT NULL,
+    p_date_lte date DEFAULT NULL,
+    p_date_lt date DEFAULT NULL,
+    p_types text[] DEFAULT NULL,
+    p_account_ids uuid[] DEFAULT NULL,
+    p_category_ids uuid[] DEFAULT NULL,
+    p_statuses text[] DEFAULT NULL,
+    p_min_amount numeric DEFAULT NULL,
+    p_max_amount numeric DEFAULT NULL,
+    p_is_recurring boolean DEFAULT NULL,
+    p_search text DEFAULT NULL
+)
+RETURNS TABLE (
+    type text,
+    status text,
+    category_id uuid,
+    total numeric,
+    tx_count bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        t.type::text,
+        t.status::text,
+        t.category_id,
+        SUM(t.amount),
+        COUNT(*)
+    FROM public.transactions t
+    WHERE t.user_id = p_user_id
+      AND (p_tenant_id IS NULL OR t.tenant_id = p_tenant_id)
+      AND t.is_canonical
+      AND (p_date_gte IS NULL OR t.date >= p_date_gte)
+      AND (p_date_lte IS NULL OR t.date <= p_date_lte)
+      AND (p_date_lt IS NULL OR t.date < p_date_lt)
+      AND (p_types IS NULL OR t.type = ANY (p_types))
+      AND (p_account_ids IS NULL OR t.account_id = ANY (p_account_ids))
+      AND (p_category_ids IS NULL OR t.category_id = ANY (p_category_ids))
+      AND (p_statuses IS NULL OR t.status = ANY (p_statuses))
+      AND (p_min_amount IS NULL OR t.amount >= p_min_amount)
+      AND (p_max_amount IS NULL OR t.amount <= p_max_amount)
+      AND (p_is_recurring IS NULL OR t.is_recurring = p_is_recurring)
+      AND (
+          p_search IS NULL
+          OR t.description ILIKE p_search
+          OR (to_jsonb(t) ->> 'merchant_name') ILIKE p_search
+          OR t.notes ILIKE p_search
+      )
+    GROUP BY 1, 2, 3;
+$$;
+
+COMMENT ON FUNCTION public.transaction_summary_groups(uuid, uuid, date, date, date, text[], uuid[], uuid[], text[], numeric, numeric, boolean, text) IS
+    'Resumo (tipo x status x categoria) do filtro da listagem. Ver TransactionRepository.summary_groups.';
+
+COMMIT;